@@ -2,6 +2,8 @@ import logging
 import json
 import os
 import azure.functions as func
+from utils.job_queue import JobQueue
+from utils.run_coordinator import run_stage
 from utils.dcpd.class_contracts_data import Contract
 
 
@@ -16,9 +18,22 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
             config = json.load(config_file)
 
         conf_env = config.get("conf.env", "azure-adls")
+
+        # Async job mode: POST enqueues a run, GET with job_id reports status
+        job_id = req.params.get("job_id")
+        if config.get("jobs", {}).get("enable", False) and (
+                req.method.upper() == "POST" or job_id):
+            try:
+                params = req.get_json()
+            except ValueError:
+                params = {}
+            body, status_code = JobQueue.from_config(config).handle_request(
+                req.method, "contracts", params, job_id)
+            return func.HttpResponse(
+                body, status_code=status_code, mimetype="application/json")
         # Create an instance of InstallBase and call main_install
         obj = Contract(conf_env,config)
-        result = obj.main_contracts()
+        result = run_stage(config, "contracts", obj.main_contracts)
 
         return func.HttpResponse(f"Function result: {result}", mimetype="text/plain")
     except Exception as e:
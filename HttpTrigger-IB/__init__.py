@@ -2,6 +2,8 @@ import logging
 import json
 import os
 import azure.functions as func
+from utils.job_queue import JobQueue
+from utils.run_coordinator import run_stage
 from utils.dcpd.class_installbase import InstallBase
 
 
@@ -15,12 +17,26 @@ def main(req: func.HttpRequest) -> func.HttpResponse:
         with open(config_file, 'r') as config_file:
             config = json.load(config_file)
         #logging.info(f'config file: {config}')
+
+        # Async job mode: POST enqueues a run, GET with job_id reports status
+        job_id = req.params.get("job_id")
+        if config.get("jobs", {}).get("enable", False) and (
+                req.method.upper() == "POST" or job_id):
+            try:
+                params = req.get_json()
+            except ValueError:
+                params = {}
+            body, status_code = JobQueue.from_config(config).handle_request(
+                req.method, "install_base", params, job_id)
+            return func.HttpResponse(
+                body, status_code=status_code, mimetype="application/json")
+
         conf_env = config.get("conf.env", "azure-adls")
         # Create an instance of InstallBase and call main_install
         logging.info(f'mode:{conf_env}\n')
         obj = InstallBase(conf_env,config)
         logging.info('before calling main_install')
-        result = obj.main_install()
+        result = run_stage(config, "install_base", obj.main_install)
 
         return func.HttpResponse(f"Function result: {result}")
     except Exception as e:
@@ -0,0 +1,32 @@
+import datetime
+import logging
+import json
+import os
+import azure.functions as func
+from utils.job_queue import JobQueue, get_pipelines
+
+
+def main(mytimer: func.TimerRequest) -> None:
+    utc_timestamp = (
+        datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
+    )
+    logging.info("Python timer trigger function ran at %s", utc_timestamp)
+
+    config_dir = os.path.join(os.path.dirname(__file__), "../config")
+    config_file = os.path.join(config_dir, "config_dcpd.json")
+    try:
+        # Read the configuration file
+        with open(config_file, "r") as config_file:
+            config = json.load(config_file)
+
+        if not config.get("jobs", {}).get("enable", False):
+            return "Jobs disabled"
+
+        # Run jobs queued by HTTP triggers
+        ls_jobs = JobQueue.from_config(config).run_pending(
+            get_pipelines(config))
+        logging.info(f"Jobs run: {[job['job_id'] for job in ls_jobs]}")
+
+        return "Success"
+    except Exception as e:
+        return str(e)
@@ -4,6 +4,7 @@ import json
 import os
 import azure.functions as func
 from utils.dcpd.class_services_data_past_release import ProcessServiceIncidents
+from utils.run_coordinator import run_stage
 
 
 def main(mytimer: func.TimerRequest) -> None:
@@ -27,7 +28,8 @@ def main(mytimer: func.TimerRequest) -> None:
             #obj = ProcessServiceIncidents(conf_env,config)
             obj = ProcessServiceIncidents(conf_env)
             logging.info('before calling main_services')
-            result = obj.main_services()
+            # Single-flight across triggers; runs after contracts when due
+            result = run_stage(config, "services", obj.main_services)
             #result = obj.pipline_component_identify()
             logging.info(f"Inside function main defined in __init__.py file with result = {result}")
         except Exception as e:
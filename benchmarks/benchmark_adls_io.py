@@ -0,0 +1,187 @@
+"""@file benchmark_adls_io.py
+
+@brief Benchmark of the I/O pattern of a DCPD run on local stand-in of ADLS.
+
+
+@details
+Locations of config_dcpd.json are seeded on LocalAdlsBackend with synthetic
+csv files and the I/O of a DCPD run is replayed through IO (azure-adls
+mode):
+    - read: every Raw and Reference input,
+    - write: every Processed output,
+    - read back: Processed outputs read by later stages (intermediate
+      results and contacts).
+Each read / write includes its Key Vault lookups and, for locations without
+file name, directory listing. Latency and bandwidth of the backend are
+configurable. Wall time of each phase and calls, bytes and injected time per
+operation are reported.
+
+Usage (from repository root):
+    python -m benchmarks.benchmark_adls_io --rows 100000 --latency 20 \
+        --bandwidth 50
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+# %% Setup Environment
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(".")
+
+from utils import IO  # noqa: E402
+from utils.io_adopter.local_adls import LocalAdlsBackend  # noqa: E402
+
+# adlsFunc resets logging.disable; quieten handlers instead
+for handler in logging.getLogger().handlers:
+    handler.setLevel(logging.WARNING)
+
+
+# %% Locations
+
+def iter_locations(dict_section, adls_config, prefix=""):
+    """Locations (with container_name) of a config section, recursively."""
+    for key, value in dict_section.items():
+        if not isinstance(value, dict) or key == "adls_credentials":
+            continue
+        if "container_name" in value and value["container_name"] != "":
+            yield f"{prefix}{key}", {
+                "file_dir": "", "file_name": value.get("file_name", ""),
+                "adls_config": adls_config, "adls_dir": value}
+        yield from iter_locations(value, adls_config, f"{prefix}{key}.")
+
+
+def get_locations(config):
+    """Inputs, outputs and outputs read back of a DCPD run."""
+    dict_file = config["file"]
+    dict_loc = {}
+    for section in ["Raw", "Reference", "Processed"]:
+        adls_config = dict_file[section]["adls_credentials"]
+        dict_loc[section] = dict(iter_locations(
+            dict_file[section], adls_config))
+
+    ls_read_back = [
+        name for name, loc in dict_loc["Processed"].items()
+        if loc["adls_dir"]["directory_name"].startswith("intermediate")
+        or name == "contact"]
+    return dict_loc, ls_read_back
+
+
+# %% Data
+
+def generate_data(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "SerialNumber": np.char.add(
+            "110-", rng.integers(0, n_rows, n_rows).astype(str)),
+        "PartNumber": rng.choice(["PDU123", "RPP456", "STS789"], n_rows),
+        "Customer": rng.choice(["abc inc", "xyz llc", "eaton"], n_rows),
+        "Date": pd.Timestamp("2023-01-01") + pd.to_timedelta(
+            rng.integers(0, 1000, n_rows), unit="D"),
+        "Value": rng.random(n_rows),
+    })
+
+
+def seed(backend, dict_loc, n_rows):
+    """Create containers and source files; outputs without file name get a
+    previous snapshot so that listing resolves the file name."""
+    service = backend.service_client("local")
+    for section, dict_section in dict_loc.items():
+        n_section = max(n_rows // 100, 10) if section == "Reference" else n_rows
+        data = generate_data(n_section).to_csv(index=False).encode("utf-8")
+        for name, loc in dict_section.items():
+            adls_dir = loc["adls_dir"]
+            file_system = service.create_file_system(adls_dir["container_name"])
+            if (section == "Processed") and (loc["file_name"] != ""):
+                continue
+            file_name = loc["file_name"] or f"{name}.csv"
+            file_system.get_file_client(
+                f"{adls_dir['directory_name']}/{file_name}").upload_data(
+                    data, overwrite=True)
+
+
+# %% Benchmark
+
+def timed(func):
+    time_start = time.perf_counter()
+    out = func()
+    return out, time.perf_counter() - time_start
+
+
+def run(dict_loc, ls_read_back, df_output):
+    dict_time = {}
+
+    _, dict_time["read inputs"] = timed(lambda: [
+        IO.read_csv("azure-adls", loc)
+        for section in ["Raw", "Reference"]
+        for loc in dict_loc[section].values()])
+
+    _, dict_time["write outputs"] = timed(lambda: [
+        IO.write_csv("azure-adls", loc, df_output)
+        for loc in dict_loc["Processed"].values()])
+
+    _, dict_time["read back"] = timed(lambda: [
+        IO.read_csv("azure-adls", dict_loc["Processed"][name])
+        for name in ls_read_back])
+
+    return dict_time
+
+
+def main(n_rows, latency, bandwidth):
+    with open("config/config_dcpd.json", "r") as file:
+        config = json.load(file)
+    dict_loc, ls_read_back = get_locations(config)
+
+    ls_secrets = {
+        value for section in ["Raw", "Reference", "Processed"]
+        for value in config["file"][section]["adls_credentials"].values()}
+
+    with tempfile.TemporaryDirectory() as root_dir:
+        backend = LocalAdlsBackend(
+            root_dir, secrets={key: "local" for key in ls_secrets})
+        seed(backend, dict_loc, n_rows)
+
+        backend.latency = latency / 1000
+        backend.bandwidth = bandwidth * 1e6 if bandwidth else None
+        backend.reset_stats()
+        IO.set_adls_backend(backend)
+        try:
+            dict_time = run(dict_loc, ls_read_back, generate_data(n_rows, 1))
+        finally:
+            IO.set_adls_backend(None)
+
+    print(f"rows: {n_rows}, latency: {latency} ms, "
+          f"bandwidth: {bandwidth or 'unlimited'} MB/s")
+    print(f"{'phase':<16} {'time (s)':>9}")
+    for phase, value in dict_time.items():
+        print(f"{phase:<16} {value:>9.2f}")
+    print(f"{'total':<16} {sum(dict_time.values()):>9.2f}")
+
+    print(f"\n{'operation':<20} {'calls':>7} {'MB':>9} {'injected (s)':>13}")
+    for op, dict_op in sorted(backend.stats.items()):
+        print(f"{op:<20} {dict_op['calls']:>7} "
+              f"{dict_op['bytes'] / 1e6:>9.1f} {dict_op['time']:>13.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--latency', type=float, default=20,
+                        help="milliseconds per request")
+    parser.add_argument('--bandwidth', type=float, default=50,
+                        help="MB/s; 0 is unlimited")
+    args = parser.parse_args()
+    main(args.rows, args.latency, args.bandwidth)
+
+# %%
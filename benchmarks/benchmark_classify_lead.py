@@ -0,0 +1,168 @@
+"""@file benchmark_classify_lead.py
+
+@brief Benchmark of columnar lead classification against split / concat
+logic.
+
+
+@details
+Creates synthetic leads and classifies them (lead type, age, due date, due
+in years and due category) using
+    - split / concat and row wise logic used earlier in
+      LeadGeneration.classify_lead and post_process_output_ilead,
+    - columnar kernel (LeadRules.classify).
+Both are evaluated for a fixed as of date; outputs are compared for equality
+and timings are reported.
+
+Usage (from repository root):
+    python -m benchmarks.benchmark_classify_lead --rows 1000000
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+# %% Setup Environment
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(".")
+
+from utils.dcpd.class_lead_rules import LeadRules  # noqa: E402
+
+
+# %% Split / concat logic (reference)
+
+def calculate_component_due_date(row):
+    if row['lead_type'] == 'EOSL':
+        eosl_year = int(row['EOSL'])
+        first_day_of_year = pd.to_datetime(f'01/01/{eosl_year}',
+                                           format='%m/%d/%Y')
+        return first_day_of_year.strftime('%m/%d/%Y')
+
+    component_date_code = pd.to_datetime(row['date_code'], format='%m/%d/%Y')
+    component_life_years = pd.DateOffset(years=row['Life__Years'])
+    return (component_date_code + component_life_years).strftime('%m/%d/%Y')
+
+
+def update_eosl(row):
+    if row['lead_type'] == 'EOSL':
+        return row['Component_Due_Date']
+    return row['EOSL']
+
+
+def categorize_due_in_category(component_due_in_years):
+    if component_due_in_years < 0:
+        return "Past Due"
+    if 0 <= component_due_in_years <= 1:
+        return "Due this year"
+    if 1 < component_due_in_years <= 3:
+        return "Due in 2-3 years"
+    if 3 < component_due_in_years < 100:
+        return "Due after 3 years"
+    return "Unknown"
+
+
+def classify_split(df_leads_wn_class, as_of):
+    df_leads = pd.DataFrame()
+
+    df_leads_wn_class.loc[:, 'date_code'] = pd.to_datetime(
+        df_leads_wn_class['date_code'])
+    df_leads_wn_class.loc[:, 'today'] = as_of
+
+    # Year of 365.2425 days; np.timedelta64(1, 'Y') is rejected by pandas 2
+    df_leads_wn_class['age'] = (
+        (df_leads_wn_class['today'] - df_leads_wn_class['date_code'])
+        / np.timedelta64(1, 'D') / 365.2425).round().astype(int)
+
+    df_leads_wn_class.EOSL = df_leads_wn_class.EOSL.fillna("")
+    flag_lead_eosl = df_leads_wn_class.EOSL != ''
+    if any(flag_lead_eosl):
+        df_leads_sub = df_leads_wn_class[flag_lead_eosl].copy()
+        df_leads_sub.loc[:, 'lead_type'] = 'EOSL'
+        df_leads = pd.concat([df_leads, df_leads_sub])
+
+    df_leads_wn_class = df_leads_wn_class[df_leads_wn_class['EOSL'] == '']
+    df_leads_wn_class.Life__Years = pd.to_numeric(df_leads_wn_class.Life__Years)
+    flag_lead_life = pd.notna(df_leads_wn_class.Life__Years)
+    if any(flag_lead_life):
+        df_leads_sub = df_leads_wn_class[flag_lead_life].copy()
+        df_leads_sub['Life__Years'] = pd.to_numeric(
+            df_leads_sub['Life__Years'], errors='coerce').fillna(0).astype(int)
+        df_leads_sub.loc[:, 'flag_include'] = (
+            df_leads_sub['age'] > df_leads_sub['Life__Years'])
+        df_leads_sub.loc[:, 'lead_type'] = 'Life'
+        df_leads = pd.concat([df_leads, df_leads_sub])
+
+    # post_process_output_ilead
+    df_leads['Component_Due_Date'] = df_leads.apply(
+        calculate_component_due_date, axis=1)
+    df_leads['EOSL'] = df_leads.apply(update_eosl, axis=1)
+    df_leads['Component_Due_in (years)'] = (
+        pd.to_datetime(df_leads['Component_Due_Date']).dt.year
+        - as_of.year).astype(int)
+    df_leads['Component_Due_in (Category)'] = df_leads[
+        'Component_Due_in (years)'].apply(categorize_due_in_category)
+    return df_leads
+
+
+# %% Data
+
+def generate_leads(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+
+    date_code = pd.Timestamp('1995-01-01') + pd.to_timedelta(
+        rng.integers(0, 11000, n_rows), unit='D')
+    df_leads = pd.DataFrame({
+        'SerialNumber_M2M': np.arange(n_rows).astype(str),
+        'date_code': date_code.strftime('%Y-%m-%d'),
+        # Missing EOSL is blank or NaN
+        'EOSL': np.where(rng.random(n_rows) < 0.3,
+                         rng.integers(2015, 2035, n_rows).astype(str),
+                         rng.choice(np.array(['', np.nan], dtype=object),
+                                    n_rows)),
+        'Life__Years': rng.choice([5.0, 7.0, 10.0, 15.0, np.nan], n_rows),
+    })
+    return df_leads
+
+
+# %% Benchmark
+
+def main(n_rows, as_of):
+    obj_rules = LeadRules()
+    df_leads = generate_leads(n_rows)
+    ls_cols = ['SerialNumber_M2M', 'lead_type', 'age', 'Life__Years',
+               'flag_include', 'Component_Due_Date', 'EOSL',
+               'Component_Due_in (years)', 'Component_Due_in (Category)']
+
+    time_start = time.perf_counter()
+    df_columnar = obj_rules.classify(df_leads.copy(), as_of)
+    time_columnar = time.perf_counter() - time_start
+
+    time_start = time.perf_counter()
+    df_split = classify_split(df_leads.copy(), as_of)
+    time_split = time.perf_counter() - time_start
+
+    pd.testing.assert_frame_equal(
+        df_columnar[ls_cols].astype(str), df_split[ls_cols].astype(str))
+
+    print(f"rows         : {n_rows}")
+    print(f"as of        : {as_of.date()}")
+    print(f"split/concat : {time_split:.2f} s")
+    print(f"columnar     : {time_columnar:.2f} s")
+    print(f"speed up     : {time_split / time_columnar:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--as-of', default='2024-01-01')
+    args = parser.parse_args()
+    main(args.rows, pd.Timestamp(args.as_of))
+
+# %%
@@ -0,0 +1,194 @@
+"""@file benchmark_contact_normalize.py
+
+@brief Benchmark of vectorized contact normalization against row wise
+cleaning.
+
+
+@details
+Creates install base contacts (ShipTo city / zipcode of install base sample
+replicated with synthetic names, emails and phone numbers) and cleans /
+validates them using
+    - row wise logic (Series.apply) used earlier in
+      ilead_contact.clean_entries_validity and Contacts.validate_op,
+    - vectorized normalization (ContactNormalize).
+Outputs are compared for equality and timings are reported.
+
+Usage (from repository root):
+    python -m benchmarks.benchmark_contact_normalize --rows 1000000
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+# %% Setup Environment
+
+import argparse
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(".")
+
+from utils.contact_normalize import ContactNormalize  # noqa: E402
+
+
+# %% Row wise logic (reference)
+
+def clean_row_wise(ar_text, col_name):
+    data = pd.DataFrame({"text_org": ar_text})
+    data["text"] = data["text_org"].copy()
+
+    if col_name == "City":
+        data["is_alphanum"] = data["text"].str.contains("\\d", regex=True)
+        data.loc[data["is_alphanum"], "text"] = ""
+        data["output"] = data["text"].copy()
+
+    elif col_name == "Zipcode":
+        data["text_len"] = data["text"].str.len()
+        data.loc[data["text_len"] < 2, "text"] = ""
+        data["text"] = data["text"].apply(
+            lambda x: x.split("-")[0] if ("-" in str(x)) else x)
+        data["text"] = pd.to_numeric(data["text"], errors="coerce")
+        data["text"] = data["text"].fillna("")
+        data["text"] = data["text"].apply(
+            lambda x: x if x == "" else format(int(x), "05d"))
+        data["output"] = data["text"].copy()
+
+    elif col_name == "Company_Phone":
+        data["text"] = data["text"].str.lower()
+        data["text"] = data["text"].apply(lambda x: x.replace("--", "-"))
+        data["text_clean"] = data["text"].apply(
+            lambda x: re.sub(r"[\W_]+", "", str(x)))
+        ls_non_phone = ["xxxxx", "9999999999", "1111111111", "0000000000"]
+        data["text_clean"] = data["text_clean"].apply(
+            lambda x: "" if (str(x) in ls_non_phone) else x)
+        data["text_clean"] = data["text_clean"].apply(
+            lambda x: x if len(x) == 0 else x[:-1] if x[-1] == "-" else x)
+        for txt in ["tel", "cell"]:
+            data["text_clean"] = data["text_clean"].str.replace(
+                txt, "", regex=True)
+        data["text_len"] = data["text_clean"].str.len()
+        data["text_new"] = data["text"]
+        data.loc[data["text_len"] <= 9, "text_new"] = ""
+        data["output"] = data["text_new"].copy()
+        data["output"] = data["output"].apply(
+            lambda x: x if len(x) == 0 else x[1:] if x[0] == "-"
+            else x[2:] if x[:2] == "1-" else x)
+        data["output"] = data["output"].apply(
+            lambda x: x if len(x) == 0 else x[:-1] if x[-1] == "-" else x)
+    return data["output"]
+
+
+def validity_row_wise(ar_text, col_name):
+    data = pd.DataFrame({"text_org": ar_text})
+    data["text"] = data["text_org"].replace(np.nan, "", regex=True)
+    data["text"] = data["text"].apply(lambda x: re.sub(r"[\W_]+", "", str(x)))
+    data["text"] = data["text"].str.upper()
+    dict_th = {"Email": 3, "Name": 1, "Company_Phone": 5,
+               "Address1": 2, "Address2": 2}
+    data["flag_Valid"] = data["text"].str.len() > dict_th[col_name]
+    if col_name == "Email":
+        data["flag_text"] = ~data["text"].str.contains(
+            "INVALID|BLANK|UNKNOWN|NOT|XXX", regex=True)
+    else:
+        data["flag_text"] = True
+    return data["flag_text"] & data["flag_Valid"]
+
+
+def strip_row_wise(ar_text):
+    return ar_text.fillna("").apply(lambda x: x.rstrip('_-* ').lstrip('_-* '))
+
+
+# %% Data
+
+def generate_contacts(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+
+    df_install = pd.read_csv("tests/ip/processed_install.csv", dtype=str)
+    ix = rng.integers(0, df_install.shape[0], n_rows)
+
+    ar_zip = df_install["ShipTo_Zip"].to_numpy()[ix]
+    ar_zip = np.where(rng.random(n_rows) < 0.1,
+                      rng.choice(["1234-5678", "7", "ab-12", "98101-"], n_rows),
+                      ar_zip)
+    ar_city = np.where(rng.random(n_rows) < 0.05, "unit 12",
+                       df_install["ShipTo_City"].to_numpy()[ix])
+
+    # Contacts repeat across units of a site
+    ar_digits = rng.choice(
+        rng.integers(10 ** 9, 10 ** 10, max(n_rows // 20, 1)).astype(str),
+        n_rows)
+    ar_phone = np.char.add(
+        rng.choice(["", "1-", "-", "Tel ", "cell: ", "+1 ("], n_rows),
+        ar_digits)
+    ar_phone = np.where(rng.random(n_rows) < 0.1,
+                        rng.choice(["9999999999", "xxxxx", "n/a", "555--12-"],
+                                   n_rows), ar_phone)
+
+    df_contacts = pd.DataFrame({
+        "Zipcode": ar_zip,
+        "City": ar_city,
+        "Company_Phone": np.char.add(
+            ar_phone, rng.choice(["", "-", " ext 5"], n_rows)),
+        "Email": rng.choice(["john@xyz.com", "invalid", "a@b", "",
+                             "-_jane.doe@abc.org*"], n_rows),
+        "Name": rng.choice(["John Doe", "*", "- Jane -", "", "Al"], n_rows),
+    })
+    return df_contacts
+
+
+# %% Benchmark
+
+def derive_row_wise(df_contacts):
+    dict_out = {}
+    for col in ["City", "Zipcode", "Company_Phone"]:
+        dict_out[f"clean_{col}"] = clean_row_wise(df_contacts[col], col)
+    for col in ["Email", "Name", "Company_Phone"]:
+        dict_out[f"valid_{col}"] = validity_row_wise(df_contacts[col], col)
+        dict_out[f"strip_{col}"] = strip_row_wise(df_contacts[col])
+    return pd.DataFrame(dict_out)
+
+
+def derive_vectorized(df_contacts, obj_normalize):
+    dict_out = {}
+    for col in ["City", "Zipcode", "Company_Phone"]:
+        dict_out[f"clean_{col}"] = obj_normalize.clean(df_contacts[col], col)
+    for col in ["Email", "Name", "Company_Phone"]:
+        dict_out[f"valid_{col}"] = obj_normalize.validity(
+            df_contacts[col], col)
+        dict_out[f"strip_{col}"] = obj_normalize.strip(df_contacts[col], col)
+    return pd.DataFrame(dict_out)
+
+
+def main(n_rows):
+    obj_normalize = ContactNormalize()
+    df_contacts = generate_contacts(n_rows)
+
+    time_start = time.perf_counter()
+    df_vectorized = derive_vectorized(df_contacts.copy(), obj_normalize)
+    time_vectorized = time.perf_counter() - time_start
+
+    time_start = time.perf_counter()
+    df_row_wise = derive_row_wise(df_contacts.copy())
+    time_row_wise = time.perf_counter() - time_start
+
+    pd.testing.assert_frame_equal(
+        df_vectorized.astype(str), df_row_wise.astype(str))
+
+    print(f"rows       : {n_rows}")
+    print(f"row wise   : {time_row_wise:.2f} s")
+    print(f"vectorized : {time_vectorized:.2f} s")
+    print(f"speed up   : {time_row_wise / time_vectorized:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    main(parser.parse_args().rows)
+
+# %%
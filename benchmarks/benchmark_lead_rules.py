@@ -0,0 +1,109 @@
+"""@file benchmark_lead_rules.py
+
+@brief Benchmark of vectorized lead rules against row wise logic.
+
+
+@details
+Creates synthetic leads and derives end customer details and chasis key
+using
+    - row wise logic (DataFrame.apply) used earlier in LeadGeneration,
+    - vectorized rules (LeadRules).
+Outputs are compared for equality and timings are reported. Component due
+date, EOSL and due category are benchmarked with lead classification, see
+benchmark_classify_lead.
+
+Usage (from repository root):
+    python -m benchmarks.benchmark_lead_rules --rows 1000000
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+# %% Setup Environment
+
+import argparse
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(".")
+
+from utils.dcpd.class_lead_rules import LeadRules  # noqa: E402
+
+
+# %% Row wise logic (reference)
+
+def derive_row_wise(df_leads, dict_end_customer):
+    for col in dict_end_customer:
+        ls_cols = ['was_startedup'] + dict_end_customer[col]
+        df_leads.loc[:, col] = df_leads[ls_cols].apply(
+            lambda x: x.iloc[1] if x.iloc[0] else x.iloc[2], axis=1)
+
+    df_leads['key_chasis'] = df_leads['pn_chasis'].fillna("(").apply(
+        lambda x: re.split(r", | \(", x)[0] if x[0] != "(" else "")
+    return df_leads
+
+
+def derive_vectorized(df_leads, obj_rules):
+    df_leads = obj_rules.apply(df_leads, obj_rules.rules_end_customer())
+    df_leads['key_chasis'] = obj_rules.key_chasis(df_leads['pn_chasis'])
+    return df_leads
+
+
+# %% Data
+
+def generate_leads(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+
+    df_leads = pd.DataFrame({
+        'was_startedup': rng.choice([True, False], n_rows),
+        'StartupAddress': rng.choice(['1 main st', '2 oak ave'], n_rows),
+        'ShipTo_Street': rng.choice(['3 pine rd', '4 elm st'], n_rows),
+        'StartupCity': rng.choice(['austin', 'dallas'], n_rows),
+        'ShipTo_City': rng.choice(['boston', 'denver'], n_rows),
+        'StartupState': rng.choice(['tx', 'ca'], n_rows),
+        'ShipTo_State': rng.choice(['ma', 'co'], n_rows),
+        'StartupPostalCode': rng.choice(['78701', '94105'], n_rows),
+        'ShipTo_Zip': rng.choice(['02110', '80202'], n_rows),
+        'pn_chasis': rng.choice(
+            ['CHS123 (2), CHS456 (1)', 'CHS789 (1)', None], n_rows),
+    })
+    return df_leads
+
+
+# %% Benchmark
+
+def main(n_rows):
+    obj_rules = LeadRules()
+    df_leads = generate_leads(n_rows)
+    ls_cols = ['key_chasis'] + list(obj_rules.dict_end_customer)
+
+    time_start = time.perf_counter()
+    df_vectorized = derive_vectorized(df_leads.copy(), obj_rules)
+    time_vectorized = time.perf_counter() - time_start
+
+    time_start = time.perf_counter()
+    df_row_wise = derive_row_wise(
+        df_leads.copy(), obj_rules.dict_end_customer)
+    time_row_wise = time.perf_counter() - time_start
+
+    pd.testing.assert_frame_equal(
+        df_vectorized[ls_cols].astype(str), df_row_wise[ls_cols].astype(str))
+
+    print(f"rows       : {n_rows}")
+    print(f"row wise   : {time_row_wise:.2f} s")
+    print(f"vectorized : {time_vectorized:.2f} s")
+    print(f"speed up   : {time_row_wise / time_vectorized:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    main(parser.parse_args().rows)
+
+# %%
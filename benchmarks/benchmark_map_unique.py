@@ -0,0 +1,133 @@
+"""@file benchmark_map_unique.py
+
+@brief Benchmark of MapUnique.map_unique against row wise Series.apply.
+
+
+@details
+Creates repetitive install base / contact columns and evaluates the
+functions converted to map_unique:
+    - suffix drop of install SerialNumber (Contract.srnum_drop_suffix),
+    - punctuation strip of serial numbers (get_range_srum / clean_serialnum),
+    - domain of email (ilead_contact.get_domain),
+    - chasis key (LeadRules.key_chasis, vectorized).
+Outputs are compared for equality and timings are reported; element wise
+functions are also timed in a process pool.
+
+Usage (from repository root):
+    python -m benchmarks.benchmark_map_unique --rows 1000000 --workers 4
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+# %% Setup Environment
+
+import argparse
+import re
+import sys
+import time
+from string import punctuation
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(".")
+
+from utils import MapUnique  # noqa: E402
+from utils.class_iLead_contact import ilead_contact  # noqa: E402
+from utils.dcpd.class_lead_rules import LeadRules  # noqa: E402
+
+
+# %% Functions (as used at call sites)
+
+def srnum_drop_suffix(srnum):
+    return re.sub(r"-(\d{1})[a-zA-Z]$", r"-\1", srnum)
+
+
+def srnum_strip(srnum):
+    return srnum.lstrip(punctuation).rstrip(punctuation)
+
+
+# %% Data
+
+def generate_data(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+
+    # Install base units repeat across contracts / services / leads
+    n_units = max(n_rows // 10, 1)
+    ar_srnum = np.char.add(
+        rng.choice(["110-", "180-", "410-", "-350-"], n_units),
+        rng.integers(10 ** 3, 10 ** 4, n_units).astype(str))
+    ar_srnum = np.char.add(
+        ar_srnum, rng.choice(["-1", "-1a", "-2b.", "-12"], n_units))
+
+    n_contacts = max(n_rows // 50, 1)
+    ar_email = np.char.add(
+        np.char.add("user", rng.integers(0, n_contacts, n_contacts).astype(str)),
+        rng.choice(["@abc.com", "@xyz.org", "", "@"], n_contacts))
+
+    return pd.DataFrame({
+        "SerialNumber": rng.choice(ar_srnum, n_rows),
+        "Email": rng.choice(ar_email, n_rows),
+        "pn_chasis": rng.choice(
+            ["CHS123 (2), CHS456 (1)", "CHS789 (1)", None, "(1) CHS1"],
+            n_rows),
+    })
+
+
+# %% Benchmark
+
+def timed(func):
+    time_start = time.perf_counter()
+    out = func()
+    return out, time.perf_counter() - time_start
+
+
+def main(n_rows, max_workers):
+    df_data = generate_data(n_rows)
+    obj_contact = ilead_contact(pd.Timestamp("2000-01-01"))
+    obj_rules = LeadRules()
+
+    ls_cases = [
+        ("srnum_drop_suffix", "SerialNumber", srnum_drop_suffix, False),
+        ("srnum_strip", "SerialNumber", srnum_strip, False),
+        ("get_domain", "Email", obj_contact.get_domain, False),
+        ("key_chasis", "pn_chasis", obj_rules.key_chasis, True),
+    ]
+
+    print(f"rows : {n_rows}")
+    print(f"{'function':<18} {'uniques':>8} {'apply':>8} {'unique':>8} "
+          f"{'pool':>8} {'speed up':>9}")
+    for name, col, func, vectorized in ls_cases:
+        ar_data = df_data[col]
+
+        if vectorized:
+            ar_exp, time_apply = timed(lambda: func(ar_data))
+        else:
+            ar_exp, time_apply = timed(lambda: ar_data.apply(func))
+
+        ar_act, time_unique = timed(lambda: MapUnique.map_unique(
+            ar_data, func, vectorized=vectorized))
+        pd.testing.assert_series_equal(ar_act, ar_exp, check_names=False)
+
+        str_pool = "-"
+        if not vectorized:
+            ar_pool, time_pool = timed(lambda: MapUnique.map_values(
+                list(ar_data.unique()), func, max_workers=max_workers))
+            str_pool = f"{time_pool:.2f}"
+
+        print(f"{name:<18} {ar_data.nunique(dropna=False):>8} "
+              f"{time_apply:>8.2f} {time_unique:>8.2f} {str_pool:>8} "
+              f"{time_apply / time_unique:>8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+    main(args.rows, args.workers)
+
+# %%
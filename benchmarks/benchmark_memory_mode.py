@@ -0,0 +1,135 @@
+"""@file benchmark_memory_mode.py
+
+@brief Benchmark of column dtype schema (memory_mode of config) applied by
+IO.read_csv.
+
+
+@details
+Synthetic install base is written to csv and read with IO.read_csv in
+local mode with memory mode disabled, with string columns of memory mode
+of config (arrow backed strings) and with low cardinality columns additionally stored as
+categorical. Memory of data (deep), read time and times of a left merge on
+serial number and a groupby on job index, as done by the pipeline, are
+reported; outputs of merge and groupby are compared with the run without
+schema.
+
+Usage (from repository root):
+    python -m benchmarks.benchmark_memory_mode --rows 500000
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+# %% Setup Environment
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(".")
+
+from utils import IO  # noqa: E402
+
+for handler in logging.getLogger().handlers:
+    handler.setLevel(logging.WARNING)
+
+
+# %% Data
+
+def generate_data(n_rows, seed=0):
+    """Install base; units of a job share job index."""
+    rng = np.random.default_rng(seed)
+    ar_job = rng.integers(0, n_rows // 4 + 1, n_rows)
+    ar_serial = np.char.add(
+        np.char.add("110-", ar_job.astype(str)),
+        np.char.add("-", rng.integers(1, 5, n_rows).astype(str)))
+    return pd.DataFrame({
+        "SerialNumber_M2M": ar_serial,
+        "key_serial": np.char.add(ar_serial, "|"),
+        "Job_Index": np.char.add("J", ar_job.astype(str)),
+        "PartNumber_TLN_BOM": np.char.add(
+            "TLN-", rng.integers(0, 2000, n_rows).astype(str)),
+        "ProductClass": rng.choice(["UPS", "PDU", "RPP", "STS"], n_rows),
+        "ShipTo_Country": rng.choice(
+            ["United States", "Canada", "Mexico"], n_rows),
+        "Qty": rng.integers(1, 5, n_rows)})
+
+
+def get_schemas():
+    with open("config/config_dcpd.json", "r") as file:
+        # Columns of config; memory mode is shipped disabled
+        dict_config = dict(json.load(file)["memory_mode"], enable=True)
+    return {
+        "disabled": {},
+        "config": dict_config,
+        "config + category": dict(dict_config, category_columns=[
+            "ProductClass", "ShipTo_Country"])}
+
+
+# %% Benchmark
+
+def run(config, df_ref):
+    time_start = time.perf_counter()
+    df_data = IO.read_csv("local", config)
+    time_read = time.perf_counter() - time_start
+    # Both sides of joins are read with IO.read_csv in the pipeline
+    df_ref = IO.apply_dtype_schema(df_ref.copy())
+
+    time_start = time.perf_counter()
+    df_merge = df_data.merge(df_ref, on="SerialNumber_M2M", how="left")
+    time_merge = time.perf_counter() - time_start
+
+    time_start = time.perf_counter()
+    df_group = df_data.groupby("Job_Index")["Qty"].sum()
+    time_group = time.perf_counter() - time_start
+
+    size = df_data.memory_usage(deep=True).sum() / 2 ** 20
+    return (size, time_read, time_merge, time_group), df_merge, df_group
+
+
+def main(n_rows):
+    print(f"rows: {n_rows}")
+    print(f"{'schema':>18} {'memory (MB)':>12} {'read (s)':>9} "
+          f"{'merge (s)':>10} {'groupby (s)':>12}")
+
+    df_exp = None
+    with tempfile.TemporaryDirectory() as root_dir:
+        df_data = generate_data(n_rows)
+        df_data.to_csv(os.path.join(root_dir, "install.csv"), index=False)
+        config = {"file_dir": root_dir, "file_name": "install.csv"}
+        df_ref = df_data[["SerialNumber_M2M"]].drop_duplicates().iloc[::3]
+        df_ref = df_ref.assign(Lead=1)
+
+        for name, dict_schema in get_schemas().items():
+            IO.set_memory_mode(dict_schema)
+            ls_stats, df_merge, df_group = run(config, df_ref)
+
+            df_merge = df_merge.astype(object)
+            if df_exp is None:
+                df_exp, df_group_exp = df_merge, df_group
+            assert df_merge.equals(df_exp), "merge outputs differ"
+            assert (df_group.to_numpy() == df_group_exp.to_numpy()).all(), \
+                "groupby outputs differ"
+
+            size, time_read, time_merge, time_group = ls_stats
+            print(f"{name:>18} {size:>12.1f} {time_read:>9.2f} "
+                  f"{time_merge:>10.2f} {time_group:>12.2f}")
+        IO.set_memory_mode(None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=500_000)
+    args = parser.parse_args()
+    main(args.rows)
+
+# %%
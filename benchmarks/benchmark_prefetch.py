@@ -0,0 +1,129 @@
+"""@file benchmark_prefetch.py
+
+@brief Benchmark of wall time blocked on reads with and without prefetch.
+
+
+@details
+A stage reading its inputs on local stand-in of ADLS (azure-adls mode) is
+replayed: each input is read at the point of use and followed by
+computation on it. With prefetch, inputs are declared up front (IO.prefetch)
+and downloaded / parsed in background while previous inputs are processed.
+Wall time of the stage and time blocked on reads (IO.read_stats) are
+reported for both runs.
+
+Usage (from repository root):
+    python -m benchmarks.benchmark_prefetch --inputs 6 --rows 200000 \
+        --latency 50 --bandwidth 50 --compute 0.5
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+# %% Setup Environment
+
+import argparse
+import logging
+import sys
+import tempfile
+import time
+
+sys.path.append(".")
+
+from utils import IO  # noqa: E402
+from utils.io_adopter.local_adls import LocalAdlsBackend  # noqa: E402
+from benchmarks.benchmark_adls_io import generate_data  # noqa: E402
+
+# adlsFunc resets logging.disable; quieten handlers instead
+for handler in logging.getLogger().handlers:
+    handler.setLevel(logging.WARNING)
+
+adls_config = {"connection_string": "conn-string",
+               "storage_account_name": "account-name"}
+
+
+# %% Inputs
+
+def seed(backend, n_inputs, n_rows):
+    """Create input files of the stage; returns their locations."""
+    file_system = backend.service_client("local").create_file_system("data")
+    data = generate_data(n_rows).to_csv(index=False).encode("utf-8")
+
+    ls_config = []
+    for ix in range(n_inputs):
+        file_name = f"input_{ix}.csv"
+        file_system.get_file_client(f"stage/{file_name}").upload_data(data)
+        ls_config.append({
+            "file_dir": "", "file_name": file_name,
+            "adls_config": adls_config,
+            "adls_dir": {"container_name": "data", "directory_name": "stage",
+                         "file_name": file_name}})
+    return ls_config
+
+
+# %% Benchmark
+
+def compute(data, seconds):
+    """Computation on input; holds the GIL like pandas transformations."""
+    time_end = time.perf_counter() + seconds
+    while time.perf_counter() < time_end:
+        data["SerialNumber"].str.upper().nunique()
+
+
+def run_stage(ls_config, compute_time, f_prefetch):
+    IO.read_stats(f_reset=True)
+    time_start = time.perf_counter()
+
+    if f_prefetch:
+        IO.prefetch("azure-adls", ls_config, {"prefetch": {"enable": True}})
+    for config in ls_config:
+        compute(IO.read_csv("azure-adls", config), compute_time)
+
+    time_total = time.perf_counter() - time_start
+    IO.clear_prefetch()
+    return time_total, IO.read_stats()
+
+
+def main(n_inputs, n_rows, latency, bandwidth, compute_time):
+    with tempfile.TemporaryDirectory() as root_dir:
+        backend = LocalAdlsBackend(root_dir, secrets={
+            key: "local" for key in adls_config.values()})
+        ls_config = seed(backend, n_inputs, n_rows)
+
+        backend.latency = latency / 1000
+        backend.bandwidth = bandwidth * 1e6 if bandwidth else None
+        IO.set_adls_backend(backend)
+        try:
+            dict_result = {
+                label: run_stage(ls_config, compute_time, f_prefetch)
+                for label, f_prefetch in [("sequential", False),
+                                          ("prefetch", True)]}
+        finally:
+            IO.set_adls_backend(None)
+
+    print(f"inputs: {n_inputs}, rows: {n_rows}, latency: {latency} ms, "
+          f"bandwidth: {bandwidth or 'unlimited'} MB/s, "
+          f"compute: {compute_time} s per input")
+    print(f"{'run':<12} {'total (s)':>10} {'blocked (s)':>12} "
+          f"{'prefetched':>11}")
+    for label, (time_total, dict_stats) in dict_result.items():
+        print(f"{label:<12} {time_total:>10.2f} "
+              f"{dict_stats['time_blocked']:>12.2f} "
+              f"{dict_stats['prefetched']:>11}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--inputs', type=int, default=6)
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--latency', type=float, default=50,
+                        help="milliseconds per request")
+    parser.add_argument('--bandwidth', type=float, default=50,
+                        help="MB/s; 0 is unlimited")
+    parser.add_argument('--compute', type=float, default=0.5,
+                        help="seconds of computation per input")
+    args = parser.parse_args()
+    main(args.inputs, args.rows, args.latency, args.bandwidth, args.compute)
+
+# %%
@@ -0,0 +1,161 @@
+"""@file benchmark_scale_out.py
+
+@brief Benchmark of hash partitioned runs (utils.scale_out) against a single
+process run.
+
+
+@details
+Synthetic raw contracts are written to a local store and a CPU bound stage
+(row wise serial number extraction, see benchmark_search_srnum) is run on
+them with 1, 2, 4 ... partitions in a process pool, followed by the reducer.
+Workers are limited to the number of cores so that durations of partitions
+are their work. Reduced output is compared with output of the single
+partition run. Wall time, speed up and balance of partitions are reported;
+bound is the speed up attainable with one core per partition (total work /
+largest partition).
+
+Usage (from repository root):
+    python -m benchmarks.benchmark_scale_out --rows 20000 --partitions 1 2 4
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+# %% Setup Environment
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(".")
+
+from utils import IO  # noqa: E402
+from utils.sampling import Sampling  # noqa: E402
+from utils.scale_out import ScaleOut  # noqa: E402
+from utils.dcpd.class_common_srnum_ops import SearchSrnum  # noqa: E402
+from benchmarks.benchmark_search_srnum import search_row_wise  # noqa: E402
+
+for handler in logging.getLogger().handlers:
+    handler.setLevel(logging.WARNING)
+
+obj_srnum = SearchSrnum()
+
+
+# %% Data
+
+def generate_data(n_rows, seed=0):
+    """Contracts; serial numbers of a contract are units of one site."""
+    rng = np.random.default_rng(seed)
+    ar_unit = np.char.add("110-", rng.integers(0, 10 ** 5, n_rows).astype(str))
+
+    ls_text = ["", "na", "see comments", "tbd"]
+    df_data = pd.DataFrame({"ContractNumber": np.arange(n_rows).astype(str)})
+    for ix, (cur_field, cur_qty) in enumerate(
+            obj_srnum.dict_srnum_cols.items()):
+        df_data[cur_field] = np.where(
+            rng.random(n_rows) < 0.7 / (ix + 1),
+            np.char.add(ar_unit, f"-{ix + 1}"), rng.choice(ls_text, n_rows))
+        df_data[cur_qty] = rng.choice([1.0, 2.0, np.nan], n_rows)
+    return df_data
+
+
+# %% Stage
+
+def stage_contracts(config, mode):
+    """Serial numbers of raw contracts of the partition."""
+    df_contract = IO.read_csv(mode, {
+        'file_dir': config['file']['dir_data'],
+        'file_name': config['file']['Raw']['contracts']['file_name']})
+    sampling = Sampling.from_config(config)
+    df_contract = sampling.sample(df_contract, 'contracts')
+    ls_cols = list(obj_srnum.dict_srnum_cols)
+    df_contract[ls_cols] = df_contract[ls_cols].fillna('')
+
+    df_out = search_row_wise(
+        df_contract, obj_srnum.dict_srnum_cols, obj_srnum.pat_srnum,
+        lambda df_data: obj_srnum.prep_data(df_data, " "))
+    df_out = df_out.rename(columns={'SerialNumber': 'Serial_Number'})
+
+    # Outputs are keyed by serial numbers; drop words of free text
+    f_unit = sampling.units(df_out['Serial_Number']).str.len() > 0
+    df_out = df_out.loc[f_unit.to_numpy()]
+    IO.write_csv(mode, ScaleOut.output_config(config, 'output_iLead'),
+                 df_out)
+
+
+def get_config(root_dir, n_partitions, max_workers):
+    dict_adls = {'container_name': 'results', 'directory_name': 'results'}
+    return {
+        'conf.env': 'local',
+        'file': {
+            'dir_data': f'{root_dir}/data/',
+            'dir_results': f'{root_dir}/results/',
+            'dir_validation': 'validation/',
+            'dir_intermediate': 'intermediate/',
+            'Raw': {'contracts': {'file_name': 'contracts.csv'}},
+            'Processed': {
+                'adls_credentials': {},
+                'output_iLead': dict(dict_adls,
+                                     file_name='output_iLead.csv')}},
+        'sampling': {'salt': 'benchmark', 'sources': {
+            'contracts': list(obj_srnum.dict_srnum_cols)}},
+        'scale_out': {'n_partitions': n_partitions,
+                      'max_workers': max_workers, 'dir': 'partitions',
+                      'stages': ['contracts'], 'outputs': ['output_iLead']}}
+
+
+# %% Benchmark
+
+def main(n_rows, ls_partitions):
+    print(f"rows: {n_rows}, cpus: {os.cpu_count()}")
+    print(f"{'partitions':>10} {'wall (s)':>9} {'speed up':>9} "
+          f"{'work (s)':>9} {'max part (s)':>13} {'bound':>6} {'rows':>8}")
+
+    time_base = n_rows_base = None
+    with tempfile.TemporaryDirectory() as root_dir:
+        os.makedirs(f'{root_dir}/data')
+        generate_data(n_rows).to_csv(
+            f'{root_dir}/data/contracts.csv', index=False)
+
+        for n_partitions in ls_partitions:
+            os.makedirs(f'{root_dir}/results', exist_ok=True)
+            # Durations of partitions are work only if each has a core
+            max_workers = min(n_partitions, os.cpu_count())
+            scale_out = ScaleOut(
+                get_config(root_dir, n_partitions, max_workers),
+                dict_stages={'contracts': stage_contracts})
+
+            time_start = time.perf_counter()
+            dict_status = scale_out.run_partitions()
+            n_rows_out = scale_out.reduce()['output_iLead']
+            time_wall = time.perf_counter() - time_start
+
+            ls_work = [df_status['duration'].sum()
+                       for df_status in dict_status.values()]
+            if time_base is None:
+                time_base, n_rows_base = time_wall, n_rows_out
+            assert n_rows_out == n_rows_base, "outputs differ"
+
+            print(f"{n_partitions:>10} {time_wall:>9.2f} "
+                  f"{time_base / time_wall:>9.2f} {sum(ls_work):>9.2f} "
+                  f"{max(ls_work):>13.2f} "
+                  f"{sum(ls_work) / max(ls_work):>6.2f} {n_rows_out:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=20_000)
+    parser.add_argument('--partitions', type=int, nargs='+',
+                        default=[1, 2, 4])
+    args = parser.parse_args()
+    main(args.rows, args.partitions)
+
+# %%
@@ -0,0 +1,141 @@
+"""@file benchmark_search_srnum.py
+
+@brief Benchmark of stacked serial number extraction against row wise
+expansion.
+
+
+@details
+Creates synthetic contracts and services with serial number fields and
+extracts serial numbers using
+    - row wise expansion (one DataFrame per row and field, concatenated) used
+      earlier in SearchSrnum.search_srnum / search_srnum_services,
+    - stacked extraction over all fields (SearchSrnum.extract_srnum).
+Outputs are compared for equality and timings are reported.
+
+Usage (from repository root):
+    python -m benchmarks.benchmark_search_srnum --rows 20000
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+# %% Setup Environment
+
+import argparse
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(".")
+
+from utils.dcpd.class_common_srnum_ops import SearchSrnum  # noqa: E402
+
+
+# %% Row wise logic (reference)
+
+def expand_srnum(col_data, pat_srnum):
+    if not col_data["is_serialnum"]:
+        return pd.DataFrame(
+            data={"SerialNumber": np.nan,
+                  "ContractNumber": col_data["ContractNumber"],
+                  "SerialNumberContract": col_data["SerialNumberContract"],
+                  "Qty": col_data["Qty"]},
+            index=[0])
+
+    sr_num = col_data["SerialNumber"]
+    ls_sr_num = []
+    for cur_srnum_pat in pat_srnum:
+        ls_sr_num_cur = re.findall(cur_srnum_pat, str(sr_num))
+        if len(ls_sr_num_cur) > 0:
+            ls_sr_num = ls_sr_num + ls_sr_num_cur
+            sr_num = re.sub(cur_srnum_pat, "", sr_num)
+        if len(sr_num) <= 2:
+            break
+
+    df_srnum = pd.DataFrame(data={"SerialNumber": ls_sr_num})
+    df_srnum["ContractNumber"] = col_data["ContractNumber"]
+    df_srnum["SerialNumberContract"] = col_data["SerialNumberContract"]
+    df_srnum["Qty"] = col_data["Qty"]
+    return df_srnum
+
+
+def search_row_wise(df_temp_org, dict_cols, pat_srnum, prep):
+    df_serialnum = pd.DataFrame()
+    for cur_field in dict_cols:
+        df_data = df_temp_org[
+            [cur_field, dict_cols[cur_field], "ContractNumber"]].copy()
+        df_data.columns = ["SerialNumberContract", "Qty", "ContractNumber"]
+        df_data.loc[:, "SerialNumber"] = prep(df_data[["SerialNumberContract"]])
+        df_data.loc[:, "is_serialnum"] = df_data["SerialNumber"].apply(
+            lambda x: re.search("|".join(pat_srnum), str(x)) is not None)
+        ls_dfs = df_data.apply(
+            lambda x: expand_srnum(x, pat_srnum), axis=1).tolist()
+        df_ls_collapse = pd.concat(ls_dfs)
+        df_ls_collapse["src"] = cur_field
+        df_serialnum = pd.concat([df_serialnum, df_ls_collapse])
+    return df_serialnum.reset_index(drop=True)
+
+
+# %% Data
+
+def generate_data(n_rows, dict_cols, seed=0):
+    rng = np.random.default_rng(seed)
+
+    ls_text = ["", "na", "see comments", "110-1234-5", "ab12-3456 (2)",
+               "110-1234-5 110-1234-6", "abc-12\r\nabc-13", "1-2",
+               "pdu 12-34, sts 56-78", "k", "xy-1 (a) zz-9", "no serial"]
+    df_data = pd.DataFrame({"ContractNumber": np.arange(n_rows).astype(str)})
+    for cur_field, cur_qty in dict_cols.items():
+        ar_num = rng.integers(0, 10 ** 6, n_rows).astype(str)
+        df_data[cur_field] = np.where(
+            rng.random(n_rows) < 0.5, rng.choice(ls_text, n_rows),
+            np.char.add(np.char.add("sn", ar_num), "-a"))
+        df_data[cur_qty] = rng.choice([1.0, 2.0, np.nan], n_rows)
+    return df_data
+
+
+# %% Benchmark
+
+def main(n_rows):
+    obj_srnum = SearchSrnum()
+    sep = " "
+
+    for name, dict_cols, pat_srnum, prep in [
+        ("contracts", obj_srnum.dict_srnum_cols, obj_srnum.pat_srnum,
+         lambda df_data: obj_srnum.prep_data(df_data, sep)),
+        ("services", obj_srnum.dict_cols_srnum, obj_srnum.pat_srnum_services,
+         lambda df_data: obj_srnum.prep_data_services(df_data, sep)),
+    ]:
+        df_data = generate_data(n_rows, dict_cols)
+
+        time_start = time.perf_counter()
+        df_stacked = obj_srnum.extract_srnum(
+            df_data.copy(), dict_cols, pat_srnum, prep)
+        time_stacked = time.perf_counter() - time_start
+
+        time_start = time.perf_counter()
+        df_row_wise = search_row_wise(
+            df_data.copy(), dict_cols, pat_srnum, prep)
+        time_row_wise = time.perf_counter() - time_start
+
+        pd.testing.assert_frame_equal(df_stacked, df_row_wise)
+
+        print(f"{name}")
+        print(f"  rows     : {n_rows} x {len(dict_cols)} fields")
+        print(f"  serials  : {df_stacked['SerialNumber'].notna().sum()}")
+        print(f"  row wise : {time_row_wise:.2f} s")
+        print(f"  stacked  : {time_stacked:.2f} s")
+        print(f"  speed up : {time_row_wise / time_stacked:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=20_000)
+    main(parser.parse_args().rows)
+
+# %%
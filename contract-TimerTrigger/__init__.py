@@ -4,6 +4,7 @@ import json
 import os
 import azure.functions as func
 from utils.dcpd.class_contracts_data import Contract
+from utils.run_coordinator import run_stage
 
 
 def main(mytimer: func.TimerRequest) -> None:
@@ -27,7 +28,8 @@ def main(mytimer: func.TimerRequest) -> None:
             logging.info(f"mode:{conf_env}\n,config: {config}")
             obj = Contract(conf_env, config)
             logging.info("before calling main_install")
-            obj.main_contracts()
+            # Single-flight across triggers
+            run_stage(config, "contracts", obj.main_contracts)
 
             return "Success"
         except Exception as e:
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""@file test_class_adls_backend.py
+
+
+
+@brief Unit Test class to test adlsFunc on local stand-in of ADLS
+
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# Import system path
+import os
+import sys
+
+sys.path.append(".")
+
+import pandas as pd
+import pytest
+from pandas._testing import assert_frame_equal
+from utils.io_adopter.class_adlsFunc import adlsFunc
+from utils.io_adopter.local_adls import LocalAdlsBackend
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = LocalAdlsBackend(
+        str(tmp_path), secrets={"ib-connection-string": "local"})
+    backend.create_file_system("results")
+    return backend
+
+
+class TestAdlsFunc:
+    """
+    This class tests read, write, listing and key vault lookups of adlsFunc.
+    """
+
+    def test_write_read(self, backend):
+        """
+        Validates data written in chunks is read back as is.
+        """
+        io_adls = adlsFunc(backend)
+        df_data = pd.DataFrame({
+            "SerialNumber": [f"110-{ix}" for ix in range(25)],
+            "Qty": range(25)})
+
+        status = io_adls.output_file_write(
+            "local", df_data, "results", "processed", "intermediate/install",
+            chunk_rows=4, max_concurrency=3)
+        assert status == "Success! File created with name: processed.csv"
+
+        df_out = io_adls.input_file_read(
+            "local", "results", "processed.csv", "intermediate/install")
+        assert_frame_equal(df_out, df_data)
+        assert backend.stats["append_data"]["calls"] == 7
+        assert backend.stats["flush_data"]["calls"] == 1
+
+    def test_list_latest(self, backend):
+        """
+        Validates listing returns the latest file of the directory.
+        """
+        io_adls = adlsFunc(backend)
+        file_system = backend.service_client("local").get_file_system_client(
+            "results")
+        for ix, file_name in enumerate(["b.csv", "a.csv"]):
+            file_client = file_system.get_file_client(f"contact/{file_name}")
+            file_client.upload_data(b"x\n1\n")
+            os.utime(file_client.local_path, (1e9 + ix, 1e9 + ix))
+
+        assert io_adls.list_ADLS_directory_contents(
+            "local", "results", "contact") == "a.csv"
+        assert isinstance(io_adls.list_ADLS_directory_contents(
+            "local", "results", "missing"), Exception)
+
+    def test_flush_visibility(self, backend):
+        """
+        Validates appended data is visible only after flush and ranged
+        downloads.
+        """
+        file_client = backend.service_client("local").get_file_system_client(
+            "results").create_file("data.csv")
+        file_client.append_data(b"world", 5)
+        file_client.append_data(b"hello", 0)
+        assert file_client.download_file().readall() == b""
+
+        with pytest.raises(ValueError) as _:
+            file_client.flush_data(4)
+        file_client.flush_data(10)
+        assert file_client.download_file().readall() == b"helloworld"
+        assert file_client.download_file(3, 4).readall() == b"lowo"
+
+    def test_read_credentials(self, backend):
+        """
+        Validates secrets are read from backend key vault.
+        """
+        io_adls = adlsFunc(backend)
+        assert io_adls.read_credentials(["ib-connection-string"]) == {
+            "ib_connection_string": "local"}
+        with pytest.raises(Exception) as _:
+            io_adls.read_credentials(["missing-secret"])
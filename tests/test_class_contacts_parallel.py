@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""@file test_class_contacts_parallel.py
+
+
+
+@brief Unit Test class to test contacts generated across sources in a
+process pool
+
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# Import system path
+import json
+import os
+import sys
+
+sys.path.append(".")
+
+import pandas as pd
+import pytest
+from pandas._testing import assert_frame_equal
+from utils import IO
+from utils.dcpd.class_generate_contacts import Contacts
+
+
+class SourceContacts(Contacts):
+    """
+    Contacts of sources read from raw files of a directory; reference data
+    and key vault of Contacts are not required.
+    """
+
+    def __init__(self, config):
+        self.mode = 'local'
+        self.config = config
+
+    def generate_contacts(self, src):
+        if src == 'failing':
+            raise ValueError(f"No data for {src}")
+        df_data = IO.read_csv(self.mode, {
+            'file_dir': self.config['file']['dir_data'],
+            'file_name': f'raw_{src}.csv'})
+        df_data['Source'] = src
+        df_data['Email'] = df_data['Email'].str.lower()
+        df_data['pid'] = os.getpid()
+        return df_data
+
+
+@pytest.fixture
+def config(tmp_path):
+    with open("config/config_dcpd.json", "r") as file:
+        config = json.load(file)
+
+    config['file']['dir_data'] = f'{tmp_path}/'
+    config['file']['dir_results'] = f'{tmp_path}/'
+    config['file']['dir_intermediate'] = 'intermediate/'
+    config['output_contacts_lead']['dict_dbs'] = {
+        'services': 1, 'failing': 1, 'contracts': 1, 'events': 1,
+        'processed': 0, 'not_implemented': -1}
+
+    for ix, src in enumerate(['services', 'contracts', 'events']):
+        pd.DataFrame({
+            'Serial Number': [f'110-{ix}-{row}' for row in range(3)],
+            'Email': [f'A{row}@{src.upper()}.COM' for row in range(3)]
+        }).to_csv(tmp_path / f'raw_{src}.csv', index=False)
+
+    os.makedirs(tmp_path / 'intermediate')
+    pd.DataFrame({'Serial Number': ['110-9-0'], 'Email': ['old@x.com'],
+                  'Source': ['processed']}).to_csv(
+        tmp_path / 'intermediate' / 'processed_contactsprocessed',
+        index=False)
+    return config
+
+
+class TestDeployAcrossSources:
+    """
+    This class tests contacts generated in a process pool are same as
+    generated sequentially.
+    """
+
+    def run(self, config, dict_parallel):
+        config['output_contacts_lead']['parallel'] = dict_parallel
+        return SourceContacts(config).deploy_across_sources()
+
+    def test_pool_equals_sequential(self, config):
+        """
+        Validates output of pool (max_workers of config) equals sequential
+        output in config order; failing source contributes no contacts.
+        """
+        dict_parallel = config['output_contacts_lead']['parallel']
+        assert dict_parallel == {'enable': True, 'max_workers': 3}
+
+        df_pool = self.run(config, dict_parallel)
+        df_seq = self.run(config, {'enable': False, 'max_workers': 3})
+
+        assert df_pool['Source'].unique().tolist() == [
+            'services', 'contracts', 'events', 'processed']
+        assert set(df_pool['pid'].dropna()) != {os.getpid()}
+        assert set(df_seq['pid'].dropna()) == {os.getpid()}
+        assert_frame_equal(df_pool.drop(columns='pid'),
+                           df_seq.drop(columns='pid'))
+
+    @pytest.mark.parametrize("max_workers", [1, 2, 10])
+    def test_max_workers(self, config, max_workers):
+        """
+        Validates output does not depend on number of workers.
+        """
+        df_exp = self.run(config, {'enable': False})
+        df_out = self.run(config, {'enable': True, 'max_workers': max_workers})
+
+        assert_frame_equal(df_out.drop(columns='pid'),
+                           df_exp.drop(columns='pid'))
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""@file test_class_filter_data.py
+
+
+
+@brief Unit Test class to test coalescing of columns of Filter
+
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# Import system path
+import sys
+import warnings
+
+sys.path.append(".")
+
+import numpy as np
+import pandas as pd
+import pytest
+from utils import Filter
+
+obj_filter = Filter()
+
+
+def prioratized_loop(temp_data_org, ls_priority):
+    """Earlier prioratized_columns: fill blanks column by column."""
+    temp_data = temp_data_org.copy()
+    temp_data['out'] = np.nan
+
+    with warnings.catch_warnings():
+        # Upcast of NaN initialized output
+        warnings.simplefilter("ignore", FutureWarning)
+        for col in ls_priority:
+            flag_na = pd.isna(temp_data['out'])
+            flag_empty = temp_data['out'] == ''
+            flag_all = (flag_na | flag_empty)
+            temp_data.loc[flag_all, 'out'] = temp_data.loc[flag_all, col]
+
+    return np.array(temp_data['out'])
+
+
+def join_row_wise(df_data, ls_col, min_len):
+    """Earlier prep_data of contacts: join unique values of a row."""
+    df_data = df_data[ls_col].fillna("").astype(str)
+    return np.array(df_data.apply(
+        lambda x:
+        '; '.join(y for y in np.unique(x)
+                  if (len(str(y)) > min_len) & pd.notna(y))
+        , axis=1), dtype=object)
+
+
+def assert_same(ar_out, ar_exp):
+    assert ar_out.dtype == ar_exp.dtype
+    # str distinguishes 1 / 1.0 and None / nan
+    assert [str(val) for val in ar_out] == [str(val) for val in ar_exp]
+
+
+dict_first = {
+    "text": pd.DataFrame({
+        "ShipTo_Country": ["usa", np.nan, "", None, "", np.nan],
+        "SoldTo_Country": ["can", "mex", np.nan, "", "", "ind"],
+        "Country": ["a", "b", "c", "d", "", np.nan]}),
+    "integer_text": pd.DataFrame({
+        "Contract_Sales_Order__c": [101, 102, 103],
+        "Original_Sales_Order__c": ["201", "", "203"],
+        "Customer": ["x", "y", "z"]}),
+    "float_text": pd.DataFrame({
+        "Contract_Sales_Order__c": [101, np.nan, 103, np.nan],
+        "Original_Sales_Order__c": ["201", "202", np.nan, ""],
+        "Customer": [1, 2, 3, np.nan]}),
+    "text_integer": pd.DataFrame({
+        "Customer": ["p", np.nan, ""], "Qty": [1, 2, 3]}),
+    "numeric": pd.DataFrame({
+        "Qty": [1, 2, 3], "Qty_old": [1.5, np.nan, 2.0]}),
+    "bool": pd.DataFrame({
+        "was_startedup": [True, False], "flag": [False, True]}),
+    "date": pd.DataFrame({
+        "startup_date": pd.to_datetime(["2020-01-01", None]),
+        "ShipmentDate": pd.to_datetime(["2021-01-01", "2022-01-01"])}),
+    "no_rows": pd.DataFrame({
+        "ShipTo_Country": pd.Series([], dtype=object),
+        "SoldTo_Country": pd.Series([], dtype=object)}),
+}
+
+
+class TestCoalesceFirst:
+    """
+    This class tests how='first' gives output of earlier
+    prioratized_columns logic.
+    """
+
+    @pytest.mark.parametrize("case", list(dict_first))
+    def test_equals_loop(self, case):
+        """
+        Validates values and types equal loop over columns; numeric values
+        preceding first text column are float.
+        """
+        df_data = dict_first[case]
+        ls_cols = list(df_data.columns)
+
+        assert_same(obj_filter.coalesce_columns(df_data, ls_cols, how='first'),
+                    prioratized_loop(df_data, ls_cols))
+        assert_same(obj_filter.prioratized_columns(df_data, ls_cols[::-1]),
+                    prioratized_loop(df_data, ls_cols[::-1]))
+
+    def test_last_column(self):
+        """
+        Validates value of last column is returned when none is available.
+        """
+        df_data = pd.DataFrame({"a": ["", np.nan], "b": [np.nan, ""]})
+        assert_same(obj_filter.coalesce_columns(df_data, ["a", "b"]),
+                    np.array([np.nan, ""], dtype=object))
+
+
+class TestCoalesceJoin:
+    """
+    This class tests how='join' gives output of earlier row wise join of
+    contact columns.
+    """
+
+    df_data = pd.DataFrame({
+        "Company_Phone": ["123", "1", "", np.nan, "999", "12"],
+        "Company_Phone_2": ["123", "45", "7", np.nan, "111", "12"],
+        "Mobile": ["0", "45", "78", "", "555", np.nan],
+        "Email": ["A@x.com", "a@x.com", "b; c", "", np.nan, 5]})
+
+    @pytest.mark.parametrize("min_len", [0, 1, 2])
+    @pytest.mark.parametrize("ls_col", [
+        ["Company_Phone", "Company_Phone_2", "Mobile"],
+        ["Email", "Mobile"],
+        ["Email"]])
+    def test_equals_row_wise(self, ls_col, min_len):
+        """
+        Validates unique values longer than min_len are sorted and joined;
+        NA is treated as empty.
+        """
+        ar_out = obj_filter.coalesce_columns(
+            self.df_data, ls_col, how='join', sep='; ', min_len=min_len)
+
+        assert_same(ar_out, join_row_wise(self.df_data, ls_col, min_len))
+
+    def test_prepared_data(self):
+        """
+        Validates output for data prepared as in contacts (blanks filled and
+        converted to string) is same as for raw data.
+        """
+        ls_col = list(self.df_data.columns)
+        df_prep = self.df_data.fillna("").astype(str)
+
+        assert_same(
+            obj_filter.coalesce_columns(df_prep, ls_col, how='join'),
+            obj_filter.coalesce_columns(self.df_data, ls_col, how='join'))
+        assert obj_filter.coalesce_columns(
+            df_prep, ["Mobile", "Email"], how='join').tolist()[:3] == [
+            "0; A@x.com", "45; a@x.com", "78; b; c"]
+
+    def test_unknown(self):
+        """
+        Validates unknown coalesce type raises.
+        """
+        with pytest.raises(ValueError, match="Unknown coalesce type"):
+            obj_filter.coalesce_columns(self.df_data, ["Email"], how='last')
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""@file test_class_io_arrow.py
+
+
+
+@brief Unit Test class to test local-arrow mode of IO
+
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# Import system path
+import os
+import shutil
+import sys
+
+sys.path.append(".")
+
+import numpy as np
+import pandas as pd
+from pandas._testing import assert_frame_equal
+from utils import IO
+import utils.io_adopter.local as io_local
+from utils.io_adopter.convert_arrow import convert_directory
+
+
+class TestLocalArrow:
+    """
+    This class tests memory mapped arrow files of local-arrow mode.
+    """
+
+    def test_convert_read(self, tmp_path):
+        """
+        Validates converted file is read same as csv and up to date files
+        are not converted again.
+        """
+        shutil.copy("tests/ip/processed_install.csv", tmp_path)
+        config = {"file_dir": str(tmp_path),
+                  "file_name": "processed_install.csv"}
+
+        # Not converted: csv is read
+        df_exp = IO.read_csv("local", config)
+        assert_frame_equal(IO.read_csv("local-arrow", config), df_exp)
+
+        dict_status = convert_directory(str(tmp_path))
+        assert list(dict_status.values()) == ["converted"]
+        assert os.path.exists(os.path.join(tmp_path, "processed_install.feather"))
+        assert list(convert_directory(str(tmp_path)).values()) == ["skipped"]
+
+        assert_frame_equal(IO.read_csv("local-arrow", config), df_exp)
+
+    def test_write_read(self, tmp_path):
+        """
+        Validates data written is read back; text columns with mixed types
+        are stored as strings.
+        """
+        config = {"file_dir": str(tmp_path), "file_name": "output_iLead.csv"}
+        df_data = pd.DataFrame({
+            "SerialNumber": ["110-1", "110-2", None],
+            "Qty": [1, 2, 3],
+            "Mixed": ["a", 1, np.nan]}, index=[5, 6, 7])
+
+        assert IO.write_csv("local-arrow", config, df_data) == "successful !"
+        assert not os.path.exists(os.path.join(tmp_path, "output_iLead.csv"))
+
+        df_out = IO.read_csv("local-arrow", config)
+        df_exp = df_data.reset_index(drop=True)
+        df_exp["SerialNumber"] = ["110-1", "110-2", np.nan]
+        df_exp["Mixed"] = ["a", "1", np.nan]
+        assert_frame_equal(df_out, df_exp)
+
+    def test_string_columns_mapped(self, tmp_path):
+        """
+        Validates string columns are read as arrow backed strings.
+        """
+        config = {"file_dir": str(tmp_path), "file_name": "install.csv"}
+        df_data = pd.DataFrame({
+            "SerialNumber": ["110-1", None], "Customer": ["abc", "xyz"]})
+        io_local.write_arrow_local(config, df_data)
+
+        df_out = io_local.read_arrow_local(config, ["SerialNumber"])
+        assert list(df_out.columns) == ["SerialNumber", "Customer"]
+        assert df_out["SerialNumber"].dtype == pd.StringDtype("pyarrow")
+        assert df_out["SerialNumber"].isna().tolist() == [False, True]
+        assert df_out["Customer"].tolist() == ["abc", "xyz"]
+
+    def test_round_trip_as_local(self, tmp_path):
+        """
+        Validates data written and read in local-arrow mode is same as in
+        local mode i.e. types are inferred as from csv.
+        """
+        df_data = pd.DataFrame({
+            "SerialNumber": ["00123", "110-2", None],
+            "Job_Index": ["0101", "0102", "0103"],
+            "Date": pd.to_datetime(["2023-01-01", "2023-02-01", None]),
+            "Qty": [1.0, 2.0, 3.0],
+            "Flag": [True, False, True]})
+
+        dict_out = {}
+        for mode in ["local", "local-arrow"]:
+            config = {"file_dir": str(tmp_path / mode),
+                      "file_name": "output_iLead.csv"}
+            os.makedirs(config["file_dir"])
+            IO.write_csv(mode, config, df_data)
+            dict_out[mode] = IO.read_csv(mode, config)
+
+        assert_frame_equal(dict_out["local-arrow"], dict_out["local"])
+        assert dict_out["local-arrow"]["Job_Index"].tolist() == [101, 102, 103]
+        assert dict_out["local-arrow"]["Date"].dtype == object
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""@file test_class_io_memory_mode.py
+
+
+
+@brief Unit Test class to test column dtype schema (memory_mode) of IO
+
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# Import system path
+import json
+import sys
+
+sys.path.append(".")
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas._testing import assert_frame_equal
+from utils import IO
+import utils.io_adopter.local as io_local
+
+dict_schema = {
+    "enable": True,
+    "string_storage": "pyarrow",
+    "string_columns": ["SerialNumber_M2M", "Job_Index", "key_serial"],
+    "category_columns": ["ShipTo_Country"]}
+
+
+@pytest.fixture
+def memory_mode():
+    yield IO.set_memory_mode(dict_schema)
+    IO.set_memory_mode(None)
+
+
+@pytest.fixture
+def install_csv(tmp_path):
+    """Processed install base with missing keys."""
+    df_data = pd.read_csv("tests/ip/processed_install.csv")
+    df_data.loc[::7, ["SerialNumber_M2M", "Job_Index"]] = np.nan
+    df_data.loc[::5, "key_serial"] = np.nan
+    df_data.to_csv(tmp_path / "processed_install.csv", index=False)
+    return {"file_dir": str(tmp_path), "file_name": "processed_install.csv"}
+
+
+def read_install(config):
+    return IO.read_csv("local", config)
+
+
+class TestMemoryMode:
+    """
+    This class tests columns converted as per memory_mode behave as object
+    columns in operations of the pipeline.
+    """
+
+    def test_disabled(self, install_csv):
+        """
+        Validates schema is not applied unless set.
+        """
+        IO.set_memory_mode(None)
+        df_data = read_install(install_csv)
+        assert df_data["SerialNumber_M2M"].dtype == object
+
+        df_out = IO.apply_dtype_schema(
+            df_data.copy(), dict(dict_schema, enable=False))
+        assert_frame_equal(df_out, df_data)
+
+    def test_read_csv(self, install_csv, memory_mode):
+        """
+        Validates schema set is applied on read; missing values are NaN.
+        """
+        df_data = read_install(install_csv)
+        dtype_str = pd.StringDtype("pyarrow", na_value=np.nan)
+        for col in dict_schema["string_columns"]:
+            assert df_data[col].dtype == dtype_str
+        assert isinstance(df_data["ShipTo_Country"].dtype, pd.CategoricalDtype)
+
+        ar_serial = df_data["SerialNumber_M2M"]
+        assert ar_serial.isna().any()
+        assert ar_serial[ar_serial.isna()].tolist()[0] is np.nan
+        assert (ar_serial == "").dtype == bool
+
+    def test_string_ops(self, install_csv, memory_mode):
+        """
+        Validates fill, replace, mask, split, merge and groupby on string
+        columns give results of object columns.
+        """
+        IO.set_memory_mode(None)
+        df_exp = read_install(install_csv)
+        IO.set_memory_mode(dict_schema)
+        df_data = read_install(install_csv)
+
+        def run(df_data):
+            df_data = df_data.copy()
+            df_data["key_serial"] = df_data["key_serial"].fillna("")
+            df_data["Job_Index"] = df_data["Job_Index"].replace("", np.nan)
+            df_data.loc[df_data["key_serial"] == "", "key_serial"] = np.nan
+            df_data[["Job", "Line"]] = df_data["Job_Index"].str.split(
+                "-", n=1, expand=True)
+
+            df_ref = pd.DataFrame({
+                "SerialNumber_M2M": df_exp["SerialNumber_M2M"].dropna()
+                .unique()[:5].tolist(), "Lead": 1})
+            df_out = df_data.merge(df_ref, on="SerialNumber_M2M", how="left")
+            df_count = df_out.groupby("SerialNumber_M2M")["Lead"].count()
+            return df_out.astype(object), df_count
+
+        df_out, df_count = run(df_data)
+        df_out_exp, df_count_exp = run(df_exp)
+        assert_frame_equal(df_out, df_out_exp, check_dtype=False,
+                           check_categorical=False)
+        assert_frame_equal(df_count.reset_index().astype(object),
+                           df_count_exp.reset_index().astype(object))
+
+    def test_local_arrow(self, tmp_path, memory_mode):
+        """
+        Validates string columns read from arrow files have dtype of schema.
+        """
+        config = {"file_dir": str(tmp_path), "file_name": "install.csv"}
+        df_data = pd.DataFrame({
+            "SerialNumber_M2M": ["110-1", None], "Customer": ["abc", "xyz"]})
+        io_local.write_arrow_local(config, df_data)
+
+        df_out = IO.read_csv("local-arrow", config)
+        assert df_out["SerialNumber_M2M"].dtype == IO.string_dtype()
+        assert df_out["SerialNumber_M2M"].tolist()[1] is np.nan
+        assert df_out["Customer"].dtype == object
+
+    def test_config(self):
+        """
+        Validates memory mode of config is disabled till transforms of
+        stages are audited for arrow backed strings; no categorical columns
+        as they fail on assignment of new labels e.g. fillna("").
+        """
+        with open("config/config_dcpd.json", "r") as file:
+            dict_config = json.load(file)["memory_mode"]
+        assert not dict_config["enable"]
+        assert dict_config["category_columns"] == []
+
+        IO.set_memory_mode(dict_config)
+        try:
+            assert IO.arrow_string_columns() == []
+        finally:
+            IO.set_memory_mode(None)
+
+        IO.set_memory_mode(dict(dict_config, enable=True))
+        try:
+            assert "Job_Index" in IO.arrow_string_columns()
+        finally:
+            IO.set_memory_mode(None)
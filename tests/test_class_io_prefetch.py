@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""@file test_class_io_prefetch.py
+
+
+
+@brief Unit Test class to test background prefetch of IO
+
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# Import system path
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(".")
+
+import pandas as pd
+import pytest
+from pandas._testing import assert_frame_equal
+from utils import IO
+
+dict_enable = {"prefetch": {"enable": True}}
+
+
+def read_in_worker(config):
+    """Prefetch and read in a forked worker."""
+    IO.prefetch("local", [config], dict_enable)
+    return IO.read_csv("local", config)
+
+
+@pytest.fixture
+def config(tmp_path):
+    config = {"file_dir": str(tmp_path), "file_name": "bom.csv"}
+    pd.DataFrame({"Job#": ["J1", "J2"], "Qty": [1, 2]}).to_csv(
+        tmp_path / "bom.csv", index=False)
+    yield config
+    IO.clear_prefetch()
+
+
+class TestPrefetch:
+    """
+    This class tests reads served by prefetch.
+    """
+
+    def test_prefetch_read(self, config):
+        """
+        Validates prefetched data is same as data read and is used once.
+        """
+        df_exp = IO.read_csv("local", config)
+        IO.read_stats(f_reset=True)
+
+        assert IO.prefetch("local", [config, dict(config)], dict_enable) == 1
+        assert_frame_equal(IO.read_csv("local", dict(config)), df_exp)
+        assert_frame_equal(IO.read_csv("local", config), df_exp)
+
+        dict_stats = IO.read_stats()
+        assert dict_stats["reads"] == 2
+        assert dict_stats["prefetched"] == 1
+
+    def test_prefetch_disabled(self, config):
+        """
+        Validates nothing is submitted when prefetch is disabled.
+        """
+        assert IO.prefetch("local", [config], {}) == 0
+        assert IO.clear_prefetch() == 0
+
+    def test_write_invalidates(self, config):
+        """
+        Validates data written after prefetch is read.
+        """
+        IO.prefetch("local", [config], dict_enable)
+        df_new = pd.DataFrame({"Job#": ["J3"], "Qty": [3]})
+        IO.write_csv("local", config, df_new)
+
+        assert_frame_equal(IO.read_csv("local", config), df_new)
+
+    def test_prefetch_error(self, config):
+        """
+        Validates failure of prefetched read is raised on read.
+        """
+        config["file_name"] = "missing.csv"
+        IO.prefetch("local", [config], dict_enable)
+        with pytest.raises(Exception) as _:
+            IO.read_csv("local", config)
+
+    def test_wait_prefetch(self, config):
+        """
+        Validates reads are complete after wait and data is kept for read.
+        """
+        IO.prefetch("local", [config], dict_enable)
+        assert IO.wait_prefetch() == 1
+        IO.read_stats(f_reset=True)
+
+        IO.read_csv("local", config)
+        assert IO.read_stats()["prefetched"] == 1
+
+    def test_prefetch_forked(self, config):
+        """
+        Validates forked workers prefetch and read with pools of their own.
+        """
+        df_exp = IO.read_csv("local", config)
+        config_worker = dict(config, file_name="bom_worker.csv")
+        df_exp.to_csv(f"{config['file_dir']}/bom_worker.csv", index=False)
+        IO.prefetch("local", [config], dict_enable)
+        IO.wait_prefetch()
+
+        with ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context("fork")) as executor:
+            df_out = executor.submit(read_in_worker, config_worker).result(
+                timeout=30)
+        assert_frame_equal(df_out, df_exp)
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""@file test_class_io_write.py
+
+
+
+@brief Unit Test class to test chunked and background writes of IO
+
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# Import system path
+import sys
+
+sys.path.append(".")
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas._testing import assert_frame_equal
+from utils import IO
+from utils.io_adopter.class_adlsFunc import adlsFunc
+from utils.io_adopter.local_adls import LocalAdlsBackend
+
+adls_config = {"connection_string": "ib-connection-string",
+               "storage_account_name": "ib-storage-account"}
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = LocalAdlsBackend(str(tmp_path), secrets={
+        key: "local" for key in adls_config.values()})
+    backend.create_file_system("results")
+    IO.set_adls_backend(backend)
+    yield backend
+    IO.wait_writes()
+    IO.set_adls_backend(None)
+
+
+def get_data(n_rows=10):
+    return pd.DataFrame({
+        "SerialNumber": [f"110-{ix}" for ix in range(n_rows)],
+        "Qty": np.arange(n_rows) * 1.5,
+        "Comment": ["a, b", "\n", np.nan, "c"] * (n_rows // 4)
+        + ["d"] * (n_rows % 4)})
+
+
+def get_config(file_name):
+    return {"adls_config": adls_config,
+            "adls_dir": {"container_name": "results",
+                         "directory_name": "validation",
+                         "file_name": file_name}}
+
+
+class TestEncodeChunks:
+    """
+    This class tests data is encoded to csv in chunks of rows.
+    """
+
+    @pytest.mark.parametrize("chunk_rows", [1, 3, 10, 100])
+    def test_chunks_join(self, chunk_rows):
+        """
+        Validates joined chunks are same as data encoded at once; header is
+        in first chunk only.
+        """
+        df_data = get_data()
+        ls_chunks = list(adlsFunc().encode_csv_chunks(df_data, chunk_rows))
+
+        assert len(ls_chunks) == -(-len(df_data) // chunk_rows)
+        assert b"".join(ls_chunks) == df_data.replace("\n", "").to_csv(
+            index=False).encode("utf-8")
+        assert sum(chunk.startswith(b"SerialNumber,") for chunk in ls_chunks) == 1
+
+    def test_empty(self):
+        """
+        Validates data without rows is encoded as header.
+        """
+        df_data = get_data().iloc[:0]
+        assert list(adlsFunc().encode_csv_chunks(df_data, 4)) == [
+            b"SerialNumber,Qty,Comment\n"]
+
+
+class TestChunkedWrite:
+    """
+    This class tests chunked upload of output_file_write.
+    """
+
+    @pytest.mark.parametrize("n_rows, chunk_rows, n_appends", [
+        (10, 3, 4), (12, 4, 3), (10, 50, 1), (0, 4, 1)])
+    def test_write_read(self, backend, n_rows, chunk_rows, n_appends):
+        """
+        Validates file read back is data written; one append per chunk and
+        single flush.
+        """
+        io_adls = adlsFunc(backend)
+        df_data = get_data(n_rows)
+
+        status = io_adls.output_file_write(
+            "local", df_data, "results", "output", "validation",
+            chunk_rows=chunk_rows, max_concurrency=2)
+        assert status == "Success! File created with name: output.csv"
+
+        df_out = io_adls.input_file_read(
+            "local", "results", "output.csv", "validation")
+        df_exp = df_data.replace("\n", np.nan)
+        assert_frame_equal(df_out, df_exp, check_dtype=n_rows > 0,
+                           check_index_type=n_rows > 0)
+        assert backend.stats["append_data"]["calls"] == n_appends
+        assert backend.stats["flush_data"]["calls"] == 1
+
+    def test_write_failure(self, backend):
+        """
+        Validates failed upload is returned and file is not committed.
+        """
+        io_adls = adlsFunc(backend)
+
+        status = io_adls.output_file_write(
+            "local", get_data(), "missing", "output", "validation")
+        assert isinstance(status, Exception)
+        assert "flush_data" not in backend.stats
+
+
+class TestWriteAsync:
+    """
+    This class tests writes submitted in background by IO.write_csv.
+    """
+
+    def test_write_async(self, backend):
+        """
+        Validates data handed over is written once waited.
+        """
+        df_data = get_data()
+        df_exp = df_data.replace("\n", np.nan)
+
+        future = IO.write_csv("azure-adls", get_config("output.csv"),
+                              df_data, asynchronous=True)
+        assert IO.wait_writes() == [
+            "Success! File created with name: output.csv"]
+        assert future.done()
+
+        assert_frame_equal(
+            IO.read_csv("azure-adls", get_config("output.csv")), df_exp)
+
+    def test_pending_bounded(self, backend):
+        """
+        Validates pending writes are bounded by max_pending.
+        """
+        for ix in range(6):
+            IO.write_csv("azure-adls", get_config(f"output_{ix}.csv"),
+                         get_data(), asynchronous=True)
+        assert len(IO.wait_writes()) <= 4
+        assert backend.stats["flush_data"]["calls"] == 6
+
+    def test_write_async_failure(self, backend):
+        """
+        Validates failure of write in background is raised by wait_writes.
+        """
+        config = get_config("output.csv")
+        config["adls_dir"]["container_name"] = "missing"
+        IO.write_csv("azure-adls", config, get_data(), asynchronous=True)
+
+        with pytest.raises(Exception) as _:
+            IO.wait_writes()
+        assert IO.wait_writes() == []
+
+    def test_pending_bounded_failure(self, backend):
+        """
+        Validates failure of write awaited to bound pending writes is raised.
+        """
+        config = get_config("output.csv")
+        config["adls_dir"]["container_name"] = "missing"
+        IO.write_csv("azure-adls", config, get_data(), asynchronous=True)
+
+        with pytest.raises(Exception) as _:
+            for ix in range(4):
+                IO.write_csv("azure-adls", get_config(f"output_{ix}.csv"),
+                             get_data(), asynchronous=True)
+        assert len(IO.wait_writes()) == 3
+
+    def test_wait_writes_no_raise(self, backend):
+        """
+        Validates failures are not raised with raise_error False; all writes
+        are awaited.
+        """
+        config = get_config("output.csv")
+        config["adls_dir"]["container_name"] = "missing"
+        IO.write_csv("azure-adls", config, get_data(), asynchronous=True)
+        IO.write_csv("azure-adls", get_config("output_0.csv"), get_data(),
+                     asynchronous=True)
+
+        assert IO.wait_writes(raise_error=False) == [
+            "Success! File created with name: output_0.csv"]
+        assert IO.wait_writes() == []
+
+
+class TestAppend:
+    """
+    This class tests rows appended to csv by IO.append_csv.
+    """
+
+    @pytest.mark.parametrize("mode", ["local", "local-arrow"])
+    def test_append_local(self, tmp_path, mode):
+        """
+        Validates file is created with header and rows are appended.
+        """
+        config = {"file_dir": str(tmp_path), "file_name": "cache.csv"}
+        df_data = get_data(6)
+
+        IO.append_csv(mode, config, df_data.iloc[:4])
+        IO.append_csv(mode, config, df_data.iloc[4:])
+
+        IO.write_csv(mode, dict(config, file_name="exp.csv"), df_data)
+        assert_frame_equal(IO.read_csv(mode, config),
+                           IO.read_csv(mode, dict(config, file_name="exp.csv")))
+
+    def test_append_adls(self, backend):
+        """
+        Validates rows are appended after content of file on ADLS.
+        """
+        df_data = get_data(6)
+        config = get_config("cache.csv")
+
+        status = IO.append_csv("azure-adls", config, df_data.iloc[:4])
+        assert status == "Success! File created with name: cache.csv"
+        IO.append_csv("azure-adls", config, df_data.iloc[4:])
+
+        assert_frame_equal(IO.read_csv("azure-adls", config),
+                           df_data.replace("\n", np.nan))
+        assert backend.stats["create_file"]["calls"] == 1
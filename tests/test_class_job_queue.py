@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""@file test_class_job_queue.py
+
+
+
+@brief Unit Test class to test file backed queue of pipeline runs
+
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# Import system path
+import json
+import os
+import sys
+import time
+
+sys.path.append(".")
+
+import pytest
+from utils import AppLogger
+from utils.io_adopter.local_adls import LocalAdlsBackend
+from utils.job_queue import AdlsJobStore, JobQueue, LocalJobStore
+from utils.run_coordinator import LocalLeaseBackend
+
+logger = AppLogger("utils.test_pipeline")
+
+
+def pipeline_ok(mode="local"):
+    logger.app_success("Read data")
+    logger.app_success("Export data")
+    return f"ran in {mode}"
+
+
+def pipeline_fail():
+    logger.app_success("Read data")
+    raise ValueError("bad data")
+
+
+dict_pipelines = {"ok": pipeline_ok, "fail": pipeline_fail}
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(LocalJobStore(str(tmp_path / "jobs")))
+
+
+def abandon(queue):
+    """Claim a job and let its lease expire as if the worker died."""
+    job = queue.claim()
+    queue.update(job["job_id"], lease_expires=time.time() - 1)
+    return job
+
+
+class TestJobQueue:
+    """
+    This class tests submission, single-flight deduplication and runs of
+    jobs.
+    """
+
+    def test_submit_single_flight(self, queue):
+        """
+        Validates identical requests share active job; different requests
+        and requests after completion get new jobs.
+        """
+        job, f_created = queue.submit("ok", {"mode": "local"})
+        job_same, f_created_same = queue.submit("ok", {"mode": "local"})
+        job_other, _ = queue.submit("ok", {"mode": "azure-adls"})
+
+        assert f_created and (not f_created_same)
+        assert job_same["job_id"] == job["job_id"]
+        assert job_other["job_id"] != job["job_id"]
+        assert queue.read_job(job["job_id"])["n_requests"] == 2
+
+        queue.run_pending(dict_pipelines)
+        job_new, f_created = queue.submit("ok", {"mode": "local"})
+        assert f_created and (job_new["job_id"] != job["job_id"])
+
+    def test_run_stages(self, queue):
+        """
+        Validates status, result and stages of a run.
+        """
+        job, _ = queue.submit("ok", {"mode": "azure-adls"})
+        ls_jobs = queue.run_pending(dict_pipelines)
+
+        assert [job_run["job_id"] for job_run in ls_jobs] == [job["job_id"]]
+        job = queue.read_job(job["job_id"])
+        assert job["status"] == "succeeded"
+        assert job["result"] == "ran in azure-adls"
+        assert [stage["step"] for stage in job["stages"]][:2] == [
+            "Read data", "Export data"]
+        assert job["duration"] >= 0
+        assert queue.claim() is None
+
+    def test_run_failed(self, queue):
+        """
+        Validates failed run is recorded and does not stop other jobs.
+        """
+        job_fail, _ = queue.submit("fail")
+        job_ok, _ = queue.submit("ok")
+        queue.run_pending(dict_pipelines)
+
+        job_fail = queue.read_job(job_fail["job_id"])
+        assert job_fail["status"] == "failed"
+        assert job_fail["error"] == "bad data"
+        assert queue.read_job(job_ok["job_id"])["status"] == "succeeded"
+
+    def test_handle_request(self, queue):
+        """
+        Validates responses of HTTP trigger.
+        """
+        body, status_code = queue.handle_request("POST", "ok", {})
+        assert status_code == 202
+        job_id = json.loads(body)["job_id"]
+
+        body, status_code = queue.handle_request("GET", "ok", job_id=job_id)
+        assert (status_code == 200) and (json.loads(body)["status"] == "queued")
+
+        assert queue.handle_request("GET", "fail", job_id=job_id)[1] == 404
+        assert queue.handle_request("GET", "ok", job_id="../x")[1] == 404
+        assert queue.handle_request("POST", "ok", [1])[1] == 400
+
+    def test_lease_expired_requeued(self, queue):
+        """
+        Validates job of a dead worker is queued again, run by next worker
+        and its stale run can no more update it.
+        """
+        job, _ = queue.submit("ok", {"mode": "local"})
+        job_dead = abandon(queue)
+        assert job_dead["job_id"] == job["job_id"]
+
+        body, _ = queue.handle_request("GET", "ok", job_id=job["job_id"])
+        assert json.loads(body)["status"] == "queued"
+
+        ls_jobs = queue.run_pending(dict_pipelines)
+        assert [job_run["job_id"] for job_run in ls_jobs] == [job["job_id"]]
+        assert ls_jobs[0]["status"] == "succeeded"
+        assert ls_jobs[0]["attempts"] == 2
+
+        # Dead worker coming back does not overwrite the job
+        assert queue.update(job["job_id"], claim_id=job_dead["claim_id"],
+                            status="failed") is None
+        assert queue.read_job(job["job_id"])["status"] == "succeeded"
+
+    def test_lease_expired_failed(self, queue):
+        """
+        Validates job exceeding attempts is failed and identical request
+        gets a new job instead of joining it.
+        """
+        queue.max_attempts = 1
+        job, _ = queue.submit("ok", {"mode": "local"})
+        abandon(queue)
+
+        body, status_code = queue.handle_request("POST", "ok", {"mode": "local"})
+        assert (status_code == 202) and (not json.loads(body)["deduplicated"])
+        assert json.loads(body)["job_id"] != job["job_id"]
+
+        job = queue.read_job(job["job_id"])
+        assert job["status"] == "failed"
+        assert job["error"].startswith("Lease expired")
+        assert len(queue.run_pending(dict_pipelines)) == 1
+
+    def test_lease_renewed(self, queue):
+        """
+        Validates lease of a long run is renewed by its worker.
+        """
+        queue.lease_duration = 0.3
+
+        def pipeline_slow():
+            time.sleep(1)
+            return "done"
+
+        job, _ = queue.submit("slow")
+        job_run = queue.run_pending({"slow": pipeline_slow})[0]
+        assert job_run["status"] == "succeeded"
+        assert job_run["attempts"] == 1
+
+    def test_adls_store(self, tmp_path):
+        """
+        Validates queue on storage account (local stand-in of ADLS).
+        """
+        backend = LocalAdlsBackend(str(tmp_path / "adls"))
+        queue = JobQueue(AdlsJobStore(
+            backend.create_file_system("results"), "jobs",
+            LocalLeaseBackend(str(tmp_path / "leases"))))
+        assert queue.list_jobs() == []
+
+        job, _ = queue.submit("ok", {"mode": "local"})
+        job_same, f_created = queue.submit("ok", {"mode": "local"})
+        assert (not f_created) and (job_same["job_id"] == job["job_id"])
+        assert os.path.isfile(backend.local_path(
+            "results", f"jobs/{job['job_id']}.json"))
+
+        ls_jobs = queue.run_pending(dict_pipelines)
+        assert [job_run["status"] for job_run in ls_jobs] == ["succeeded"]
+        assert queue.read_job(job["job_id"])["n_requests"] == 2
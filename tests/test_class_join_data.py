@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""@file test_class_join_data.py
+
+
+
+@brief Unit Test class to test keyed joins against DataFrame.merge
+
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# Import system path
+import sys
+
+sys.path.append(".")
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas._testing import assert_frame_equal
+from utils.join_data import Join
+
+
+def get_data(key):
+    df_left = pd.DataFrame({
+        "SerialNumber_M2M": ["a", "b", "a", "c", None, "d"],
+        "Qty": [1, 2, 3, 4, 5, 6],
+        "Component": ["x", "y", "z", "x", "y", "z"]})
+    df_right = pd.DataFrame({
+        key: ["b", "a", "e", "a", None, "b", "c"],
+        "Qty": [10, 20, 30, 40, 50, 60, 70],
+        "Region": ["n", "s", "e", "w", "n", "s", "e"]})
+    return df_left, df_right
+
+
+class TestJoin:
+    """
+    This class tests joins of indexed data give output of DataFrame.merge.
+    """
+
+    @pytest.mark.parametrize("how", ["left", "inner", "right"])
+    def test_same_key(self, how):
+        """
+        Validates rows, order, dtypes and suffixes equal merge on key with
+        repeated keys on both sides.
+        """
+        df_left, df_right = get_data("SerialNumber_M2M")
+        join = Join()
+        join.register("install", df_right, "SerialNumber_M2M")
+        df_out = join.join(df_left, "install", "SerialNumber_M2M", how=how)
+
+        assert_frame_equal(df_out, df_left.merge(
+            df_right, on="SerialNumber_M2M", how=how))
+
+    @pytest.mark.parametrize("how", ["left", "inner", "right"])
+    @pytest.mark.parametrize("keep_key", [False, True])
+    def test_other_key(self, how, keep_key):
+        """
+        Validates output equals merge on left_on / right_on; unmatched right
+        rows have missing left key.
+        """
+        df_left, df_right = get_data("SerialNumber")
+        join = Join()
+        join.register("services", df_right, "SerialNumber",
+                      keep_key=keep_key)
+        df_out = join.join(df_left, "services", "SerialNumber_M2M", how=how)
+
+        df_exp = df_left.merge(df_right, left_on="SerialNumber_M2M",
+                               right_on="SerialNumber", how=how)
+        if not keep_key:
+            df_exp = df_exp.drop(columns=["SerialNumber"])
+        assert_frame_equal(df_out, df_exp)
+
+    def test_right_all_matched(self):
+        """
+        Validates right join without unmatched keys keeps integer dtype of
+        left columns.
+        """
+        df_left, df_right = get_data("SerialNumber_M2M")
+        df_right = df_right.loc[df_right["SerialNumber_M2M"] != "e"]
+        join = Join()
+        join.register("install", df_right, "SerialNumber_M2M", ["Region"])
+        df_out = join.join(df_left, "install", "SerialNumber_M2M",
+                           how="right")
+
+        df_exp = df_left.merge(df_right[["SerialNumber_M2M", "Region"]],
+                               on="SerialNumber_M2M", how="right")
+        assert_frame_equal(df_out, df_exp)
+        assert df_out["Qty"].dtype == np.int64
+
+    def test_fanout_guard(self):
+        """
+        Validates fan-out above limit raises and unlimited join does not.
+        """
+        df_left = pd.DataFrame({"Job_Index": ["j1"] * 2})
+        df_right = pd.DataFrame({"Job_Index": ["j1"] * 4, "Part": range(4)})
+        join = Join(max_fanout=2)
+        join.register("bom", df_right, "Job_Index")
+        assert join.is_registered("bom")
+
+        with pytest.raises(ValueError, match="fan-out 2 -> 8"):
+            join.join(df_left, "bom", "Job_Index")
+        assert len(join.join(df_left, "bom", "Job_Index",
+                             max_fanout=np.inf)) == 8
+        with pytest.raises(ValueError, match="Unknown join type"):
+            join.join(df_left, "bom", "Job_Index", how="outer")
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""@file test_class_lead_delta.py
+
+
+
+@brief Unit Test class to test changes of lead generation outputs
+
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# Import system path
+import sys
+
+sys.path.append(".")
+
+import pandas as pd
+from utils.dcpd.class_lead_delta import LeadDelta
+
+obj_delta = LeadDelta()
+
+
+class TestLeadDelta:
+    """
+    This class tests changes of output against fingerprints of previous
+    snapshot.
+    """
+
+    ls_key = ['Serial_Number', 'Component', 'Lead_Type']
+    df_prev_out = pd.DataFrame({
+        'Serial_Number': ['A', 'A', 'B', 'C'],
+        'Component': ['Fan', 'Fan', 'Cap', 'Fan'],
+        'Lead_Type': ['EOSL', 'EOSL', 'EOSL', 'Life'],
+        'Date': ['2024-01-01', '2024-02-01', '2024-03-01', '2024-04-01']})
+
+    def test_lead_delta_first_run(self):
+        """
+        Validates every row is an insert without previous snapshot and
+        repeated keys are numbered.
+        """
+        df_delta, df_fingerprint = obj_delta.lead_delta(
+            self.df_prev_out, None, self.ls_key)
+
+        assert df_delta['Change_Type'].tolist() == ['insert'] * 4
+        assert df_fingerprint['Key'].tolist() == [
+            'A|Fan|EOSL|0', 'A|Fan|EOSL|1', 'B|Cap|EOSL|0', 'C|Fan|Life|0']
+
+    def test_lead_delta(self):
+        """
+        Validates updated, inserted and deleted rows; unchanged output has
+        no changes.
+        """
+        _, df_prev = obj_delta.lead_delta(self.df_prev_out, None, self.ls_key)
+
+        df_out = self.df_prev_out.copy()
+        df_out.loc[2, 'Date'] = '2025-03-01'
+        df_out = df_out.drop(index=3)
+        df_out.loc[4] = ['D', 'Fan', 'EOSL', '2024-05-01']
+
+        df_delta, _ = obj_delta.lead_delta(df_out, df_prev, self.ls_key)
+
+        assert df_delta['Serial_Number'].tolist() == ['B', 'D', 'C']
+        assert df_delta['Change_Type'].tolist() == [
+            'update', 'insert', 'delete']
+
+        df_delta, _ = obj_delta.lead_delta(
+            self.df_prev_out, df_prev, self.ls_key)
+        assert df_delta.empty
+
+    def test_fingerprint_csv(self, tmp_path):
+        """
+        Validates fingerprints written to and read from csv match output.
+        """
+        _, df_prev = obj_delta.lead_delta(self.df_prev_out, None, self.ls_key)
+        df_prev.to_csv(tmp_path / "fingerprint.csv", index=False)
+        df_prev = pd.read_csv(tmp_path / "fingerprint.csv")
+
+        df_delta, _ = obj_delta.lead_delta(
+            self.df_prev_out, df_prev, self.ls_key)
+        assert df_delta.empty
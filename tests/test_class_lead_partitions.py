@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""@file test_class_lead_partitions.py
+
+
+
+@brief Unit Test class to test partitions of lead generation
+
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# Import system path
+import sys
+
+sys.path.append(".")
+
+import pandas as pd
+from utils.dcpd.class_lead_partitions import LeadPartitions
+
+obj_partitions = LeadPartitions()
+
+
+class TestPartitions:
+    """
+    This class tests install base data is partitioned on product family and
+    partition file names.
+    """
+
+    def test_split_partitions(self):
+        """
+        Validates rows are split on normalised product family; missing
+        values are in partition unknown.
+        """
+        df_data = pd.DataFrame({
+            'product_prodclass': ['PDU', 'RPP', None, 'pdu', ' STS '],
+            'SerialNumber_M2M': ['a', 'b', 'c', 'd', 'e']})
+
+        dict_out = obj_partitions.split_partitions(
+            df_data, 'product_prodclass')
+
+        assert list(dict_out.keys()) == ['pdu', 'rpp', 'sts', 'unknown']
+        assert dict_out['pdu'].SerialNumber_M2M.tolist() == ['a', 'd']
+        assert dict_out['unknown'].SerialNumber_M2M.tolist() == ['c']
+        assert sum(len(df) for df in dict_out.values()) == len(df_data)
+
+    def test_split_bom(self):
+        """
+        Validates BOM of a partition has rows of jobs of its units only;
+        units without job need no BOM and merge of each partition with its
+        BOM is the merge of all units with the full BOM.
+        """
+        df_data = pd.DataFrame({
+            'product_prodclass': ['PDU', 'RPP', 'PDU', 'STS'],
+            'Job_Index': ['J1-1', 'J2-1', 'J3-2', None]})
+        df_bom = pd.DataFrame({
+            'Job_Index': ['J1', 'J1', 'J2', 'J3', 'J4'],
+            'PartNumber_BOM_BOM': ['a', 'b', 'c', 'd', 'e']})
+
+        dict_install = obj_partitions.split_partitions(
+            df_data, 'product_prodclass')
+        dict_bom = obj_partitions.split_bom(df_bom, dict_install)
+
+        assert list(dict_bom.keys()) == ['pdu', 'rpp', 'sts']
+        assert dict_bom['pdu'].PartNumber_BOM_BOM.tolist() == ['a', 'b', 'd']
+        assert dict_bom['rpp'].PartNumber_BOM_BOM.tolist() == ['c']
+        assert dict_bom['sts'].empty
+
+        def merge(df_install, df_bom):
+            df_install = df_install.assign(
+                Job_Index=df_install['Job_Index'].str.split('-').str[0])
+            return df_bom.merge(df_install.dropna(subset=['Job_Index']),
+                                on='Job_Index', how='right')
+
+        df_out = pd.concat(
+            [merge(dict_install[key], dict_bom[key]) for key in dict_install],
+            ignore_index=True)
+        df_exp = merge(df_data, df_bom)
+        pd.testing.assert_frame_equal(
+            df_out.sort_values('PartNumber_BOM_BOM').reset_index(drop=True),
+            df_exp.sort_values('PartNumber_BOM_BOM').reset_index(drop=True))
+
+    def test_partition_key(self):
+        """
+        Validates names of partitions are suitable for file names.
+        """
+        df_data = pd.DataFrame({
+            'product_prodclass': ['PDU - Primary', 'UPS/STS', '', None]})
+
+        ar_key = obj_partitions.partition_key(df_data, 'product_prodclass')
+
+        assert ar_key.tolist() == ['pdu_primary', 'ups_sts', 'unknown',
+                                   'unknown']
+
+    def test_partition_file_name(self):
+        """
+        Validates output file names are suffixed with partition.
+        """
+        assert obj_partitions.partition_file_name('output_iLead.csv') == \
+               'output_iLead.csv'
+        assert obj_partitions.partition_file_name(
+            'output_iLead.csv', 'sts') == 'output_iLead_sts.csv'
+        assert obj_partitions.suffix_file_name(
+            'output_iLead.csv', 'delta') == 'output_iLead_delta.csv'
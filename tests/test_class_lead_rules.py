@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""@file test_class_lead_rules.py
+
+
+
+@brief Unit Test class to test rules and classification of leads
+
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# Import system path
+import sys
+
+sys.path.append(".")
+
+import numpy as np
+import pandas as pd
+import pytest
+from utils.dcpd.class_lead_rules import LeadRules
+
+obj_rules = LeadRules()
+
+
+class TestClassify:
+    """
+    This class tests classification of leads as EOSL / Life leads.
+    """
+
+    @staticmethod
+    def get_data():
+        return pd.DataFrame({
+            'key': ['a', 'b', 'c', 'd'],
+            'date_code': ['2010-06-15', '2000-02-29', '2020-01-01', '2019-01-01'],
+            'EOSL': ['', np.nan, '2030', ''],
+            'Life__Years': [10.0, 5.0, np.nan, np.nan]})
+
+    def test_classify_valid_scenario(self):
+        """
+        Validates lead type, age, due date and category for a fixed as of
+        date.
+        """
+        df_out = obj_rules.classify(self.get_data(), pd.Timestamp('2024-03-01'))
+
+        # EOSL leads followed by Life leads; leads without EOSL / life dropped
+        assert df_out['key'].tolist() == ['c', 'a', 'b']
+        assert df_out['lead_type'].tolist() == ['EOSL', 'Life', 'Life']
+        assert df_out['age'].tolist() == [4, 14, 24]
+        assert df_out['Component_Due_Date'].tolist() == [
+            '01/01/2030', '06/15/2020', '02/28/2005']
+        assert df_out['EOSL'].tolist() == ['01/01/2030', '', '']
+        assert df_out['Component_Due_in (years)'].tolist() == [6, -4, -19]
+        assert df_out['Component_Due_in (Category)'].tolist() == [
+            'Due after 3 years', 'Past Due', 'Past Due']
+        assert df_out['flag_include'].tolist()[1:] == [True, True]
+
+    def test_classify_reproducible(self):
+        """
+        Validates output depends only on the as of date.
+        """
+        df_out_1 = obj_rules.classify(self.get_data(), '2022-01-01')
+        df_out_2 = obj_rules.classify(self.get_data(), '2022-01-01')
+        pd.testing.assert_frame_equal(df_out_1, df_out_2)
+
+    @pytest.mark.parametrize(
+        "df_leads",
+        [None,
+         pd.DataFrame(),
+         pd.DataFrame(data={"test_col": ['new', 'new', 'existing']}),
+         ])
+    def test_classify_err(self, df_leads):
+        with pytest.raises(Exception) as _:
+            obj_rules.classify(df_leads, pd.Timestamp('2024-03-01'))
+
+
+class TestDates:
+    """
+    This class tests date helpers of lead classification.
+    """
+
+    def test_add_years(self):
+        """
+        Validates years are added as done by pandas DateOffset.
+        """
+        ar_date = pd.to_datetime(
+            ['2000-02-29', '2010-12-31', '2015-07-04', '2004-02-29']).to_numpy(
+            dtype='datetime64[D]')
+        ar_years = np.array([1, 10, 0, 4])
+
+        ar_act = obj_rules.add_years(ar_date, ar_years)
+        ar_exp = [pd.Timestamp(date) + pd.DateOffset(years=int(years))
+                  for date, years in zip(ar_date, ar_years)]
+        assert list(pd.DatetimeIndex(ar_act)) == ar_exp
+
+    def test_due_category(self):
+        ar_due_in = np.array([-1, 0, 1, 2, 3, 4, 100, np.nan])
+        assert obj_rules.due_category(ar_due_in).tolist() == [
+            'Past Due', 'Due this year', 'Due this year', 'Due in 2-3 years',
+            'Due in 2-3 years', 'Due after 3 years', 'Unknown', 'Unknown']
+
+
+class TestResolveComponent:
+    """
+    This class tests resolving lead components to services components.
+    """
+
+    def test_resolve_component(self):
+        ar_component = pd.Series(['Fans', 'M4 Display', 'BCMS', '', 'Fans'])
+        ar_act = obj_rules.resolve_component(ar_component, ['fan', 'display'])
+        assert ar_act.tolist() == ['fan', 'display', 'BCMS', '', 'fan']
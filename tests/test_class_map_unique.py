@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""@file test_class_map_unique.py
+
+
+
+@brief Unit Test class to test evaluation of functions per distinct value
+
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# Import system path
+import sys
+
+sys.path.append(".")
+
+import numpy as np
+import pandas as pd
+from utils.map_unique import MapUnique
+
+
+class TestMapUnique:
+    """
+    This class tests map_unique against row wise apply.
+    """
+
+    def test_element_wise(self):
+        ar_data = pd.Series(
+            ["a-1", "b-2", "a-1", np.nan, "b-2"], index=[5, 6, 7, 8, 9],
+            name="SerialNumber")
+        ar_act = MapUnique.map_unique(ar_data, lambda x: str(x).upper())
+        pd.testing.assert_series_equal(
+            ar_act, ar_data.apply(lambda x: str(x).upper()))
+
+    def test_vectorized(self):
+        ar_data = pd.Series(["x", "yy", "x", "zzz"])
+        ar_act = MapUnique.map_unique(
+            ar_data, lambda ar: ar.str.len(), vectorized=True)
+        assert ar_act.tolist() == [1, 2, 1, 3]
+
+    def test_empty(self):
+        ar_act = MapUnique.map_unique(pd.Series([], dtype=object), len)
+        assert ar_act.empty
+
+    def test_map_values_pool(self):
+        ls_values = [str(ix) for ix in range(MapUnique.MIN_UNIQUES_POOL)]
+        ls_act = MapUnique.map_values(ls_values, len, max_workers=2)
+        assert ls_act == [len(value) for value in ls_values]
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""@file test_class_rules.py
+
+
+
+@brief Unit Test class to test first match decoding of utils.Rules
+
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# Import system path
+import re
+import sys
+
+sys.path.append(".")
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas._testing import assert_series_equal
+from utils.rules import Rules
+
+obj_rules = Rules()
+
+# (label, pattern) in priority order; "gold" is found before "silver"
+ls_rules = [("Gold", "gold"), ("Silver", "silver"), ("PM", r"pm\d")]
+
+
+def decode_loop(ar_text, ls_rules):
+    """Earlier decoding: label of a row is set by first rule found only."""
+    ar_out = pd.Series("", index=ar_text.index, dtype=object)
+    for label, pattern in ls_rules:
+        f_found = ar_text.apply(
+            lambda x: re.search(pattern, str(x)) is not None)
+        f_blank = ar_out == ""
+        ar_out.loc[f_blank & f_found] = label
+    return ar_out
+
+
+class TestFirstMatch:
+    """
+    This class tests first pattern in priority order decides the label.
+    """
+
+    def test_compile_first_match(self):
+        """
+        Validates group of first pattern in priority order is set, not of
+        leftmost occurrence.
+        """
+        pattern = Rules.compile_first_match(["silver", "gold"])
+
+        match = pattern.match("gold and silver")
+        assert match.group("_r0") == "silver"
+        assert match.group("_r1") is None
+        assert pattern.match("gold").group("_r1") == "gold"
+        assert pattern.match("bronze") is None
+
+    @pytest.mark.parametrize("text, label", [
+        ("silver then gold", "Gold"),
+        ("gold then silver", "Gold"),
+        ("silver with pm2", "Silver"),
+        ("pm3", "PM"),
+        ("pm", ""),
+        ("", ""),
+        (np.nan, "")])
+    def test_priority_order(self, text, label):
+        """
+        Validates label of first rule found; missing text and text matching
+        no rule get the default.
+        """
+        ar_out = obj_rules.first_match(pd.Series([text]), ls_rules)
+        assert ar_out.tolist() == [label]
+
+    def test_equals_loop(self):
+        """
+        Validates output equals earlier loop over rules for repeated text.
+        """
+        ar_text = pd.Series(
+            ["silver gold", "gold", "pm1 silver", "none", "gold", "pm9"] * 3,
+            index=np.arange(18) * 2)
+
+        assert_series_equal(obj_rules.first_match(ar_text, ls_rules),
+                            decode_loop(ar_text, ls_rules))
+
+    @pytest.mark.parametrize("f_existing", [False, True])
+    def test_existing_value(self, f_existing):
+        """
+        Validates decoded labels replace existing value of column; rows of
+        partial frame keep their index.
+        """
+        df_data = pd.DataFrame({"Description": [
+            "Silver (PM1)", "GOLD plan", None, "bronze"]}, index=[3, 1, 7, 5])
+        if f_existing:
+            df_data["Contract"] = "Bronze"
+
+        df_data.loc[:, "Contract"] = obj_rules.first_match(
+            df_data["Description"], ls_rules, default="None",
+            prep=lambda ar_text: ar_text.str.replace(" ", "").str.lower()
+            .str.replace(")", ""))
+
+        assert df_data["Contract"].tolist() == [
+            "Silver", "Gold", "None", "None"]
+
+    def test_no_rules(self):
+        """
+        Validates every row gets the default without rules.
+        """
+        ar_out = obj_rules.first_match(pd.Series(["gold", None]), [], "-")
+        assert ar_out.tolist() == ["-", "-"]
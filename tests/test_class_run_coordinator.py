@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""@file test_class_run_coordinator.py
+
+
+
+@brief Unit Test class to test single-flight runs of pipeline stages
+
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# Import system path
+import json
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+sys.path.append(".")
+
+import pytest
+from utils.run_coordinator import LocalLeaseBackend, RunCoordinator, \
+    cron_matches
+
+
+@pytest.fixture
+def coordinator(tmp_path):
+    return RunCoordinator(
+        LocalLeaseBackend(str(tmp_path)), {"services": ["contracts"]},
+        lease_duration=1, poll_interval=0.02, wait_timeout=10,
+        start_grace=0.3, due_window=5)
+
+
+def schedule_at(time_sec):
+    """NCRONTAB expression of a daily timer firing at given second."""
+    time_utc = datetime.fromtimestamp(int(time_sec), tz=timezone.utc)
+    return f"{time_utc.second} {time_utc.minute} {time_utc.hour} * * *"
+
+
+def run_threads(ls_targets):
+    ls_threads = [threading.Thread(target=target) for target in ls_targets]
+    for thread in ls_threads:
+        thread.start()
+        time.sleep(0.05)
+    for thread in ls_threads:
+        thread.join()
+
+
+class TestRunCoordinator:
+    """
+    This class tests duplicate runs, attaching to runs in flight and
+    ordering of dependent stages.
+    """
+
+    def test_single_flight(self, coordinator):
+        """
+        Validates concurrent callers of a stage share one run.
+        """
+        ls_calls, ls_results = [], []
+
+        def stage():
+            ls_calls.append(1)
+            time.sleep(0.3)
+            return "done"
+
+        run_threads([lambda: ls_results.append(
+            coordinator.run("contracts", stage))] * 3)
+
+        assert len(ls_calls) == 1
+        assert ls_results == ["done"] * 3
+
+        # Run after completion is a new run
+        assert coordinator.run("contracts", stage) == "done"
+        assert len(ls_calls) == 2
+
+    def test_attach_failed(self, coordinator):
+        """
+        Validates error of run in flight is raised to attached caller.
+        """
+        ls_errors = []
+
+        def stage():
+            time.sleep(0.3)
+            raise ValueError("bad data")
+
+        def call():
+            try:
+                coordinator.run("contracts", stage)
+            except Exception as e:
+                ls_errors.append(str(e))
+
+        run_threads([call, call])
+        assert ls_errors[0] == "bad data"
+        assert "bad data" in ls_errors[1]
+
+    def test_expired_lease(self, coordinator):
+        """
+        Validates lease of crashed run expires and stage can run again.
+        """
+        backend = coordinator.backend
+        assert backend.acquire("contracts", 0.1) is not None
+        assert backend.acquire("contracts", 0.1) is None
+        time.sleep(0.2)
+
+        assert coordinator.run("contracts", lambda: "rerun") == "rerun"
+
+    def test_order_after_dependency(self, coordinator):
+        """
+        Validates services waits for contracts due by its timer; services
+        does not wait once contracts ran for the schedule.
+        """
+        ls_order = []
+
+        def contracts():
+            time.sleep(0.3)
+            ls_order.append("contracts")
+
+        def services():
+            ls_order.append("services")
+
+        # Timers of both fire now (second resolution); services requested
+        # first
+        coordinator.dict_schedules = {"contracts": schedule_at(time.time())}
+        coordinator.start_grace = 2
+        run_threads([lambda: coordinator.run("services", services),
+                     lambda: coordinator.run("contracts", contracts)])
+        assert ls_order == ["contracts", "services"]
+
+        # Contracts ran for the schedule
+        time_start = time.time()
+        coordinator.run("services", services)
+        assert time.time() - time_start < 0.2
+
+    def test_idle_dependency(self, coordinator):
+        """
+        Validates services does not wait for contracts neither running nor
+        due, and waits for contracts running.
+        """
+        time_start = time.time()
+        coordinator.run("services", lambda: None)
+        coordinator.dict_schedules = {
+            "contracts": schedule_at(time.time() + 3600)}
+        coordinator.run("services", lambda: None)
+        assert time.time() - time_start < 0.2
+
+        ls_order = []
+
+        def contracts():
+            time.sleep(0.3)
+            ls_order.append("contracts")
+
+        run_threads([lambda: coordinator.run("contracts", contracts),
+                     lambda: coordinator.run(
+                         "services", lambda: ls_order.append("services"))])
+        assert ls_order == ["contracts", "services"]
+
+    def test_cron_matches(self):
+        """
+        Validates NCRONTAB expressions and schedules of config match timers
+        of function.json.
+        """
+        # Monday 2 Jan 2023 02:00:30 UTC
+        time_sec = datetime(2023, 1, 2, 2, 0, 30,
+                            tzinfo=timezone.utc).timestamp()
+        assert cron_matches("30 0 2 * * *", time_sec)
+        assert cron_matches("*/10 0 1-3 * * 1", time_sec)
+        assert cron_matches("0,30 */1 * 2 1 1-5", time_sec)
+        assert not cron_matches("0 0 2 * * *", time_sec)
+        assert not cron_matches("30 0 2 * * 0", time_sec)
+
+        with open("config/config_dcpd.json", "r") as file:
+            dict_schedules = json.load(file)["run_coordinator"]["schedules"]
+        for stage, trigger in [("contracts", "contract-TimerTrigger"),
+                               ("services", "Services-TimerTrigger")]:
+            with open(f"{trigger}/function.json", "r") as file:
+                dict_function = json.load(file)
+            assert dict_schedules[stage] == \
+                dict_function["bindings"][0]["schedule"]
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""@file test_class_sampling.py
+
+
+
+@brief Unit Test class to test sampling of units for dev runs
+
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# Import system path
+import sys
+
+sys.path.append(".")
+
+import pandas as pd
+from pandas._testing import assert_frame_equal
+from utils.sampling import Sampling
+
+dict_sampling = {
+    "enable": True, "fraction": 0.3, "salt": "test",
+    "sources": {"SerialNumber": ["Serial"],
+                "contracts": ["Product_1_Serial__c", "Product_2_Serial__c"]}}
+
+
+class TestSampling:
+    """
+    This class tests hash based sample of units.
+    """
+
+    def test_disabled(self):
+        """
+        Validates data is returned as is if sampling is disabled.
+        """
+        df_data = pd.DataFrame({"Serial": ["110-1234-1", "120-0001"]})
+        sampling = Sampling(dict(dict_sampling, enable=False))
+        assert sampling.sample(df_data, "SerialNumber") is df_data
+        assert sampling.restrict(df_data, ["Serial"], df_data[:0]) is df_data
+        assert Sampling.from_config({}).f_enable is False
+
+    def test_units(self):
+        """
+        Validates units are prefixes of serial numbers, ranges and text.
+        """
+        ar_units = Sampling(dict_sampling).units(pd.Series([
+            "110-1234-1a", "110 - 1234-1-3 & 120-5555", "no serial", None]))
+        assert ar_units.tolist() == [
+            ["110-1234"], ["110-1234", "120-5555"], [], []]
+
+    def test_consistent(self):
+        """
+        Validates sample is deterministic, close to fraction and a unit is
+        sampled in all sources.
+        """
+        ls_units = [f"{ix}-{jx}" for ix in range(110, 130)
+                    for jx in range(1000, 1500)]
+        df_srnum = pd.DataFrame({"Serial": [f"{unit}-1" for unit in ls_units]})
+        df_contract = pd.DataFrame({
+            "Product_1_Serial__c": [f"{unit}-1 TO 3" for unit in ls_units],
+            "Product_2_Serial__c": ""})
+
+        sampling = Sampling(dict_sampling)
+        df_out = sampling.sample(df_srnum, "SerialNumber")
+        assert_frame_equal(
+            df_out, Sampling(dict_sampling).sample(df_srnum, "SerialNumber"))
+        assert abs(len(df_out) / len(df_srnum) - 0.3) < 0.02
+
+        df_out_contract = sampling.sample(df_contract, "contracts")
+        assert df_out_contract.index.tolist() == df_out.index.tolist()
+
+        # Other salt samples other units
+        df_salt = Sampling(dict(dict_sampling, salt="other")).sample(
+            df_srnum, "SerialNumber")
+        assert df_salt.index.tolist() != df_out.index.tolist()
+
+    def test_rows_kept(self):
+        """
+        Validates rows with any sampled unit or no unit are kept.
+        """
+        sampling = Sampling(dict_sampling)
+        ls_units = [f"110-{ix}" for ix in range(1000, 1100)]
+        f_sampled = sampling.is_sampled(pd.Series(ls_units))
+        unit_in = ls_units[f_sampled.argmax()]
+        unit_out = ls_units[(~f_sampled).argmax()]
+
+        df_contract = pd.DataFrame({
+            "Product_1_Serial__c": [unit_out, unit_out, "", None],
+            "Product_2_Serial__c": [unit_in, None, "TBD", None]},
+            index=[7, 7, 8, 9])
+        df_out = sampling.sample(df_contract, "contracts")
+        assert_frame_equal(df_out, df_contract.iloc[[0, 2, 3]])
+
+    def test_restrict(self):
+        """
+        Validates semi join on keys; numbers compared as integers and text
+        ignoring case.
+        """
+        df_m2m = pd.DataFrame({
+            "Shipper#": [1, 1, 2, 3], "ShipperItem#": [1, 2, 1, 1],
+            "Job#": ["j1", "J2 ", "j3", "j4"]})
+        df_srnum = pd.DataFrame({
+            "Shipper": [1.0, 3.0], "ShipperItem": ["1", "1"]})
+
+        sampling = Sampling(dict_sampling)
+        df_out = sampling.restrict(
+            df_m2m, ["Shipper#", "ShipperItem#"], df_srnum)
+        assert_frame_equal(df_out, df_m2m.iloc[[0, 3]])
+
+        df_out = sampling.restrict(
+            df_m2m, ["Job#"], pd.DataFrame({"Job_Index": ["J2", "J4"]}))
+        assert_frame_equal(df_out, df_m2m.iloc[[1, 3]])
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""@file test_class_scale_out.py
+
+
+
+@brief Unit Test class to test hash partitioned run and reducer
+
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# Import system path
+import importlib
+import os
+import sys
+
+sys.path.append(".")
+
+import pandas as pd
+import pytest
+from pandas._testing import assert_frame_equal
+from utils import IO
+from utils.sampling import Sampling
+from utils.scale_out import DICT_STAGES, ScaleOut
+
+
+def stage_leads(config, mode):
+    """Stage of the chain: serial numbers and latest contact of units."""
+    df_srnum = IO.read_csv(mode, {
+        'file_dir': config['file']['dir_data'],
+        'file_name': config['file']['Raw']['SerialNumber']['file_name']})
+    df_srnum = Sampling.from_config(config).sample(df_srnum, 'SerialNumber')
+
+    df_leads = df_srnum.assign(
+        Serial_Number=df_srnum['Serial'].str.split(', ')).explode(
+        'Serial_Number')
+    IO.write_csv(mode, ScaleOut.output_config(config, 'output_iLead'),
+                 df_leads[['Serial_Number', 'Customer']])
+
+    df_contact = df_leads.rename(columns={'Serial_Number': 'SerialNumber'})
+    df_contact = df_contact.sort_values(
+        by=['SerialNumber', 'Source', 'Contact_Type', 'Date'],
+        ascending=False).drop_duplicates(
+        subset=['SerialNumber', 'Source', 'Contact_Type'])
+    IO.write_csv(mode, ScaleOut.output_config(config, 'contact'),
+                 df_contact[['SerialNumber', 'Source', 'Contact_Type',
+                             'Date', 'Customer']])
+
+
+def stage_fail(config, mode):
+    raise ValueError('failed')
+
+
+def read_sorted(config, name):
+    df_data = IO.read_csv('local', ScaleOut.output_config(config, name))
+    return df_data.sort_values(list(df_data.columns)).reset_index(drop=True)
+
+
+@pytest.fixture
+def config(tmp_path):
+    os.makedirs(tmp_path / 'data')
+    os.makedirs(tmp_path / 'results')
+
+    ls_serial = [f'{ix}-{jx}-1' for ix in range(110, 115)
+                 for jx in range(1000, 1020)]
+    df_srnum = pd.DataFrame({
+        'Serial': ls_serial + [
+            '110-1000-1, 114-1019-1', 'UNKNOWN', '110-1000-1'],
+        'Source': 'services', 'Contact_Type': 'PM',
+        'Date': ['2023-01-01'] * len(ls_serial) + [
+            '2023-02-01', '2023-01-01', '2023-03-01']})
+    df_srnum['Customer'] = [f'c{ix}' for ix in range(len(df_srnum))]
+    df_srnum.to_csv(tmp_path / 'data' / 'SerialNumber.csv', index=False)
+
+    dict_adls = {'container_name': 'results', 'directory_name': 'results'}
+    yield {
+        'conf.env': 'local',
+        'file': {
+            'dir_data': f'{tmp_path}/data/',
+            'dir_results': f'{tmp_path}/results/',
+            'dir_validation': 'validation/',
+            'dir_intermediate': 'intermediate/',
+            'Raw': {'SerialNumber': {'file_name': 'SerialNumber.csv'}},
+            'Processed': {
+                'adls_credentials': {},
+                'output_iLead': dict(dict_adls, file_name='output_iLead.csv',
+                                     ref_install='output_ref_install.csv'),
+                'output_iLead_contact': dict(
+                    dict_adls, file_name='output_iLead_contact.csv'),
+                'customer': dict(dict_adls, directory_name='customer',
+                                 file_name='customer.csv')}},
+        'sampling': {'enable': False, 'salt': 'test',
+                     'sources': {'SerialNumber': ['Serial']}},
+        'scale_out': {'n_partitions': 3, 'max_workers': 2,
+                      'stages': ['leads'],
+                      'outputs': ['output_iLead', 'contact']}}
+
+
+class TestScaleOut:
+    """
+    This class tests partitioned runs of the chain and its reducer.
+    """
+
+    def test_partition_config(self, config):
+        """
+        Validates results of a partition are written to its directory.
+        """
+        config_part = ScaleOut(config).partition_config(2)
+        assert config_part['file']['dir_results'].endswith(
+            '/results/partitions/part_02/')
+        assert config_part['file']['Processed']['customer'][
+            'directory_name'] == 'partitions/part_02/customer'
+        assert config_part['scale_out']['partition'] == 2
+        assert Sampling.from_config(config_part).f_enable
+        assert 'partition' not in config['scale_out']
+
+    def test_reduce_equals_full_run(self, config):
+        """
+        Validates merged outputs of partitions equal outputs of a single
+        run; rows read by several partitions are counted once.
+        """
+        stage_leads(config, 'local')
+        df_leads_exp = read_sorted(config, 'output_iLead')
+        df_contact_exp = read_sorted(config, 'contact')
+
+        scale_out = ScaleOut(config, dict_stages={'leads': stage_leads})
+        dict_status = scale_out.run_partitions()
+        assert sorted(dict_status) == [0, 1, 2]
+
+        # Each partition processes a share of units
+        ls_rows = [len(IO.read_csv('local', scale_out.output_config(
+            scale_out.partition_config(partition), 'output_iLead')))
+            for partition in range(3)]
+        assert max(ls_rows) < len(df_leads_exp)
+        # Rows without unit / with units of several partitions are replicated
+        assert sum(ls_rows) > len(df_leads_exp)
+
+        dict_rows = scale_out.reduce()
+        assert dict_rows == {'output_iLead': len(df_leads_exp),
+                             'contact': len(df_contact_exp)}
+        assert_frame_equal(read_sorted(config, 'output_iLead'), df_leads_exp)
+        assert_frame_equal(read_sorted(config, 'contact'), df_contact_exp)
+
+    def test_reduce_pending(self, config):
+        """
+        Validates reducer fails if a partition has not succeeded.
+        """
+        config['scale_out']['max_workers'] = 1
+        scale_out = ScaleOut(config, dict_stages={
+            'leads': stage_leads, 'fail': stage_fail})
+        scale_out.run_partitions([0, 1])
+        with pytest.raises(Exception):
+            scale_out.reduce()
+
+        scale_out.ls_stages = ['leads', 'fail']
+        with pytest.raises(Exception):
+            scale_out.run_partitions([2])
+        with pytest.raises(ValueError, match=r'\[2\]'):
+            scale_out.check_partitions()
+
+    def test_default_stages(self):
+        """
+        Validates stages of config_dcpd.json run each pipeline once and the
+        contacts pipeline can be imported.
+        """
+        config = IO.read_json(mode='local', config={
+            'file_dir': './config/', 'file_name': 'config_dcpd.json'})
+        ls_stages = config['scale_out']['stages']
+        assert len(ls_stages) == len(set(ls_stages))
+        assert set(ls_stages) <= set(DICT_STAGES)
+
+        module = importlib.import_module(
+            'utils.dcpd.class_generate_contacts')
+        assert hasattr(module, 'Contacts')
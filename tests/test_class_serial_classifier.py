@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""@file test_class_serial_classifier.py
+
+
+
+@brief Unit Test class to test classification of serial numbers
+
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# Import system path
+import sys
+from string import punctuation
+
+sys.path.append(".")
+
+import pandas as pd
+import pytest
+from utils.dcpd.class_serial_classifier import SerialClassifier
+
+
+def get_ref():
+    ref = pd.read_csv("tests/ip/ref_decode_serialnumber.csv", dtype=str)
+    ref["flag_keep"] = ref["flag_keep"].str.upper() == "TRUE"
+    ref["SerialNumberPattern"] = ref["SerialNumberPattern"].str.lower()
+    return ref
+
+
+obj_classifier = SerialClassifier(
+    get_ref(), pat_mob="\\d\\d\\d-\\d\\d\\d-\\d\\d\\d\\d")
+
+
+class TestProduct:
+    """
+    This class tests identification of product from serial number.
+    """
+
+    @pytest.mark.parametrize(
+        "srnum, ex_op",
+        [
+            ("150-123-3-4", "PDU"),
+            ("350-123-3-4", "PDU - Primary"),
+            ("420-123-3-4", "PDU - Secondary"),
+            ("54-123-3-4", "Reactor"),
+            ("180-123-3-4", "RPP"),
+            ("410-123-3-4", "STS"),
+            ("110-526-3421", "STS"),
+            ("26-0820-1", "RPP"),
+            ("x-123", ""),
+        ])
+    def test_product(self, srnum, ex_op):
+        df_out = obj_classifier.classify(pd.Series([srnum]))
+        assert df_out["Product"].tolist() == [ex_op]
+
+    def test_product_priority(self):
+        """
+        Validates product listed later in the reference wins when patterns
+        of multiple products match.
+        """
+        ref = pd.DataFrame({
+            "Product": ["PDU", "RPP", "PDU"],
+            "SerialNumberPattern": ["1", "12", "123"],
+            "flag_keep": [True, True, True]})
+        obj = SerialClassifier(ref)
+        df_out = obj.classify(["1", "12", "123", "1234", "2"])
+        assert df_out["Product"].tolist() == ["PDU", "RPP", "RPP", "RPP", ""]
+
+    @pytest.mark.parametrize("ar_serialnumber", [None, 5])
+    def test_product_err(self, ar_serialnumber):
+        with pytest.raises(Exception) as _:
+            obj_classifier.classify(ar_serialnumber)
+
+
+class TestValidity:
+    """
+    This class tests validity and mobile number checks.
+    """
+
+    def test_validity_strip(self):
+        """
+        Validates serial numbers are stripped before validity and mobile
+        number checks; index of input is retained.
+        """
+        ar_srnum = pd.Series(
+            ["-180-123-1.", "180-test-1", "180-12-bus", "180-555-123-4567",
+             "180-123-1"], index=[10, 11, 12, 13, 14])
+        df_out = obj_classifier.classify(ar_srnum, strip_chars=punctuation)
+
+        assert df_out.index.tolist() == [10, 11, 12, 13, 14]
+        assert df_out["SerialNumber"].tolist() == [
+            "180-123-1", "180-test-1", "180-12-bus", "180-555-123-4567",
+            "180-123-1"]
+        assert df_out["Product"].tolist() == ["", "RPP", "RPP", "RPP", "RPP"]
+        assert df_out["f_valid"].tolist() == [True, False, False, True, True]
+        assert df_out["flag_mob"].tolist() == [False, False, False, True, False]
@@ -21,6 +21,7 @@ from pandas._testing import assert_frame_equal
 sys.path.append(".")
 
 # Initialize class instance
+import numpy as np
 import pandas as pd
 import pytest
 from utils.dcpd.class_serial_number import SerialNumber
@@ -372,6 +373,163 @@ class TestKnownfunction:
     # Method is not implemented. This function enhances testcase coverage mostly.
 
 
+# %% persisted cache of expanded serial numbers
+class TestSerialNumberCache:
+    """
+    This class tests the persisted cache of expanded serial numbers. Output with
+    cache should match output without cache; cache should be invalidated on
+    version change.
+    """
+
+    @staticmethod
+    def get_config(file_dir, version="v1"):
+        return {
+            "file": {
+                "dir_results": str(file_dir),
+                "dir_intermediate": "",
+                "Processed": {
+                    "adls_credentials": {},
+                    "serial_number_cache": {"file_name": "serial_number_cache.csv"},
+                },
+            },
+            "serial_number": {"cache": {"enable": True, "version": version}},
+        }
+
+    @staticmethod
+    def get_data():
+        ar_serialnum = ['110-1900-12,14,17,19', '442-0002-7a-12a', '180-0557-1-2b',
+                        '110-115', '110-115']
+        ar_installsize = [4, 6, 2, 3, 3]
+        ar_key_serial = ['1:1', '2:2', '3:3', '4:4', '5:5']
+        return ar_serialnum, ar_installsize, ar_key_serial
+
+    @staticmethod
+    def sort_output(df_out):
+        return df_out.sort_values(
+            by=['KeySerial', 'SerialNumber']).reset_index(drop=True)
+
+    def test_cache_output_matches(self, tmp_path):
+        """
+        Validates output served from cache against output without cache.
+        """
+        exp_op, _ = SerialNumber().get_serialnumber(*self.get_data())
+
+        config = self.get_config(tmp_path)
+        act_op_1, _ = SerialNumber(mode='local', config=config).get_serialnumber(
+            *self.get_data())
+
+        obj_cache = SerialNumber(mode='local', config=config)
+        assert obj_cache.ref_data.shape[0] > 0
+        act_op_2, _ = obj_cache.get_serialnumber(*self.get_data())
+
+        # Rows are in order of input as without cache
+        exp_op = exp_op.reset_index(drop=True)
+        assert_frame_equal(act_op_1, exp_op)
+        assert_frame_equal(act_op_2, exp_op)
+
+    def test_cache_order(self, tmp_path):
+        """
+        Validates serial numbers served from cache and expanded are in order
+        of input rows.
+        """
+        data = [ls[::-1] for ls in self.get_data()]
+        exp_op, _ = SerialNumber().get_serialnumber(*data)
+
+        config = self.get_config(tmp_path)
+        SerialNumber(mode='local', config=config).get_serialnumber(*data)
+        act_op, _ = SerialNumber(mode='local', config=config) \
+            .get_serialnumber(*data)
+
+        assert act_op['KeySerial'].iloc[0] == '5:5'
+        assert_frame_equal(act_op, exp_op.reset_index(drop=True))
+
+    def test_cache_leading_zeros(self, tmp_path):
+        """
+        Validates numeric serial numbers are read from cache as text i.e.
+        with leading zeros and are served as such.
+        """
+        pd.DataFrame({
+            'SerialNumberRaw': ['0101'], 'InstallSize': [1],
+            'DataType': ['m2m'], 'SerialNumberOrg': ['0101'],
+            'SerialNumber': ['0101'], 'MappingKey': [''],
+            'MappingValue': [np.nan], 'Version': ['v1']}).to_csv(
+            tmp_path / "serial_number_cache.csv", index=False)
+
+        obj_cache = SerialNumber(mode='local', config=self.get_config(tmp_path))
+        assert obj_cache.ref_data['SerialNumber'].tolist() == ['0101']
+        assert obj_cache.ref_data['MappingKey'].tolist() == ['']
+
+        act_op, _ = obj_cache.get_serialnumber(['0101', '110-115'], [1, 3],
+                                               ['1:1', '2:2'])
+        assert act_op['SerialNumber'].tolist()[0] == '0101'
+        assert act_op['KeySerial'].tolist()[0] == '1:1'
+
+    def test_cache_append(self, tmp_path):
+        """
+        Validates new entries are appended to cache file; file is rewritten
+        when entries of an earlier version are dropped.
+        """
+        ar_serialnum, ar_installsize, ar_key_serial = self.get_data()
+        file_path = tmp_path / "serial_number_cache.csv"
+
+        SerialNumber(mode='local', config=self.get_config(tmp_path)) \
+            .get_serialnumber(ar_serialnum[:1], ar_installsize[:1],
+                              ar_key_serial[:1])
+        text_1 = file_path.read_text()
+
+        obj_cache = SerialNumber(mode='local', config=self.get_config(tmp_path))
+        obj_cache.get_serialnumber(ar_serialnum[1:3], ar_installsize[1:3],
+                                   ar_key_serial[1:3])
+        text_2 = file_path.read_text()
+        assert text_2.startswith(text_1) and len(text_2) > len(text_1)
+        assert text_2.count('SerialNumberRaw') == 1
+        assert SerialNumber(mode='local', config=self.get_config(
+            tmp_path)).ref_data.shape[0] == obj_cache.ref_data.shape[0]
+
+        obj_cache = SerialNumber(
+            mode='local', config=self.get_config(tmp_path, version="v2"))
+        obj_cache.get_serialnumber(ar_serialnum[:1], ar_installsize[:1],
+                                   ar_key_serial[:1])
+        df_file = pd.read_csv(file_path, dtype=str)
+        assert set(df_file['Version']) == {'v2'}
+
+    def test_cache_skips_repeated_serial(self, tmp_path):
+        """
+        Validates serial numbers repeated in a batch are not cached.
+        """
+        obj_cache = SerialNumber(mode='local', config=self.get_config(tmp_path))
+        obj_cache.get_serialnumber(*self.get_data())
+        assert '110-115' not in obj_cache.ref_data['SerialNumberRaw'].values
+
+    def test_cache_version(self, tmp_path):
+        """
+        Validates cache is invalidated on version change.
+        """
+        SerialNumber(mode='local', config=self.get_config(tmp_path)).get_serialnumber(
+            *self.get_data())
+
+        obj_cache = SerialNumber(
+            mode='local', config=self.get_config(tmp_path, version="v2"))
+        assert obj_cache.ref_data.shape[0] == 0
+
+    def test_known_range_flags(self, tmp_path):
+        """
+        Validates known_range flags serial numbers available in cache.
+        """
+        config = self.get_config(tmp_path)
+        SerialNumber(mode='local', config=config).get_serialnumber(*self.get_data())
+
+        ar_serialnum, ar_installsize, ar_key_serial = self.get_data()
+        df_input = pd.DataFrame(data={
+            'SerialNumberOrg': ar_serialnum, 'InstallSize': ar_installsize,
+            'KeySerial': ar_key_serial})
+        obj_cache = SerialNumber(mode='local', config=config)
+        obj_cache.data_type = "m2m"
+        _, df_flag = obj_cache.known_range(df_input)
+
+        assert list(df_flag['known_sr_num']) == [True, True, True, False, False]
+
+
 # %% unknown range function
 class TestUnknownfunction:
     """
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""@file test_class_standard_bom.py
+
+
+
+@brief Unit Test class to test lookup of standard BOM for made to stock units
+
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# Import system path
+import os
+import shutil
+import sys
+
+from pandas._testing import assert_frame_equal
+
+sys.path.append(".")
+
+import pandas as pd
+import pytest
+from utils.dcpd.class_standard_bom import StandardBOM
+
+
+def get_config(dir_data, dir_results, f_cache=True):
+    return {
+        "file": {
+            "dir_data": str(dir_data),
+            "dir_results": str(dir_results),
+            "dir_intermediate": "",
+            "Raw": {
+                "bomdata_deafault": {"file_name": "bomdata_default.csv"},
+                "bomdata_sisc": {"file_name": "bomdata_sisc.csv"},
+            },
+            "Processed": {
+                "adls_credentials": {},
+                "standard_bom_lookup": {"file_name": "standard_bom_lookup.csv"},
+            },
+        },
+        "standard_bom": {"cache": {"enable": f_cache}},
+    }
+
+
+class TestResolve:
+    """
+    This class tests resolving made to stock units to standard BOM lines.
+    """
+
+    def test_resolve_valid_scenario(self, tmp_path):
+        """
+        Validates output against expected output.
+        """
+        obj_bom = StandardBOM(mode='local', config=get_config(
+            "tests/ip/", tmp_path, f_cache=False))
+        df_install_mts = pd.read_csv("tests/ip/df_install_mts.csv")
+        df_out_mts_ac = obj_bom.resolve(df_install_mts, merge_type='left')
+        df_out_mts_exp = pd.read_csv("tests/ip/df_out_mts_exp.csv")
+        assert_frame_equal(df_out_mts_ac.fillna(""), df_out_mts_exp.fillna(""))
+
+    def test_resolve_fallback(self):
+        """
+        Validates units with unknown revision get first revision of TLN and
+        units with unknown TLN are retained for left join only.
+        """
+        df_bom = pd.DataFrame({
+            "fparent": ["tln1 ", "tln1", "tln1", "tln2"],
+            "fparentrev": ["B", "A", "A", "A"],
+            "fcomponent": ["c3", "c1", "c2", "c4"],
+            "fqty": [1, 2, 3, 4]})
+        df_install_mts = pd.DataFrame({
+            "SerialNumber_M2M": ["s1", "s2", "s3"],
+            "Revision": ["A", "Z", "A"],
+            "PartNumber_TLN_Shipment": ["tln1", " tln1", "tln3"]})
+
+        obj_bom = StandardBOM()
+        obj_bom.lookup = obj_bom.join.register(
+            "standard_bom", obj_bom.build_lookup(df_bom), "key_bom",
+            ["f_exact"] + obj_bom.ls_cols_bom)
+
+        df_out = obj_bom.resolve(df_install_mts, merge_type='left')
+        assert df_out["SerialNumber_M2M"].tolist() == ["s1", "s1", "s2", "s3"]
+        assert df_out["PartNumber_BOM_BOM"].fillna("").tolist() == [
+            "c1", "c2", "c1", ""]
+        assert df_out["Revision"].fillna("").tolist() == ["A", "A", "A", ""]
+
+        df_out = obj_bom.resolve(df_install_mts, merge_type='inner')
+        assert df_out["SerialNumber_M2M"].tolist() == ["s1", "s1"]
+
+    @pytest.mark.parametrize(
+        "df_install_mts",
+        [None,
+         'dcacac',
+         (pd.DataFrame(data={"test_col": ['new', 'new', 'existing']})),
+         ])
+    def test_resolve_err(self, df_install_mts):
+        obj_bom = StandardBOM(mode='local', config=get_config(
+            "tests/ip/", "", f_cache=False))
+        with pytest.raises(Exception) as _:
+            obj_bom.resolve(df_install_mts, merge_type='left')
+
+
+class TestLookupCache:
+    """
+    This class tests the persisted lookup; lookup should be read from the
+    persisted file unless source files change.
+    """
+
+    @staticmethod
+    def copy_source(dir_data):
+        for file_name in ["bomdata_default.csv", "bomdata_sisc.csv"]:
+            shutil.copy(os.path.join("tests/ip", file_name), dir_data)
+
+    def test_lookup_persisted(self, tmp_path):
+        """
+        Validates lookup read from persisted file matches lookup built from
+        source.
+        """
+        self.copy_source(tmp_path)
+        config = get_config(tmp_path, tmp_path)
+
+        exp_lookup = StandardBOM(mode='local', config=config).get_lookup()
+        assert os.path.exists(os.path.join(tmp_path, "standard_bom_lookup.csv"))
+
+        obj_bom = StandardBOM(mode='local', config=config)
+        signature = obj_bom.source_signature()
+        assert obj_bom.read_lookup(signature) is not None
+
+        act_lookup = obj_bom.get_lookup()
+        assert_frame_equal(act_lookup.fillna(""), exp_lookup.fillna(""))
+
+    def test_lookup_rebuilt_on_change(self, tmp_path):
+        """
+        Validates persisted lookup is discarded when source files change.
+        """
+        self.copy_source(tmp_path)
+        config = get_config(tmp_path, tmp_path)
+        StandardBOM(mode='local', config=config).get_lookup()
+
+        with open(os.path.join(tmp_path, "bomdata_sisc.csv"), "a") as file:
+            file.write("SISC,tln9,X0,comp9,,desc,EA,Stock,1\n")
+
+        obj_bom = StandardBOM(mode='local', config=config)
+        assert obj_bom.read_lookup(obj_bom.source_signature()) is None
+        assert "tln9" in obj_bom.get_lookup().index
+
+    def test_input_configs(self, tmp_path):
+        """
+        Validates files declared for prefetch: persisted lookup if enabled,
+        else source files; none once lookup is available.
+        """
+        self.copy_source(tmp_path)
+        obj_bom = StandardBOM(mode='local', config=get_config(
+            tmp_path, tmp_path, f_cache=False))
+        assert [config["file_name"] for config in obj_bom.input_configs()] \
+            == ["bomdata_sisc.csv", "bomdata_default.csv"]
+
+        obj_bom = StandardBOM(mode='local', config=get_config(
+            tmp_path, tmp_path))
+        assert [config["file_name"] for config in obj_bom.input_configs()] \
+            == ["standard_bom_lookup.csv"]
+
+        obj_bom.get_lookup()
+        assert obj_bom.input_configs() == []
@@ -21,6 +21,7 @@ from utils.logger import AppLogger
 logger = AppLogger('DCPD', level='')
 from utils import IO
 import numpy as np
+import os
 from utils.strategic_customer import StrategicCustomer
 
 obj_strategic_customer = StrategicCustomer()
@@ -169,6 +170,100 @@ class TestIdentification:
             assert info.type == Exception
 
 
+class TestResolutionCache:
+    """
+    Test for resolution of customer identities; each identity is evaluated
+    once per listing and persisted across runs.
+    """
+
+    @staticmethod
+    def get_ref(domain='abb.com'):
+        ref_data = [{'DisplayName': 'DisplayName', ' Condition 1': 'MatchType_00', ' ': 'CompanyName', ' Condition 2': 'MatchType_01', ' .1': 'CompanyAliasName', ' Condition 3': 'MatchType_02', ' .2': 'CompanyDomain'}, {'DisplayName': 'ABB', ' Condition 1': 'begins with', ' ': 'ABB;Zenith', ' Condition 2': 'begins with', ' .1': 'ABB;Zenith', ' Condition 3': 'ends with', ' .2': domain}]
+        return obj_strategic_customer.read_ref_data(pd.DataFrame(ref_data))
+
+    @staticmethod
+    def get_leads():
+        return pd.DataFrame({
+            'Serial_Number': ['s1', 's2', 's3', 's4'],
+            'CompanyName': ['zenith power', 'qts', 'zenith power', 'qts'],
+            'CompanyAliasName': ['', '', '', ''],
+            'CompanyDomain': [np.nan, 'x@abb.com', np.nan, 'x@eaton.com']})
+
+    def test_resolution_reused(self, monkeypatch):
+        """
+        Identities resolved by one instance are not evaluated again by
+        another instance for the same listing.
+        """
+        monkeypatch.setattr(StrategicCustomer, 'dict_resolution', {})
+        ref_df = self.get_ref()
+
+        ar_ref_ix = StrategicCustomer().resolve_customers(
+            ref_df, self.get_leads())
+        assert ar_ref_ix.tolist() == [0, 0, 0, -1]
+
+        obj_sc = StrategicCustomer()
+        monkeypatch.setattr(obj_sc, 'evaluate_customers', None)
+        result = obj_sc.pipeline_identify_customers(ref_df, self.get_leads())
+        assert result['Serial_Number'].tolist() == ['s1', 's2', 's3', 's4']
+        assert result['StrategicCustomer'].tolist() == [
+            'abb', 'abb', 'abb', 'Other']
+
+    def test_resolution_invalidated(self, monkeypatch):
+        """
+        Identities are evaluated again when the listing changes.
+        """
+        monkeypatch.setattr(StrategicCustomer, 'dict_resolution', {})
+        obj_sc = StrategicCustomer()
+
+        ar_ref_ix = obj_sc.resolve_customers(self.get_ref(), self.get_leads())
+        assert ar_ref_ix.tolist() == [0, 0, 0, -1]
+
+        ar_ref_ix = obj_sc.resolve_customers(
+            self.get_ref('eaton.com'), self.get_leads())
+        assert ar_ref_ix.tolist() == [0, -1, 0, 0]
+
+    def test_resolution_persisted(self, monkeypatch, tmp_path):
+        """
+        Persisted identities are loaded for the same listing only.
+        """
+        config = {
+            "file": {
+                "dir_results": str(tmp_path),
+                "dir_intermediate": "",
+                "Processed": {
+                    "adls_credentials": {},
+                    "customer_resolution_cache": {
+                        "file_name": "customer_resolution_cache.csv"},
+                },
+            },
+            "strategic_customer": {"cache": {"enable": True}},
+        }
+        ref_df = self.get_ref()
+        signature = StrategicCustomer.listing_signature(ref_df)
+
+        monkeypatch.setattr(StrategicCustomer, 'dict_resolution', {})
+        obj_sc = StrategicCustomer()
+        obj_sc.init_cache('local', config)
+        obj_sc.load_resolution(signature)
+        obj_sc.resolve_customers(ref_df, self.get_leads())
+        obj_sc.export_resolution(signature)
+        assert os.path.exists(
+            os.path.join(tmp_path, "customer_resolution_cache.csv"))
+
+        monkeypatch.setattr(StrategicCustomer, 'dict_resolution', {})
+        obj_sc = StrategicCustomer()
+        obj_sc.init_cache('local', config)
+        obj_sc.load_resolution(signature)
+        assert StrategicCustomer.dict_resolution[signature] == {
+            ('zenith power', '', ''): 0,
+            ('qts', '', 'x@abb.com'): 0,
+            ('qts', '', 'x@eaton.com'): -1}
+
+        signature_new = StrategicCustomer.listing_signature(
+            self.get_ref('eaton.com'))
+        obj_sc.load_resolution(signature_new)
+        assert StrategicCustomer.dict_resolution[signature_new] == {}
+
 
 # %% *** Call ***
 
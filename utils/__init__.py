@@ -20,3 +20,7 @@ from utils.logger import AppLogger
 from utils.io import IO
 from utils.filter_data import Filter
 from utils.format_data import Format
+from utils.join_data import Join
+from utils.rules import Rules
+from utils.map_unique import MapUnique
+from utils.contact_normalize import ContactNormalize
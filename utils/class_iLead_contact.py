@@ -13,6 +13,9 @@ from datetime import datetime
 import numpy as np
 import pandas as pd
 
+from utils.contact_normalize import ContactNormalize
+from utils.map_unique import MapUnique
+
 
 # %% ***** Define Class : iLead Contacts *****
 
@@ -22,6 +25,7 @@ class ilead_contact:
 
     def __init__(self, TH_DATE):
         self.TH_MIN_INSTALL_DATE = TH_DATE
+        self.normalize = ContactNormalize()
 
     def get_city(self, zc, zcdb):
         """
@@ -76,127 +80,11 @@ class ilead_contact:
         data = data.rename(columns={data.columns[0]: "text_org"})
         try:
             if action == "clean":
-                data["text"] = data["text_org"].copy()
-
-                if col_name == "City":
-                    data["is_alphanum"] = data["text"].str.contains(
-                        "\\d", regex=True)
-                    data.loc[data["is_alphanum"], "text"] = ""
-                    data["output"] = data["text"].copy()
-
-                elif col_name == "Zipcode":
-                    th_valid = 2
-
-                    # string length
-                    data["text_len"] = data["text"].str.len()
-                    data.loc[data["text_len"] < th_valid, "text"] = ""
-
-                    # Remove extra Info
-                    data["text"] = data["text"].apply(
-                        lambda x: x.split("-")[0] if ("-" in str(x)) else x
-                    )
-
-                    # character length: 4 to 5
-                    data["text"] = pd.to_numeric(data["text"], errors="coerce")
-                    data["text"] = data["text"].fillna("")
-
-                    data["text"] = data["text"].apply(
-                        lambda x: x if x == "" else format(int(x), "05d")
-                    )
-
-                    data["output"] = data["text"].copy()
-
-                elif col_name == "Company_Phone":
-
-                    # string length
-                    TH_STR_LEN = 9
-
-                    # Clean Ph Num
-                    data["text"] = data["text"].str.lower()
-                    data["text"] = data["text"].apply(
-                        lambda x: x.replace("--", "-"))
-
-                    # Remove special characters
-                    data["text_clean"] = data["text"].apply(
-                        lambda x: re.sub("[\W_]+", "", str(x))
-                    )
-
-                    ls_non_phone = ["xxxxx", "9999999999",
-                                    "1111111111", "0000000000"]
-                    data["text_clean"] = data["text_clean"].apply(
-                        lambda x: "" if (str(x) in ls_non_phone) else x
-                    )
-                    logging.info(
-                        "On line 130, Company Phone- class_ilead_contact")
-                    data["text_clean"] = data["text_clean"].apply(
-                        lambda x: x if len(x) == 0 else x[:-1] if x[-1] == "-" else x
-                    )
-
-                    # Clean Phone Number
-                    ls_txt = ["tel", "cell"]
-                    for txt in ls_txt:
-                        data["text_clean"] = data["text_clean"].str.replace(
-                            txt, "", regex=True
-                        )
-                    logging.info(
-                        "On line 140, Company Phone- class_ilead_contact")
-                    # Get the string length
-                    data["text_len"] = data["text_clean"].str.len()
-                    data["text_org_len"] = data["text_org"].str.len()
-                    logging.info(
-                        "On line 144, Company Phone- class_ilead_contact")
-                    # Format Phone Number
-                    ls_txt = ["text_clean", "text", "text_len"]
-
-                    data["text_new"] = data["text"]
-                    logging.info(
-                        "On line 155, Company Phone- class_ilead_contact")
-                    data.loc[data["text_len"] <= TH_STR_LEN, "text_new"] = ""
-                    data["output"] = data["text_new"].copy()
-                    data["output"] = data["output"].apply(
-                        lambda x: x
-                        if len(x) == 0
-                        else x[1:]
-                        if x[0] == "-"
-                        else x[2:]
-                        if x[:2] == "1-"
-                        else x
-                    )
-                    logging.info(
-                        "On line 162, Company Phone- class_ilead_contact")
-                    data["output"] = data["output"].apply(
-                        lambda x: x if len(x) == 0 else x[:-1] if x[-1] == "-" else x
-                    )
+                data["output"] = self.normalize.clean(
+                    data["text_org"], col_name)
             elif action == "validity":
-                data["text"] = data["text_org"].replace(np.nan, "", regex=True)
-                data["text"] = data["text"].apply(
-                    lambda x: re.sub("[\W_]+", "", str(x))
-                )
-                data["text"] = data["text"].str.upper()
-                if col_name == "Email":
-                    ls_not_ups = ["INVALID", "BLANK",
-                                  "UNKNOWN", "NOT", "XXX"]  # No
-                    TH_STR_LEN = 3
-                elif col_name == "Name":
-                    TH_STR_LEN = 1
-                elif col_name == "Company_Phone":
-                    TH_STR_LEN = 5
-                elif col_name == "Address1":
-                    TH_STR_LEN = 2
-                elif col_name == "Address2":
-                    TH_STR_LEN = 2
-                # Flag baed on string length
-                data["flag_Valid"] = data["text"].str.len()
-                data["flag_Valid"] = data["flag_Valid"] > TH_STR_LEN
-                # Flag baed on string
-                if "ls_not_ups" in locals():
-                    non_ups_regex = "|".join(ls_not_ups)
-                    data["flag_text"] = ~data["text"].str.contains(
-                        non_ups_regex, regex=True
-                    )
-                else:
-                    data["flag_text"] = True
-                data["output"] = data["flag_text"] & data["flag_Valid"]
+                data["output"] = self.normalize.validity(
+                    data["text_org"], col_name)
         except Exception as e:
             logging.info(f"On line 189, Error: {e}")
             return e
@@ -750,8 +638,8 @@ class ilead_contact:
                 data_mod.loc[:, col] = data_mod[col].astype(str).str.lower()
             del col
 
-            data_mod['domain'] = data_mod["Email"].apply(
-                lambda x: self.get_domain(x))
+            data_mod['domain'] = MapUnique.map_unique(
+                data_mod["Email"], self.get_domain)
 
             data_mod.loc[:, 'comp_email'] = (data_mod["CompanyName"] + ":"
                                              + data_mod["domain"])
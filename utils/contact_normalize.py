@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+
+"""
+@file contact_normalize.py
+
+@brief Vectorized normalization and validation of contact fields.
+
+
+@details Contact fields (City, Zipcode, Company_Phone, Name, Email,
+Address) are cleaned and validated column wise using pandas string methods
+with compiled regexes and masks; each distinct value is normalized once.
+Normalization of each column is described by a spec (dict_spec):
+    - clean: method cleaning the column and its settings,
+    - validity: minimum length and invalid text of a valid entry,
+    - contact: characters stripped and minimum length of a valid contact.
+
+Example:
+    {'Zipcode': {'clean': {'method': 'clean_zipcode',
+                           'min_len': 2, 'width': 5}}}
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# %% *** Setup Environment ***
+import re
+
+import numpy as np
+import pandas as pd
+
+from utils.logger import AppLogger
+from utils.map_unique import MapUnique
+logger = AppLogger(__name__)
+
+# %% *** Define Class ***
+
+
+class ContactNormalize:
+    """Vectorized normalization of contact fields."""
+
+    re_special = re.compile(r"[\W_]+")
+    re_digit = re.compile(r"\d")
+    re_zip_extension = re.compile(r"-.*", re.DOTALL)
+    re_phone_prefix = re.compile(r"^(?:-|1-)")
+    re_phone_suffix = re.compile(r"-\Z")
+
+    dict_spec = {
+        "City": {
+            "clean": {"method": "clean_city"}},
+        "Zipcode": {
+            "clean": {"method": "clean_zipcode", "min_len": 2, "width": 5}},
+        "Company_Phone": {
+            "clean": {"method": "clean_phone", "min_len": 9,
+                      "ls_invalid": ["xxxxx", "9999999999",
+                                     "1111111111", "0000000000"],
+                      "ls_remove": ["tel", "cell"]},
+            "validity": {"min_len": 5},
+            "contact": {"strip": "_-* ", "min_len": 10}},
+        "Email": {
+            "validity": {"min_len": 3,
+                         "ls_invalid": ["INVALID", "BLANK",
+                                        "UNKNOWN", "NOT", "XXX"]},
+            "contact": {"strip": "_-* ", "min_len": 4}},
+        "Name": {
+            "validity": {"min_len": 1},
+            "contact": {"strip": "_-* ", "min_len": 2}},
+        "Address1": {
+            "validity": {"min_len": 2}},
+        "Address2": {
+            "validity": {"min_len": 2}},
+    }
+
+    @staticmethod
+    def per_distinct(ar_text, func, *args):
+        """
+        Evaluate func once per distinct value (NA included) and broadcast
+        the result to all rows.
+
+        :param ar_text: Input data.
+        :type ar_text: pandas Series
+        :param func: Function of pandas Series returning pandas Series.
+        :type func: function
+        :return: Output of func for each row.
+        :rtype: pandas Series
+
+        """
+        return MapUnique.map_unique(
+            ar_text, lambda ar_uniques: func(ar_uniques, *args),
+            vectorized=True)
+
+    def get_spec(self, col_name, action):
+        """
+        Normalization settings of a column.
+
+        :param col_name: Column name.
+        :type col_name: str
+        :param action: 'clean', 'validity' or 'contact'.
+        :type action: str
+        :raises KeyError: Column is not configured for action.
+        :return: Settings.
+        :rtype: dict
+
+        """
+        if action not in self.dict_spec.get(col_name, {}):
+            raise KeyError(f"{col_name} is not configured for {action}")
+        return self.dict_spec[col_name][action]
+
+    # *** Clean ***
+
+    def clean(self, ar_text, col_name):
+        """
+        Clean column as configured in its spec.
+
+        :param ar_text: Text to be cleaned.
+        :type ar_text: pandas Series
+        :param col_name: Column name.
+        :type col_name: str
+        :return: Cleaned text.
+        :rtype: pandas Series
+
+        """
+        dict_clean = self.get_spec(col_name, "clean")
+        return self.per_distinct(
+            ar_text, getattr(self, dict_clean["method"]), dict_clean)
+
+    def clean_city(self, ar_text, dict_clean):
+        """
+        City containing digits is blanked.
+
+        :param ar_text: City.
+        :type ar_text: pandas Series
+        :param dict_clean: Settings.
+        :type dict_clean: dict
+        :return: Cleaned city.
+        :rtype: pandas Series
+
+        """
+        flag_digit = ar_text.str.contains(self.re_digit, na=False)
+        return ar_text.mask(flag_digit, "")
+
+    def clean_zipcode(self, ar_text, dict_clean):
+        """
+        Zipcode shorter than min_len is blanked, extension (after "-") is
+        dropped and numeric zipcode is zero padded to width.
+
+        :param ar_text: Zipcode.
+        :type ar_text: pandas Series
+        :param dict_clean: Settings with min_len and width.
+        :type dict_clean: dict
+        :return: Cleaned zipcode.
+        :rtype: pandas Series
+
+        """
+        ar_text = ar_text.mask(ar_text.str.len() < dict_clean["min_len"], "")
+
+        # Non text entries are retained as is
+        ar_base = ar_text.str.replace(self.re_zip_extension, "", regex=True)
+        ar_text = ar_base.where(pd.notna(ar_base), ar_text)
+
+        ar_num = pd.to_numeric(ar_text, errors="coerce")
+        flag_num = np.isfinite(ar_num.to_numpy(dtype=float))
+
+        ar_out = pd.Series("", index=ar_text.index, dtype=object)
+        ar_out[flag_num] = (
+            ar_num[flag_num].astype("int64").astype(str)
+            .str.zfill(dict_clean["width"]))
+        return ar_out
+
+    def clean_phone(self, ar_text, dict_clean):
+        """
+        Phone number is blanked if it has min_len or less digits / letters
+        (after dropping invalid numbers and text like "tel"); leading "-" or
+        "1-" and trailing "-" are trimmed.
+
+        :param ar_text: Phone number.
+        :type ar_text: pandas Series
+        :param dict_clean: Settings with min_len, ls_invalid and ls_remove.
+        :type dict_clean: dict
+        :return: Cleaned phone number.
+        :rtype: pandas Series
+
+        """
+        ar_text = ar_text.str.lower().str.replace("--", "-", regex=False)
+
+        ar_clean = ar_text.str.replace(self.re_special, "", regex=True)
+        ar_clean = ar_clean.mask(ar_clean.isin(dict_clean["ls_invalid"]), "")
+        for txt in dict_clean["ls_remove"]:
+            ar_clean = ar_clean.str.replace(txt, "", regex=False)
+
+        ar_out = ar_text.mask(ar_clean.str.len() <= dict_clean["min_len"], "")
+        ar_out = ar_out.str.replace(self.re_phone_prefix, "", regex=True)
+        ar_out = ar_out.str.replace(self.re_phone_suffix, "", regex=True)
+        return ar_out
+
+    # *** Validate ***
+
+    def validity(self, ar_text, col_name):
+        """
+        Flag valid entries; entry is valid if it has more than min_len
+        digits / letters and has no invalid text.
+
+        :param ar_text: Text to be validated.
+        :type ar_text: pandas Series
+        :param col_name: Column name.
+        :type col_name: str
+        :return: Flag indicating valid entries.
+        :rtype: pandas Series
+
+        """
+        dict_valid = self.get_spec(col_name, "validity")
+        return self.per_distinct(ar_text, self.validity_text, dict_valid)
+
+    def validity_text(self, ar_text, dict_valid):
+        """
+        Flag valid entries as per settings.
+
+        :param ar_text: Text to be validated.
+        :type ar_text: pandas Series
+        :param dict_valid: Settings with min_len and optional ls_invalid.
+        :type dict_valid: dict
+        :return: Flag indicating valid entries.
+        :rtype: pandas Series
+
+        """
+        ar_text = ar_text.fillna("").astype(str)
+        ar_text = ar_text.str.replace(self.re_special, "", regex=True)
+        ar_text = ar_text.str.upper()
+
+        flag_valid = ar_text.str.len() > dict_valid["min_len"]
+        if "ls_invalid" in dict_valid:
+            flag_valid &= ~ar_text.str.contains(
+                "|".join(dict_valid["ls_invalid"]), regex=True)
+        return flag_valid
+
+    def strip(self, ar_text, col_name):
+        """
+        Strip characters configured for contact column; NA is treated as
+        empty.
+
+        :param ar_text: Text to be stripped.
+        :type ar_text: pandas Series
+        :param col_name: Column name.
+        :type col_name: str
+        :return: Stripped text.
+        :rtype: pandas Series
+
+        """
+        dict_contact = self.get_spec(col_name, "contact")
+        return self.per_distinct(
+            ar_text.fillna(""), lambda x: x.str.strip(dict_contact["strip"]))
+
+    def min_length(self, col_name):
+        """
+        Minimum length of a valid contact column.
+
+        :param col_name: Column name.
+        :type col_name: str
+        :return: Minimum length.
+        :rtype: int
+
+        """
+        return self.get_spec(col_name, "contact")["min_len"]
+
+
+# %%
@@ -23,6 +23,7 @@ import traceback
 import pandas as pd
 from utils import IO
 from utils import AppLogger
+from utils.dcpd.class_serial_classifier import SerialClassifier
 import logging
 #import utils.json_creator as js
 logger = AppLogger(__name__)
@@ -65,6 +66,7 @@ class BusinessLogic:
         logger.app_info(f"Type for ref_prod_fr_srnum: {type(ref_prod_fr_srnum)}")
         ref_prod_fr_srnum['SerialNumberPattern'] = ref_prod_fr_srnum['SerialNumberPattern'].str.lower()
         self.ref_prod_fr_srnum = ref_prod_fr_srnum
+        self.srnum_classifier = SerialClassifier(ref_prod_fr_srnum)
 
         # Read Reference: Product from TLN
         logger.app_info("Reading the file ref_lead_opportunities")
@@ -83,32 +85,8 @@ class BusinessLogic:
 
     def idetify_product_fr_serial(self, ar_serialnumber):
 
-        df_data = pd.DataFrame(data={'SerialNumber': ar_serialnumber})
-
-        # ref_prod_fr_srnum
-        ref_prod = self.ref_prod_fr_srnum
-        ref_prod = ref_prod[ref_prod.flag_keep]
-
-        # Pre-Process Data
-        ls_prod = ref_prod.Product.unique()
-        df_data['Product'] = ''
-        for prod in ls_prod:
-            # prod = ls_prod [0]
-            ls_pattern = ref_prod.loc[
-                ref_prod.Product == prod, 'SerialNumberPattern']
-
-            df_data['flag_prod'] = df_data.SerialNumber.str.startswith(
-                tuple(ls_pattern))
-            df_data.loc[df_data['flag_prod'], 'Product'] = prod
-            df_data = df_data.drop('flag_prod', axis=1)
-
-        dict_pat = {'526?-3421': 'STS', '26??-0820': 'RPP'}
-        for pat in dict_pat:
-            prod = dict_pat[pat]
-            df_data['flag_prod'] = df_data.SerialNumber.apply(
-                lambda x: re.search(pat, x) != None)
-            df_data.loc[df_data['flag_prod'], 'Product'] = prod
-            df_data = df_data.drop('flag_prod', axis=1)
+        # Product from prefix trie of ref_prod_fr_srnum and STS / RPP patterns
+        df_data = self.srnum_classifier.classify(ar_serialnumber)
 
         #
         return df_data['Product']
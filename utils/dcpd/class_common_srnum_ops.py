@@ -26,6 +26,7 @@ from utils import IO
 import os
 import json
 from utils import AppLogger
+from utils import MapUnique
 
 logger = AppLogger(__name__)
 
@@ -80,14 +81,14 @@ class SearchSrnum:
         try:
             # Format - Punctuation
             for char in self.ls_char:
-                df_srnum["SerialNumberContract"] = df_srnum[
-                    "SerialNumberContract"
-                ].apply(lambda x: re.sub(f"{char}+", "-", x))
+                df_srnum["SerialNumberContract"] = MapUnique.map_unique(
+                    df_srnum["SerialNumberContract"],
+                    lambda x: re.sub(f"{char}+", "-", x))
 
             # Format - Punctuation
-            df_srnum["SerialNumberContract"] = df_srnum["SerialNumberContract"].apply(
-                lambda x: x.lstrip(punctuation).rstrip(punctuation)
-            )
+            df_srnum["SerialNumberContract"] = MapUnique.map_unique(
+                df_srnum["SerialNumberContract"],
+                lambda x: x.lstrip(punctuation).rstrip(punctuation))
 
             return df_srnum
         except Exception as excp:
@@ -111,47 +112,15 @@ class SearchSrnum:
             # Input
             sep = " "
 
-            # Initialize Output
-            df_serialnum = pd.DataFrame()
-
             # Prepare Data
             df_temp_org = self.prepare_srnum_data(df_temp_org)
 
             # PDI Salesforce has 4 fields with SerialNumber data.
-            # Extract SerialNumber data from these fields.
-            for cur_field in self.dict_srnum_cols:
-                # cur_field = list(dict_srnum_cols.keys())[0]
-                cur_qty = self.dict_srnum_cols[cur_field]
-
-                # TODO: Take ContractNumber "key" as an input to this method.
-                df_data = df_temp_org[[cur_field, cur_qty, "ContractNumber"]].copy()
-                df_data.columns = ["SerialNumberContract", "Qty", "ContractNumber"]
-
-                # Format - Punctuation
-                # df_data = self.clean_serialnum(df_data)
-
-                df_data.loc[:, "SerialNumber"] = self.prep_data(
-                    df_data[["SerialNumberContract"]], sep
-                )
+            # Extract SerialNumber data from these fields in one pass.
+            df_serialnum = self.extract_srnum(
+                df_temp_org, self.dict_srnum_cols, self.pat_srnum,
+                lambda df_data: self.prep_data(df_data, sep))
 
-                df_data.loc[:, "is_serialnum"] = df_data["SerialNumber"].apply(
-                    lambda x: re.search("|".join(self.pat_srnum), str(x)) is not None
-                )
-                # Expand Serial number
-                ls_dfs = df_data.apply(
-                    lambda x: self.expand_srnum(x, self.pat_srnum), axis=1
-                ).tolist()
-
-                # Results
-                df_ls_collapse = pd.concat(ls_dfs)
-                df_ls_collapse["src"] = cur_field
-
-                df_serialnum = pd.concat([df_serialnum, df_ls_collapse])
-
-                # env_.logger.app_debug(f'{cur_field}: {df_serialnum.shape[0]}')
-                del ls_dfs, df_data, df_ls_collapse
-
-            df_serialnum = df_serialnum.reset_index(drop=True)
             logger.app_info('exiting Search sr num')
             logger.app_success(_step)
 
@@ -200,51 +169,89 @@ class SearchSrnum:
             raise Exception from excp
         return df_temp_org["SerialNumber"]
 
-    def expand_srnum(self, col_data, pat_srnum) -> pd.DataFrame:
+    def extract_srnum(self, df_temp_org, dict_cols, pat_srnum, prep) -> pd.DataFrame:
         """
-        Expand SerialNumbers.
+        Extract SerialNumbers from all serial number fields in one pass.
+
+        Fields are stacked with their Qty; each distinct field text is
+        scanned once per pattern (in order of pattern). Matches of a pattern
+        are removed from the text before scanning with next pattern and scan
+        stops once text has 2 or less characters. Fields with text not
+        matching any pattern are retained with SerialNumber as NaN.
 
-        :param col_data: Serial Number data
-        :type col_data: Row of the dataframe
-        :param pat_srnum: Pattern to identify Serial Number
-        :type pat_srnum: String
+        :param df_temp_org: Contract data
+        :type df_temp_org: pandas DataFrame
+        :param dict_cols: Serial number field mapped to its Qty field
+        :type dict_cols: dict
+        :param pat_srnum: Patterns to identify Serial Number
+        :type pat_srnum: list
+        :param prep: Function cleaning serial number field
+        :type prep: function
         :raises Exception: Raised if unknown data type provided.
-        :return: dataframe having expanded serial number
+        :return: Extracted SerialNumber with ContractNumber,
+            SerialNumberContract, Qty and src (field)
         :rtype: pd.DataFrame
 
         """
         _step = "Expand Serial Number"
         try:
-            if not col_data["is_serialnum"]:
-                df_srnum = pd.DataFrame(
-                    data={
-                        "SerialNumber": np.nan,
-                        "ContractNumber": col_data["ContractNumber"],
-                        "SerialNumberContract": col_data["SerialNumberContract"],
-                        "Qty": col_data["Qty"],
-                    },
-                    index=[0],
-                )
-                return df_srnum
-
-            sr_num = col_data["SerialNumber"]
-
-            ls_sr_num = []
-
-            for cur_srnum_pat in pat_srnum:
-                ls_sr_num_cur = re.findall(cur_srnum_pat, str(sr_num))
+            # Stack fields: one row per (field, contract)
+            df_stack = pd.concat(
+                [pd.DataFrame({
+                    "ContractNumber": df_temp_org["ContractNumber"].values,
+                    "SerialNumberContract": df_temp_org[cur_field].values,
+                    "Qty": df_temp_org[dict_cols[cur_field]].values,
+                    "src": cur_field})
+                    for cur_field in dict_cols],
+                ignore_index=True)
+
+            ar_text = prep(df_stack[["SerialNumberContract"]].copy())
+
+            # Scan distinct texts
+            ar_uid, ar_uniques = pd.factorize(ar_text)
+            ar_uniques = pd.Series(ar_uniques, dtype=object)
+            ar_serial = ar_uniques.str.count("|".join(pat_srnum)) > 0
+
+            ls_match = []
+            ar_rest = ar_uniques[ar_serial]
+            for ix_pat, cur_srnum_pat in enumerate(pat_srnum):
+                ar_found = ar_rest.str.findall(cur_srnum_pat).explode().dropna()
+                ls_match.append(pd.DataFrame({
+                    "uid": ar_found.index, "ix_pat": ix_pat,
+                    "SerialNumber": ar_found.values}))
+
+                ar_rest = ar_rest.str.replace(cur_srnum_pat, "", regex=True)
+                ar_rest = ar_rest[ar_rest.str.len() > 2]
+
+            # Matches of a text: in order of pattern and position
+            df_match = pd.concat(ls_match, ignore_index=True).sort_values(
+                ["uid", "ix_pat"], kind="stable")
+            ar_count = np.bincount(
+                df_match["uid"].to_numpy(dtype=np.int64),
+                minlength=len(ar_uniques))
+            ar_start = np.cumsum(ar_count) - ar_count
+
+            # (row_id, SerialNumber) pairs; non serial texts retain a row
+            ar_is_serial = np.zeros(len(ar_uid), dtype=bool)
+            ar_is_serial[ar_uid >= 0] = ar_serial.to_numpy()[ar_uid[ar_uid >= 0]]
+            ar_n = np.ones(len(ar_uid), dtype=np.int64)
+            ar_n[ar_is_serial] = ar_count[ar_uid[ar_is_serial]]
+
+            ar_row_id = np.repeat(np.arange(len(ar_n)), ar_n)
+            ar_pos = np.arange(len(ar_row_id)) - np.repeat(
+                np.cumsum(ar_n) - ar_n, ar_n)
+
+            ar_srnum = np.full(len(ar_row_id), np.nan, dtype=object)
+            f_serial = ar_is_serial[ar_row_id]
+            ar_ix_match = (ar_start[ar_uid[ar_row_id[f_serial]]]
+                           + ar_pos[f_serial])
+            ar_srnum[f_serial] = df_match["SerialNumber"].to_numpy()[
+                ar_ix_match]
+
+            # Join context back by row id
+            df_srnum = df_stack.take(ar_row_id).reset_index(drop=True)
+            df_srnum.insert(0, "SerialNumber", ar_srnum)
 
-                if len(ls_sr_num_cur) > 0:
-                    ls_sr_num = ls_sr_num + ls_sr_num_cur
-                    sr_num = re.sub(cur_srnum_pat, "", sr_num)
-
-                if len(sr_num) <= 2:
-                    break
-
-            df_srnum = pd.DataFrame(data={"SerialNumber": ls_sr_num})
-            df_srnum["ContractNumber"] = col_data["ContractNumber"]
-            df_srnum["SerialNumberContract"] = col_data["SerialNumberContract"]
-            df_srnum["Qty"] = col_data["Qty"]
         except Exception as excp:
             logger.app_fail(_step, f"{traceback.print_exc()}")
             raise Exception from excp
@@ -291,50 +298,15 @@ class SearchSrnum:
             # Input
             sep = " "
 
-            # Initialize Output
-            df_serialnum = pd.DataFrame()
-
             # Prepare Data
             logger.app_info("Calling the method prepare_srnum_data_services defined in class_common_srnum_ops.py")
             df_temp_org = self.prepare_srnum_data_services(df_temp_org)
             logger.app_info("Finished Calling the method prepare_srnum_data_services defined in class_common_srnum_ops.py")
             # PDI Salesforce has 4 fields with SerialNumber data.
-            # Extract SerialNumber data from these fields.
-            for cur_field in self.dict_cols_srnum:
-                # cur_field = list(dict_srnum_cols.keys())[0]
-                cur_qty = self.dict_cols_srnum[cur_field]
-
-                df_data = df_temp_org[[cur_field, cur_qty, "ContractNumber"]].copy()
-                df_data.columns = ["SerialNumberContract", "Qty", "ContractNumber"]
-
-                # Format - Punctuation
-                # df_data = self.clean_serialnum(df_data)
-                logger.app_info("Calling the method prep_data_services defined in class_common_srnum_ops.py")
-                df_data.loc[:, "SerialNumber"] = self.prep_data_services(
-                    df_data[["SerialNumberContract"]], sep
-                )
-                logger.app_info("Finished Calling the method prep_data_services defined in class_common_srnum_ops.py")
-
-                df_data.loc[:, "is_serialnum"] = df_data["SerialNumber"].apply(
-                    lambda x: re.search("|".join(self.pat_srnum_services), str(x))
-                    is not None
-                )
-                logger.app_info("Calling the method expand_srnum defined in class_common_srnum_ops.py")
-                # Expand Serial number
-                ls_dfs = df_data.apply(
-                    lambda x: self.expand_srnum(x, self.pat_srnum_services), axis=1
-                ).tolist()
-                logger.app_info("Finished Calling the method expand_srnum defined in class_common_srnum_ops.py")
-                # Results
-                df_ls_collapse = pd.concat(ls_dfs)
-                df_ls_collapse["src"] = cur_field
-
-                df_serialnum = pd.concat([df_serialnum, df_ls_collapse])
-
-                # env_.logger.app_debug(f'{cur_field}: {df_serialnum.shape[0]}')
-                del ls_dfs, df_data, df_ls_collapse
-
-            df_serialnum = df_serialnum.reset_index(drop=True)
+            # Extract SerialNumber data from these fields in one pass.
+            df_serialnum = self.extract_srnum(
+                df_temp_org, self.dict_cols_srnum, self.pat_srnum_services,
+                lambda df_data: self.prep_data_services(df_data, sep))
 
             logger.app_success(_step)
 
@@ -33,11 +33,15 @@ import pandas as pd
 import sys
 from utils.dcpd.class_business_logic import BusinessLogic
 from utils.dcpd.class_serial_number import SerialNumber
+from utils.dcpd.class_serial_classifier import SerialClassifier
 from utils.dcpd.class_common_srnum_ops import SearchSrnum
 from utils import IO
 from utils import Filter
 from utils import AppLogger
+from utils import Rules
+from utils import MapUnique
 from utils.format_data import Format
+from utils.sampling import Sampling
 import json
 
 # path = os.getcwd()
@@ -46,6 +50,7 @@ import json
 # os.chdir(path)
 
 logger = AppLogger(__name__)
+obj_rules = Rules()
 
 punctuation = punctuation + " "
 
@@ -80,6 +85,14 @@ class Contract:
             self.config=config
             #logging.info("'config':config")
             self.mode = self.config.get("conf.env", "azure-adls")
+        IO.set_memory_mode(self.config.get('memory_mode', {}))
+
+        # Persisted cache of expanded serial numbers
+        self.srnum.init_cache(self.mode, self.config)
+
+        # Dev run: sample of units
+        self.sampling = Sampling.from_config(self.config)
+
         # variables
         # self.config = IO.read_json(mode="local", config={
         #     "file_dir": "./references/", "file_name": "config_dcpd.json"})
@@ -91,6 +104,8 @@ class Contract:
             "pat_single_srnum"
         ]
         self.pat_mob = self.config["contracts"]["srnum_pattern"]["pat_mob"]
+        self.srnum_classifier = SerialClassifier(
+            self.bus_logic.ref_prod_fr_srnum, pat_mob=self.pat_mob)
 
         self.dict_decode_contract = self.config["contracts"]["config_cols"][
             "dict_decode_contract"
@@ -135,6 +150,7 @@ class Contract:
         :raises Exception: Collects any / all exception.
 
         """
+        failed = False
         try:
             # PreProcess: Contracts Data
             df_contract = self.pipeline_contract
@@ -161,6 +177,7 @@ class Contract:
                     "adls_dir": self.config["file"]["Processed"]["contracts"]["validation"],
                 },
                 df_contract,
+                asynchronous=True,
             )
 
             # Merge Summarised contract and install base data.
@@ -182,9 +199,14 @@ class Contract:
             )
             logger.app_info('Successfully executed')
         except Exception as excp:
+            failed = True
             logger.app_info(f" main function failed, {excp} ")
             logger.app_fail(self.main_contract, f"{traceback.print_exc()}")
             raise Exception('f"{self.main_contract}: Failed') from excp
+        finally:
+            # Wait for validation exports written in background; on failure
+            # their errors are logged and do not replace error of pipeline
+            IO.wait_writes(raise_error=not failed)
 
     # ***** Pipelines *****
     @property
@@ -214,6 +236,7 @@ class Contract:
                     "adls_dir": self.config["file"]["Raw"]["contracts"],
                 },
             )
+            df_contract = self.sampling.sample(df_contract, "contracts")
             logger.app_info(f" read df_contract {df_contract.shape[0]} ")
             logger.app_info(f" read df_contract {df_contract.columns} ")
             df_contract["BillingAddress"] = df_contract["BillingStreet"]
@@ -245,7 +268,9 @@ class Contract:
                     "adls_config": self.config["file"]["Processed"]["adls_credentials"],
                     "adls_dir": self.config["file"]["Processed"]["contracts"]["contract_srnum_validation"],
                 },
-                df_contract_srnum,
+                # Modified by validation below
+                df_contract_srnum.copy(),
+                asynchronous=True,
             )
 
             logger.app_success(_step)
@@ -327,6 +352,20 @@ class Contract:
 
         return df_out
 
+    @staticmethod
+    def srnum_drop_suffix(srnum):
+        """
+        Drop single character suffix of serial number e.g. "111-0000-1a"
+        gives "111-0000-1".
+
+        :param srnum: Serial number.
+        :type srnum: str
+        :return: Serial number without suffix.
+        :rtype: str
+
+        """
+        return re.sub(r"-(\d{1})[a-zA-Z]$", r"-\1", srnum)
+
     def validate_contract_install_sr_num(self, df_contract):
         """
         Validate contract Serial Numbers.
@@ -344,9 +383,8 @@ class Contract:
             logger.app_info("Finished calling read_processed_installbase() function defined in class_contracts_data.py")                                             
             df_install.loc[:, "SerialNumber"] = df_install.SerialNumber_M2M.astype(str)
             # handling single character case in SerialNumber col "111-0000-1a"
-            df_install["SerialNumber"] = df_install["SerialNumber"].apply(
-                lambda x: re.sub(r"-(\d{1})[a-zA-Z]$", r"-\1", x)
-            )
+            df_install["SerialNumber"] = MapUnique.map_unique(
+                df_install["SerialNumber"], self.srnum_drop_suffix)
 
             logger.app_info("Reading csv file from function validate_contract_install_sr_num defined inside class_contracts_data.py")
             df = IO.read_csv(
@@ -594,6 +632,7 @@ class Contract:
                     "adls_dir": self.config["file"]["Processed"]["contracts"]["contract_startup_validation"],
                 },
                 df_startup_org,
+                asynchronous=True,
             )
 
         except Exception as excp:
@@ -616,20 +655,12 @@ class Contract:
         _step = "Decode Contract Service Data"
         try:
             df_contract.Service_Plan = df_contract.Service_Plan.str.lower()
-            df_contract["Eaton_ContractType"] = ""
-            for type_ in self.dict_contract:
-                # type_ = 'Gold'
-                df_contract["flag_ided"] = df_contract["Service_Plan"].str.contains(
-                    str.lower(type_)
-                )
-                df_contract["flag_blank"] = df_contract["Eaton_ContractType"] == ""
-                df_contract["flag"] = (
-                    df_contract["flag_blank"] & df_contract["flag_ided"]
-                )
-                df_contract.loc[
-                    df_contract["flag"], "Eaton_ContractType"
-                ] = self.dict_contract[type_]
-            df_contract = df_contract.drop(["flag_ided", "flag_blank", "flag"], axis=1)
+
+            # First plan type (config order) found in service plan
+            df_contract["Eaton_ContractType"] = obj_rules.first_match(
+                df_contract["Service_Plan"],
+                [(self.dict_contract[type_], str.lower(type_))
+                 for type_ in self.dict_contract])
 
             IO.write_csv(
                 self.mode,
@@ -640,7 +671,9 @@ class Contract:
                     "adls_config": self.config["file"]["Processed"]["adls_credentials"],
                     "adls_dir": self.config["file"]["Processed"]["contracts"]["contract_decode_validation"],
                 },
-                df_contract,
+                # Modified by decode of installbase
+                df_contract.copy(),
+                asynchronous=True,
             )
 
         except KeyError as excp:
@@ -664,34 +697,13 @@ class Contract:
         """
         _step = "Decode Installbase description data"
         try:
-            df_install_temp["Description"] = (
-                df_install_temp["Description"]
-                .str.replace(" ", "")
-                .str.lower()
-                .str.replace(")", "")
-            )
-
-            # Decode Contracts from
-            df_install_temp.loc[:, "Eaton_ContractType_M2M"] = ""
-
-            for type_ in self.dict_decode_contract:
-                # type_ = 'gold'
-                pat_contract = self.dict_decode_contract[type_]
-                df_install_temp["flag_ided"] = df_install_temp["Description"].apply(
-                    lambda x: re.search(pat_contract, str(x)) is not None
-                )
-
-                df_install_temp["flag_blank"] = (
-                    df_install_temp["Eaton_ContractType_M2M"] == ""
-                )
-
-                df_install_temp["flag"] = (
-                    df_install_temp["flag_blank"] & df_install_temp["flag_ided"]
-                )
-
-                df_install_temp.loc[
-                    df_install_temp["flag"], "Eaton_ContractType_M2M"
-                ] = type_
+            # Decode Contracts from description; first contract type (config
+            # order) found in description without spaces and ")"
+            df_install_temp.loc[:, "Eaton_ContractType_M2M"] = obj_rules.first_match(
+                df_install_temp["Description"],
+                list(self.dict_decode_contract.items()),
+                prep=lambda ar_text: ar_text.str.replace(" ", "").str.lower()
+                .str.replace(")", ""))
 
             df_install_temp = df_install_temp.loc[
                 df_install_temp["Eaton_ContractType_M2M"] != "",
@@ -836,9 +848,9 @@ class Contract:
                     "SerialNumber"
                 ].str.replace(f"{char}", sep, regex=True)
 
-                df_temp_org.loc[:, "SerialNumber"] = df_temp_org["SerialNumber"].apply(
-                    lambda x: re.sub(f"{sep}+", sep, str(x))
-                )
+                df_temp_org.loc[:, "SerialNumber"] = MapUnique.map_unique(
+                    df_temp_org["SerialNumber"],
+                    lambda x: re.sub(f"{sep}+", sep, str(x)))
 
             # Prep Data
             df_temp_org = df_temp_org.rename(
@@ -847,9 +859,9 @@ class Contract:
             df_temp_org["SerialNumberOrg"] = (
                 df_temp_org["SerialNumberOrg"].astype(str).str.lower()
             )
-            df_temp_org["SerialNumberOrg"] = df_temp_org["SerialNumberOrg"].apply(
-                lambda x: x.lstrip(punctuation).rstrip(punctuation)
-            )
+            df_temp_org["SerialNumberOrg"] = MapUnique.map_unique(
+                df_temp_org["SerialNumberOrg"],
+                lambda x: x.lstrip(punctuation).rstrip(punctuation))
             #df_temp_org = df_temp_org[df_temp_org["SerialNumberOrg"] != '110-0333-a-b']
             # Get Range
             logger.app_info("Now calling get_serialnumber method in class_serial_number.py")
@@ -945,26 +957,20 @@ class Contract:
             logger.app_info('Inside filter sr num')
             df_temp_org = df_temp_org[pd.notna(df_temp_org.SerialNumber)]
 
-            # Filter : Limit to DCPD products : STS / RPP / PDU
-            df_temp_org.loc[:, "Product"] = self.bus_logic.idetify_product_fr_serial(
-                df_temp_org["SerialNumber"]
-            )
-            df_temp_org = df_temp_org[df_temp_org["Product"] != ""]
+            # Classify : Product, validity and mobile number in one pass
+            df_class = self.srnum_classifier.classify(
+                df_temp_org["SerialNumber"], strip_chars=punctuation)
+            df_temp_org = df_temp_org.assign(
+                SerialNumber=df_class["SerialNumber"],
+                Product=df_class["Product"])
 
+            # Filter : Limit to DCPD products : STS / RPP / PDU
             # Filter : Valid Serial Number
-            df_temp_org["SerialNumber"] = df_temp_org["SerialNumber"].apply(
-                lambda x: x.lstrip(punctuation).rstrip(punctuation)
-            )
-            df_temp_org.loc[:, "valid_sr"] = self.srnum.validate_srnum(
-                df_temp_org["SerialNumber"]
-            )
-            df_temp_org = df_temp_org.loc[df_temp_org["valid_sr"], :]
-
             # Filter : Mobile number (as they have similar patterns to Serial Numbers)
-            df_temp_org["flag_mob"] = df_temp_org.SerialNumber.apply(
-                lambda x: re.search(self.pat_mob, str(x)) is not None
-            )
-            df_temp_org = df_temp_org[df_temp_org["flag_mob"] == False]
+            df_temp_org = df_temp_org[
+                (df_class["Product"] != "")
+                & df_class["f_valid"]
+                & ~df_class["flag_mob"]]
 
             df_temp_org = df_temp_org[
                 [
@@ -1161,9 +1167,8 @@ class Contract:
                     str
                 )
                 # handling single character case in SerialNumber col "111-0000-1a"
-                df_install["SerialNumber"] = df_install["SerialNumber"].apply(
-                    lambda x: re.sub(r"-(\d{1})[a-zA-Z]$", r"-\1", x)
-                )
+                df_install["SerialNumber"] = MapUnique.map_unique(
+                    df_install["SerialNumber"], self.srnum_drop_suffix)
 
             try:
                 ls_prep_contract_cols = self.config["contracts"]["config_cols"][
@@ -29,16 +29,17 @@ import re
 import numpy as np
 import pandas as pd
 import traceback
+from concurrent.futures import ProcessPoolExecutor
 
 from utils import IO
 from utils import AppLogger
 from utils.format_data import Format
-from utils.dcpd import Contract
+from utils.dcpd.class_contracts_data import Contract
 from utils.class_iLead_contact import ilead_contact
 from utils.filter_data import Filter
 from utils.contacts_fr_events_data import DataExtraction
+from utils.sampling import Sampling
 
-contractObj = Contract()
 filter_ = Filter()
 logger = AppLogger(__name__)
 
@@ -49,20 +50,30 @@ logger = AppLogger(__name__)
 class Contacts:
     """Class will extract and process contract data and processed data."""
 
-    def __init__(self, mode='local'):
+    def __init__(self, mode='local', config=None):
         """
         Initialise environment variables, class instance and variables.
 
         :param mode: DESCRIPTION, defaults to 'local'
         :type mode: sttring, optional
+        :param config: Project configuration, defaults to None i.e. read
+            from references.
+        :type config: dictionary, optional
         """
         # class instance
         self.format = Format()
         self.mode = mode
 
         # variables
-        self.config = IO.read_json(mode='local', config={
-            "file_dir": './references/', "file_name": 'config_dcpd.json'})
+        if config is None:
+            config = IO.read_json(mode='local', config={
+                "file_dir": './references/', "file_name": 'config_dcpd.json'})
+        self.config = config
+        IO.set_memory_mode(self.config.get('memory_mode', {}))
+        self.contract = Contract(self.mode, self.config)
+
+        # Dev run: sample of units
+        self.sampling = Sampling.from_config(self.config)
 
         # steps
         self.contact_contracts = 'generate contract'
@@ -117,9 +128,13 @@ class Contacts:
 
         return df_con  # "Successful !"
 
-    def deploy_across_sources(self): # pragma: no cover
+    def deploy_across_sources(self):
         """
-        Deploy generate_contacts across data bases listed in config.
+        Deploy generate_contacts across data bases listed in config. When
+        enabled in config (output_contacts_lead.parallel), sources are
+        processed in a bounded process pool; a failing source contributes
+        no contacts and does not fail other sources. Output is concatenated
+        in config order, same as sequential processing.
 
         :return: Contacts from all the databases.
         :rtype: pandas DataFrame.
@@ -133,47 +148,72 @@ class Contacts:
             logger.app_fail(_step, f'{traceback.print_exc()}')
             raise ValueError from e
 
+        # Sources are independent; contacts are generated in parallel
+        dict_parallel = self.config['output_contacts_lead'].get(
+            "parallel", {})
+        max_workers = dict_parallel.get("max_workers", 1) if (
+            dict_parallel.get("enable", False)) else 1
+        ls_generate = [src for src in dict_sources if dict_sources[src] == 1]
+        max_workers = min(max_workers, len(ls_generate))
+
+        dict_futures = {}
+        executor = None
+        if max_workers > 1:
+            executor = ProcessPoolExecutor(max_workers=max_workers)
+            dict_futures = {src: executor.submit(self.generate_contacts, src)
+                            for src in ls_generate}
+
         # Generate contacts from all databases from config
-        df_out = pd.DataFrame()
-        for src in dict_sources:
-            # src = list(dict_sources.keys())[0]
-            f_analyze = dict_sources[src]
-
-            if f_analyze == 1:
-                _step = f"Generate contacts: {src}"
-
-                try:
-                    df_data = self.generate_contacts(src)
-                except:
-                    logger.app_fail(_step, f'{traceback.print_exc()}')
-                    df_data = pd.DataFrame()
+        ls_out = []
+        try:
+            for src in dict_sources:
+                # src = list(dict_sources.keys())[0]
+                f_analyze = dict_sources[src]
 
-            elif f_analyze == 0:
-                _step = f"Read old processed data: {src}"
+                if f_analyze == 1:
+                    _step = f"Generate contacts: {src}"
 
-                try:
-                    file_dir = {
-                        'file_dir': self.config['file']['dir_results'] +
-                                    self.config['file']['dir_intermediate'],
-                        'file_name': ('processed_contacts' + src)}
-                    df_data = IO.read_csv(self.mode, file_dir)
+                    try:
+                        if src in dict_futures:
+                            df_data = dict_futures[src].result()
+                        else:
+                            df_data = self.generate_contacts(src)
+                    except:
+                        # Failure of a source does not fail other sources
+                        logger.app_fail(_step, f'{traceback.print_exc()}')
+                        df_data = pd.DataFrame()
+
+                elif f_analyze == 0:
+                    _step = f"Read old processed data: {src}"
 
-                except:
-                    logger.app_fail(_step, f'{traceback.print_exc()}')
+                    try:
+                        file_dir = {
+                            'file_dir': self.config['file']['dir_results'] +
+                                        self.config['file']['dir_intermediate'],
+                            'file_name': ('processed_contacts' + src)}
+                        df_data = IO.read_csv(self.mode, file_dir)
+
+                    except:
+                        logger.app_fail(_step, f'{traceback.print_exc()}')
+                        df_data = pd.DataFrame()
+
+                elif f_analyze == -1:
+                    logger.app_info(
+                        f"Generate contact method not implemented for {src}")
                     df_data = pd.DataFrame()
 
-            elif f_analyze == -1:
-                logger.app_info(
-                    f"Generate contact method not implemented for {src}")
-                df_data = pd.DataFrame()
+                else:
+                    logger.app_info(f"Unknown analyze method {f_analyze}")
+                    df_data = pd.DataFrame()
 
-            else:
-                logger.app_info(f"Unknown analyze method {f_analyze}")
-                df_data = pd.DataFrame()
+                ls_out.append(df_data)
+                del df_data
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
 
-            # Concatenate output from all sources
-            df_out = pd.concat([df_out, df_data])
-            del df_data
+        # Concatenate output from all sources (in config order)
+        df_out = pd.concat([pd.DataFrame()] + ls_out)
 
         return df_out
 
@@ -202,6 +242,7 @@ class Contacts:
             file_dir = {'file_dir': self.config['file']['dir_data'],
                         'file_name': self.config['file']['Raw'][src]['file_name']}
             df_data = IO.read_csv(self.mode, file_dir)
+            df_data = self.sampling.sample(df_data, src)
             del file_dir
 
             ls_dict = [src]
@@ -291,11 +332,9 @@ class Contacts:
                     n_col = 'nc_' + key
                     df_data[ls_col] = df_data[ls_col].fillna("").astype(str)
 
-                    df_data.loc[:, n_col] = df_data[ls_col].apply(
-                        lambda x:
-                        '; '.join(y for y in np.unique(x)
-                                  if (len(str(y)) > min_len) & pd.notna(y))
-                        , axis=1)
+                    df_data.loc[:, n_col] = filter_.coalesce_columns(
+                        df_data, ls_col, how='join', sep='; ',
+                        min_len=min_len)
 
                     dict_in[key] = n_col
                 else:
@@ -512,17 +551,10 @@ class Contacts:
         df_con.loc[:, "flag_include"] = False
 
         min_length = {
-            "Name": 2,
-            "Email": 4,
-            "Company_Phone": 10
-        }
+            col: self.gc.normalize.min_length(col) for col in ls_cols_must}
         for col in ls_cols_must:
             # Clean Name
-            df_con.loc[:, col] = df_con[col].fillna("")
-            df_con.loc[:, col] = df_con[col].apply(
-                lambda x: x.rstrip('_-* ').lstrip('_-* ')
-            )
-            ml = min_length[col]
+            df_con.loc[:, col] = self.gc.normalize.strip(df_con[col], col)
 
             # Identiy Valid entries
             n_col = f"f_{col}"
@@ -546,7 +578,7 @@ class Contacts:
             columns={'Serial Number': 'SerialNumber'},
             inplace=True
         )
-        df_con = contractObj.validate_contract_install_sr_num(df_con)
+        df_con = self.contract.validate_contract_install_sr_num(df_con)
         df_con = df_con.loc[df_con.flag_validinstall]
         del df_con['flag_validinstall']
         del df_con['SerialNumber']
@@ -44,6 +44,7 @@ import numpy as np
 from utils.dcpd.class_business_logic import BusinessLogic
 from utils.dcpd.class_serial_number import SerialNumber
 from utils.strategic_customer import StrategicCustomer
+from utils.sampling import Sampling
 from utils import IO
 
 from utils import AppLogger
@@ -53,6 +54,7 @@ logger = AppLogger(__name__)
 logger.app_info('On file class_install_base')
 from utils import Format
 from utils import Filter
+from utils import MapUnique
 
 obj_srnum = SerialNumber()
 logger.app_info('before calling Business Logic')
@@ -85,11 +87,19 @@ class InstallBase:
         # Variable
         self.ls_char = [' ', '-']
         self.config = config
+        IO.set_memory_mode(self.config.get('memory_mode', {}))
 
         self.ls_priority = ['ShipTo_Country', 'SoldTo_Country']
         self.ls_cols_out = ['key_serial', 'SerialNumber', 'Product']
         self.ls_cols_ref = ['ProductClass', 'product_type', 'product_prodclass']
 
+        # Persisted cache of expanded serial numbers
+        obj_srnum.init_cache(self.mode, self.config)
+
+        # Dev run: sample of units; raw serial numbers are read once
+        self.sampling = Sampling.from_config(self.config)
+        self.df_srnum_raw = None
+
         # data_install = self.main_install()
 
         # return data_install
@@ -201,6 +211,12 @@ class InstallBase:
                  'adls_dir': self.config['file']['Raw']['M2M']
                  }
                  )
+            if self.sampling.f_enable:
+                # Shipments of sampled serial numbers
+                df_srnum_raw = self.read_serialnum()
+                df_data_install = self.sampling.restrict(
+                    df_data_install, ['Shipper#', 'ShipperItem#'],
+                    df_srnum_raw[['Shipper', 'ShipperItem']], 'M2M')
             logger.app_info(f'df_data_install from adls-read: {df_data_install.head()}')
 
             logger.app_info(f'df_data_install columns from adls-read: {df_data_install.columns}')
@@ -326,14 +342,8 @@ class InstallBase:
         """
         try:
             # Read SerialNumber data
-
-            df_srnum = IO.read_csv(
-                self.mode,
-                {'file_dir': self.config['file']['dir_data'],
-                 'file_name': self.config['file']['Raw']['SerialNumber']['file_name'],
-                 'adls_config': self.config['file']['Raw']['adls_credentials'],
-                 'adls_dir': self.config['file']['Raw']['SerialNumber']
-                })
+            df_srnum = self.read_serialnum()
+            self.df_srnum_raw = None
 
             # Format Data
             input_format = self.config['database']['SerialNumber']['Dictionary Format']
@@ -343,13 +353,11 @@ class InstallBase:
             # # Format - Punctuation
             df_srnum = self.clean_serialnum(df_srnum)
 
-            # Serial (Filter : Product)
-            df_srnum['Product'] = obj_bus_logic.idetify_product_fr_serial(
-                df_srnum['SerialNumber'])
-
-            # Filter : Valid Serial Number
-            df_srnum.loc[:, 'valid_sr'] = obj_srnum.validate_srnum(
+            # Serial (Filter : Product) and Filter : Valid Serial Number
+            df_class = obj_bus_logic.srnum_classifier.classify(
                 df_srnum['SerialNumber'])
+            df_srnum['Product'] = df_class['Product']
+            df_srnum.loc[:, 'valid_sr'] = df_class['f_valid']
 
             # Export to csv
             IO.write_csv(
@@ -370,6 +378,26 @@ class InstallBase:
                 "filter product class", f"{traceback.print_exc()}")
             raise ValueError from excp
 
+    def read_serialnum(self) -> pd.DataFrame:  # pragma: no cover
+        """
+        Read raw Serial Number Data, sampled in dev run mode.
+
+        :return df_srnum_raw: Raw serial number data
+        :rtype: pd.DataFrame
+
+        """
+        if self.df_srnum_raw is None:
+            df_srnum_raw = IO.read_csv(
+                self.mode,
+                {'file_dir': self.config['file']['dir_data'],
+                 'file_name': self.config['file']['Raw']['SerialNumber']['file_name'],
+                 'adls_config': self.config['file']['Raw']['adls_credentials'],
+                 'adls_dir': self.config['file']['Raw']['SerialNumber']
+                })
+            self.df_srnum_raw = self.sampling.sample(
+                df_srnum_raw, 'SerialNumber')
+        return self.df_srnum_raw
+
     def pipeline_customer(self, df_data_install: pd.DataFrame) -> pd.DataFrame:  # pragma: no cover
         """
         Identify strategic customer from the data.
@@ -382,7 +410,7 @@ class InstallBase:
 
         """
         logger.app_info('within pipeline_customer')
-        obj_sc = StrategicCustomer()
+        obj_sc = StrategicCustomer(self.config)
         logger.app_info('created strategic customer object')
         df_customer = obj_sc.main_customer_list(df_leads=df_data_install)
         logger.app_info('within pipeline_customer: 386')
@@ -483,6 +511,9 @@ class InstallBase:
 
                                   }
                                  )
+            # BOM of sampled jobs
+            df_bom = self.sampling.restrict(
+                df_bom, ['Job#'], df_install[['Job_Index']], 'bom')
             # Format Data
             logger.app_info(f'columns of bom data : {df_bom.columns}')
             input_format = self.config['database']['bom']['Dictionary Format']
@@ -759,11 +790,13 @@ class InstallBase:
         try:
             # Format - Duplicate Characters e.g. -- / ---
             for char in self.ls_char:
-                df_srnum['SerialNumber'] = df_srnum['SerialNumber'].apply(
+                df_srnum['SerialNumber'] = MapUnique.map_unique(
+                    df_srnum['SerialNumber'],
                     lambda x: re.sub(f'{char}+', '-', x))
 
             # Format - Punctuation
-            df_srnum['SerialNumber'] = df_srnum['SerialNumber'].apply(
+            df_srnum['SerialNumber'] = MapUnique.map_unique(
+                df_srnum['SerialNumber'],
                 lambda x: x.lstrip(punctuation).rstrip(punctuation))
 
             return df_srnum
@@ -0,0 +1,84 @@
+"""@file class_lead_delta.py
+
+@brief: Changes of lead generation outputs since previous snapshot.
+
+
+@details
+Rows of an output are fingerprinted on every run; fingerprints of previous
+snapshot identify rows inserted, updated and deleted since, so that
+consumers load changes instead of complete output.
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+# %% Setup Environment
+
+import numpy as np
+import pandas as pd
+
+
+# %% Lead Delta
+
+class LeadDelta:
+    """Fingerprints and changes of outputs."""
+
+    @staticmethod
+    def fingerprint(df_data, ls_key):
+        """
+        Fingerprint rows of output. Rows are identified by key columns;
+        repeated keys are numbered in order of occurrence. Fingerprint is
+        hash of all columns of the row.
+        @param df_data: output data e.g. output iLead.
+        @param ls_key: key columns e.g. Serial_Number, Component, Lead_Type.
+        @return: pd.Dataframe with key columns, Key and Fingerprint.
+        """
+        df_key = df_data[ls_key].fillna('').astype(str)
+        ar_occurrence = df_key.groupby(ls_key, sort=False).cumcount()
+
+        df_out = df_key.copy()
+        df_out['Key'] = df_key.agg('|'.join, axis=1) + '|' + \
+            ar_occurrence.astype(str)
+        df_out['Fingerprint'] = pd.util.hash_pandas_object(
+            df_data, index=False).values.view('int64')
+        return df_out.reset_index(drop=True)
+
+    def lead_delta(self, df_data, df_prev, ls_key):
+        """
+        Compare output with fingerprints of previous snapshot.
+            - insert: key not in previous snapshot,
+            - update: key in previous snapshot with different fingerprint,
+            - delete: key of previous snapshot not in output; only key
+              columns are available.
+        @param df_data: output data e.g. output iLead.
+        @param df_prev: fingerprints of previous snapshot, None if not
+        available i.e. every row is an insert.
+        @param ls_key: key columns e.g. Serial_Number, Component, Lead_Type.
+        @return: tuple of changes (output columns and Change_Type) and
+        fingerprints of output.
+        """
+        df_fingerprint = self.fingerprint(df_data, ls_key)
+        if df_prev is None:
+            df_prev = pd.DataFrame(columns=ls_key + ['Key', 'Fingerprint'])
+
+        ser_prev = pd.Series(
+            df_prev['Fingerprint'].astype('int64').values,
+            index=df_prev['Key'].astype(str).values)
+        ar_prev = df_fingerprint['Key'].map(ser_prev)
+
+        ar_change = np.where(
+            ar_prev.isna(), 'insert',
+            np.where(ar_prev == df_fingerprint['Fingerprint'], '', 'update'))
+        f_change = ar_change != ''
+        df_changed = df_data.reset_index(drop=True).loc[f_change].copy()
+        df_changed['Change_Type'] = ar_change[f_change]
+
+        df_deleted = df_prev.loc[
+            ~df_prev['Key'].astype(str).isin(df_fingerprint['Key']),
+            ls_key].copy()
+        df_deleted['Change_Type'] = 'delete'
+
+        df_delta = pd.concat([df_changed, df_deleted], ignore_index=True)
+        return df_delta, df_fingerprint
@@ -19,18 +19,25 @@ direct written permission from Eaton Corporation.
 import os
 import traceback
 from string import punctuation
-import re
 from datetime import timedelta
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 import numpy as np
 import pandas as pd
 
 from utils.dcpd.class_business_logic import BusinessLogic
+from utils.dcpd.class_lead_rules import LeadRules
+from utils.dcpd.class_lead_delta import LeadDelta
+from utils.dcpd.class_lead_partitions import LeadPartitions
 from utils.dcpd.class_serial_number import SerialNumber
+from utils.dcpd.class_standard_bom import StandardBOM
 from utils.strategic_customer import StrategicCustomer
+from utils.sampling import Sampling
 from utils.format_data import Format
 from utils import AppLogger
 from utils import IO
 from utils import Filter
+from utils import Join
+from utils import MapUnique
 
 path = os.getcwd()
 path = os.path.join(path.split('ileads_lead_generation')[0],
@@ -47,13 +54,46 @@ punctuation = punctuation + ' '
 
 class LeadGeneration:
 
-    def __init__(self, mode='local'):
+    def __init__(self, mode='local', as_of=None, config=None):
+        """
+        Initialize lead generation.
+
+        :param mode: IO mode i.e. 'local' or 'azure-adls'.
+        :type mode: str
+        :param as_of: Date on which leads are evaluated (age, due in
+            years), defaults to lead_generation.as_of_date in config or
+            today.
+        :type as_of: str or pandas Timestamp, optional
+        :param config: Project configuration, defaults to None i.e. read
+            from references.
+        :type config: dictionary, optional
+
+        """
         self.mode = mode
         self.srnum = SerialNumber()
         self.bus_logic = BusinessLogic()
-        self.config = IO.read_json(mode='local', config={
-            "file_dir": './references/', "file_name": 'config_dcpd.json'})
+        if config is None:
+            config = IO.read_json(mode='local', config={
+                "file_dir": './references/', "file_name": 'config_dcpd.json'})
+        self.config = config
+        IO.set_memory_mode(self.config.get('memory_mode', {}))
         self.format = Format()
+        self.lead_rules = LeadRules()
+        self.lead_partitions = LeadPartitions()
+        self.delta = LeadDelta()
+        self.standard_bom = StandardBOM(mode=self.mode, config=self.config)
+        self.join = Join(
+            max_fanout=self.config['lead_generation'].get('max_join_fanout'))
+        self.as_of = pd.Timestamp(
+            as_of or self.config['lead_generation'].get('as_of_date')
+            or pd.Timestamp.now()).normalize()
+        # Partition (product family) processed by this instance
+        self.partition = None
+        # Keys identifying rows of outputs across runs (delta export)
+        self.ls_key_ilead = ['Serial_Number', 'Component', 'Lead_Type']
+        self.ls_key_ref_install = ['Serial_Number']
+        # Dev run: sample of units
+        self.sampling = Sampling.from_config(self.config)
 
     def main_lead_generation(self):  # pragma: no cover
         """
@@ -62,37 +102,27 @@ class LeadGeneration:
 
         _step = 'Read Merged Contracts and Install Base data'
         try:
+            IO.prefetch(self.mode, self.stage_inputs())
             df_install = self.pipeline_contract_install()
             logger.app_success(
                 f"***** {df_install.SerialNumber_M2M.nunique()} *****")
             logger.app_success(_step)
 
-            # ***** PreProcess BOM data *****
-            _step = 'Process BOM data and identify leads'
-            # Read Data
-            df_leads = self.pipeline_bom_identify_lead(df_install)
-            logger.app_success(
-                f"***** {df_leads.SerialNumber_M2M.nunique()} *****")
-            logger.app_success(_step)
-
-            _step = 'Merge data: Install and BOM'
-            df_leads = self.pipeline_merge(df_leads, df_install, 'meta_data')
-            logger.app_success(
-                f"***** {df_leads.SerialNumber_M2M.nunique()} *****")
-            logger.app_success(_step)
-
-            # Service data
-            _step = 'Adding JCOMM and Sidecar Fields to Lead Generation Data'
-            df_leads = self.pipeline_add_jcomm_sidecar(df_leads)
-            logger.app_success(_step)
-
-            # Post Process : Leads
-            _step = 'Post Process output before formatting to calculate standard offering.'
-            df_leads = self.post_proecess_leads(df_leads)
-            logger.app_success(_step)
-
-            _step = "Post Processing and Deriving columns on output iLeads"
-            df_leads = self.post_process_output_ilead(df_leads)
+            dict_partition = self.config['lead_generation'].get(
+                'partition', {})
+            if dict_partition.get('enable', False):
+                _step = 'Generate leads for product partitions'
+                dict_install = self.lead_partitions.split_partitions(
+                    df_install,
+                    dict_partition.get('column', 'product_prodclass'))
+                # Only partitions are kept during fan-out
+                del df_install
+                df_leads = self.pipeline_partitioned_leads(
+                    dict_install, dict_partition)
+            else:
+                _step = 'Generate leads'
+                df_leads = self.pipeline_leads(df_install)
+                del df_install
             logger.app_success(_step)
 
             # Post Process : InstallBase
@@ -128,6 +158,13 @@ class LeadGeneration:
 
             _step = "Formatting Output"
 
+            # Partition of rows, when output is left partitioned
+            ar_partition = ar_partition_ref = None
+            if dict_partition.get('enable', False) and (
+                    dict_partition.get('export', 'concat') == 'partitioned'):
+                ar_partition = self.lead_partitions.partition_key(
+                    df_leads, dict_partition.get('column', 'product_prodclass'))
+
             ref_install_output_format = self.config['output_format'][
                 'ref_install_base']
             ref_install = self.format.format_output(df_leads,
@@ -146,86 +183,317 @@ class LeadGeneration:
 
             _step = "Exporting reference install file"
 
-            ref_install = ref_install.drop_duplicates(
-                subset=['Serial_Number']). \
-                reset_index(drop=True)
+            # Rows of ref_install are aligned with df_leads till deduplication
+            f_unique = ~ref_install.duplicated(subset=['Serial_Number'])
+            if ar_partition is not None:
+                ar_partition_ref = ar_partition[f_unique.values]
+            ref_install = ref_install.loc[f_unique].reset_index(drop=True)
 
-            IO.write_csv(self.mode,
-                         {'file_dir': self.config['file']['dir_results'],
-                          'file_name':
-                              self.config['file']['Processed']['output_iLead'][
-                                  'ref_install']
-                          }, ref_install)
+            self.export_output(
+                ref_install,
+                self.config['file']['Processed']['output_iLead'][
+                    'ref_install'],
+                ar_partition_ref)
 
             logger.app_success(_step)
 
             _step = "Exporting output iLead file"
 
-            IO.write_csv(self.mode,
-                         {'file_dir': self.config['file']['dir_results'],
-                          'file_name':
-                              self.config['file']['Processed']['output_iLead'][
-                                  'file_name']
-                          }, output_ilead)
+            self.export_output(
+                output_ilead,
+                self.config['file']['Processed']['output_iLead'][
+                    'file_name'],
+                ar_partition)
 
             logger.app_success(_step)
 
+            # Changes against previous snapshot
+            if self.config['lead_generation'].get('delta', {}).get(
+                    'enable', False):
+                _step = "Exporting changes of reference install and iLead"
+                self.export_delta(
+                    ref_install,
+                    self.config['file']['Processed']['output_iLead'][
+                        'ref_install'],
+                    self.ls_key_ref_install)
+                self.export_delta(
+                    output_ilead,
+                    self.config['file']['Processed']['output_iLead'][
+                        'file_name'],
+                    self.ls_key_ilead)
+                logger.app_success(_step)
+
+            logger.app_info(f"Reads: {IO.read_stats()}")
+
         except Exception as e:
             logger.app_fail(_step, f'{traceback.print_exc()}')
             raise Exception('f"{_step}: Failed') from e
 
+        finally:
+            IO.clear_prefetch()
+
         return 'successfully !'
 
+    #  ***** Inputs ****
+    def input_config(self, name):
+        """
+        Location of an input of lead generation.
+        @param name: name of input i.e. contracts, lead_opportunities, bom,
+        services, services_intermediate, chasis or area_region.
+        @return: dictionary with file_dir and file_name.
+        """
+        dict_file = self.config['file']
+        dir_intermediate = dict_file['dir_results'] + \
+            dict_file['dir_intermediate']
+        dict_location = {
+            'contracts': (dir_intermediate,
+                          dict_file['Processed']['contracts']['file_name']),
+            'lead_opportunities': (
+                dict_file['dir_ref'],
+                dict_file['Reference']['lead_opportunities']),
+            'bom': (dict_file['dir_data'],
+                    dict_file['Raw']['bom']['file_name']),
+            'services_intermediate': (
+                dir_intermediate,
+                dict_file['Processed']['services']['intermediate']),
+            'services': (dir_intermediate,
+                         dict_file['Processed']['services']['file_name']),
+            'chasis': (dict_file['dir_ref'],
+                       dict_file['Reference']['chasis']),
+            'area_region': (dict_file['dir_ref'],
+                            dict_file['Reference']['area_region'])}
+
+        file_dir, file_name = dict_location[name]
+        return {'file_dir': file_dir, 'file_name': file_name}
+
+    def stage_inputs(self):
+        """
+        Inputs of lead generation in order of use. Inputs are declared up
+        front so that they are read in background (see IO.prefetch) while
+        previous steps are computed.
+        @return: list of locations.
+        """
+        ls_config = [self.input_config(name) for name in [
+            'contracts', 'lead_opportunities', 'bom']]
+        ls_config += self.standard_bom.input_configs()
+        ls_config += [self.input_config(name) for name in [
+            'services_intermediate', 'services', 'chasis', 'area_region']]
+        return ls_config
+
     #  ***** Pipelines ****
-    def post_proecess_leads(self, df_leads):
+    def pipeline_leads(self, df_install, partition=None, df_bom=None,
+                       ref_lead_opp=None):  # pragma: no cover
+        """
+        Identify leads for install base data, add meta data and services
+        and post process leads. Validation files are suffixed with partition
+        when data of a partition is processed.
+        @param df_install: processed install base data coming from contract
+        pipeline.
+        @param partition: name of partition of install base data, None if
+        data is not partitioned.
+        @param df_bom: BOM data of install base data (see read_bom), read if
+        None.
+        @param ref_lead_opp: reference lead opportunities (see
+        read_ref_lead_opp), read if None.
+        @return: pd.Dataframe
+        """
+        self.partition = partition
+        _step = f'Process BOM data and identify leads ({partition})'
+        try:
+            df_leads = self.pipeline_bom_identify_lead(
+                df_install, df_bom, ref_lead_opp)
+            logger.app_success(
+                f"***** {df_leads.SerialNumber_M2M.nunique()} *****")
+            logger.app_success(_step)
+
+            _step = 'Merge data: Install and BOM'
+            df_leads = self.pipeline_merge(df_leads, df_install, 'meta_data')
+            logger.app_success(
+                f"***** {df_leads.SerialNumber_M2M.nunique()} *****")
+            logger.app_success(_step)
+
+            # Service data
+            _step = 'Adding JCOMM and Sidecar Fields to Lead Generation Data'
+            df_leads = self.pipeline_add_jcomm_sidecar(df_leads)
+            logger.app_success(_step)
 
-        # All other displays: Invalid
-        df_leads['is_standard_offering'] = False
-
-        # PDU + ( M4 display  + 8212)
-        ls_comp_type = ['M4 Display', '8212 Display']
-        f_std_offer = (
-                (df_leads.Product_M2M_Org.str.upper().isin(
-                    ['PDU', 'PDU - PRIMARY', 'PDU - SECONDARY']))
-                & df_leads.Component.isin(ls_comp_type)
-                & df_leads.is_valid_logic_tray_lead
-                & df_leads.is_valid_door_assembly_lead
-                & df_leads.is_valid_input_breaker_panel_lead
-        )
-
-        df_leads.loc[f_std_offer, 'is_standard_offering'] = True
-        # PDU + ( 'Monochrome Display', 'Color Display')
-        ls_comp_type = ['Monochrome Display', 'Color Display']
-        f_std_offer = (
-                (df_leads.Product_M2M_Org.str.upper().isin(
-                    ['PDU', 'PDU - PRIMARY', 'PDU - SECONDARY']))
-                & df_leads.Component.isin(ls_comp_type)
-                & df_leads.is_valid_door_assembly_lead
-                & df_leads.is_valid_input_breaker_panel_lead
-        )
-
-        df_leads.loc[f_std_offer, 'is_standard_offering'] = True
-
-        # RPP + ( M4 display  + 8212)
-        ls_comp_type = ['Monochrome Display',
-                        'Color Display', 'M4 Display', '8212 Display']
-        f_std_offer = (
-                (df_leads.Product_M2M_Org.str.upper() == 'RPP')
-                & df_leads.Component.isin(ls_comp_type)
-                & df_leads.is_valid_chasis_lead
-                & (pd.to_datetime(df_leads.ShipmentDate) >= pd.to_datetime(
-            "2008-01-01"))
-
-        )
-
-        df_leads.loc[f_std_offer, 'is_standard_offering'] = True
-        # All other components: are valid
-        ls_comp_type = ['BCMS', 'PCB', 'SPD', 'Fan', 'PDU', 'RPP', 'STS']
-        f_std_offer = df_leads.Component.isin(ls_comp_type)
-        df_leads.loc[f_std_offer, 'is_standard_offering'] = True
+            # Post Process : Leads
+            _step = 'Post Process output before formatting to calculate standard offering.'
+            df_leads = self.post_proecess_leads(df_leads)
+            logger.app_success(_step)
+
+            _step = "Post Processing and Deriving columns on output iLeads"
+            df_leads = self.post_process_output_ilead(df_leads)
+            logger.app_success(_step)
+        except Exception as e:
+            logger.app_fail(_step, f'{traceback.print_exc()}')
+            raise Exception('f"{_step}: Failed') from e
+
+        return df_leads
+
+    def pipeline_partitioned_leads(self, dict_install, dict_partition):  # pragma: no cover
+        """
+        Identify leads for each partition (product family e.g. PDU, RPP, STS)
+        of install base data. Units of a partition share the BOM parts and
+        reference leads they are matched on, so partitions are independent
+        and are processed in a bounded process pool (lead_generation.partition
+        in config). BOM and reference leads are read once; a worker gets
+        its partition and BOM of its jobs only (see partition_leads) and
+        partitions are released once submitted, so memory is bounded by
+        the partitions in progress. Leads are concatenated in partition
+        order.
+        @param dict_install: dictionary of partition name and processed
+        install base data (see LeadPartitions.split_partitions); partitions
+        are removed once processed.
+        @param dict_partition: partition settings i.e. column and max_workers.
+        @return: pd.Dataframe
+        """
+        _step = 'Read BOM data and reference leads'
+        try:
+            ls_partition = list(dict_install)
+            logger.app_info(
+                f"Partitions: { {k: len(v) for k, v in dict_install.items()} }")
+
+            ref_lead_opp = self.read_ref_lead_opp()
+            df_bom = self.read_bom(pd.concat(
+                [df_part[['Job_Index']] for df_part in dict_install.values()],
+                ignore_index=True))
+            dict_bom = self.lead_partitions.split_bom(df_bom, dict_install)
+            del df_bom
+
+            max_workers = min(dict_partition.get('max_workers', 1),
+                              len(dict_install))
+
+            dict_leads = {}
+            if max_workers > 1:
+                # Workers are forked; reads in background must be idle
+                IO.wait_prefetch()
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    dict_futures = {}
+                    for partition in ls_partition:
+                        # Next partition is submitted once a worker is free
+                        while len(dict_futures) >= max_workers:
+                            done, _ = wait(dict_futures.values(),
+                                           return_when=FIRST_COMPLETED)
+                            for partition_done, future in list(
+                                    dict_futures.items()):
+                                if future in done:
+                                    _step = f'Generate leads: {partition_done}'
+                                    dict_leads[partition_done] = \
+                                        dict_futures.pop(partition_done).result()
+                                    logger.app_success(_step)
+                        dict_futures[partition] = executor.submit(
+                            partition_leads, self.mode, self.as_of,
+                            self.config, partition,
+                            dict_install.pop(partition),
+                            dict_bom.pop(partition), ref_lead_opp)
+                    for partition, future in dict_futures.items():
+                        _step = f'Generate leads: {partition}'
+                        dict_leads[partition] = future.result()
+                        logger.app_success(_step)
+            else:
+                try:
+                    for partition in ls_partition:
+                        _step = f'Generate leads: {partition}'
+                        dict_leads[partition] = self.pipeline_leads(
+                            dict_install.pop(partition), partition,
+                            dict_bom.pop(partition), ref_lead_opp)
+                        logger.app_success(_step)
+                finally:
+                    self.partition = None
+
+            df_leads = pd.concat(
+                [dict_leads.pop(partition) for partition in ls_partition],
+                ignore_index=True)
+        except Exception as e:
+            logger.app_fail(_step, f'{traceback.print_exc()}')
+            raise Exception('f"{_step}: Failed') from e
 
         return df_leads
 
+    def partition_file_name(self, file_name, partition=None):
+        """
+        Suffix file name with partition e.g. output_iLead.csv is
+        output_iLead_pdu.csv for partition pdu.
+        @param file_name: file name.
+        @param partition: name of partition, defaults to partition processed
+        by this instance.
+        @return: str
+        """
+        partition = self.partition if partition is None else partition
+        return self.lead_partitions.partition_file_name(file_name, partition)
+
+    def export_output(self, df_data, file_name, ar_partition=None):  # pragma: no cover
+        """
+        Write output to result directory; one file per partition if
+        partition of rows is given.
+        @param df_data: data to be written.
+        @param file_name: file name.
+        @param ar_partition: partition of each row, None to write single
+        file.
+        @return: None
+        """
+        if ar_partition is None:
+            IO.write_csv(self.mode,
+                         {'file_dir': self.config['file']['dir_results'],
+                          'file_name': file_name}, df_data)
+            return
+
+        ar_partition = pd.Series(ar_partition, index=df_data.index) \
+            .fillna('unknown')
+        for partition in sorted(ar_partition.unique()):
+            IO.write_csv(
+                self.mode,
+                {'file_dir': self.config['file']['dir_results'],
+                 'file_name': self.partition_file_name(file_name, partition)},
+                df_data.loc[ar_partition == partition].reset_index(drop=True))
+
+    def export_delta(self, df_data, file_name, ls_key):  # pragma: no cover
+        """
+        Write changes of output against previous snapshot and fingerprints of
+        output to result directory, e.g. output_iLead_delta.csv and
+        output_iLead_fingerprint.csv for output_iLead.csv.
+        @param df_data: output data e.g. output iLead.
+        @param file_name: file name of output.
+        @param ls_key: key columns e.g. Serial_Number, Component, Lead_Type.
+        @return: pd.Dataframe of changes.
+        """
+        config_fingerprint = {
+            'file_dir': self.config['file']['dir_results'],
+            'file_name': self.lead_partitions.suffix_file_name(
+                file_name, 'fingerprint')}
+
+        _step = f"Read fingerprints of previous snapshot: {file_name}"
+        try:
+            df_prev = IO.read_csv(self.mode, config_fingerprint)
+        except Exception:
+            # Fingerprints are not available for the very first run
+            logger.app_info(f"{_step}: not available")
+            df_prev = None
+
+        df_delta, df_fingerprint = self.delta.lead_delta(
+            df_data, df_prev, ls_key)
+        logger.app_info(
+            f"Changes of {file_name}: "
+            f"{df_delta['Change_Type'].value_counts().to_dict()}")
+
+        IO.write_csv(self.mode,
+                     {'file_dir': self.config['file']['dir_results'],
+                      'file_name': self.lead_partitions.suffix_file_name(
+                          file_name, 'delta')},
+                     df_delta)
+        IO.write_csv(self.mode, config_fingerprint, df_fingerprint)
+        return df_delta
+
+    def post_proecess_leads(self, df_leads):
+        """
+        Identify if lead is a standard offering based on product, component
+        and validity of related parts (see LeadRules.rules_standard_offering).
+        @param df_leads: leads data.
+        @return: leads data with column is_standard_offering.
+        """
+        return self.lead_rules.apply(
+            df_leads, self.lead_rules.rules_standard_offering())
 
     def post_process_ref_install(self, ref_install):
         """
@@ -273,12 +541,7 @@ class LeadGeneration:
             ref_install.loc[:, 'flag_prior_service_lead'] = False
 
             # Area
-            ref_area = IO.read_csv(
-                self.mode, {
-                    'file_dir': self.config['file']['dir_ref'],
-                    'file_name': self.config['file']['Reference'][
-                        'area_region']
-                })
+            ref_area = IO.read_csv(self.mode, self.input_config('area_region'))
 
             ref_install['Key_region'] = ref_install['StartupState'].copy()
             ref_install.loc[
@@ -286,9 +549,12 @@ class LeadGeneration:
             ref_install['ShipTo_State']
 
             ref_area.Abreviation = ref_area.Abreviation.str.lower()
-            ref_install = ref_install.merge(
-                ref_area[['Abreviation', "Region", 'CSE Area']],
-                left_on='Key_region', right_on='Abreviation', how="left")
+            self.join.register(
+                'area_region', ref_area, 'Abreviation',
+                ["Region", 'CSE Area'], keep_key=True)
+            ref_install = self.join.join(
+                ref_install, 'area_region', 'Key_region', how="left",
+                step=_step)
             del ref_install['Key_region']
             ref_install["Brand"] = 'PDI'
             ref_install["Clean_Model_ID"] = (
@@ -297,19 +563,13 @@ class LeadGeneration:
             )
 
             # Upgraded Monitor check, 10 Nov, 23
-            df_service = IO.read_csv(
-                self.mode, {
-                'file_dir': self.config['file']['dir_results'] +
-                            self.config['file'][
-                            'dir_intermediate'],
-                'file_name': self.config['file']['Processed']['services'][
-                      'file_name']
-            })
+            df_service = IO.read_csv(self.mode, self.input_config('services'))
             df_service = df_service[df_service.component == 'Display']
-            df_service = df_service.rename(
-                columns={'SerialNumber': 'SerialNumber_M2M'})
-            ref_install = ref_install.merge(df_service[['type', 'SerialNumber_M2M']],
-                                      on='SerialNumber_M2M', how='left')
+            self.join.register(
+                'services_display', df_service, 'SerialNumber', ['type'])
+            ref_install = self.join.join(
+                ref_install, 'services_display', 'SerialNumber_M2M',
+                how='left', step=_step)
             ref_install = ref_install.rename(columns={'type': 'Upgrade_Type'})
             ref_install.loc[
                 ref_install.Upgrade_Type.notna(), "Upgraded_Monitor"] = True
@@ -344,7 +604,7 @@ class LeadGeneration:
         #ref_install = ref_install.rename({"Customer_old": "Customer", "Customer": "End_Customer"})
 
         # Update strategic account logic
-        obj_sc = StrategicCustomer('local')
+        obj_sc = StrategicCustomer(self.config)
         df_customer = obj_sc.main_customer_list(df_leads=ref_install)
         df_customer = df_customer.drop_duplicates(subset=['Serial_Number'])
 
@@ -354,18 +614,9 @@ class LeadGeneration:
 
         # End To Custoimer details
         ref_install['EndCustomer'] = ref_install['Customer'].copy()
-        dict_cols = {
-            "End_Customer_Address": ['StartupAddress', 'ShipTo_Street'],
-            "End_Customer_City": ['StartupCity', 'ShipTo_City'],
-            "End_Customer_State": ['StartupState', 'ShipTo_State'],
-            "End_Customer_Zip": ['StartupPostalCode', 'ShipTo_Zip']
-            }
-        for col in dict_cols:
-            ls_cols = ['was_startedup'] + dict_cols[col]
-            # Startup columns
-            ref_install.loc[:, col] = ref_install[ls_cols].apply(
-                lambda x: x[1] if x[0] else x[2], axis=1
-            )
+        # Startup columns
+        ref_install = self.lead_rules.apply(
+            ref_install, self.lead_rules.rules_end_customer())
         return ref_install
 
     def post_process_output_ilead(self, output_ilead_df):
@@ -377,35 +628,8 @@ class LeadGeneration:
         _step = "Deriving columns for output_iLead final data."
         try:
 
-            # Calculate the current year
-            current_year = pd.Timestamp.now().year
-
-            _step = "Derive column Component_Due_Date based on Lead_Type, Component_Date_Code"
-            # Apply the custom function to create the 'Component_Due_Date' column
-            output_ilead_df['Component_Due_Date'] = output_ilead_df.apply(
-                self.calculate_component_due_date, axis=1)
-            output_ilead_df['EOSL'] = output_ilead_df.apply(self.update_eosl,
-                                                            axis=1)
-
-            logger.app_success(_step)
-
-            _step = 'Calculating Component_Due_in (years) using Component_Due_Date and current year'
-
-            # Calculate the difference in years between 'Component_Due_Date' and the current year
-            output_ilead_df['Component_Due_in (years)'] = pd.to_datetime(
-                output_ilead_df['Component_Due_Date']).dt.year - current_year
-
-            # Convert the 'year_difference' to integer
-            output_ilead_df['Component_Due_in (years)'] = output_ilead_df[
-                'Component_Due_in (years)'].astype(int)
-
-            logger.app_success(_step)
-
-            _step = 'Deriving Component_Due_in (Category) based on Due years'
-
-            # Apply the function to create the 'Component_Due_in (Category)' column
-            output_ilead_df['Component_Due_in (Category)'] = output_ilead_df[
-                'Component_Due_in (years)'].apply(self.categorize_due_in_category)
+            # Component_Due_Date, EOSL, Component_Due_in (years) and
+            # Component_Due_in (Category) are derived by classify_lead
 
             # Add prod meta data
             output_ilead_df = self.prod_meta_data(output_ilead_df)
@@ -421,19 +645,13 @@ class LeadGeneration:
         _step = "Product meta data"
         try:
             # Read reference data
-            ref_chasis = IO.read_csv(
-                self.mode, {
-                    'file_dir': self.config['file']['dir_ref'],
-                    'file_name': self.config['file']['Reference']['chasis']
-                    })
+            ref_chasis = IO.read_csv(self.mode, self.input_config('chasis'))
             ref_chasis = ref_chasis.drop_duplicates(subset=['key_chasis'])
 
             # Get part numbers
-            output_ilead_df['key_chasis'] = output_ilead_df['pn_chasis'].copy()
-            output_ilead_df['key_chasis']= output_ilead_df['key_chasis'].fillna("(")
-            output_ilead_df.loc[:, 'key_chasis'] = output_ilead_df[
-                'key_chasis'].apply(
-                    lambda x: re.split(", | \(", x)[0] if x[0] != "(" else "")
+            output_ilead_df['key_chasis'] = MapUnique.map_unique(
+                output_ilead_df['pn_chasis'], self.lead_rules.key_chasis,
+                vectorized=True)
 
             # Attach data
             output_ilead_df = output_ilead_df.merge(
@@ -454,36 +672,22 @@ class LeadGeneration:
         """
         _step = 'Read Services data and append has_jcomm, has_sidecar field to lead data'
         try:
+            # Services indexed by the first partition are reused by the
+            # next partitions
             if service_df is not None:
-                df_service_jcomm_sidecar = service_df
-            else:
-                df_service_jcomm_sidecar = IO.read_csv(self.mode,
-                                                       {'file_dir':
-                                                            self.config[
-                                                                'file'][
-                                                                'dir_results'] +
-                                                            self.config[
-                                                                'file'][
-                                                                'dir_intermediate'],
-                                                        'file_name':
-                                                            self.config[
-                                                                'file'][
-                                                                'Processed']
-                                                            ['services'][
-                                                                'intermediate']
-                                                        })
-
-            df_service_jcomm_sidecar = df_service_jcomm_sidecar[
-                ['SerialNumber', 'Has_JCOMM',
-                 'Has_Sidecar']]
-
-            df_service_jcomm_sidecar.rename(
-                columns={'SerialNumber': 'SerialNumber_M2M'},
-                inplace=True)
-
-            df_leads = df_leads.merge(df_service_jcomm_sidecar,
-                                      left_on='SerialNumber_M2M',
-                                      right_on='SerialNumber_M2M', how='left')
+                self.join.register(
+                    'services_jcomm_sidecar', service_df,
+                    'SerialNumber', ['Has_JCOMM', 'Has_Sidecar'])
+            elif not self.join.is_registered('services_jcomm_sidecar'):
+                df_service_jcomm_sidecar = IO.read_csv(
+                    self.mode, self.input_config('services_intermediate'))
+                self.join.register(
+                    'services_jcomm_sidecar', df_service_jcomm_sidecar,
+                    'SerialNumber', ['Has_JCOMM', 'Has_Sidecar'])
+
+            df_leads = self.join.join(
+                df_leads, 'services_jcomm_sidecar', 'SerialNumber_M2M',
+                how='left', step=_step)
 
             logger.app_success(_step)
             return df_leads
@@ -491,35 +695,56 @@ class LeadGeneration:
             logger.app_fail(_step, f'{traceback.print_exc()}')
             raise Exception('f"{_step}: Failed') from e
 
-    def pipeline_bom_identify_lead(self, df_install):  # pragma: no cover
+    def read_ref_lead_opp(self):  # pragma: no cover
+        """
+        Reads reference lead opportunities with EOSL or life.
+        @return: pd.Dataframe
+        """
+        ref_lead_opp = IO.read_csv(
+            self.mode, self.input_config('lead_opportunities'))
+        return ref_lead_opp.dropna(
+            subset=['EOSL', 'Life__Years'], how='all') \
+            .reset_index(drop=True)
+
+    def read_bom(self, df_install):  # pragma: no cover
+        """
+        Reads raw BOM data and formats it; BOM of sampled jobs in a dev run.
+        @param df_install: install base data with Job_Index.
+        @return: pd.Dataframe
+        """
+        df_bom = IO.read_csv(self.mode, self.input_config('bom'))
+        df_bom[["Job#", "blank"]] = df_bom["Job#"].str.split("-", expand=True)
+
+        # BOM of sampled jobs
+        df_bom = self.sampling.restrict(
+            df_bom, ["Job#"],
+            df_install[["Job_Index"]].apply(
+                lambda x: x.str.split("-").str[0]), 'bom')
+
+        input_format = self.config['database']['bom']['Dictionary Format']
+        return self.format.format_data(df_bom, input_format)
+
+    def pipeline_bom_identify_lead(self, df_install, df_bom=None,
+                                   ref_lead_opp=None):  # pragma: no cover
         """
         This method reads the bom data joins it with install data and then uses the input
         reference lead file to generate the leads.
         @param df_install: processed install base data coming from contract pipeline
+        @param df_bom: BOM data (see read_bom), read if None.
+        @param ref_lead_opp: reference lead opportunities (see
+        read_ref_lead_opp), read if None.
         @return: return a df_lead after identifying the leads.
         """
         # Read : Reference lead opportunities
         _step = "Read : Reference lead opportunities"
         try:
-            ref_lead_opp = IO.read_csv(
-                self.mode, {
-                    'file_dir': self.config['file']['dir_ref'],
-                    'file_name': self.config['file']['Reference'][
-                        'lead_opportunities']
-                })
+            if ref_lead_opp is None:
+                ref_lead_opp = self.read_ref_lead_opp()
 
             # Read : Raw BOM data
             _step = "Read raw data : BOM"
-
-            df_bom = IO.read_csv(
-                self.mode, {
-                    'file_dir': self.config['file']['dir_data'],
-                    'file_name': self.config['file']['Raw']['bom'][
-                        'file_name']})
-            df_bom[["Job#", "blank"]] = df_bom["Job#"].str.split("-", expand=True)
-
-            input_format = self.config['database']['bom']['Dictionary Format']
-            df_bom = self.format.format_data(df_bom, input_format)
+            if df_bom is None:
+                df_bom = self.read_bom(df_install)
 
             # Merge raw bom data with processed_merge_contract_install dataframe
             _step = 'Merge data: Install and BOM'
@@ -529,10 +754,6 @@ class LeadGeneration:
             df_bom = self.pipeline_merge(df_bom, df_install, type_='lead_id')
             logger.app_success(_step)
 
-            ref_lead_opp = ref_lead_opp.dropna(
-                subset=['EOSL', 'Life__Years'], how='all') \
-                .reset_index(drop=True)
-
             # Identify Lead from Part Number TLN and BOM
 
             _step = 'Identify Lead for BOM'
@@ -580,23 +801,15 @@ class LeadGeneration:
         _step = "Merging leads and services data to extract date code at component level"
         try:
             if df_services is None:
-                df_services = IO.read_csv(self.mode,
-                                          {'file_dir': self.config['file'][
-                                                           'dir_results'] +
-                                                       self.config['file'][
-                                                           'dir_intermediate'],
-                                           'file_name':
-                                               self.config['file']['Processed']
-                                               ['services']['file_name']
-                                           })
-
-            # Convert to correct date format
+                df_services = IO.read_csv(
+                    self.mode, self.input_config('services'))
+
+            # Dates are kept as datetime64 (day precision)
             df_services['ClosedDate'] = pd.to_datetime(
-                df_services['ClosedDate'], errors='coerce'). \
-                dt.strftime('%Y-%m-%d')
+                df_services['ClosedDate'], errors='coerce').dt.normalize()
 
             df_services.sort_values(by='ClosedDate', ascending=False,
-                                    inplace=True)
+                                    inplace=True, kind='stable')
 
             # Identify the duplicate rows based on the two columns and keep the last occurrence
             # using this because when there is no duplicate drop_duplicate can result none
@@ -620,16 +833,13 @@ class LeadGeneration:
 
             df_services['component'] = df_services['component'].str.lower()
 
-            # Convert to correct date format
-            df_leads['InstallDate'] = pd.to_datetime(df_leads['InstallDate'],
-                                                     errors='coerce'). \
-                dt.strftime('%Y-%m-%d')
+            df_leads['InstallDate'] = pd.to_datetime(
+                df_leads['InstallDate'], errors='coerce').dt.normalize()
 
             df_leads['Component'] = df_leads['Component'].fillna("")
-            # Create a new column based on the list values
-            df_leads['temp_column'] = df_leads['Component'].apply(
-                lambda x: next(
-                    (val for val in unique_component if val in x.lower()), x))
+            # Services component of each lead component
+            df_leads['temp_column'] = self.lead_rules.resolve_component(
+                df_leads['Component'], unique_component)
 
             df_services.rename(columns={'SerialNumber': 'SerialNumber_M2M'},
                                inplace=True)
@@ -639,17 +849,20 @@ class LeadGeneration:
                                       right_on=['SerialNumber_M2M',
                                                 'component'], how='left')
 
-            # Replace NaN with empty string
-            df_leads = df_leads.fillna('')
+            # Replace NaN with empty string (dates are kept as NaT)
+            ls_cols_date = ['InstallDate', 'ClosedDate']
+            ls_cols_fill = [col for col in df_leads.columns
+                            if col not in ls_cols_date]
+            df_leads[ls_cols_fill] = df_leads[ls_cols_fill].fillna('')
             df_leads = df_leads.reset_index(drop=True)
 
             # Use np.where to create the new column
-            df_leads['date_code'] = np.where(df_leads['ClosedDate'] != '',
-                                             df_leads['ClosedDate'],
-                                             df_leads['InstallDate'])
+            f_services = pd.notna(df_leads['ClosedDate'])
+            df_leads['date_code'] = df_leads['ClosedDate'].where(
+                f_services, df_leads['InstallDate'])
 
             # Use np.where to create the new column
-            df_leads['source'] = np.where(df_leads['ClosedDate'] != '',
+            df_leads['source'] = np.where(f_services,
                                           'Services', 'InstallBase')
 
             df_leads = df_leads.drop_duplicates().reset_index(drop=True)
@@ -700,7 +913,12 @@ class LeadGeneration:
 
                 # Changed join from "inner" to "right" on 19th July 23 (Bug CIPILEADS-533)
                 # Joined  made to batch data with bom data on 23rd Oct, 23
-                df_out_mto = df_bom.merge(df_install_mto[ls_cols], on=key, how='right')
+                # Every unit in a job gets all BOM parts of the job i.e.
+                # fan-out is expected
+                self.join.register('install_mto', df_install_mto, key, ls_cols)
+                df_out_mto = self.join.join(
+                    df_bom, 'install_mto', key, how='right',
+                    max_fanout=np.inf, step=_step)
 
                 # Added component part numbers for made to stock data on 23rd Oct, 23
                 df_out_mts = self.add_data_mts(df_install_mts[ls_cols], merge_type='left')
@@ -717,7 +935,12 @@ class LeadGeneration:
                 ls_cols = ls_cols + ['SerialNumber_M2M']
                 ls_cols.remove('SerialNumber')
                 # Changed join from "inner" to "right" on 19th July 23 (Bug CIPILEADS-533)
-                df_out = df_bom.merge(df_install[ls_cols], on=key, how='right')
+                # Install base may have several rows per serial number;
+                # fan-out is logged but not limited
+                self.join.register('install', df_install, key, ls_cols)
+                df_out = self.join.join(
+                    df_bom, 'install', key, how='right',
+                    max_fanout=np.inf, step=_step)
 
         except Exception as e:
             logger.app_fail(_step, f"{traceback.print_exc()}")
@@ -732,12 +955,8 @@ class LeadGeneration:
         # Read : Contract Processed data
         _step = "Read processed contract data"
         try:
-            df_contract = IO.read_csv(self.mode, {
-                'file_dir': self.config['file']['dir_results'] +
-                            self.config['file'][
-                                'dir_intermediate'],
-                'file_name': self.config['file']['Processed'][
-                    'contracts']['file_name']})
+            df_contract = IO.read_csv(
+                self.mode, self.input_config('contracts'))
 
             df_contract = df_contract.drop_duplicates(
                 subset=['SerialNumber_M2M']) \
@@ -843,8 +1062,9 @@ class LeadGeneration:
                          {'file_dir': self.config['file']['dir_results'] +
                                       self.config['file']['dir_validation'],
                           'file_name':
-                              self.config['file']['Processed']['output_iLead'][
-                                  'before_classify']
+                              self.partition_file_name(
+                                  self.config['file']['Processed'][
+                                      'output_iLead']['before_classify'])
                           }, df_leads_out)
 
             logger.app_debug(
@@ -882,8 +1102,9 @@ class LeadGeneration:
                                       self.config['file'][
                                           'dir_validation'],
                           'file_name':
-                              self.config['file']['Processed']['output_iLead'][
-                                  'after_classify']
+                              self.partition_file_name(
+                                  self.config['file']['Processed'][
+                                      'output_iLead']['after_classify'])
                           }, df_leads_out)
         except Exception as e:
             logger.app_fail(_step, f'{traceback.print_exc()}')
@@ -1198,6 +1419,8 @@ class LeadGeneration:
             1. EOSL: if a component reaches its End of Service Life
             2. Life: based on age of component if it has reached its design life
                 if Life of component > design life, then only lead will be raised.
+        Age, due date, due in years and due category are evaluated as of
+        self.as_of.
 
         :param df_leads_wn_class: BOM data mapped with lead opportunities
         :type df_leads_wn_class: pandas dataframe
@@ -1209,8 +1432,6 @@ class LeadGeneration:
         """
         _step = 'Lead classification'
         try:
-            df_leads = pd.DataFrame()
-
             # Merge generated leads and services data
             try:
                 _step = 'Merge lead and services data'
@@ -1222,50 +1443,9 @@ class LeadGeneration:
                 logger.app_fail(_step, f"{traceback.print_exc()}")
                 raise Exception from e
 
-            # Derive fields
-            df_leads_wn_class.loc[:, 'date_code'] = pd.to_datetime(
-                df_leads_wn_class['date_code'])
-            df_leads_wn_class.loc[:, 'today'] = pd.to_datetime(
-                pd.Timestamp.now())
-
-            df_leads_wn_class['age'] = (
-                    (df_leads_wn_class['today'] - df_leads_wn_class[
-                        'date_code'])
-                    / np.timedelta64(1, 'Y')).round().astype(int)
-
-            # EOSL Leads
-            df_leads_wn_class.EOSL = df_leads_wn_class.EOSL.fillna("")
-            flag_lead_eosl = df_leads_wn_class.EOSL != ''
-
-            if any(flag_lead_eosl):
-                df_leads_sub = df_leads_wn_class[flag_lead_eosl].copy()
-                df_leads_sub.loc[:, 'lead_type'] = 'EOSL'
-                df_leads = pd.concat([df_leads, df_leads_sub])
-                del df_leads_sub
-            del flag_lead_eosl
-
-            df_leads_wn_class = df_leads_wn_class[
-                df_leads_wn_class['EOSL'] == '']
-            # For DCPD leads due this year will be processed
-            df_leads_wn_class.Life__Years = pd.to_numeric(
-                df_leads_wn_class.Life__Years)
-            flag_lead_life = pd.notna(df_leads_wn_class.Life__Years)
-            if any(flag_lead_life):
-                df_leads_sub = df_leads_wn_class[flag_lead_life].copy()
-                df_leads_sub['Life__Years'] = df_leads_sub[
-                    'Life__Years'].replace('', pd.NA)
-                df_leads_sub['Life__Years'] = pd.to_numeric(
-                    df_leads_sub['Life__Years'],
-                    errors='coerce').fillna(0).astype(int)
-                df_leads_sub.loc[:, 'flag_include'] = (
-                        df_leads_sub['age'] > df_leads_sub['Life__Years'])
-
-                # if any(df_leads_sub.flag_include):
-                df_leads_sub.loc[:, 'lead_type'] = 'Life'
-                # df_leads_sub = df_leads_sub[df_leads_sub['flag_include']]
-                df_leads = pd.concat([df_leads, df_leads_sub])
-
-                del flag_lead_life
+            # Classify leads and derive age, due date and due category
+            _step = 'Lead classification'
+            df_leads = self.lead_rules.classify(df_leads_wn_class, self.as_of)
 
             logger.app_debug(f'{_step} : SUCCEEDED', 1)
 
@@ -1275,30 +1455,6 @@ class LeadGeneration:
 
         return df_leads
 
-    def calculate_component_due_date(self, row):
-        """
-        Define a custom function to calculate the 'Component_Due_Date'
-        """
-        if row['lead_type'] == 'EOSL':
-            eosl_year = int(row['EOSL'])
-            first_day_of_year = pd.to_datetime(f'01/01/{eosl_year}',
-                                               format='%m/%d/%Y')
-            return first_day_of_year.strftime('%m/%d/%Y')
-
-        component_date_code = pd.to_datetime(row['date_code'],
-                                             format='%m/%d/%Y')
-        component_life_years = pd.DateOffset(years=row['Life__Years'])
-        return (component_date_code + component_life_years).strftime(
-            '%m/%d/%Y')
-
-    def update_eosl(self, row):
-        """
-        Changes the format of EOSL column from year to date
-        """
-        if row['lead_type'] == 'EOSL':
-            return row['Component_Due_Date']
-        return row['EOSL']
-
     def add_data_mts(self, df_install_mts, merge_type):
         """
         Method to join made to stock data with standard bom data
@@ -1306,107 +1462,11 @@ class LeadGeneration:
         :param merge_type: merge type
         :return: Merged data
         """
-        # Read Standard BOM data and preprocess standard bom data
-        df_bom_data_default = IO.read_csv(
-            self.mode,
-            {'file_dir': self.config['file']['dir_data'],
-             'file_name': self.config['file']['Raw']['bomdata_deafault']['file_name']}
-        )
-        df_bom_sisc = IO.read_csv(
-            self.mode,
-            {'file_dir': self.config['file']['dir_data'],
-             'file_name': self.config['file']['Raw']['bomdata_sisc']['file_name']}
-        )
-        df_standard_bom = df_bom_sisc._append(
-            df_bom_data_default, ignore_index=True
-        )
-        df_standard_bom.rename(
-            columns={
-                "fparent": "PartNumber_TLN_Shipment",
-                "fcomponent": "PartNumber_BOM_BOM",
-                "fparentrev": "Revision",
-                "fqty": "Total_Quantity"
-            }, inplace=True
-        )
-        df_standard_bom["PartNumber_TLN_Shipment"] = df_standard_bom[
-            "PartNumber_TLN_Shipment"].str.lstrip().str.rstrip()
-        df_standard_bom["PartNumber_BOM_BOM"] = df_standard_bom[
-            "PartNumber_BOM_BOM"].str.lstrip().str.rstrip()
-        df_standard_bom = df_standard_bom[
-            ['PartNumber_TLN_Shipment', 'PartNumber_BOM_BOM', 'Revision', "Total_Quantity"]
-        ]
-
-        # Preprocess made to stock data
-        df_install_mts["PartNumber_TLN_Shipment"] = df_install_mts[
-            "PartNumber_TLN_Shipment"].astype(str).str.lstrip().str.rstrip()
-
-        # Merge made to stock data with standard bom data based on shipment
-        # number and revision
-        df_install_mts = df_install_mts.merge(
-            df_standard_bom,
-            on=['PartNumber_TLN_Shipment', 'Revision'],
-            how=merge_type
-        )
-
-        # Further divide the mts data based on if the join was successful i.e.
-        # obtained BOM number is null or not.
-        # For the batch data where join fails, it doesn't seem to have a proper
-        # revision, hence we merge it with the first revision available
-        df_install_mts_joined = df_install_mts.loc[
-            df_install_mts["PartNumber_BOM_BOM"].notna()
-        ]
-        df_install_mts_not_joined = df_install_mts.loc[
-            df_install_mts["PartNumber_BOM_BOM"].isna()
-        ]
-
-        # Preprocess standard bom data to select the first revision for every shipment
-        df_standard_bom[["PartNumber_TLN_Shipment", "Revision"]].fillna("", inplace=True)
-        df_standard_bom['key'] = (
-                df_standard_bom["PartNumber_TLN_Shipment"] + ":" +
-                df_standard_bom["Revision"]
-        )
-        df_standard_bom.drop_duplicates(["PartNumber_TLN_Shipment", "key"],
-                                        inplace=True)
-        df_standard_bom.sort_values(by=["key"])
-        df_standard_bom.drop_duplicates(["PartNumber_TLN_Shipment"],
-                                        keep='first', inplace=True)
-        df_standard_bom.drop(["key"], axis=1, inplace=True)
-
-        # Merge the not joined data with the first revision available
-        df_install_mts_not_joined.drop(
-            ["PartNumber_BOM_BOM", "Revision", "Total_Quantity"],
-            axis=1,
-            inplace=True
-        )
-        df_install_mts_not_joined = df_install_mts_not_joined.merge(
-            df_standard_bom,
-            on=['PartNumber_TLN_Shipment'],
-            how=merge_type
-        )
-
-        # Append joined data and unjoined data to get complete made to stock data
-        df_install_mts = df_install_mts_joined._append(
-            df_install_mts_not_joined, ignore_index=True
-        )
+        # Resolve units to standard BOM lines (lookup is built once)
+        df_install_mts = self.standard_bom.resolve(df_install_mts, merge_type)
 
         return df_install_mts
 
-    def categorize_due_in_category(self, component_due_in_years):
-        """
-        Method categorises component due date
-        :param component_due_in_years: Due date in years
-        :return: Due category
-        """
-        if component_due_in_years < 0:
-            return "Past Due"
-        if 0 <= component_due_in_years <= 1:
-            return "Due this year"
-        if 1 < component_due_in_years <= 3:
-            return "Due in 2-3 years"
-        if 3 < component_due_in_years < 100:
-            return "Due after 3 years"
-        return "Unknown"  # Or any other default category you want to assign
-
     def add_raise_lead_on(self, ref_install):
         """
         Method to calculate the date to raise the lead on
@@ -1446,6 +1506,27 @@ class LeadGeneration:
 
         return ref_install
 
+
+def partition_leads(mode, as_of, config, partition, df_install, df_bom,
+                    ref_lead_opp):  # pragma: no cover
+    """
+    Leads of a partition of install base data, run in a worker process of
+    LeadGeneration.pipeline_partitioned_leads. Lead generation of the
+    worker is built from config so that only the partition, BOM of its jobs
+    and reference leads are sent to the worker.
+    @param mode: IO mode i.e. 'local' or 'azure-adls'.
+    @param as_of: date on which leads are evaluated.
+    @param config: project configuration.
+    @param partition: name of partition.
+    @param df_install: processed install base data of partition.
+    @param df_bom: BOM data of jobs of partition (see read_bom).
+    @param ref_lead_opp: reference lead opportunities (see read_ref_lead_opp).
+    @return: pd.Dataframe
+    """
+    obj_lead = LeadGeneration(mode=mode, as_of=as_of, config=config)
+    return obj_lead.pipeline_leads(df_install, partition, df_bom, ref_lead_opp)
+
+
 #%%
 if __name__ == "__main__":
     obj = LeadGeneration()
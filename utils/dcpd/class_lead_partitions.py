@@ -0,0 +1,94 @@
+"""@file class_lead_partitions.py
+
+@brief: Partitions of install base data processed by lead generation.
+
+
+@details
+Install base data is split on product family (lead_generation.partition in
+config) so that partitions are processed independently; outputs of a
+partition are written to files suffixed with the name of the partition.
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+# %% Setup Environment
+
+import os
+
+import numpy as np
+
+
+# %% Lead Partitions
+
+class LeadPartitions:
+    """Partitions of install base data and their file names."""
+
+    @staticmethod
+    def partition_key(df_data, col_partition):
+        """
+        Name of partition for each row i.e. lower case value of partition
+        column suitable for file names; 'unknown' if value is missing.
+        @param df_data: data to be partitioned.
+        @param col_partition: partition column e.g. product_prodclass.
+        @return: np.array
+        """
+        ar_key = df_data[col_partition].fillna('').astype(str) \
+            .str.strip().str.lower() \
+            .str.replace(r'[^0-9a-z]+', '_', regex=True).str.strip('_')
+        return np.where(ar_key == '', 'unknown', ar_key)
+
+    def split_partitions(self, df_data, col_partition):
+        """
+        Split data on partition column.
+        @param df_data: data to be partitioned.
+        @param col_partition: partition column e.g. product_prodclass.
+        @return: dictionary of partition name and data sorted by name.
+        """
+        ar_key = self.partition_key(df_data, col_partition)
+        return {
+            partition: df_data.loc[ar_key == partition].reset_index(drop=True)
+            for partition in sorted(set(ar_key))}
+
+    @staticmethod
+    def split_bom(df_bom, dict_install):
+        """
+        BOM of jobs of each partition of install base data. Units are
+        matched to BOM on job i.e. Job_Index up to first "-"; units without
+        job (made to stock) are resolved to standard BOM and need no rows.
+        @param df_bom: formatted BOM data.
+        @param dict_install: dictionary of partition name and data.
+        @return: dictionary of partition name and BOM data.
+        """
+        dict_bom = {}
+        for partition, df_install in dict_install.items():
+            ar_job = df_install['Job_Index'].dropna().str.split('-').str[0]
+            dict_bom[partition] = df_bom.loc[
+                df_bom['Job_Index'].isin(ar_job.unique())]
+        return dict_bom
+
+    @staticmethod
+    def suffix_file_name(file_name, suffix):
+        """
+        Suffix file name e.g. output_iLead.csv is output_iLead_pdu.csv for
+        suffix pdu.
+        @param file_name: file name.
+        @param suffix: suffix.
+        @return: str
+        """
+        root, ext = os.path.splitext(file_name)
+        return f"{root}_{suffix}{ext}"
+
+    def partition_file_name(self, file_name, partition=None):
+        """
+        Suffix file name with partition e.g. output_iLead.csv is
+        output_iLead_pdu.csv for partition pdu.
+        @param file_name: file name.
+        @param partition: name of partition, None for data not partitioned.
+        @return: str
+        """
+        if partition is None:
+            return file_name
+        return self.suffix_file_name(file_name, partition)
@@ -0,0 +1,309 @@
+"""@file class_lead_rules.py
+
+@brief: Rules for columns derived while post processing leads.
+
+
+@details
+Derived columns of lead generation (standard offering, end customer
+details, chasis key) are described as declarative rules and evaluated
+column wise using utils.Rules. Lead type, component due date, EOSL and due
+category are derived by the columnar kernel LeadRules.classify. Both
+produce same output as the earlier row wise (DataFrame.apply) logic.
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+# %% Setup Environment
+
+import numpy as np
+import pandas as pd
+
+from utils.rules import Rules
+
+obj_rules = Rules()
+
+
+# %% Lead Rules
+
+class LeadRules:
+    """Rules for derived columns of leads."""
+
+    def __init__(self):
+        self.ls_pdu = ['PDU', 'PDU - PRIMARY', 'PDU - SECONDARY']
+
+        self.dict_end_customer = {
+            "End_Customer_Address": ['StartupAddress', 'ShipTo_Street'],
+            "End_Customer_City": ['StartupCity', 'ShipTo_City'],
+            "End_Customer_State": ['StartupState', 'ShipTo_State'],
+            "End_Customer_Zip": ['StartupPostalCode', 'ShipTo_Zip']
+        }
+
+    # ***** Rules *****
+
+    def rules_standard_offering(self):
+        """
+        Rules to identify if lead is a standard offering.
+
+        :return: Rules for column is_standard_offering.
+        :rtype: dictionary
+
+        """
+        def is_product(df_leads, ls_product):
+            return df_leads.Product_M2M_Org.str.upper().isin(ls_product)
+
+        return {'is_standard_offering': {
+            'rules': [
+                # PDU + ( M4 display  + 8212)
+                {'condition': lambda df: (
+                    is_product(df, self.ls_pdu)
+                    & df.Component.isin(['M4 Display', '8212 Display'])
+                    & df.is_valid_logic_tray_lead
+                    & df.is_valid_door_assembly_lead
+                    & df.is_valid_input_breaker_panel_lead),
+                 'value': True},
+                # PDU + ( 'Monochrome Display', 'Color Display')
+                {'condition': lambda df: (
+                    is_product(df, self.ls_pdu)
+                    & df.Component.isin(['Monochrome Display', 'Color Display'])
+                    & df.is_valid_door_assembly_lead
+                    & df.is_valid_input_breaker_panel_lead),
+                 'value': True},
+                # RPP + ( M4 display  + 8212)
+                {'condition': lambda df: (
+                    is_product(df, ['RPP'])
+                    & df.Component.isin(['Monochrome Display', 'Color Display',
+                                         'M4 Display', '8212 Display'])
+                    & df.is_valid_chasis_lead
+                    & (pd.to_datetime(df.ShipmentDate)
+                       >= pd.to_datetime("2008-01-01"))),
+                 'value': True},
+                # All other components: are valid
+                {'condition': lambda df: df.Component.isin(
+                    ['BCMS', 'PCB', 'SPD', 'Fan', 'PDU', 'RPP', 'STS']),
+                 'value': True}],
+            # All other displays: Invalid
+            'default': False}}
+
+    def rules_end_customer(self):
+        """
+        Rules for end customer details; startup details are used for units
+        which were started up else ship to details.
+
+        :return: Rules for End_Customer_* columns.
+        :rtype: dictionary
+
+        """
+        dict_rules = {}
+        for col, (col_startup, col_shipto) in self.dict_end_customer.items():
+            dict_rules[col] = {
+                'rules': [
+                    {'condition': lambda df: Rules.is_true(df['was_startedup']),
+                     'value': Rules.col(col_startup)}],
+                'default': Rules.col(col_shipto)}
+        return dict_rules
+
+    # ***** Values *****
+
+    def key_chasis(self, ar_pn_chasis):
+        """
+        Chasis part number from list of chasis part numbers e.g.
+        "CHS123 (2), CHS456 (1)" gives "CHS123".
+
+        :param ar_pn_chasis: Chasis part numbers.
+        :type ar_pn_chasis: pandas Series.
+        :return: First chasis part number.
+        :rtype: pandas Series.
+
+        """
+        ar_pn_chasis = ar_pn_chasis.fillna("(")
+        ar_key = ar_pn_chasis.str.split(r", | \(", n=1, regex=True).str[0]
+        return ar_key.where(~ar_pn_chasis.str.startswith("("), "")
+
+    def resolve_component(self, ar_component, ls_component):
+        """
+        Services component of each lead component i.e. first services
+        component contained in the lead component (case insensitive); lead
+        component is retained if none is contained. Components are resolved
+        once per distinct value and broadcast to rows.
+
+        :param ar_component: Component of leads.
+        :type ar_component: pandas Series.
+        :param ls_component: Components of services data (lower case).
+        :type ls_component: list
+        :return: Resolved component of each lead.
+        :rtype: pandas Series.
+
+        """
+        ar_component = ar_component.astype('category')
+        ls_resolved = [
+            next((val for val in ls_component if val in component.lower()),
+                 component)
+            for component in ar_component.cat.categories]
+
+        ar_resolved = np.asarray(ls_resolved + [np.nan], dtype=object)
+        return pd.Series(ar_resolved[ar_component.cat.codes.to_numpy()],
+                         index=ar_component.index)
+
+    # ***** Classification *****
+
+    def classify(self, df_leads, as_of):
+        """
+        Classify leads and derive age, due date, due in years and due
+        category in one pass over datetime64 / numeric arrays.
+            - EOSL: component has End of Service Life (EOSL is not blank)
+            - Life: component has design life (Life__Years is available)
+        Leads which are neither are dropped; EOSL leads are followed by
+        Life leads. Due date of EOSL leads also replaces EOSL; EOSL of Life
+        leads is blank.
+
+        :param df_leads: Leads with date_code, EOSL and Life__Years.
+        :type df_leads: pandas DataFrame.
+        :param as_of: Date on which age and due in years are evaluated.
+        :type as_of: pandas Timestamp.
+        :return: Classified leads.
+        :rtype: pandas DataFrame.
+
+        """
+        ar_eosl = df_leads['EOSL'].fillna('')
+        f_eosl = (ar_eosl != '').to_numpy()
+        ar_life = pd.to_numeric(df_leads['Life__Years'].where(~f_eosl))
+        f_life = ~f_eosl & pd.notna(ar_life).to_numpy()
+
+        # Single take: EOSL leads followed by Life leads
+        ix_eosl = np.flatnonzero(f_eosl)
+        ix_life = np.flatnonzero(f_life)
+        df_out = df_leads.iloc[np.concatenate([ix_eosl, ix_life])].copy()
+        f_eosl = np.arange(df_out.shape[0]) < ix_eosl.shape[0]
+
+        ar_lead_type = np.where(f_eosl, 'EOSL', 'Life')
+        ar_date_code = pd.to_datetime(
+            df_out['date_code']).to_numpy(dtype='datetime64[D]')
+        as_of = np.datetime64(pd.Timestamp(as_of).date(), 'D')
+
+        # Age (years)
+        ar_age = self.years_between(ar_date_code, as_of)
+
+        # Life: integer life years; lead is included if age exceeds life
+        ar_life = ar_life.iloc[ix_life].fillna(0).astype(int).to_numpy()
+        ar_life_out = df_out['Life__Years'].to_numpy(dtype=object).copy()
+        ar_life_out[~f_eosl] = ar_life
+        ar_include = np.full(df_out.shape[0], np.nan, dtype=object)
+        ar_include[~f_eosl] = ar_age[~f_eosl] > ar_life
+
+        # Due date: 1st Jan of EOSL year / date code + life
+        ar_due = np.full(df_out.shape[0], np.datetime64('NaT'),
+                         dtype='datetime64[D]')
+        ar_eosl_year = pd.to_numeric(
+            ar_eosl.iloc[ix_eosl]).astype(int).to_numpy()
+        ar_due[f_eosl] = (ar_eosl_year - 1970).astype(
+            'datetime64[Y]').astype('datetime64[D]')
+        ar_due[~f_eosl] = self.add_years(ar_date_code[~f_eosl], ar_life)
+
+        ar_due_in = (ar_due.astype('datetime64[Y]').astype(float)
+                     - (as_of.astype('datetime64[Y]').astype(float)))
+        ar_due_in[np.isnat(ar_due)] = np.nan
+
+        df_out['lead_type'] = ar_lead_type
+        df_out['age'] = pd.array(
+            np.where(np.isnat(ar_date_code), np.nan, ar_age), dtype='Int64')
+        df_out['Life__Years'] = pd.Series(
+            ar_life_out, index=df_out.index).infer_objects()
+        df_out['flag_include'] = ar_include
+        # Dates are formatted once per distinct date
+        ar_due_unique, ar_inverse = np.unique(ar_due, return_inverse=True)
+        ar_due_text = pd.DatetimeIndex(ar_due_unique).strftime(
+            '%m/%d/%Y').to_numpy(dtype=object)
+        df_out['Component_Due_Date'] = ar_due_text[ar_inverse.ravel()]
+        # EOSL is blank for Life leads as in row wise logic
+        df_out['EOSL'] = np.where(
+            f_eosl, df_out['Component_Due_Date'], '').astype(object)
+        df_out['Component_Due_in (years)'] = pd.array(ar_due_in, dtype='Int64')
+        df_out['Component_Due_in (Category)'] = self.due_category(ar_due_in)
+
+        return df_out
+
+    @staticmethod
+    def years_between(ar_date, as_of):
+        """
+        Years (rounded) from dates till as of date; a year is 365.2425 days.
+
+        :param ar_date: Dates.
+        :type ar_date: numpy datetime64[D] array.
+        :param as_of: As of date.
+        :type as_of: numpy datetime64[D].
+        :return: Years, NaN for missing dates.
+        :rtype: numpy array.
+
+        """
+        ar_days = (as_of - ar_date).astype(float)
+        ar_days[np.isnat(ar_date)] = np.nan
+        return np.round(ar_days / 365.2425)
+
+    @staticmethod
+    def add_years(ar_date, ar_years):
+        """
+        Add years to dates; as pandas DateOffset(years=n), 29th Feb moves to
+        28th Feb in non leap years.
+
+        :param ar_date: Dates.
+        :type ar_date: numpy datetime64[D] array.
+        :param ar_years: Years to be added.
+        :type ar_years: numpy int array.
+        :return: Dates.
+        :rtype: numpy datetime64[D] array.
+
+        """
+        ar_year = ar_date.astype('datetime64[Y]')
+        ar_month = ar_date.astype('datetime64[M]')
+        ar_day = (ar_date - ar_month.astype('datetime64[D]')).astype(int)
+
+        ar_month_new = (ar_year + ar_years.astype('timedelta64[Y]')).astype(
+            'datetime64[M]') + (ar_month - ar_year.astype('datetime64[M]'))
+        ar_month_len = ((ar_month_new + 1).astype('datetime64[D]')
+                        - ar_month_new.astype('datetime64[D]')).astype(int)
+
+        return ar_month_new.astype('datetime64[D]') + np.minimum(
+            ar_day, ar_month_len - 1).astype('timedelta64[D]')
+
+    @staticmethod
+    def due_category(ar_due_in):
+        """
+        Categorise component due in years.
+
+        :param ar_due_in: Due in years.
+        :type ar_due_in: numpy array.
+        :return: Category.
+        :rtype: numpy array.
+
+        """
+        with np.errstate(invalid='ignore'):
+            return np.select(
+                [ar_due_in < 0,
+                 (0 <= ar_due_in) & (ar_due_in <= 1),
+                 (1 < ar_due_in) & (ar_due_in <= 3),
+                 (3 < ar_due_in) & (ar_due_in < 100)],
+                ["Past Due", "Due this year", "Due in 2-3 years",
+                 "Due after 3 years"],
+                default="Unknown").astype(object)
+
+    # ***** Apply *****
+
+    def apply(self, df_data, dict_rules):
+        """
+        Derive columns described by rules.
+
+        :param df_data: Input data.
+        :type df_data: pandas DataFrame.
+        :param dict_rules: Rules for derived columns.
+        :type dict_rules: dictionary
+        :return: Data with derived columns.
+        :rtype: pandas DataFrame.
+
+        """
+        return obj_rules.apply(df_data, dict_rules)
+
+
+# %%
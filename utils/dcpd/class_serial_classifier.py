@@ -0,0 +1,282 @@
+"""@file class_serial_classifier.py
+
+
+
+@brief Classify serial numbers: product, validity and mobile number.
+
+
+@details
+Serial numbers from contracts, services and install base are classified in
+one pass over distinct serial numbers:
+- Product: prefix trie over SerialNumberPattern of ref_decode_serialnumber;
+  when patterns of multiple products match, product listed later in the
+  reference has priority. STS / RPP identified by pattern within the serial
+  number override the prefix match.
+- Validity: serial number should not contain / end with invalid keywords.
+- Mobile number: serial number matching mobile number pattern.
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# %% ***** Setup Environment *****
+
+import re
+import traceback
+import numpy as np
+import pandas as pd
+
+from utils import AppLogger
+
+loggerObj = AppLogger(__name__)
+
+
+# %%
+
+class SerialClassifier:
+    """
+    Compiled classifier of serial numbers.
+
+    """
+
+    # Should not contain
+    ls_invalid_content = [
+        "fwt", "exp", "crat",
+        "seis",  # Updated 03/07/2023
+        "bcb", "bcms", "box", "cab", "com",
+        "cratin", "ext", "floor", "freig", "inst", "jbox", "label", "line",
+        "loadbk", "repo", "serv", "skirts", "spare", "su", "super", "test",
+        "time", "trai", "trans", "tst", "warran", "nan",
+        # Added section for Should not end in
+        "bus", "combos", "ds", "ef", "ew", "fl", "flsk", "fs", "fsk", "jb",
+        "lg", "lll", "misc", "nin", "pm", "rpp", "sk", "skirt", "skt", "spg",
+        "supk", "tap", "tm", "tspk",
+    ]
+
+    # Should not end in
+    ls_invalid_end = [
+        "bus", "combos", "ds", "ef", "ew", "fl", "flsk", "fs", "fsk", "jb",
+        "lg", "lll", "misc", "nin", "pm", "rpp", "sk", "skirt", "skt", "spg",
+        "supk", "tap", "tm", "tspk",
+    ]
+
+    # Product identified by pattern within serial number; applied in order
+    dict_pat_product = {'526?-3421': 'STS', '26??-0820': 'RPP'}
+
+    # Trie key: node * N_CHAR + code point of character
+    N_CHAR = 0x110000
+
+    def __init__(self, ref_prod_fr_srnum=None, pat_mob=None):
+        """
+        Compile classifier.
+
+        :param ref_prod_fr_srnum: Reference with columns Product,
+        SerialNumberPattern (lower case) and flag_keep, defaults to None
+        :type ref_prod_fr_srnum: Pandas Data Frame, optional
+        :param pat_mob: Pattern of mobile number, defaults to None
+        :type pat_mob: String, optional
+
+        """
+        self.re_invalid_content = re.compile(
+            "(?:" + "|".join(self.ls_invalid_content) + ")")
+        self.re_invalid_end = re.compile(
+            "(?:" + "$|".join(self.ls_invalid_end) + "$)")
+        self.re_mob = re.compile(pat_mob) if pat_mob else None
+
+        self.ar_product = np.array([], dtype=object)
+        self.trie = None
+        if ref_prod_fr_srnum is not None:
+            self.compile_trie(ref_prod_fr_srnum)
+
+    # ***** Product *****
+
+    def compile_trie(self, ref_prod_fr_srnum):
+        """
+        Compile prefix trie of serial number patterns. Trie is stored as
+        sorted transition keys (node, character) with child node and the
+        priority of product for patterns ending at each node.
+
+        :param ref_prod_fr_srnum: Reference with columns Product,
+        SerialNumberPattern (lower case) and flag_keep.
+        :type ref_prod_fr_srnum: Pandas Data Frame
+        :raises Exception: Throws exception if reference is not valid.
+
+        """
+
+        current_step = "Compile serial number classifier"
+
+        try:
+            ref_prod = ref_prod_fr_srnum[ref_prod_fr_srnum.flag_keep]
+            self.ar_product = np.array(ref_prod.Product.unique(), dtype=object)
+            dict_priority = {prod: ix for ix, prod in enumerate(self.ar_product)}
+
+            dict_child = {}
+            ls_priority = [-1]
+            for prod, pattern in zip(ref_prod.Product,
+                                     ref_prod.SerialNumberPattern):
+                node = 0
+                for char in str(pattern):
+                    key = (node, char)
+                    if key not in dict_child:
+                        dict_child[key] = len(ls_priority)
+                        ls_priority.append(-1)
+                    node = dict_child[key]
+                ls_priority[node] = max(ls_priority[node], dict_priority[prod])
+
+            ar_keys = np.array(
+                [node * self.N_CHAR + ord(char) for node, char in dict_child],
+                dtype=np.int64)
+            ar_child = np.array(list(dict_child.values()), dtype=np.int64)
+            ar_order = np.argsort(ar_keys)
+
+            self.trie = {
+                "keys": ar_keys[ar_order],
+                "child": ar_child[ar_order],
+                "priority": np.array(ls_priority, dtype=np.int64),
+                "depth": max([len(str(pattern)) for pattern
+                              in ref_prod.SerialNumberPattern] + [0]),
+            }
+            loggerObj.app_debug(
+                f"{current_step}: {len(ls_priority)} nodes")
+
+        except Exception as e:
+            loggerObj.app_fail(current_step, f"{traceback.print_exc()}")
+            raise Exception from e
+
+    def product_prefix(self, ar_text):
+        """
+        Product of serial numbers from prefix trie.
+
+        :param ar_text: Distinct serial numbers.
+        :type ar_text: numpy array of String
+        :return: Product; "" if no pattern matches.
+        :rtype: numpy array
+
+        """
+        depth = self.trie["depth"]
+        ar_priority = np.full(
+            len(ar_text), self.trie["priority"][0], dtype=np.int64)
+
+        if (depth > 0) and (len(ar_text) > 0):
+            # Code points of first characters; 0 beyond end of text
+            ar_code = np.asarray(ar_text, dtype=f"U{depth}").view(
+                np.int32).reshape(len(ar_text), depth).astype(np.int64)
+
+            ar_keys = self.trie["keys"]
+            ar_node = np.zeros(len(ar_text), dtype=np.int64)
+            f_alive = np.ones(len(ar_text), dtype=bool)
+            for ix in range(depth):
+                ar_key = ar_node * self.N_CHAR + ar_code[:, ix]
+                ar_pos = np.minimum(
+                    np.searchsorted(ar_keys, ar_key), len(ar_keys) - 1)
+                f_alive &= (ar_code[:, ix] > 0) & (ar_keys[ar_pos] == ar_key)
+                if not f_alive.any():
+                    break
+                ar_node = np.where(f_alive, self.trie["child"][ar_pos], 0)
+                ar_priority = np.where(
+                    f_alive,
+                    np.maximum(ar_priority, self.trie["priority"][ar_node]),
+                    ar_priority)
+
+        ar_out = np.full(len(ar_text), "", dtype=object)
+        f_match = ar_priority >= 0
+        ar_out[f_match] = self.ar_product[ar_priority[f_match]]
+        return ar_out
+
+    def product(self, ar_text):
+        """
+        Product of serial numbers.
+
+        :param ar_text: Distinct serial numbers.
+        :type ar_text: Pandas Series
+        :return: Product; "" if product is not identified.
+        :rtype: numpy array
+
+        """
+        ar_out = self.product_prefix(ar_text.to_numpy(dtype=str))
+        for pat, prod in self.dict_pat_product.items():
+            ar_out[ar_text.str.contains(pat, regex=True).to_numpy()] = prod
+        return ar_out
+
+    # ***** Validity *****
+
+    def validity(self, ar_serialnum):
+        """
+        Validate serial numbers; serial number should not contain / end with
+        invalid keywords.
+
+        :param ar_serialnum: Serial numbers.
+        :type ar_serialnum: Pandas Series
+        :return: f_valid_content, f_valid_end and f_valid.
+        :rtype: Pandas Data Frame
+
+        """
+        ar_text = pd.Series(ar_serialnum).astype(str)
+
+        df_out = pd.DataFrame(index=ar_text.index)
+        df_out["f_valid_content"] = ~ar_text.str.contains(
+            self.re_invalid_content)
+        df_out["f_valid_end"] = ~ar_text.str.contains(self.re_invalid_end)
+        df_out["f_valid"] = df_out["f_valid_end"] & df_out["f_valid_content"]
+        return df_out
+
+    def is_mobile(self, ar_serialnum):
+        """
+        Flag serial numbers matching mobile number pattern.
+
+        :param ar_serialnum: Serial numbers.
+        :type ar_serialnum: Pandas Series
+        :return: Flag for mobile number.
+        :rtype: Pandas Series
+
+        """
+        ar_text = pd.Series(ar_serialnum).astype(str)
+        if self.re_mob is None:
+            return pd.Series(False, index=ar_text.index)
+        return ar_text.str.contains(self.re_mob)
+
+    # ***** Classify *****
+
+    def classify(self, ar_serialnumber, strip_chars=None):
+        """
+        Classify serial numbers in one pass over distinct serial numbers.
+
+        :param ar_serialnumber: Serial numbers.
+        :type ar_serialnumber: Pandas Series / list
+        :param strip_chars: Characters stripped from serial number before
+        validity and mobile number checks, defaults to None
+        :type strip_chars: String, optional
+        :return: SerialNumber (stripped), Product, f_valid_content,
+        f_valid_end, f_valid and flag_mob; index as of input.
+        :rtype: Pandas Data Frame
+
+        """
+        df_data = pd.DataFrame(data={'SerialNumber': ar_serialnumber})
+
+        ar_codes, ar_uniques = pd.factorize(
+            df_data['SerialNumber'], use_na_sentinel=False)
+        ar_uniques = pd.Series(ar_uniques, dtype=object)
+        f_text = ar_uniques.map(type).eq(str).to_numpy()
+
+        ar_product = np.full(len(ar_uniques), "", dtype=object)
+        if self.trie is not None:
+            ar_product[f_text] = self.product(ar_uniques[f_text])
+
+        ar_text = ar_uniques.astype(str)
+        if strip_chars is not None:
+            ar_text = ar_text.str.strip(strip_chars)
+
+        df_unique = self.validity(ar_text)
+        df_unique.insert(0, "SerialNumber", ar_uniques.where(
+            ~f_text, ar_text) if strip_chars is not None else ar_uniques)
+        df_unique.insert(1, "Product", ar_product)
+        df_unique["flag_mob"] = self.is_mobile(ar_text)
+
+        df_out = df_unique.take(ar_codes)
+        df_out.index = df_data.index
+        return df_out
+
+
+# %%
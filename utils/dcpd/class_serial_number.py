@@ -26,10 +26,13 @@ direct written permission from Eaton Corporation.
 
 import re
 import traceback
+import numpy as np
 import pandas as pd
 import sys
 from decimal import Decimal #to deal with Decimal values (determined from the value of dictionary dict_mapping)
 from utils import AppLogger
+from utils import IO
+from utils.dcpd.class_serial_classifier import SerialClassifier
 
 loggerObj = AppLogger(__name__)
 
@@ -45,24 +48,61 @@ class SerialNumber:
 
     """
 
-    def __init__(self, f_reset=False):
+    ls_cols_cache = [
+        "SerialNumberRaw",
+        "InstallSize",
+        "DataType",
+        "SerialNumberOrg",
+        "SerialNumber",
+        "MappingKey",
+        "MappingValue",
+        "Version",
+    ]
+
+    def __init__(self, f_reset=False, mode="local", config=None):
         """
         Function to initialize the csv file to read.
 
-        :param f_reset: optional boolean value
+        :param f_reset: Ignore previously persisted expansions and rebuild
+        the cache from scratch, defaults to False.
         :type f_reset: Boolean datatype.
+        :param mode: IO mode used to read / write the cache, defaults to
+        'local'.
+        :type mode: String.
+        :param config: Project configuration. Cache is enabled only when
+        config is provided and config['serial_number']['cache']['enable'] is
+        true.
+        :type config: Dictionary, optional
         :ref_data: Reads serial number csv file from data source
         :type ref_data: Default value is False.
         :raises Exception: None
 
         """
 
-        ref_data = pd.DataFrame(columns=["SerialNumberOrg", "SerialNumber"])
+        ref_data = pd.DataFrame(columns=self.ls_cols_cache)
 
         self.ref_data = ref_data.copy()
 
         self.dict_mapping = {}
 
+        self.classifier = SerialClassifier()
+
+        # Persisted cache of expanded serial numbers (see init_cache)
+        self.f_reset = f_reset
+        self.f_cache = False
+        self.f_cache_updated = False
+        # Cache file is rewritten instead of appended to (reset or stale
+        # entries dropped on read)
+        self.f_cache_rewrite = False
+        # Entries added in current run, not persisted yet
+        self.ref_data_new = ref_data.copy()
+        self.cache_version = ""
+        self.cache_config = {}
+        self.mode = mode
+
+        if config is not None:
+            self.init_cache(mode, config)
+
     def check_var_size(self, local_vars, log):
         df_size = pd.DataFrame(columns=['Var', 'Size'])
         i = 0
@@ -77,6 +117,131 @@ class SerialNumber:
         del df_size
         #return "success"
 
+    def init_cache(self, mode, config):
+        """
+        Configure the persisted cache of expanded serial numbers. Serial
+        numbers expanded in earlier runs are read from the cache and only
+        new serial numbers are expanded by unknown_range.
+        Cache entries are tagged with the version provided in config. A
+        change in the version (i.e. change in expansion rules) invalidates
+        all the earlier entries.
+
+        :param mode: IO mode i.e. 'local' or 'azure-adls'.
+        :type mode: String.
+        :param config: Project configuration.
+        :type config: Dictionary.
+        :raises Exception: Throws exception if cache settings are not
+        available in the config.
+
+        """
+
+        current_step = "Initialize serial number cache"
+
+        try:
+            dict_cache = config.get("serial_number", {}).get("cache", {})
+
+            self.mode = mode
+            self.f_cache = bool(dict_cache.get("enable", False))
+            self.cache_version = str(dict_cache.get("version", ""))
+
+            if self.f_cache:
+                self.cache_config = {
+                    "file_dir": config["file"]["dir_results"]
+                    + config["file"]["dir_intermediate"],
+                    "file_name": config["file"]["Processed"][
+                        "serial_number_cache"]["file_name"],
+                    "adls_config": config["file"]["Processed"]["adls_credentials"],
+                    "adls_dir": config["file"]["Processed"]["serial_number_cache"],
+                    # Serial numbers are text e.g. leading zeros of '0101'
+                    "dtype": str,
+                    "keep_default_na": False,
+                }
+
+                if self.f_reset:
+                    self.f_cache_rewrite = True
+                else:
+                    self.ref_data = self.read_ref_data()
+
+            loggerObj.app_debug(current_step)
+
+        except Exception as e:
+            loggerObj.app_fail(current_step, f"{traceback.print_exc()}")
+            raise Exception from e
+
+    def read_ref_data(self):
+        """
+        Read serial numbers expanded in earlier runs. Cache is read as text
+        (missing values are blank). Entries created with a different cache
+        version are dropped; cache file is then rewritten on next export.
+
+        :return ref_data: Cached expansions.
+        :rtype: Pandas Data Frame
+
+        """
+
+        current_step = "Read serial number cache"
+
+        try:
+            ref_data = IO.read_csv(self.mode, self.cache_config)
+            ref_data = ref_data.loc[:, self.ls_cols_cache]
+        except Exception:
+            # Cache is not available for the very first run
+            loggerObj.app_info(f"{current_step}: cache not available")
+            return pd.DataFrame(columns=self.ls_cols_cache)
+
+        n_entries = ref_data.shape[0]
+        ref_data = ref_data[
+            (ref_data["Version"] == self.cache_version)
+            & (ref_data["SerialNumberRaw"] != "")
+            & (ref_data["SerialNumber"] != "")]
+        self.f_cache_rewrite = ref_data.shape[0] < n_entries
+
+        ref_data["InstallSize"] = pd.to_numeric(
+            ref_data["InstallSize"], errors="coerce")
+        ref_data["MappingValue"] = pd.to_numeric(
+            ref_data["MappingValue"], errors="coerce")
+
+        loggerObj.app_info(f"{current_step}: {ref_data.shape[0]} entries")
+        return ref_data.reset_index(drop=True)
+
+    def export_ref_data(self):
+        """
+        Persist the cache of expanded serial numbers when new serial numbers
+        were expanded in the current run. New entries are appended to the
+        cache file; file is rewritten only if it has stale entries or the
+        cache is reset.
+
+        :return: Status of export.
+        :rtype: String
+
+        """
+
+        current_step = "Export serial number cache"
+
+        if not (self.f_cache and self.f_cache_updated):
+            return "unchanged"
+
+        try:
+            if self.f_cache_rewrite:
+                status = IO.write_csv(
+                    self.mode, self.cache_config, self.ref_data)
+            else:
+                status = IO.append_csv(
+                    self.mode, self.cache_config, self.ref_data_new)
+            # Writes to ADLS return the error instead of raising
+            if isinstance(status, Exception):
+                raise status
+            self.f_cache_updated = False
+            self.f_cache_rewrite = False
+            self.ref_data_new = self.ref_data_new.iloc[0:0]
+            loggerObj.app_success(current_step)
+        except Exception:
+            # Failing to persist cache must not fail the pipeline
+            loggerObj.app_fail(current_step, f"{traceback.print_exc()}")
+            status = "unsuccessful !"
+
+        return status
+
     def validate_srnum(self, ar_serialnum):
         """
         Perform validation of the serial numbers.
@@ -98,106 +263,8 @@ class SerialNumber:
         try:
             df_data = pd.DataFrame(data={"SerialNumber": ar_serialnum})
 
-            # Should not contain
-            pat_invalid_self = [
-                "fwt",
-                "exp",
-                "crat",
-                "seis",  # Updated 03/07/2023
-                "bcb",
-                "bcms",
-                "box",
-                "cab",
-                "com",
-                "cratin",
-                "ext",
-                "floor",
-                "freig",
-                "inst",
-                "jbox",
-                "label",
-                "line",
-                "loadbk",
-                "repo",
-                "serv",
-                "skirts",
-                "spare",
-                "su",
-                "super",
-                "test",
-                "time",
-                "trai",
-                "trans",
-                "tst",
-                "warran",
-                "nan",
-                # Added section for Should not end in
-                "bus",
-                "combos",
-                "ds",
-                "ef",
-                "ew",
-                "fl",
-                "flsk",
-                "fs",
-                "fsk",
-                "jb",
-                "lg",
-                "lll",
-                "misc",
-                "nin",
-                "pm",
-                "rpp",
-                "sk",
-                "skirt",
-                "skt",
-                "spg",
-                "supk",
-                "tap",
-                "tm",
-                "tspk",
-            ]
-
-            pat_invalid_self = "(" + "|".join(pat_invalid_self) + ")"
-            df_data.loc[:, "f_valid_content"] = df_data["SerialNumber"].apply(
-                lambda x: re.search(pat_invalid_self, str(x)) == None
-            )
-            del pat_invalid_self
-
-            # Should not end in
-            pat_invalid_self = [
-                "bus",
-                "combos",
-                "ds",
-                "ef",
-                "ew",
-                "fl",
-                "flsk",
-                "fs",
-                "fsk",
-                "jb",
-                "lg",
-                "lll",
-                "misc",
-                "nin",
-                "pm",
-                "rpp",
-                "sk",
-                "skirt",
-                "skt",
-                "spg",
-                "supk",
-                "tap",
-                "tm",
-                "tspk",
-            ]
-            pat_invalid_self = "(" + "$|".join(pat_invalid_self) + "$)"
-
-            df_data.loc[:, "f_valid_end"] = df_data["SerialNumber"].apply(
-                lambda x: re.search(pat_invalid_self, str(x)) == None
-            )
-
-            df_data["f_valid"] = df_data["f_valid_end"] & df_data["f_valid_content"]
+            # Should not contain / end in invalid keywords
+            df_data = self.classifier.classify(df_data["SerialNumber"])
 
             loggerObj.app_debug(current_step)
 
@@ -290,7 +357,11 @@ class SerialNumber:
             df_org["known_sr_num"] = False
             loggerObj.app_info(f"The content of df_org after adding new column known_sr_num is {df_org}")
             #loggerObj.app_info(f"The column names of df_org is {df_org.columns}")
-            
+
+            # Known ranges: serial numbers expanded in earlier runs
+            if self.f_cache:
+                df_out_known, df_org = self.known_range(df_org)
+
             # UnKnown ranges
             df_subset = df_org.loc[
                 df_org["known_sr_num"] == False,
@@ -301,14 +372,24 @@ class SerialNumber:
             loggerObj.app_info("Number of rows in df_org in function get_serialnumber in class_serial_number.py are {0} Number of rows in df_subset is {1}".format(len(df_org), len(df_subset)))
 
             loggerObj.app_info(f"The content of data frame df_subset is {df_subset}")
-            df_out_unknown, df_could_not = self.unknown_range(df_subset)
+            df_out_unknown, df_could_not = self.unknown_range(
+                df_subset, col_row="ix_row" if self.f_cache else None)
             del df_subset
             loggerObj.app_info("Finished calling unknown_range method defined inside class_serial_number.py")
             loggerObj.app_info("Before clubbing df_could_not and df_out_unknown")
             # Club Data
-            if False:
-                #df_out = pd.concat([df_out_known, df_out_unknown])
-                df_out = pd.concat([df_could_not, df_out_unknown])
+            if self.f_cache:
+                self.update_ref_data(df_org, df_out_unknown)
+                self.export_ref_data()
+
+                # Serial numbers in order of input rows as without cache
+                df_out_unknown["ix_row"] = df_org.loc[
+                    df_org["known_sr_num"] == False, "ix_row"
+                ].to_numpy()[df_out_unknown["ix_row"].to_numpy()]
+                df_out = pd.concat([df_out_known, df_out_unknown]) \
+                    .sort_values(by="ix_row", kind="stable") \
+                    .drop(columns=["ix_row"]).reset_index(drop=True)
+                del df_out_known, df_out_unknown
             else:
                 loggerObj.app_info("Inside else")
                 df_out = df_out_unknown.copy()
@@ -322,13 +403,17 @@ class SerialNumber:
 
         return df_out, df_could_not
 
-    def known_range(self, df_input):  # pragma: no cover
+    def known_range(self, df_input):
         """
         Function contains known dataframe values which have been processed
         earlier by the code. It will help in filtering the serial number types
         processed earlier.
-        Note: Method not implemented currently.
-        # pragma: no cover
+        Cache is keyed by raw serial number, InstallSize and data_type.
+
+        identify_seq_type is stateful (self.dict_mapping) for repeated serial
+        numbers. Therefore, serial numbers repeated within the batch or
+        already present in self.dict_mapping are not served from the cache
+        and are always expanded by unknown_range.
 
         :param df_input: Serial number is passed to the function.
         It will record the earlier processed serial numbers which may be
@@ -336,7 +421,9 @@ class SerialNumber:
         :type df_input: Pandas Dataframe.
         :raises Exception: Throws ValueError exception for Invalid values
         passed to function.
-        :return df_out_known: Returns the dataframe of values which are known.
+        :return df_out_known, df_input: Returns the dataframe of values which
+        are known (with ix_row, position of input row) and input data with
+        flags known_sr_num and f_cache.
         :rtype:  Pandas Dataframe
 
         """
@@ -344,28 +431,149 @@ class SerialNumber:
         current_step = "Known range of serial numbers"
 
         try:
-            ref_data = self.ref_data
+            ls_cols = ["SerialNumberOrg", "InstallSize", "KeySerial"]
+            df_input = df_input.copy()
+            df_input["ix_row"] = range(df_input.shape[0])
+            df_input["SerialNumberRaw"] = df_input["SerialNumberOrg"].astype(str)
+            df_input["Size"] = pd.to_numeric(df_input["InstallSize"], errors="coerce")
+            df_input["DataType"] = getattr(self, "data_type", "m2m")
+
+            # Keys used by identify_seq_type for self.dict_mapping
+            df_input["SerialNumberPrep"] = self.prep_srnum(df_input[ls_cols].copy())
+            key_1 = (
+                df_input["SerialNumberPrep"]
+                .str.replace("/", "-", regex=False)
+                .str.replace("--", "-", regex=False)
+            )
+            key_2 = key_1.str.replace(",", "-", regex=False)
+            df_input["MappingKey_1"] = key_1
+            df_input["MappingKey_2"] = key_2
+
+            df_key = pd.concat([
+                pd.DataFrame({"ix_row": df_input["ix_row"], "key": key_1}),
+                pd.DataFrame({"ix_row": df_input["ix_row"], "key": key_2}),
+            ]).drop_duplicates()
+            f_shared = (
+                df_key["key"].map(df_key["key"].value_counts()) > 1
+            ) | df_key["key"].isin(list(self.dict_mapping))
+            ls_row_shared = df_key.loc[f_shared, "ix_row"].unique()
+            del df_key, f_shared, key_1, key_2
+
+            df_input["f_cache"] = (
+                ~df_input["ix_row"].isin(ls_row_shared) & pd.notna(df_input["Size"])
+            )
 
-            ls_cols = ["SerialNumberOrg", "SerialNumber"]
-            df_out_known = df_input.merge(
-                ref_data[ls_cols], on="SerialNumberOrg", how="right"
+            # Lookup
+            ref_data = self.ref_data.rename(columns={"InstallSize": "Size"})
+            df_out_known = df_input.loc[
+                df_input["f_cache"],
+                ["ix_row", "SerialNumberRaw", "Size", "DataType", "KeySerial"],
+            ].merge(
+                ref_data.drop(columns=["Version"]),
+                on=["SerialNumberRaw", "Size", "DataType"],
+                how="inner",
             )
-            loggerObj.app_info(current_step)  # pragma: no cover
+            df_input["known_sr_num"] = df_input["ix_row"].isin(df_out_known["ix_row"])
+
+            # Replay state of identify_seq_type for serial numbers served from cache
+            df_mapping = df_out_known.loc[
+                df_out_known["MappingKey"] != "", ["MappingKey", "MappingValue"]
+            ].drop_duplicates(subset=["MappingKey"])
+            self.dict_mapping.update(
+                dict(zip(df_mapping["MappingKey"], df_mapping["MappingValue"]))
+            )
+
+            df_out_known = df_out_known.sort_values(by="ix_row", kind="stable")
+            df_out_known = df_out_known.loc[
+                :, ["SerialNumberOrg", "SerialNumber", "KeySerial", "ix_row"]
+            ].reset_index(drop=True)
+
+            loggerObj.app_info(
+                f"{current_step}: {df_input['known_sr_num'].sum()} / {df_input.shape[0]}")
 
         except Exception as e:
-            df_out_known = pd.DataFrame(columns=["SerialNumber", "SerialNumberOrg"])
             loggerObj.app_fail(current_step, f"{traceback.print_exc()}")
             raise Exception from e
 
-        return df_out_known  # pragma: no cover
+        return df_out_known, df_input
+
+    def update_ref_data(self, df_input, df_out_unknown):
+        """
+        Add serial numbers expanded in current run to the cache.
+
+        :param df_input: Input data with flags from known_range.
+        :type df_input: Pandas Dataframe.
+        :param df_out_unknown: Serial numbers expanded by unknown_range.
+        :type df_out_unknown: Pandas Dataframe.
+        :raises Exception: Throws exception for Invalid values passed
+        to function.
+
+        """
+
+        current_step = "Update serial number cache"
+
+        try:
+            # Only serial numbers eligible for the cache are added. These are
+            # unique within the batch, hence can be mapped back to the input
+            # using the cleaned serial number.
+            df_new = df_input.loc[
+                df_input["f_cache"] & ~df_input["known_sr_num"],
+                ["SerialNumberRaw", "Size", "DataType", "SerialNumberPrep",
+                 "MappingKey_1", "MappingKey_2"],
+            ]
+            if df_new.shape[0] == 0:
+                return
+
+            df_new = df_new.rename(
+                columns={"Size": "InstallSize", "SerialNumberPrep": "SerialNumberOrg"})
+
+            # State set by identify_seq_type for the serial number
+            df_new["MappingKey"] = ""
+            for col in ["MappingKey_2", "MappingKey_1"]:
+                flag = df_new[col].isin(list(self.dict_mapping))
+                df_new.loc[flag, "MappingKey"] = df_new.loc[flag, col]
+            df_new["MappingValue"] = df_new["MappingKey"].map(
+                lambda x: float(self.dict_mapping[x]) if x != "" else None
+            )
+
+            df_new = df_new.merge(
+                df_out_unknown[["SerialNumberOrg", "SerialNumber"]],
+                on="SerialNumberOrg",
+                how="inner",
+            )
+            df_new = df_new[pd.notna(df_new["SerialNumber"])]
+            df_new["SerialNumber"] = df_new["SerialNumber"].astype(str)
+            df_new["Version"] = self.cache_version
+            df_new = df_new.loc[:, self.ls_cols_cache].reset_index(drop=True)
+
+            if self.ref_data.shape[0] == 0:
+                self.ref_data = df_new
+            else:
+                self.ref_data = pd.concat(
+                    [self.ref_data, df_new]).reset_index(drop=True)
+            if self.ref_data_new.shape[0] == 0:
+                self.ref_data_new = df_new
+            else:
+                self.ref_data_new = pd.concat(
+                    [self.ref_data_new, df_new]).reset_index(drop=True)
+            self.f_cache_updated = True
+
+            loggerObj.app_info(f"{current_step}: {df_new.shape[0]} entries")
+
+        except Exception as e:
+            loggerObj.app_fail(current_step, f"{traceback.print_exc()}")
+            raise Exception from e
 
-    def unknown_range(self, df_input):
+    def unknown_range(self, df_input, col_row=None):
         """
         Function processes the range of serial numbers which are unknown to the
         code or which have not been processed earlier.
 
         :param df_input: Serial number is passed to the function.
         :type df_input: Pandas Dataframe.
+        :param col_row: Column added to output with position of input row of
+        each serial number, defaults to None i.e. not added.
+        :type col_row: String, optional
         :raises Exception: Throws ValueError exception for Invalid values
         passed to function.
         :return df_out_unknown,could_not: List of values processed by the
@@ -430,6 +638,10 @@ class SerialNumber:
             loggerObj.app_info(f"Number of rows processed by calling generate_seq function defined in class_serial_number.py are = {len(df_input)}")
             loggerObj.app_info("Completed execution of generate_seq in the class class_serial_number.py")
             df_out_unknown = pd.concat(ls_seq_out_unknown.tolist())
+            if col_row is not None:
+                df_out_unknown[col_row] = np.repeat(
+                    np.arange(len(ls_seq_out_unknown)),
+                    [len(df_seq) for df_seq in ls_seq_out_unknown])
 
             could_not = df_input.loc[df_input["f_analyze"] == False, :]
             loggerObj.app_debug(current_step)
@@ -37,6 +37,7 @@ from utils import Filter
 from utils import Format
 from utils.dcpd.class_common_srnum_ops import SearchSrnum
 from utils.dcpd.class_business_logic import BusinessLogic
+from utils.sampling import Sampling
 import utils.dcpd.class_contracts_data as ccd
 
 # Set project path
@@ -47,7 +48,6 @@ import utils.dcpd.class_contracts_data as ccd
 # Create instance of the class
 formatObj = Format()
 filterObj = Filter()
-contractObj = ccd.Contract()
 busLogObj = BusinessLogic()
 srnumObj = SearchSrnum()
 loggerObj = AppLogger(__name__)
@@ -64,13 +64,20 @@ class ProcessServiceIncidents:
 
     """
 
-    def __init__(self, mode='local'):
+    def __init__(self, mode='local', config=None):
         self.mode = mode
         # self.config = IO.read_json(mode='local', config={
         #     "file_dir": './references/', "file_name": 'config_dcpd.json'})
-        self.config = IO.read_json(mode,
-                                   config={"file_dir": 'config/',
-                                           "file_name": 'config_dcpd.json'})
+        if config is None:
+            config = IO.read_json(mode,
+                                  config={"file_dir": 'config/',
+                                          "file_name": 'config_dcpd.json'})
+        self.config = config
+        IO.set_memory_mode(self.config.get('memory_mode', {}))
+        self.contract = ccd.Contract(self.mode, self.config)
+
+        # Dev run: sample of units
+        self.sampling = Sampling.from_config(self.config)
 
     def check_var_size(self, local_vars, log):
         #loggerObj.app_info("Inside check_var_size function")
@@ -122,6 +129,7 @@ class ProcessServiceIncidents:
                         'adls_config': self.config['file']['Raw']['adls_credentials'],
                         'adls_dir': self.config['file']['Raw']['services']}
             df_services_raw = IO.read_csv(self.mode, file_dir)
+            df_services_raw = self.sampling.sample(df_services_raw, 'services')
 
             # Get Config for filter
             _step = 'Filter raw services data'
@@ -196,7 +204,7 @@ class ProcessServiceIncidents:
 
             _step = 'Validate serial number data'
             loggerObj.app_info("Now calling validate_contract_install_sr_num function defined in class_contracts_data.py")
-            validate_srnum = contractObj.validate_contract_install_sr_num(
+            validate_srnum = self.contract.validate_contract_install_sr_num(
                 expand_srnumdf)
             loggerObj.app_info("Finished calling validate_contract_install_sr_num function defined in class_contracts_data.py")
             # Filter rows with valid serial number
@@ -358,7 +366,7 @@ class ProcessServiceIncidents:
             if total_number_of_rows >= 10000:
                 while new <= total_number_of_rows:
                     loggerObj.app_info(f"Now calling get_range_srum method defined in class_contract_data.py with indexes {old} and {new}")
-                    intermediate_expanded_temp_df = contractObj.get_range_srum(df_out.iloc[old:new])
+                    intermediate_expanded_temp_df = self.contract.get_range_srum(df_out.iloc[old:new])
                     list_of_expanded_data_frames.append(intermediate_expanded_temp_df)
                     loggerObj.app_info(f"Finished calling get_range_srum method defined in class_contract_data.py with indexes {old} and {new}")
                     old = new
@@ -367,7 +375,7 @@ class ProcessServiceIncidents:
             
             if (old < total_number_of_rows and new - total_number_of_rows > 0):
                 loggerObj.app_info(f"Now calling get_range_srum method defined in class_contract_data.py with indexes {old} and {new}")
-                intermediate_expanded_temp_df = contractObj.get_range_srum(df_out.iloc[old:new])
+                intermediate_expanded_temp_df = self.contract.get_range_srum(df_out.iloc[old:new])
                 list_of_expanded_data_frames.append(intermediate_expanded_temp_df)
                 loggerObj.app_info(f"Finished calling get_range_srum method defined in class_contract_data.py with indexes {old} and {new}")
             
@@ -390,7 +398,7 @@ class ProcessServiceIncidents:
 
             loggerObj.app_info(f"Total number of records to processed before calling validate_contract_install_sr_num are {len(df_out)}")
             
-            validated_sr_num = contractObj.validate_contract_install_sr_num(
+            validated_sr_num = self.contract.validate_contract_install_sr_num(
                 expanded_sr_num
             )
             loggerObj.app_info("Finished calling validate_contract_install_sr_num method defined in class_contracts_data.py")
@@ -548,6 +556,8 @@ class ProcessServiceIncidents:
                             'adls_config': self.config['file']['Raw']['adls_credentials'],
                            'adls_dir': self.config['file']['Raw']['services']}
                 df_services_raw = IO.read_csv(self.mode, file_dir)
+                df_services_raw = self.sampling.sample(
+                    df_services_raw, 'services')
 
                 # Read corresponding serial number data file for raw services data
                 file_dir = {'file_dir': self.config['file']['dir_results'] +
@@ -611,7 +621,7 @@ class ProcessServiceIncidents:
 
             # Serial number validation - Expand serial numbers
             loggerObj.app_info("Calling function get_range_srum defined inside class_contracts_data.py from function pipline_component_identify defined inside class_services_data.py")
-            expand_srnumdf = contractObj.get_range_srum(df_out)
+            expand_srnumdf = self.contract.get_range_srum(df_out)
             loggerObj.app_info("Finished calling function get_range_srum defined inside class_contracts_data.py from function pipline_component_identify defined inside class_services_data.py")
 
             # Removing the rows with none values
@@ -620,7 +630,7 @@ class ProcessServiceIncidents:
 
             # Validate serial number data
             loggerObj.app_info("Calling function validate_contract_install_sr_num defined inside class_contracts_data.py from function pipline_component_identify defined inside class_services_data.py")
-            validate_srnum = contractObj.validate_contract_install_sr_num(
+            validate_srnum = self.contract.validate_contract_install_sr_num(
                 expand_srnumdf)
             loggerObj.app_info("Finished calling function validate_contract_install_sr_num defined inside class_contracts_data.py from function pipline_component_identify defined inside class_services_data.py")
 
@@ -688,14 +698,14 @@ class ProcessServiceIncidents:
             df_out = IO.read_csv(self.mode, file_dir)
 
             # Serial number validation - Expand serial numbers
-            expand_srnumdf = contractObj.get_range_srum(df_out)
+            expand_srnumdf = self.contract.get_range_srum(df_out)
 
             # Removing the rows with none values
             expand_srnumdf['SerialNumber'].replace('', np.nan, inplace=True)
             expand_srnumdf.dropna(subset=['SerialNumber'], inplace=True)
 
             # Validate serial number data
-            validate_srnum = contractObj.validate_contract_install_sr_num(expand_srnumdf)
+            validate_srnum = self.contract.validate_contract_install_sr_num(expand_srnumdf)
 
             # Filter rows with valid serial number
             validate_srnum = validate_srnum.loc[validate_srnum.flag_validinstall]
@@ -0,0 +1,369 @@
+"""@file class_standard_bom.py
+
+
+
+@brief Lookup of standard BOM for made to stock units.
+
+
+@details
+Made to stock units (units without Job_Index) get their components from the
+standard BOM (bomdata_sisc.csv and bomdata_default.csv). Standard BOM is
+prepared once as a lookup table and persisted; it is rebuilt only when the
+source files change.
+
+Lookup has two kinds of entries indexed on a single key:
+- exact: all BOM lines of a part number (TLN) and revision,
+  key = "<TLN>\t<Revision>"
+- fallback: for units whose revision is not available in the BOM, a single
+  BOM line of the first revision of the TLN, key = "<TLN>"
+
+Made to stock units are resolved to BOM lines with one indexed join.
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# %% ***** Setup Environment *****
+
+import os
+import traceback
+import numpy as np
+import pandas as pd
+
+from utils import AppLogger
+from utils import IO
+from utils import Join
+
+loggerObj = AppLogger(__name__)
+
+
+# %%
+
+class StandardBOM:
+    """
+    Lookup of standard BOM lines for made to stock install base units.
+
+    """
+
+    ls_cols_bom = [
+        "PartNumber_TLN_Shipment",
+        "PartNumber_BOM_BOM",
+        "Revision",
+        "Total_Quantity",
+    ]
+
+    ls_cols_lookup = ["key_bom", "f_exact"] + ls_cols_bom + ["Signature"]
+
+    dict_rename = {
+        "fparent": "PartNumber_TLN_Shipment",
+        "fcomponent": "PartNumber_BOM_BOM",
+        "fparentrev": "Revision",
+        "fqty": "Total_Quantity",
+    }
+
+    def __init__(self, mode="local", config=None):
+        """
+        Initialize standard BOM lookup.
+
+        :param mode: IO mode i.e. 'local' or 'azure-adls'.
+        :type mode: String.
+        :param config: Project configuration, defaults to None
+        :type config: Dictionary, optional
+
+        """
+        self.mode = mode
+        self.join = Join()
+        self.lookup = None
+        self.f_cache = False
+
+        if config is not None:
+            self.init_cache(mode, config)
+
+    def init_cache(self, mode, config):
+        """
+        Configure source files and persisted lookup.
+
+        :param mode: IO mode i.e. 'local' or 'azure-adls'.
+        :type mode: String.
+        :param config: Project configuration.
+        :type config: Dictionary.
+        :raises Exception: Throws exception if settings are not available in
+        the config.
+
+        """
+
+        current_step = "Initialize standard BOM lookup"
+
+        try:
+            self.mode = mode
+            self.lookup = None
+            self.ls_config_source = [
+                {"file_dir": config["file"]["dir_data"],
+                 "file_name": config["file"]["Raw"][key]["file_name"]}
+                for key in ["bomdata_sisc", "bomdata_deafault"]]
+
+            dict_cache = config.get("standard_bom", {}).get("cache", {})
+            self.f_cache = bool(dict_cache.get("enable", False))
+            if self.f_cache:
+                self.cache_config = {
+                    "file_dir": config["file"]["dir_results"]
+                    + config["file"]["dir_intermediate"],
+                    "file_name": config["file"]["Processed"][
+                        "standard_bom_lookup"]["file_name"],
+                    "adls_config": config["file"]["Processed"]["adls_credentials"],
+                    "adls_dir": config["file"]["Processed"]["standard_bom_lookup"],
+                }
+
+            loggerObj.app_debug(current_step)
+
+        except Exception as e:
+            loggerObj.app_fail(current_step, f"{traceback.print_exc()}")
+            raise Exception from e
+
+    def input_configs(self):
+        """
+        Files read to get lookup i.e. persisted lookup if enabled, else
+        source files; none once lookup is available.
+
+        :return: Locations of files.
+        :rtype: list of dictionaries
+
+        """
+        if self.lookup is not None:
+            return []
+        if self.f_cache:
+            return [self.cache_config]
+        return list(self.ls_config_source)
+
+    # ***** Lookup *****
+
+    def source_signature(self):
+        """
+        Signature (name, size and modification time) of the source files.
+        Lookup is rebuilt when the signature changes.
+
+        :return: Signature of source files.
+        :rtype: String
+
+        """
+        ls_signature = []
+        for config in self.ls_config_source:
+            file_path = os.path.join(config["file_dir"], config["file_name"])
+            stat = os.stat(file_path)
+            ls_signature.append(
+                f"{config['file_name']}:{stat.st_size}:{stat.st_mtime_ns}")
+        return ";".join(ls_signature)
+
+    def get_lookup(self):
+        """
+        Standard BOM lookup; read from the persisted lookup when the source
+        files are unchanged, else built from the source files.
+
+        :return: Lookup indexed on key_bom.
+        :rtype: Pandas Data Frame
+
+        """
+        if self.lookup is not None:
+            return self.lookup
+
+        signature = self.source_signature()
+
+        lookup = self.read_lookup(signature) if self.f_cache else None
+        if lookup is None:
+            lookup = self.build_lookup(self.read_source(), signature)
+            self.export_lookup(lookup)
+
+        self.lookup = self.join.register(
+            "standard_bom", lookup, "key_bom",
+            ["f_exact"] + self.ls_cols_bom)
+        return self.lookup
+
+    def read_source(self):
+        """
+        Read standard BOM source files.
+
+        :return: Standard BOM.
+        :rtype: Pandas Data Frame
+
+        """
+        ls_bom = [IO.read_csv(self.mode, config)
+                  for config in self.ls_config_source]
+        return pd.concat(ls_bom, ignore_index=True)
+
+    def build_lookup(self, df_standard_bom, signature=""):
+        """
+        Build lookup from standard BOM.
+
+        :param df_standard_bom: Standard BOM with columns fparent,
+        fcomponent, fparentrev and fqty.
+        :type df_standard_bom: Pandas Data Frame
+        :param signature: Signature of source files, defaults to ""
+        :type signature: String, optional
+        :return: Lookup with exact and fallback entries.
+        :rtype: Pandas Data Frame
+
+        """
+
+        current_step = "Build standard BOM lookup"
+
+        try:
+            df_standard_bom = df_standard_bom.rename(columns=self.dict_rename)
+            df_standard_bom = df_standard_bom[self.ls_cols_bom].copy()
+            for col in ["PartNumber_TLN_Shipment", "PartNumber_BOM_BOM"]:
+                df_standard_bom[col] = df_standard_bom[col].str.strip()
+            df_standard_bom = df_standard_bom[
+                pd.notna(df_standard_bom["PartNumber_TLN_Shipment"])]
+
+            # Exact: all BOM lines of TLN and revision
+            df_exact = df_standard_bom[
+                pd.notna(df_standard_bom["PartNumber_BOM_BOM"])].copy()
+            df_exact["key_bom"] = self.key_exact(
+                df_exact["PartNumber_TLN_Shipment"], df_exact["Revision"])
+            df_exact["f_exact"] = True
+
+            # Fallback: first BOM line of first revision of TLN
+            key = (df_standard_bom["PartNumber_TLN_Shipment"] + ":"
+                   + df_standard_bom["Revision"])
+            df_fallback = df_standard_bom.assign(key=key).sort_values(
+                "key", kind="stable", na_position="last")
+            df_fallback = df_fallback.drop_duplicates(
+                ["PartNumber_TLN_Shipment"], keep="first").copy()
+            df_fallback["key_bom"] = df_fallback["PartNumber_TLN_Shipment"]
+            df_fallback["f_exact"] = False
+            df_fallback = df_fallback.drop(columns=["key"])
+
+            lookup = pd.concat([df_exact, df_fallback], ignore_index=True)
+            lookup["Signature"] = signature
+
+            loggerObj.app_info(
+                f"{current_step}: {df_exact.shape[0]} exact, "
+                f"{df_fallback.shape[0]} fallback entries")
+            return lookup[self.ls_cols_lookup]
+
+        except Exception as e:
+            loggerObj.app_fail(current_step, f"{traceback.print_exc()}")
+            raise Exception from e
+
+    def read_lookup(self, signature):
+        """
+        Read persisted lookup; lookup built from different source files is
+        discarded.
+
+        :param signature: Signature of current source files.
+        :type signature: String
+        :return: Lookup, None if unavailable or outdated.
+        :rtype: Pandas Data Frame
+
+        """
+
+        current_step = "Read standard BOM lookup"
+
+        try:
+            lookup = IO.read_csv(self.mode, self.cache_config)
+            lookup = lookup.loc[:, self.ls_cols_lookup]
+        except Exception:
+            # Lookup is not available for the very first run
+            loggerObj.app_info(f"{current_step}: lookup not available")
+            return None
+
+        if (lookup.shape[0] == 0) or (
+                lookup["Signature"].astype(str) != signature).any():
+            loggerObj.app_info(f"{current_step}: source files changed")
+            return None
+
+        lookup["key_bom"] = lookup["key_bom"].astype(str)
+        lookup["f_exact"] = lookup["f_exact"].astype(bool)
+
+        loggerObj.app_info(f"{current_step}: {lookup.shape[0]} entries")
+        return lookup
+
+    def export_lookup(self, lookup):
+        """
+        Persist lookup.
+
+        :param lookup: Lookup with exact and fallback entries.
+        :type lookup: Pandas Data Frame
+        :return: Status of export.
+        :rtype: String
+
+        """
+
+        current_step = "Export standard BOM lookup"
+
+        if not self.f_cache:
+            return "disabled"
+
+        try:
+            status = IO.write_csv(self.mode, self.cache_config, lookup)
+            loggerObj.app_success(current_step)
+        except Exception:
+            # Failing to persist lookup must not fail the pipeline
+            loggerObj.app_fail(current_step, f"{traceback.print_exc()}")
+            status = "unsuccessful !"
+
+        return status
+
+    # ***** Resolve *****
+
+    @staticmethod
+    def key_exact(ar_tln, ar_revision):
+        """
+        Key of exact lookup entries.
+
+        :param ar_tln: Part number (TLN).
+        :type ar_tln: Pandas Series
+        :param ar_revision: Revision.
+        :type ar_revision: Pandas Series
+        :return: Key.
+        :rtype: Pandas Series
+
+        """
+        return ar_tln + "\t" + ar_revision.astype(str)
+
+    def resolve(self, df_install_mts, merge_type="left"):
+        """
+        Resolve made to stock units to standard BOM lines. Units are matched
+        on TLN and revision; units whose revision is not available in BOM are
+        matched to the first revision of the TLN.
+
+        :param df_install_mts: Made to stock install data.
+        :type df_install_mts: Pandas Data Frame
+        :param merge_type: 'left' or 'inner', defaults to "left"
+        :type merge_type: String, optional
+        :return: Install data with PartNumber_BOM_BOM and Total_Quantity;
+        units with exact match are followed by units with fallback match.
+        :rtype: Pandas Data Frame
+
+        """
+        lookup = self.get_lookup()
+        ls_cols = list(df_install_mts.columns)
+
+        ar_tln = df_install_mts["PartNumber_TLN_Shipment"].astype(str).str.strip()
+        key_bom = self.key_exact(ar_tln, df_install_mts["Revision"])
+        f_exact = key_bom.isin(lookup.index[lookup["f_exact"]])
+
+        df_install_mts = df_install_mts.assign(
+            PartNumber_TLN_Shipment=ar_tln,
+            key_bom=key_bom.where(f_exact, ar_tln),
+            f_exact_match=f_exact)
+        if merge_type == "inner":
+            df_install_mts = df_install_mts[f_exact]
+
+        df_out = self.join.join(
+            df_install_mts, lookup, "key_bom", how=merge_type,
+            ls_cols=["Revision", "PartNumber_BOM_BOM", "Total_Quantity"],
+            max_fanout=np.inf, step="Resolve standard BOM")
+
+        # Revision of units matched on TLN is taken from BOM
+        df_out["Revision"] = df_out["Revision_x"].where(
+            df_out["f_exact_match"], df_out["Revision_y"])
+        df_out = df_out.sort_values(
+            "f_exact_match", ascending=False, kind="stable")
+
+        return df_out[ls_cols + ["PartNumber_BOM_BOM", "Total_Quantity"]] \
+            .reset_index(drop=True)
+
+
+# %%
@@ -259,22 +259,84 @@ class Filter:
         return df_data['is_valid']
 
     def prioratized_columns(self, temp_data_org, ls_priority):
-        #  df_data = df_data_install.copy()
-        # ls_priority = ['ShipTo_Country', 'SoldTo_Country']
-        temp_data = temp_data_org.copy()
-        del temp_data_org
-
-        temp_data['out'] = np.nan
-
-        for col in ls_priority:
-            # col = ls_priority[0]
-            flag_na = pd.isna(temp_data['out'])
-            flag_empty = temp_data['out'] == ''
-            flag_all = (flag_na | flag_empty)
-            temp_data.loc[flag_all, 'out'] = temp_data.loc[flag_all, col]
-
-        ar_out = np.array(temp_data['out'])
-        return ar_out
+        """
+        First value available (not NA and not empty) across columns in order
+        of priority. Value of last column is returned if none is available.
+
+        :param temp_data_org: Input data.
+        :type temp_data_org: pandas DataFrame
+        :param ls_priority: Columns in order of priority.
+        :type ls_priority: list
+        :return: Prioritized value for each row.
+        :rtype: numpy array
+
+        """
+        return self.coalesce_columns(temp_data_org, ls_priority, how='first')
+
+    def coalesce_columns(self, df_data, ls_cols, how='first', sep='; ',
+                         min_len=0):
+        """
+        Coalesce N columns into one using array operations.
+
+        how='first': first value not NA and not empty in order of ls_cols;
+            value of last column if none is available. Values of numeric
+            columns preceding first column which is not numeric are float.
+        how='join': unique values (sorted) longer than min_len joined with
+            sep; values are converted to string and NA is treated as empty.
+            Output matches sep.join(np.unique(row)) applied row wise.
+
+        :param df_data: Input data.
+        :type df_data: pandas DataFrame
+        :param ls_cols: Columns to coalesce.
+        :type ls_cols: list
+        :param how: 'first' or 'join', defaults to 'first'
+        :type how: string, optional
+        :param sep: Separator for how='join', defaults to '; '
+        :type sep: string, optional
+        :param min_len: Values with length <= min_len are dropped for
+            how='join', defaults to 0
+        :type min_len: int, optional
+        :raises ValueError: Unknown coalesce type.
+        :return: Coalesced value for each row.
+        :rtype: numpy array
+
+        """
+        if how == 'first':
+            ar_data = df_data[ls_cols].to_numpy(dtype=object)
+            ar_valid = pd.notna(ar_data) & (ar_data != '')
+
+            # Index of first available column, else last column
+            ar_ix = np.where(ar_valid.any(axis=1),
+                             ar_valid.argmax(axis=1), len(ls_cols) - 1)
+            ar_out = ar_data[np.arange(ar_data.shape[0]), ar_ix]
+
+            # Output is NaN initialized i.e. float until a column which is
+            # not numeric is reached; values of preceding columns are float
+            ls_numeric = [pd.api.types.is_numeric_dtype(df_data[col])
+                          and not pd.api.types.is_bool_dtype(df_data[col])
+                          for col in ls_cols]
+            if all(ls_numeric) or (ar_data.shape[0] == 0):
+                return ar_out.astype(float)
+            f_float = ar_ix < ls_numeric.index(False)
+            ar_out[f_float] = ar_out[f_float].astype(float)
+            return ar_out
+
+        if how == 'join':
+            ar_data = np.sort(
+                df_data[ls_cols].fillna('').astype(str).to_numpy(dtype=str),
+                axis=1)
+            ar_valid = np.char.str_len(ar_data) > min_len
+            # Row is sorted; duplicates are adjacent
+            ar_valid[:, 1:] &= ar_data[:, 1:] != ar_data[:, :-1]
+
+            ar_out = np.full(ar_data.shape[0], '', dtype=object)
+            for ix in range(ar_data.shape[1]):
+                ar_val = np.where(ar_valid[:, ix], ar_data[:, ix], '')
+                ar_sep = np.where(ar_valid[:, ix] & (ar_out != ''), sep, '')
+                ar_out = ar_out + ar_sep.astype(object) + ar_val.astype(object)
+            return ar_out
+
+        raise ValueError(f'Unknown coalesce type: {how}')
 
 
 # %%
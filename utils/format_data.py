@@ -103,8 +103,7 @@ class Format:
 
             elif dict_val['data_type'] == 'text':
                 # *** Text ***
-                df_data[col] = df_data[col].fillna("").astype(str)
-                df_data[col] = df_data[col].str.lower().str.strip()
+                df_data[col] = self.format_text(df_data[col])
 
             elif dict_val['data_type'] in [
                     'numeric', 'numeric : float', 'numeric : integer']:
@@ -125,6 +124,34 @@ class Format:
             logger.app_info(f'end of format data : {df_data}')
         return df_data
 
+    def format_text(self, ar_text):
+        """
+        Convert text to lower case and strip spaces. Arrow backed strings and
+        categorical columns (see memory_mode in config) retain their dtype;
+        for categorical only the categories are formatted.
+
+        :param ar_text: Text to be formatted.
+        :type ar_text: pd.Series.
+        :return: Formatted text, blanks for missing values.
+        :rtype: pd.Series
+
+        """
+        if isinstance(ar_text.dtype, pd.CategoricalDtype):
+            ar_cat = ar_text.cat.categories.astype(str).str.lower().str.strip()
+            codes = ar_text.cat.codes.to_numpy()
+            ar_out = np.full(len(codes), "", dtype=object)
+            if len(ar_cat) > 0:
+                ar_out = np.where(
+                    codes >= 0, np.asarray(ar_cat, dtype=object)[codes], "")
+            return pd.Series(
+                ar_out, index=ar_text.index, name=ar_text.name
+            ).astype('category')
+
+        if isinstance(ar_text.dtype, pd.StringDtype):
+            return ar_text.fillna("").str.lower().str.strip()
+
+        return ar_text.fillna("").astype(str).str.lower().str.strip()
+
     def format_date(self, dataset, ls_date_formats=[]):
         """
         Format date strings into pandas datetime.
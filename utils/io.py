@@ -19,19 +19,176 @@ direct written permission from Eaton Corporation.
 
 from utils.class_iLead_contact import ilead_contact
 import logging
+import os
+import json
 import utils.io_adopter.local as io_local
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from utils.io_adopter.class_adlsFunc import adlsFunc
 #from azure.storage.filedatalake import DataLakeServiceClient
 from utils import AppLogger
+from concurrent import futures
+from concurrent.futures import ThreadPoolExecutor
 import re
+import time
 logger = AppLogger(__name__)
 
 # %% Define class
 io_adls = adlsFunc()
+
+
+def read_config_section(section):
+    """
+    Read a section of IO settings from configuration.
+
+    :param section: Key of the section e.g. memory_mode.
+    :type section: str
+    :return: settings, empty when unavailable.
+    :rtype: dictionary
+    """
+    config_file = os.path.join(
+        os.path.dirname(__file__), "../config", "config_dcpd.json")
+    try:
+        with open(config_file, 'r') as file:
+            return json.load(file).get(section, {})
+    except Exception:
+        return {}
+
+
+# Column dtype schema (memory mode) of the running pipeline; set from config
+# of the pipeline by IO.set_memory_mode
+dict_memory_mode = {}
+dict_write_mode = read_config_section('write_mode')
+dict_read_mode = read_config_section('read_mode')
+
+# Writes submitted with asynchronous=True; awaited by IO.wait_writes
+io_writer = ThreadPoolExecutor(
+    max_workers=dict_write_mode.get('async', {}).get('max_workers', 2))
+ls_pending_writes = []
+
+# Reads submitted with IO.prefetch; consumed by IO.read_csv
+io_reader = ThreadPoolExecutor(
+    max_workers=dict_read_mode.get('prefetch', {}).get('max_workers', 4))
+dict_prefetch = {}
+# Wall time callers were blocked on reads i.e. waiting for prefetched data
+# or reading synchronously
+dict_read_stats = {'reads': 0, 'prefetched': 0, 'time_blocked': 0.0}
+
+
+def reset_executors():
+    """
+    Threads of the pools are not copied to forked processes; new pools are
+    started in the child so that its reads and writes in background run.
+    """
+    global io_writer, io_reader
+    io_writer = ThreadPoolExecutor(
+        max_workers=dict_write_mode.get('async', {}).get('max_workers', 2))
+    io_reader = ThreadPoolExecutor(
+        max_workers=dict_read_mode.get('prefetch', {}).get('max_workers', 4))
+    ls_pending_writes.clear()
+
+
+os.register_at_fork(after_in_child=reset_executors)
+
+
 class IO():
 
+    @staticmethod
+    def set_adls_backend(backend=None):
+        """
+        Set storage / key vault backend of azure-adls mode e.g.
+        utils.io_adopter.local_adls.LocalAdlsBackend to run without cloud.
+
+        :param backend: Backend, defaults to None i.e. Azure.
+        :type backend: AzureBackend like object, optional
+        :return: Backend set.
+        :rtype: AzureBackend like object
+
+        """
+        io_adls.backend = adlsFunc(backend).backend
+        return io_adls.backend
+
+    @staticmethod
+    def set_memory_mode(dict_schema=None):
+        """
+        Set column dtype schema (memory_mode section of config) applied to
+        data read by IO.read_csv.
+
+        :param dict_schema: memory mode settings, defaults to None i.e.
+        disabled.
+        :type dict_schema: dictionary, optional
+        :return: memory mode settings set.
+        :rtype: dictionary
+
+        """
+        dict_memory_mode.clear()
+        dict_memory_mode.update(dict_schema or {})
+        return dict_memory_mode
+
+    @staticmethod
+    def string_dtype(dict_schema=None):
+        """
+        Dtype of string columns of memory mode. Missing values are NaN as
+        for object columns, so masks are boolean and blanks can be filled
+        (na_value needs pandas 2.3 or later). Memory mode is disabled in
+        config as only Format.format_text is audited for these columns;
+        non-string values can not be assigned to them.
+
+        :param dict_schema: memory mode settings, defaults to memory mode set.
+        :type dict_schema: dictionary, optional
+        :return: String dtype.
+        :rtype: pd.StringDtype
+
+        """
+        if dict_schema is None:
+            dict_schema = dict_memory_mode
+        return pd.StringDtype(
+            dict_schema.get('string_storage', 'pyarrow'), na_value=np.nan)
+
+    @staticmethod
+    def apply_dtype_schema(data, dict_schema=None) -> pd.DataFrame:
+        """
+        Convert columns to compact dtypes as per schema in config
+        (memory_mode). Key columns e.g. serial numbers and part numbers are
+        stored as arrow backed strings and low cardinality columns are stored
+        as categorical. Columns not present in data are ignored.
+
+        :param data: Data read from source.
+        :type data: pandas DataFrame.
+        :param dict_schema: memory mode settings, defaults to memory mode set
+        by IO.set_memory_mode.
+        :type dict_schema: dictionary, optional
+        :return: Data with columns converted.
+        :rtype: pandas DataFrame.
+
+        """
+        if dict_schema is None:
+            dict_schema = dict_memory_mode
+
+        if (not dict_schema.get('enable', False)) or (
+                not isinstance(data, pd.DataFrame)):
+            return data
+
+        _step = 'Apply dtype schema'
+        try:
+            dtype_str = IO.string_dtype(dict_schema)
+
+            for col in dict_schema.get('string_columns', []):
+                if col in data.columns:
+                    data[col] = data[col].astype(dtype_str)
+
+            for col in dict_schema.get('category_columns', []):
+                if col in data.columns:
+                    data[col] = data[col].astype('category')
+
+            logger.app_debug(_step, 1)
+        except Exception as e:
+            logger.app_info(f'{_step}: {str(e)}')
+            raise Exception from e
+
+        return data
+
     @staticmethod
     def read_csv_adls(config) -> pd.DataFrame:
         connection_string_key = config['adls_config']['connection_string']
@@ -55,7 +212,8 @@ class IO():
             logger.app_info("Function is starting.")
             
             logger.app_info(f'connection String: {connection_string}\n, Container name: {container_name}\n, file name: {file_name}\n,  directory name:{directory_name}')
-            result= io_adls.input_file_read(connection_string, container_name, file_name, directory_name=directory_name, sep=',')
+            result= io_adls.input_file_read(connection_string, container_name, file_name, directory_name=directory_name, sep=',',
+                                            **io_local.csv_parse_options(config))
             logger.app_info(f"Type of result: {result}")
             
             return result
@@ -63,7 +221,7 @@ class IO():
         except Exception as e:
             raise e
     @staticmethod    
-    def write_csv_adls(config,dataset):
+    def write_csv_adls(config,dataset,append=False):
         logger.app_info('inside write_csv_adls')
         connection_string_key = config['adls_config']['connection_string']
         storage_account_name_key = config['adls_config']['storage_account_name']
@@ -91,31 +249,221 @@ class IO():
             #dataset.to_csv(output_file_name, index=False)
             logger.app_info(f"Type of dataset: {dataset}")
             logger.app_info(f'connection String: {connection_string}\n, Container name: {output_container_name}\n, file name: {output_file_name}\n,  directory name:{output_directory_name}')
-            result= io_adls.output_file_write(connection_string, dataset, output_container_name,output_file_name, output_directory_name)
+            dict_adls_write = dict_write_mode.get('adls', {})
+            result= io_adls.output_file_write(
+                connection_string, dataset, output_container_name,
+                output_file_name, output_directory_name,
+                chunk_rows=dict_adls_write.get('chunk_rows', 100000),
+                max_concurrency=dict_adls_write.get('max_concurrency', 4),
+                append=append)
             return result
         except Exception as e:
             return e
 
+    @staticmethod
+    def arrow_string_columns(dict_schema=None):
+        """
+        String columns read from memory mapped arrow files without copy i.e.
+        string columns of memory mode, when enabled.
+
+        :param dict_schema: memory mode settings, defaults to memory mode set
+        by IO.set_memory_mode.
+        :type dict_schema: dictionary, optional
+        :return: Column names.
+        :rtype: list
+
+        """
+        if dict_schema is None:
+            dict_schema = dict_memory_mode
+
+        if (not dict_schema.get('enable', False)) or (
+                dict_schema.get('string_storage', 'pyarrow') != 'pyarrow'):
+            return []
+        return dict_schema.get('string_columns', [])
+
+    # *** Prefetch ***
+    @staticmethod
+    def location_key(mode, config):
+        """
+        Key identifying location of a file across configs built separately.
+
+        :param mode: 'local', 'local-arrow' or 'azure-adls'.
+        :type mode: str
+        :param config: Location of the file.
+        :type config: dictionary
+        :return: Key.
+        :rtype: tuple
+
+        """
+        return (mode, config.get('file_dir', ''), config.get('file_name', ''),
+                json.dumps(config.get('adls_dir', {}), sort_keys=True))
+
+    @staticmethod
+    def prefetch(mode, ls_config, dict_settings=None):
+        """
+        Start reading inputs declared by a stage in background so that
+        download and parsing overlap with computation of previous steps.
+        Data is handed over on first IO.read_csv of the location; reads
+        which fail are raised then. Location being prefetched is not read
+        again.
+
+        :param mode: 'local', 'local-arrow' or 'azure-adls'.
+        :type mode: str
+        :param ls_config: Locations of inputs in order of use.
+        :type ls_config: list of dictionaries
+        :param dict_settings: read mode settings, defaults to read_mode
+        settings in config_dcpd.json.
+        :type dict_settings: dictionary, optional
+        :return: Number of reads submitted.
+        :rtype: int
+
+        """
+        if dict_settings is None:
+            dict_settings = dict_read_mode
+
+        if not dict_settings.get('prefetch', {}).get('enable', False):
+            return 0
+
+        n_submitted = 0
+        for config in ls_config:
+            key = IO.location_key(mode, config)
+            if key in dict_prefetch:
+                continue
+            # Futures are bound to the process; forked workers read directly
+            dict_prefetch[key] = (os.getpid(), io_reader.submit(
+                IO.read_csv_source, mode, config))
+            n_submitted += 1
+
+        logger.app_info(f'Prefetch: {n_submitted} inputs submitted')
+        return n_submitted
+
+    @staticmethod
+    def wait_prefetch():
+        """
+        Wait for prefetched reads in progress e.g. before worker processes
+        are forked, so that no read thread holds a lock copied to workers.
+        Data is kept for IO.read_csv.
+
+        :return: Number of prefetched inputs.
+        :rtype: int
+
+        """
+        futures.wait([future for _, future in dict_prefetch.values()])
+        return len(dict_prefetch)
+
+    @staticmethod
+    def clear_prefetch():
+        """
+        Drop prefetched data not consumed by stage e.g. inputs of branches
+        not executed.
+
+        :return: Number of prefetched inputs dropped.
+        :rtype: int
+
+        """
+        n_dropped = len(dict_prefetch)
+        for _, future in dict_prefetch.values():
+            future.cancel()
+        dict_prefetch.clear()
+        return n_dropped
+
+    @staticmethod
+    def read_stats(f_reset=False):
+        """
+        Reads and wall time callers were blocked on reads.
+
+        :param f_reset: Reset statistics after reading, defaults to False.
+        :type f_reset: bool, optional
+        :return: reads, prefetched (reads served by prefetch) and
+        time_blocked (seconds).
+        :rtype: dictionary
+
+        """
+        dict_out = dict(dict_read_stats)
+        if f_reset:
+            dict_read_stats.update(
+                {'reads': 0, 'prefetched': 0, 'time_blocked': 0.0})
+        return dict_out
+
     # *** CSV ***
     @staticmethod
     def read_csv(mode, config) -> pd.DataFrame:
+        """
+        Read data; data prefetched for the location (see IO.prefetch) is
+        used if available.
+            - local: csv file,
+            - local-arrow: memory mapped Arrow IPC (Feather V2) file of the
+              csv location (see utils.io_adopter.convert_arrow); csv if not
+              converted,
+            - azure-adls: file on ADLS.
+
+        :param mode: 'local', 'local-arrow' or 'azure-adls'.
+        :type mode: str
+        :param config: Location of the file.
+        :type config: dictionary
+        :raises ValueError: Unknown mode.
+        :return: Data.
+        :rtype: pandas DataFrame.
+
+        """
+        time_start = time.perf_counter()
+        pid, future = dict_prefetch.pop(
+            IO.location_key(mode, config), (None, None))
+        try:
+            if (future is not None) and (pid == os.getpid()):
+                dict_read_stats['prefetched'] += 1
+                return future.result()
+            return IO.read_csv_source(mode, config)
+        finally:
+            dict_read_stats['reads'] += 1
+            dict_read_stats['time_blocked'] += (
+                time.perf_counter() - time_start)
+
+    @staticmethod
+    def read_csv_source(mode, config) -> pd.DataFrame:
+        """
+        Read data from source, see IO.read_csv.
+
+        :param mode: 'local', 'local-arrow' or 'azure-adls'.
+        :type mode: str
+        :param config: Location of the file.
+        :type config: dictionary
+        :raises ValueError: Unknown mode.
+        :return: Data.
+        :rtype: pandas DataFrame.
+
+        """
 
         if mode == 'local':
-            return io_local.read_csv_local(config)
+            return IO.apply_dtype_schema(io_local.read_csv_local(config))
+        elif mode == 'local-arrow':
+            return IO.apply_dtype_schema(io_local.read_arrow_local(
+                config, IO.arrow_string_columns(), IO.string_dtype()))
         elif mode == 'azure-adls':
             logger.app_info(f'Mode {mode} is implemented')
             #logger.app_info(f'Mode {config} is fetched')
-            return IO.read_csv_adls(config)
+            return IO.apply_dtype_schema(IO.read_csv_adls(config))
         else:
             logger.app_info(f'Mode {mode} is not implemented')
             raise ValueError ('Not implemented or unknow mode')
 
     @staticmethod
-    def write_csv(mode, config, data):
+    def write_csv(mode, config, data, asynchronous=False):
         logger.app_info('inside write csv function IO module')
 
+        # Data prefetched before this write is outdated
+        _, future = dict_prefetch.pop(
+            IO.location_key(mode, config), (None, None))
+        if future is not None:
+            future.cancel()
+
+        if asynchronous:
+            return IO.write_csv_async(mode, config, data)
+
         if mode == 'local':
             return io_local.write_csv_local(config, data)
+        elif mode == 'local-arrow':
+            return io_local.write_arrow_local(config, data)
         elif mode == 'azure-adls':
             logger.app_info(f'data {data} is passed to io')
             logger.app_info(f'config {config} is fetched')
@@ -124,11 +472,116 @@ class IO():
             logger.app_info(f'Mode {mode} is not implemented')
             raise ValueError ('Not implemented or unknow mode')
 
+    @staticmethod
+    def append_csv(mode, config, data):
+        """
+        Append rows to csv so that only new rows are written; file is
+        created with header if it does not exist. Columns of data are
+        expected in order of the file.
+            - local: rows appended to csv,
+            - local-arrow: Arrow IPC files can not be appended; rows of
+              file and data are written,
+            - azure-adls: rows appended to file on ADLS.
+
+        :param mode: 'local', 'local-arrow' or 'azure-adls'.
+        :type mode: str
+        :param config: Location of the file.
+        :type config: dictionary
+        :param data: Rows to be appended.
+        :type data: pandas DataFrame.
+        :raises ValueError: Unknown mode.
+        :return: Status of the write.
+
+        """
+        # Data prefetched before this write is outdated
+        _, future = dict_prefetch.pop(
+            IO.location_key(mode, config), (None, None))
+        if future is not None:
+            future.cancel()
+
+        if mode == 'local':
+            return io_local.append_csv_local(config, data)
+        elif mode == 'local-arrow':
+            if os.path.exists(io_local.arrow_path(config)):
+                data = pd.concat(
+                    [io_local.read_arrow_local(config), data],
+                    ignore_index=True)
+            return io_local.write_arrow_local(config, data)
+        elif mode == 'azure-adls':
+            return IO.write_csv_adls(config, data, append=True)
+        else:
+            logger.app_info(f'Mode {mode} is not implemented')
+            raise ValueError ('Not implemented or unknow mode')
+
+    @staticmethod
+    def write_csv_async(mode, config, data):
+        """
+        Write csv in background so that exports (e.g. validation files) do
+        not block the pipeline. Data is not copied: it is handed over to the
+        write and must not be modified in place until the write completes;
+        callers modifying it later pass a copy. Number of pending writes is
+        bounded; IO.wait_writes needs to be called before pipeline ends.
+
+        :param mode: 'local', 'local-arrow' or 'azure-adls'.
+        :type mode: str
+        :param config: Location of the file.
+        :type config: dictionary
+        :param data: Data to be written.
+        :type data: pandas DataFrame.
+        :raises Exception: Raised if a pending write awaited to bound pending
+            writes failed.
+        :return: Future of the write.
+        :rtype: concurrent.futures.Future
+
+        """
+        max_pending = dict_write_mode.get('async', {}).get('max_pending', 4)
+        while len(ls_pending_writes) >= max_pending:
+            result = ls_pending_writes.pop(0).result()
+            # Writes to ADLS return the error instead of raising
+            if isinstance(result, Exception):
+                raise result
+
+        future = io_writer.submit(IO.write_csv, mode, config, data)
+        ls_pending_writes.append(future)
+        return future
+
+    @staticmethod
+    def wait_writes(raise_error=True):
+        """
+        Wait for all writes submitted in background.
+
+        :param raise_error: Raise first failure of writes after all writes
+            completed; failures are only logged otherwise e.g. when pipeline
+            already failed. Defaults to True.
+        :type raise_error: bool
+        :raises Exception: Raised if any of the writes failed.
+        :return: Results of the successful writes pending at the time of
+            call.
+        :rtype: list
+
+        """
+        ls_results = []
+        ls_errors = []
+        while ls_pending_writes:
+            try:
+                result = ls_pending_writes.pop(0).result()
+            except Exception as excp:
+                result = excp
+            # Writes to ADLS return the error instead of raising
+            if isinstance(result, Exception):
+                logger.app_info(f'Write in background failed: {result}')
+                ls_errors.append(result)
+            else:
+                ls_results.append(result)
+        if raise_error and ls_errors:
+            raise ls_errors[0]
+        return ls_results
+
     # *** JSON ***
     @staticmethod
     def read_json(mode, config):
 
-        if mode == 'local':
+        if mode in ['local', 'local-arrow']:
             return io_local.read_json_local(config)
         elif mode == 'azure-adls':
             return io_local.read_json_local(config)
@@ -14,6 +14,7 @@ import numpy as np
 import pandas as pd
 import pyarrow.parquet as pq
 
+from azure.core.exceptions import ResourceNotFoundError
 from azure.storage.filedatalake import DataLakeServiceClient
 from azure.identity import ClientSecretCredential
 from azure.identity import DefaultAzureCredential
@@ -22,11 +23,56 @@ from azure.keyvault.secrets import SecretClient
 # from azure.identity import ManagedIdentityCredential
 from azure.storage.filedatalake import DataLakeDirectoryClient
 from io import BytesIO
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import logging
 import json
 
 
+class AzureBackend:
+    """
+    Storage backend of adlsFunc: Azure Data Lake Storage Gen2 and Key Vault.
+
+    A backend provides:
+        - service_client(connection_string): DataLakeServiceClient like
+          client of the storage account
+        - secret_client(vault_url): SecretClient like client of key vault
+    utils.io_adopter.local_adls.LocalAdlsBackend is a local file system
+    stand-in with same interface.
+    """
+
+    def service_client(self, connection_string):
+        """
+        Client of storage account.
+
+        Parameters
+        ----------
+        connection_string : string.
+
+        Returns
+        -------
+        DataLakeServiceClient.
+        """
+        return DataLakeServiceClient.from_connection_string(
+            str(connection_string))
+
+    def secret_client(self, vault_url):
+        """
+        Client of key vault.
+
+        Parameters
+        ----------
+        vault_url : string.
+
+        Returns
+        -------
+        SecretClient.
+        """
+        credential = DefaultAzureCredential()
+        return SecretClient(vault_url=vault_url, credential=credential)
+
+
 class adlsFunc:
     """
     Process data on ADLS.
@@ -39,6 +85,17 @@ class adlsFunc:
         - Delete Files from ADLS
     """
 
+    def __init__(self, backend=None):
+        """
+        Initialize with storage backend.
+
+        Parameters
+        ----------
+        backend : AzureBackend like object, optional
+            Storage and key vault backend. The default is AzureBackend().
+        """
+        self.backend = AzureBackend() if backend is None else backend
+
     def read_credentials(self, ls_cred=[]):
         """
         Read the configurations related to ADLS and creates a dictionary.
@@ -60,8 +117,7 @@ class adlsFunc:
 
         try:
             # Setup Environment
-            credential = DefaultAzureCredential()
-            secret_client = SecretClient(vault_url=url_vault, credential=credential)
+            secret_client = self.backend.secret_client(url_vault)
         except Exception as e:
             print(f"Error: {str(e)}")
 
@@ -113,7 +169,8 @@ class adlsFunc:
             return e
 
     def input_file_read(
-        self, connection_string, container_name, file_name, directory_name="", sep=","
+        self, connection_string, container_name, file_name, directory_name="", sep=",",
+        **kwargs_csv
     ):
         """
         Read files stored on ADLS Gen 2.
@@ -125,6 +182,8 @@ class adlsFunc:
         directory_name : string, optional
           Sub-folder  within the container. Default is '' i.e file is stored in
           container.
+        kwargs_csv : optional parse settings of csv passed to pd.read_csv
+          e.g. dtype.
 
         Returns
         -------
@@ -135,9 +194,7 @@ class adlsFunc:
         try:
             # logging.disable(logging.CRITICAL)
             logging.info("inside input file read")
-            service_client = DataLakeServiceClient.from_connection_string(
-                str(connection_string)
-            )
+            service_client = self.backend.service_client(connection_string)
 
             container_client = service_client.get_file_system_client(
                 file_system=container_name
@@ -166,7 +223,7 @@ class adlsFunc:
             else:
                 # If it's not a Parquet file, attempt to read as CSV or Excel
                 try:
-                    out_df = pd.read_csv(BytesIO(downloaded_bytes), sep=sep)
+                    out_df = pd.read_csv(BytesIO(downloaded_bytes), sep=sep, **kwargs_csv)
                     logging.info("inside csv")
                 except Exception as csv_error:
                     return csv_error
@@ -184,10 +241,19 @@ class adlsFunc:
         output_container_name,
         output_file_name,
         output_directory_name="",
+        chunk_rows=100000,
+        max_concurrency=4,
+        append=False,
     ):
         """
         Export data to blob storage.
 
+        Data is encoded to CSV in chunks of rows and chunks are appended to
+        the file in parallel; at most 2 * max_concurrency encoded chunks are
+        held in memory. File is committed with single flush once all chunks
+        are uploaded. With append, rows are appended after the content of
+        an existing file (without header) instead of replacing it.
+
         Parameters
         ----------
         dataset : Pandas Data Frame.
@@ -197,6 +263,12 @@ class adlsFunc:
             DESCRIPTION.
         output_directory_name : string, optional
             DESCRIPTION. The default is ''.
+        chunk_rows : int, optional
+            Rows encoded per chunk. The default is 100000.
+        max_concurrency : int, optional
+            Parallel uploads of chunks. The default is 4.
+        append : bool, optional
+            Append rows to existing file. The default is False.
 
         Returns
         -------
@@ -205,31 +277,50 @@ class adlsFunc:
         try:
             # logging.disable(logging.CRITICAL)
             logging.info("inside class_adlsfunc output write")
-            dataset = dataset.replace("\n", "")
-            logging.info(f"dataset after replace \n: {dataset}")
-            service_client = DataLakeServiceClient.from_connection_string(
-                str(connection_string)
-            )
+            service_client = self.backend.service_client(connection_string)
             container_client = service_client.get_file_system_client(
                 file_system=output_container_name
             )
-            # data = bytes(dataset.to_csv(line_terminator='\n',index=False), encoding='utf-8')
-            data = dataset.to_csv(index=False).replace("\r\n", "\n").encode("utf-8")
-            #logging.info(f"data after converting to bytes: {data}")
             final_file = output_file_name + ".csv"
 
             if output_directory_name == "":
                 logging.info("output directory name empty")
-                output_file_client = container_client.create_file(final_file)
+                parent_client = container_client
             else:
-                directory_client = container_client.get_directory_client(
+                parent_client = container_client.get_directory_client(
                     output_directory_name
                 )
-                directory_client.create_directory()
-                output_file_client = directory_client.create_file(final_file)
 
-            output_file_client.append_data(data, 0, len(data))
-            output_file_client.flush_data(len(data))
+            # Appended rows start at the end of existing file
+            offset = 0
+            if append:
+                output_file_client = parent_client.get_file_client(final_file)
+                try:
+                    offset = output_file_client.get_file_properties().size
+                except ResourceNotFoundError:
+                    append = False
+
+            if not append:
+                if output_directory_name != "":
+                    parent_client.create_directory()
+                output_file_client = parent_client.create_file(final_file)
+
+            pending = deque()
+            max_pending = 2 * max(max_concurrency, 1)
+            with ThreadPoolExecutor(max_workers=max(max_concurrency, 1)) as executor:
+                for data in self.encode_csv_chunks(
+                        dataset, chunk_rows, header=not append):
+                    # Bounded buffers: wait for oldest upload
+                    if len(pending) >= max_pending:
+                        pending.popleft().result()
+                    pending.append(executor.submit(
+                        output_file_client.append_data, data, offset, len(data)))
+                    offset += len(data)
+
+                while pending:
+                    pending.popleft().result()
+
+            output_file_client.flush_data(offset)
 
             # logging.disable(logging.NOTSET)
 
@@ -239,6 +330,30 @@ class adlsFunc:
             logging.info("within exception of write class_adls func")
             return e
 
+    def encode_csv_chunks(self, dataset, chunk_rows=100000, header=True):
+        """
+        Encode data to CSV bytes in chunks of rows. Header is part of the
+        first chunk; concatenated chunks are same as encoding complete data.
+
+        Parameters
+        ----------
+        dataset : Pandas Data Frame.
+        chunk_rows : int, optional
+            Rows encoded per chunk. The default is 100000.
+        header : bool, optional
+            Encode header in first chunk. The default is True.
+
+        Yields
+        ------
+        bytes
+            Encoded chunk.
+        """
+        chunk_rows = max(int(chunk_rows), 1)
+        for start in range(0, max(dataset.shape[0], 1), chunk_rows):
+            chunk = dataset.iloc[start:start + chunk_rows].replace("\n", "")
+            yield chunk.to_csv(index=False, header=header and (start == 0)).replace(
+                "\r\n", "\n").encode("utf-8")
+
     def list_ADLS_directory_contents(
         self, connection_string, container_name, directory_name=""
     ):
@@ -261,9 +376,7 @@ class adlsFunc:
             # logging.disable(logging.CRITICAL)
 
             file_dict = {}
-            service_client = DataLakeServiceClient.from_connection_string(
-                str(connection_string)
-            )
+            service_client = self.backend.service_client(connection_string)
             file_system_client = service_client.get_file_system_client(
                 file_system=container_name
             )
@@ -307,9 +420,7 @@ class adlsFunc:
 
             today_date = datetime.today().strftime("%Y-%m-%d")
 
-            service_client = DataLakeServiceClient.from_connection_string(
-                str(connection_string)
-            )
+            service_client = self.backend.service_client(connection_string)
 
             file_system_client = service_client.get_file_system_client(
                 file_system=container_name
@@ -351,9 +462,7 @@ class adlsFunc:
             logging.disable(logging.CRITICAL)
 
             file_dict = {}
-            service_client = DataLakeServiceClient.from_connection_string(
-                str(connection_string)
-            )
+            service_client = self.backend.service_client(connection_string)
             file_system_client = service_client.get_file_system_client(
                 file_system=container_name
             )
@@ -417,9 +526,7 @@ class adlsFunc:
         try:
             logging.disable(logging.CRITICAL)
 
-            service_client = DataLakeServiceClient.from_connection_string(
-                str(connection_string)
-            )
+            service_client = self.backend.service_client(connection_string)
             container_client = service_client.get_file_system_client(
                 file_system=container_name
             )
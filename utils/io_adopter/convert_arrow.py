@@ -0,0 +1,104 @@
+"""@file convert_arrow.py
+
+
+
+@brief Convert csv drops to Arrow IPC (Feather V2) files of local-arrow mode.
+
+
+@details
+Every csv file under the given directories is parsed as in local mode and
+written next to it as <name>.feather, which IO reads memory mapped in
+local-arrow mode. Files whose feather file is newer than the csv are
+skipped unless forced.
+
+Usage (from repository root):
+    python -m utils.io_adopter.convert_arrow ./data ./results
+    python -m utils.io_adopter.convert_arrow ./references --sep "\t" \
+        --pattern AccountManagerListing.csv
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# %% ***** Setup Environment *****
+
+import argparse
+import fnmatch
+import os
+import traceback
+
+import utils.io_adopter.local as io_local
+from utils.logger import AppLogger
+
+logger = AppLogger(__name__)
+
+
+# %% ***** Convert *****
+
+def convert_directory(file_dir, pattern="*.csv", sep=",", encoding="utf-8",
+                      f_force=False):
+    """
+    Convert csv files of a directory (recursively) to feather files.
+    @param file_dir: directory with csv files
+    @param pattern: pattern of file names to be converted
+    @param sep: separator of csv files
+    @param encoding: encoding of csv files
+    @param f_force: convert files even if feather file is up to date
+    @return: dictionary of csv path and status i.e. converted, skipped or
+    failed
+    """
+    dict_status = {}
+    for dir_path, _, ls_files in os.walk(file_dir):
+        for file_name in sorted(fnmatch.filter(ls_files, pattern)):
+            if not file_name.lower().endswith(".csv"):
+                continue
+
+            config = {"file_dir": dir_path, "file_name": file_name,
+                      "sep": sep, "encoding": encoding}
+            csv_path = os.path.join(dir_path, file_name)
+            arrow_path = io_local.arrow_path(config)
+
+            if (not f_force) and os.path.exists(arrow_path) and (
+                    os.path.getmtime(arrow_path) >= os.path.getmtime(csv_path)):
+                dict_status[csv_path] = "skipped"
+                continue
+
+            try:
+                io_local.convert_csv_to_arrow(config)
+                dict_status[csv_path] = "converted"
+            except Exception:
+                # Continue with remaining files; failed file is read as csv
+                logger.app_fail(
+                    f"Convert {csv_path}", f"{traceback.print_exc()}")
+                dict_status[csv_path] = "failed"
+
+    return dict_status
+
+
+def main(ls_dir, pattern="*.csv", sep=",", encoding="utf-8", f_force=False):
+    dict_status = {}
+    for file_dir in ls_dir:
+        dict_status.update(convert_directory(
+            file_dir, pattern, sep, encoding, f_force))
+
+    for csv_path, status in dict_status.items():
+        print(f"{status:<10} {csv_path}")
+    return dict_status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert csv files to feather files of local-arrow mode")
+    parser.add_argument("dirs", nargs="+", help="directories with csv files")
+    parser.add_argument("--pattern", default="*.csv")
+    parser.add_argument("--sep", default=",")
+    parser.add_argument("--encoding", default="utf-8")
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+    main(args.dirs, args.pattern, args.sep.encode().decode("unicode_escape"),
+         args.encoding, args.force)
+
+# %%
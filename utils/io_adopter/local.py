@@ -14,7 +14,11 @@ here on. This technical information may not be reproduced or used without
 direct written permission from Eaton Corporation.
 """
 
+import io
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
 import os
 import traceback
 import json
@@ -51,10 +55,23 @@ def read_json_local(config):
 
 
 #  *** CSV ***
+def csv_parse_options(config):
+    """
+    Optional parse settings of a csv location passed to pd.read_csv i.e.
+    dtype (e.g. str to keep leading zeros of numeric text) and
+    keep_default_na.
+    @param config: config contains location of the file
+    @return: dictionary of keyword arguments of pd.read_csv
+    """
+    return {key: config[key] for key in ['dtype', 'keep_default_na']
+            if key in config}
+
+
 def read_csv_local(config):
     """
     Method to read csv file from local machine
-    @param config: config contains location of the file, filename and encoding
+    @param config: config contains location of the file, filename, encoding
+    and optional parse settings (see csv_parse_options)
     @return: pandas dataframe for the csv file
     """
     _step = f'Read csv : {config}'
@@ -70,7 +87,8 @@ def read_csv_local(config):
 
     try:
         file_path = os.path.join(file_dir, file_name)
-        data = pd.read_csv(file_path, sep=sep, encoding=encoding)
+        data = pd.read_csv(file_path, sep=sep, encoding=encoding,
+                           **csv_parse_options(config))
 
         logger.app_debug(f"{_step}: SUCCEED", 1)
         return data
@@ -101,4 +119,183 @@ def write_csv_local(config, data):
         logger.app_fail(_step, f"{traceback.print_exc()}")
         raise Exception from e
 
+
+def append_csv_local(config, data):
+    """
+    Method to append rows to csv file on local machine; header is written
+    only if file does not exist.
+    @param config: config contains location of the file and filename
+    @param data: pandas dataframe to be appended, columns in order of file
+    @return: status of the write
+    """
+    _step = f'Append csv : {config}'
+
+    try:
+        file_path = os.path.join(config['file_dir'], config['file_name'])
+    except Exception as e:
+        logger.app_fail("Required config not provided", 1)
+        raise ValueError from e
+
+    try:
+        data.to_csv(file_path, index=False, mode='a',
+                    header=not os.path.exists(file_path))
+
+        logger.app_debug(f"{_step}: SUCCEED", 1)
+        return 'successful !'
+
+    except Exception as e:
+        logger.app_fail(_step, f"{traceback.print_exc()}")
+        raise Exception from e
+
+
+#  *** Arrow ***
+def arrow_path(config):
+    """
+    Path of Arrow IPC (Feather V2) file of a csv location i.e. extension
+    .csv replaced by .feather.
+    @param config: config contains location of the file and filename
+    @return: path of feather file
+    """
+    file_path = os.path.join(config['file_dir'], config['file_name'])
+    return os.path.splitext(file_path)[0] + '.feather'
+
+
+def read_arrow_local(config, ls_string_cols=(), dtype_str=None):
+    """
+    Method to read data from memory mapped Arrow IPC (Feather V2) file;
+    csv is read if file is not converted yet. Numeric columns without nulls
+    and string columns in ls_string_cols (as arrow backed strings) refer to
+    the mapped file without copy, so processes reading same file share one
+    physical copy.
+    @param config: config contains location of the file, filename and encoding
+    @param ls_string_cols: string columns to be kept as arrow backed strings
+    @param dtype_str: arrow backed string dtype of ls_string_cols, defaults
+    to pd.StringDtype("pyarrow")
+    @return: pandas dataframe for the file
+    """
+    _step = f'Read arrow : {config}'
+    try:
+        file_path = arrow_path(config)
+    except Exception as e:
+        logger.app_fail("Required config not provided", 1)
+        raise ValueError from e
+
+    if not os.path.exists(file_path):
+        logger.app_debug(f"{_step}: not converted, reading csv", 1)
+        return read_csv_local(config)
+
+    try:
+        # Mapping is released once table / data is released
+        table = pa.ipc.open_file(pa.memory_map(file_path, 'r')).read_all()
+
+        ls_arrow = [
+            col for col in ls_string_cols
+            if col in table.column_names
+            and pa.types.is_string(table.schema.field(col).type)]
+        ls_cols = table.column_names
+
+        data = table.drop_columns(ls_arrow).to_pandas(split_blocks=True)
+        for col in data.columns[data.dtypes == object]:
+            # Missing text is NaN as in csv
+            if table[col].null_count > 0:
+                data[col] = data[col].where(pd.notna(data[col]), np.nan)
+        for col in ls_arrow:
+            if dtype_str is None:
+                data[col] = pd.arrays.ArrowStringArray(table[col])
+            else:
+                data[col] = pd.array(table[col], dtype=dtype_str)
+        data = data[ls_cols]
+
+        logger.app_debug(f"{_step}: SUCCEED", 1)
+        return data
+
+    except Exception as e:
+        logger.app_fail(_step, f"{traceback.print_exc()}")
+        raise Exception from e
+
+
+def arrow_compatible(data):
+    """
+    Text columns mixing types (e.g. numbers and strings) can not be stored
+    in arrow; values of such columns are stored as strings as in csv.
+    @param data: pandas dataframe
+    @return: pandas dataframe which can be converted to arrow
+    """
+    data = data.copy(deep=False)
+    for col in data.columns[data.dtypes == object]:
+        try:
+            pa.array(data[col], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            data[col] = data[col].where(
+                pd.isna(data[col]), data[col].astype(str))
+    return data
+
+
+def parse_as_csv(data, config=None):
+    """
+    Data as read back from csv written by write_csv_local i.e. values
+    written as text and types inferred by pd.read_csv (dates as strings,
+    numeric text as numbers), so that local and local-arrow modes read the
+    same data.
+    @param data: pandas dataframe
+    @param config: config with optional parse settings (see
+    csv_parse_options)
+    @return: pandas dataframe parsed from csv of data
+    """
+    buffer = io.StringIO()
+    data.to_csv(buffer, index=False)
+    buffer.seek(0)
+    return pd.read_csv(buffer, **csv_parse_options(config or {}))
+
+
+def write_arrow_local(config, data, parsed=False):
+    """
+    Method to write data to uncompressed Arrow IPC (Feather V2) file so that
+    it can be memory mapped. Data is normalized as csv (see parse_as_csv)
+    unless already parsed from csv. File is written aside and replaced,
+    processes mapping the previous file keep reading it.
+    @param config: config contains location of the file and filename
+    @param data: pandas dataframe to be written
+    @param parsed: data is read from csv by read_csv_local
+    @return: status of the write
+    """
+    _step = f'Write arrow : {config}'
+
+    try:
+        file_path = arrow_path(config)
+    except Exception as e:
+        logger.app_fail("Required config not provided", 1)
+        raise ValueError from e
+
+    try:
+        temp_path = f"{file_path}.{os.getpid()}.tmp"
+        if parsed:
+            data = data.reset_index(drop=True)
+        else:
+            data = parse_as_csv(data, config)
+        try:
+            feather.write_feather(data, temp_path, compression='uncompressed')
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            feather.write_feather(
+                arrow_compatible(data), temp_path, compression='uncompressed')
+        os.replace(temp_path, file_path)
+
+        logger.app_debug(f"{_step}: SUCCEED", 1)
+        return 'successful !'
+
+    except Exception as e:
+        logger.app_fail(_step, f"{traceback.print_exc()}")
+        raise Exception from e
+
+
+def convert_csv_to_arrow(config):
+    """
+    Convert csv file to Arrow IPC (Feather V2) file placed next to it. Data
+    is parsed as in read_csv_local so both modes read the same data.
+    @param config: config contains location of the file, filename and encoding
+    @return: path of feather file
+    """
+    write_arrow_local(config, read_csv_local(config), parsed=True)
+    return arrow_path(config)
+
 # %%
@@ -0,0 +1,472 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""@file local_adls.py
+
+
+
+@brief Local file system stand-in for ADLS Gen2 and Key Vault.
+
+
+@details
+LocalAdlsBackend has the interface of AzureBackend (class_adlsFunc) and
+emulates the part of the Azure SDK used by adlsFunc on a local directory:
+    - file systems (containers) are sub directories of root_dir,
+    - directories, get_paths with last_modified (second resolution as on
+      ADLS), ranged downloads,
+    - append_data / flush_data: appended data is not visible until flushed;
+      data appended to an existing file follows its content,
+    - secrets of key vault from a dictionary.
+
+Each request waits for latency and transfer of data waits for
+size / bandwidth, so I/O optimizations can be measured without cloud. Calls,
+bytes and time of every operation are collected in stats.
+
+Example:
+    backend = LocalAdlsBackend("/tmp/adls", latency=0.02, bandwidth=50e6,
+                               secrets={"IB-St-Connection-String": "local"})
+    IO.set_adls_backend(backend)
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# %% ***** Setup Environment *****
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+
+# Results per page of get_paths
+PAGE_SIZE_PATHS = 5000
+
+
+# %% ***** Backend *****
+
+class LocalAdlsBackend:
+    """
+    Local file system backend of adlsFunc with latency and bandwidth
+    injection.
+    """
+
+    def __init__(self, root_dir, latency=0.0, bandwidth=None, secrets=None):
+        """
+        Initialize backend.
+
+        Parameters
+        ----------
+        root_dir : string
+            Directory holding file systems.
+        latency : float, optional
+            Seconds per request. The default is 0.
+        bandwidth : float, optional
+            Bytes per second of transfers; None is unlimited. The default
+            is None.
+        secrets : dictionary, optional
+            Secrets of key vault. The default is None.
+        """
+        self.root_dir = root_dir
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.secrets = dict(secrets or {})
+
+        self.stats = {}
+        self.staged = {}
+        self.lock = threading.Lock()
+
+    # *** Interface ***
+
+    def service_client(self, connection_string):
+        """
+        Client of storage account; connection string is not used.
+
+        Returns
+        -------
+        LocalServiceClient.
+        """
+        return LocalServiceClient(self)
+
+    def secret_client(self, vault_url):
+        """
+        Client of key vault; vault url is not used.
+
+        Returns
+        -------
+        LocalSecretClient.
+        """
+        return LocalSecretClient(self)
+
+    # *** Emulation ***
+
+    def request(self, op, n_bytes=0):
+        """
+        Wait for latency of a request and transfer of n_bytes; record stats.
+
+        Parameters
+        ----------
+        op : string
+            Operation e.g. download_file.
+        n_bytes : int, optional
+            Bytes transferred. The default is 0.
+        """
+        wait = self.latency
+        if self.bandwidth:
+            wait += n_bytes / self.bandwidth
+        if wait > 0:
+            time.sleep(wait)
+
+        with self.lock:
+            dict_op = self.stats.setdefault(
+                op, {"calls": 0, "bytes": 0, "time": 0.0})
+            dict_op["calls"] += 1
+            dict_op["bytes"] += n_bytes
+            dict_op["time"] += wait
+
+    def reset_stats(self):
+        """Clear collected stats."""
+        with self.lock:
+            self.stats = {}
+
+    def create_file_system(self, file_system):
+        """
+        Create file system (container).
+
+        Parameters
+        ----------
+        file_system : string.
+
+        Returns
+        -------
+        LocalFileSystemClient.
+        """
+        return LocalServiceClient(self).create_file_system(file_system)
+
+    def local_path(self, file_system, path=""):
+        """
+        Local path of a path within file system.
+
+        Parameters
+        ----------
+        file_system : string.
+        path : string, optional
+            Path within file system. The default is ''.
+
+        Returns
+        -------
+        string.
+        """
+        ls_parts = [part for part in str(path).split("/") if part != ""]
+        return os.path.join(self.root_dir, file_system, *ls_parts)
+
+
+# %% ***** Clients *****
+
+def join_path(*ls_path):
+    """Join ADLS path parts with '/'."""
+    return "/".join(
+        part.strip("/") for part in ls_path if part.strip("/") != "")
+
+
+def last_modified(local_path):
+    """Last modified time of a local path in second resolution (UTC)."""
+    return datetime.fromtimestamp(
+        int(os.path.getmtime(local_path)), tz=timezone.utc)
+
+
+class LocalPathProperties:
+    """Properties of a path returned by get_paths."""
+
+    def __init__(self, name, last_modified, is_directory, content_length):
+        self.name = name
+        self.last_modified = last_modified
+        self.is_directory = is_directory
+        self.content_length = content_length
+        # Size as in properties of get_file_properties
+        self.size = content_length
+
+
+class LocalServiceClient:
+    """DataLakeServiceClient stand-in."""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def get_file_system_client(self, file_system):
+        return LocalFileSystemClient(self.backend, file_system)
+
+    def create_file_system(self, file_system):
+        self.backend.request("create_file_system")
+        os.makedirs(self.backend.local_path(file_system), exist_ok=True)
+        return self.get_file_system_client(file_system)
+
+
+class LocalFileSystemClient:
+    """FileSystemClient stand-in."""
+
+    def __init__(self, backend, file_system):
+        self.backend = backend
+        self.file_system_name = file_system
+
+    def exists(self):
+        return os.path.isdir(self.backend.local_path(self.file_system_name))
+
+    def get_directory_client(self, directory):
+        return LocalDirectoryClient(
+            self.backend, self.file_system_name, join_path(directory))
+
+    def get_file_client(self, file_path):
+        return LocalFileClient(
+            self.backend, self.file_system_name, join_path(file_path))
+
+    def create_file(self, file):
+        file_client = self.get_file_client(file)
+        file_client.create_file()
+        return file_client
+
+    def get_paths(self, path=None, recursive=True, max_results=None):
+        """
+        Paths (files and directories) under path in lexicographic order.
+
+        Raises
+        ------
+        ResourceNotFoundError
+            If file system or path does not exist.
+        """
+        path = join_path(path or "")
+        local_dir = self.backend.local_path(self.file_system_name, path)
+        if not os.path.isdir(local_dir):
+            self.backend.request("get_paths")
+            raise ResourceNotFoundError(
+                f"The specified path does not exist: {path}")
+
+        ls_paths = []
+        for dir_path, ls_dirs, ls_files in os.walk(local_dir):
+            rel_dir = os.path.relpath(dir_path, local_dir)
+            rel_dir = "" if rel_dir == "." else rel_dir.replace(os.sep, "/")
+            for name in ls_dirs + ls_files:
+                local_path = os.path.join(dir_path, name)
+                f_dir = os.path.isdir(local_path)
+                ls_paths.append(LocalPathProperties(
+                    name=join_path(path, rel_dir, name),
+                    last_modified=last_modified(local_path),
+                    is_directory=f_dir,
+                    content_length=0 if f_dir else os.path.getsize(local_path)))
+            if not recursive:
+                break
+
+        ls_paths = sorted(ls_paths, key=lambda x: x.name)
+        if max_results is not None:
+            ls_paths = ls_paths[:max_results]
+
+        for _ in range(max(1, -(-len(ls_paths) // PAGE_SIZE_PATHS))):
+            self.backend.request("get_paths")
+        return ls_paths
+
+
+class LocalDirectoryClient:
+    """DataLakeDirectoryClient stand-in."""
+
+    def __init__(self, backend, file_system, path):
+        self.backend = backend
+        self.file_system_name = file_system
+        self.path_name = path
+
+    def create_directory(self):
+        self.backend.request("create_directory")
+        if not os.path.isdir(self.backend.local_path(self.file_system_name)):
+            raise ResourceNotFoundError(
+                f"The specified filesystem does not exist: "
+                f"{self.file_system_name}")
+        os.makedirs(self.backend.local_path(
+            self.file_system_name, self.path_name), exist_ok=True)
+
+    def get_file_client(self, file):
+        return LocalFileClient(
+            self.backend, self.file_system_name,
+            join_path(self.path_name, file))
+
+    def create_file(self, file):
+        file_client = self.get_file_client(file)
+        file_client.create_file()
+        return file_client
+
+
+class LocalDownloader:
+    """StorageStreamDownloader stand-in."""
+
+    def __init__(self, data):
+        self.data = data
+        self.size = len(data)
+
+    def readall(self):
+        return self.data
+
+
+class LocalFileClient:
+    """DataLakeFileClient stand-in."""
+
+    def __init__(self, backend, file_system, path):
+        self.backend = backend
+        self.file_system_name = file_system
+        self.path_name = path
+        self.local_path = backend.local_path(file_system, path)
+
+    def key(self):
+        return (self.file_system_name, self.path_name)
+
+    def check_exists(self):
+        if not os.path.isfile(self.local_path):
+            raise ResourceNotFoundError(
+                f"The specified path does not exist: {self.path_name}")
+
+    def create_file(self):
+        """Create (or truncate) file; parent directories are created."""
+        self.backend.request("create_file")
+        if not os.path.isdir(self.backend.local_path(self.file_system_name)):
+            raise ResourceNotFoundError(
+                f"The specified filesystem does not exist: "
+                f"{self.file_system_name}")
+        if os.path.isdir(self.local_path):
+            raise ResourceExistsError(
+                f"The specified path is a directory: {self.path_name}")
+
+        os.makedirs(os.path.dirname(self.local_path), exist_ok=True)
+        with self.backend.lock:
+            self.backend.staged[self.key()] = {}
+            open(self.local_path, "wb").close()
+
+    def get_file_properties(self):
+        self.backend.request("get_file_properties")
+        self.check_exists()
+        return LocalPathProperties(
+            name=self.path_name,
+            last_modified=last_modified(self.local_path),
+            is_directory=False,
+            content_length=os.path.getsize(self.local_path))
+
+    def download_file(self, offset=None, length=None):
+        """
+        Download file or range of file.
+
+        Parameters
+        ----------
+        offset : int, optional
+            Start of range. The default is None i.e. 0.
+        length : int, optional
+            Bytes of range. The default is None i.e. till end of file.
+
+        Returns
+        -------
+        LocalDownloader.
+        """
+        self.check_exists()
+        with open(self.local_path, "rb") as file:
+            file.seek(offset or 0)
+            data = file.read() if length is None else file.read(length)
+
+        self.backend.request("download_file", len(data))
+        return LocalDownloader(data)
+
+    def append_data(self, data, offset, length=None):
+        """Stage data at offset; not visible until flush_data."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        data = bytes(data if length is None else data[:length])
+
+        self.backend.request("append_data", len(data))
+        with self.backend.lock:
+            if self.key() not in self.backend.staged:
+                # Existing file: data is appended after its content
+                self.check_exists()
+                self.backend.staged[self.key()] = {}
+            self.backend.staged[self.key()][offset] = data
+
+    def flush_data(self, offset, retain_uncommitted_data=False):
+        """
+        Commit staged data; staged data should cover [size of file, offset)
+        without gaps i.e. data is appended to committed content.
+
+        Raises
+        ------
+        ValueError
+            If staged data does not match offset.
+        """
+        self.backend.request("flush_data")
+        with self.backend.lock:
+            dict_staged = self.backend.staged.get(self.key(), {})
+
+            position = os.path.getsize(self.local_path) \
+                if os.path.isfile(self.local_path) else 0
+            ls_data = []
+            if position > 0:
+                with open(self.local_path, "rb") as file:
+                    ls_data.append(file.read())
+            for start in sorted(dict_staged):
+                if start != position:
+                    raise ValueError(
+                        f"Invalid flush position {offset}: data missing "
+                        f"at {position} of {self.path_name}")
+                ls_data.append(dict_staged[start])
+                position += len(dict_staged[start])
+            if position != offset:
+                raise ValueError(
+                    f"Invalid flush position {offset}: {position} bytes "
+                    f"appended to {self.path_name}")
+
+            temp_path = self.local_path + ".flush"
+            with open(temp_path, "wb") as file:
+                file.write(b"".join(ls_data))
+            os.replace(temp_path, self.local_path)
+
+            if not retain_uncommitted_data:
+                self.backend.staged[self.key()] = {}
+
+    def upload_data(self, data, overwrite=False):
+        """Create file with data (create, append and flush)."""
+        if (not overwrite) and os.path.isfile(self.local_path):
+            raise ResourceExistsError(
+                f"The specified path already exists: {self.path_name}")
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self.create_file()
+        self.append_data(data, 0, len(data))
+        self.flush_data(len(data))
+
+    def delete_file(self):
+        self.backend.request("delete_file")
+        self.check_exists()
+        os.remove(self.local_path)
+        with self.backend.lock:
+            self.backend.staged.pop(self.key(), None)
+
+    def _delete(self):
+        self.delete_file()
+
+
+class LocalSecret:
+    """KeyVaultSecret stand-in."""
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+
+class LocalSecretClient:
+    """SecretClient stand-in."""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def get_secret(self, name):
+        self.backend.request("get_secret")
+        if name not in self.backend.secrets:
+            raise ResourceNotFoundError(f"Secret not found: {name}")
+        return LocalSecret(name, self.backend.secrets[name])
+
+
+# %%
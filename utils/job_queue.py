@@ -0,0 +1,674 @@
+"""@file job_queue.py
+
+
+
+@brief File backed queue of pipeline runs requested over HTTP.
+
+
+@details
+HTTP triggers enqueue a run and return its job id instead of running the
+pipeline within the request. Each job is a json file of the queue (config:
+jobs) with status (queued, running, succeeded,
+failed), timings and progress of pipeline stages. Worker (Jobs-TimerTrigger
+or python -m utils.job_queue) claims queued jobs in order of submission and
+runs them.
+
+Identical requests (same pipeline and parameters) submitted while a run is
+queued or running share the job (single-flight) i.e. pipeline is run once.
+
+A running job holds a lease renewed by its worker (config:
+jobs.lease_duration). If the worker dies (function timeout, host recycled) the
+lease expires; the job is queued again, or failed after jobs.max_attempts,
+and is not joined by later requests.
+
+Jobs are kept where every instance of the function app sees them: files of
+a directory of the storage account (AdlsJobStore, azure-adls mode) or of
+local disk (LocalJobStore, local mode and tests).
+
+Stage progress is collected from steps logged by AppLogger (app_success /
+app_fail) while the job runs.
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# %% ***** Setup Environment *****
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import socket
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime, timezone
+
+from utils.logger import AppLogger
+
+logger = AppLogger(__name__)
+
+# Status of jobs yet to be completed
+LS_STATUS_ACTIVE = ['queued', 'running']
+
+
+# %% ***** Stage progress *****
+
+class StageRecorder:
+    """
+    Records steps logged by AppLogger (app_success / app_fail) as stages of
+    a job.
+    """
+
+    def __init__(self, queue, job_id, claim_id=None):
+        self.queue = queue
+        self.job_id = job_id
+        self.claim_id = claim_id
+        self.time_last = time.time()
+
+    def __call__(self, step, status):
+        time_now = time.time()
+        self.queue.update(self.job_id, claim_id=self.claim_id, stage={
+            'step': step, 'status': status, 'at': timestamp(time_now),
+            'duration': round(time_now - self.time_last, 3)})
+        self.time_last = time_now
+
+
+def timestamp(time_sec=None):
+    """
+    ISO timestamp (UTC).
+
+    :param time_sec: Seconds since epoch, defaults to now.
+    :type time_sec: float, optional
+    :return: Timestamp.
+    :rtype: str
+
+    """
+    time_sec = time.time() if time_sec is None else time_sec
+    return datetime.fromtimestamp(time_sec, tz=timezone.utc).isoformat()
+
+
+# %% ***** Job stores *****
+
+class LocalJobStore:
+    """
+    Job files in a directory of local file system (local mode, tests).
+    """
+
+    def __init__(self, queue_dir, lock_timeout=30):
+        """
+        Initialize store.
+
+        :param queue_dir: Directory of job files.
+        :type queue_dir: str
+        :param lock_timeout: Seconds after which lock of a crashed process
+        is broken, defaults to 30.
+        :type lock_timeout: int, optional
+
+        """
+        self.queue_dir = queue_dir
+        self.lock_timeout = lock_timeout
+        self.lock_path = os.path.join(queue_dir, '.lock')
+        os.makedirs(queue_dir, exist_ok=True)
+
+    def job_path(self, job_id):
+        return os.path.join(self.queue_dir, f'{job_id}.json')
+
+    def read_job(self, job_id):
+        try:
+            with open(self.job_path(job_id), 'r') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+    def write_job(self, job):
+        # Readers never see partially written job
+        path_tmp = self.job_path(job['job_id']) + \
+            f'.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(path_tmp, 'w') as file:
+            json.dump(job, file, indent=2)
+        os.replace(path_tmp, self.job_path(job['job_id']))
+
+    def list_jobs(self):
+        ls_jobs = []
+        for path in glob.glob(os.path.join(self.queue_dir, '*.json')):
+            try:
+                with open(path, 'r') as file:
+                    ls_jobs.append(json.load(file))
+            except (OSError, ValueError):
+                continue
+        return ls_jobs
+
+    def lock(self):
+        """
+        Acquire lock of queue (lock file created exclusively). Lock older
+        than lock_timeout is of a crashed process and is broken.
+        """
+        while True:
+            try:
+                os.close(os.open(
+                    self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.lock_path) > \
+                            self.lock_timeout:
+                        os.remove(self.lock_path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                time.sleep(0.01)
+
+    def unlock(self):
+        try:
+            os.remove(self.lock_path)
+        except FileNotFoundError:
+            pass
+
+
+class AdlsJobStore:
+    """
+    Job files in a directory of the storage account (azure-adls mode), so
+    that HTTP triggers and the worker share the queue across instances.
+    Queue is locked by a lease of utils.run_coordinator backends.
+    """
+
+    def __init__(self, file_system_client, directory_name, lease_backend,
+                 lock_timeout=30, poll_interval=0.1):
+        """
+        Initialize store.
+
+        :param file_system_client: Client of container (file system) of
+        io_adls backend.
+        :param directory_name: Directory of job files.
+        :type directory_name: str
+        :param lease_backend: BlobLeaseBackend (or LocalLeaseBackend) of
+        lock.
+        :param lock_timeout: Seconds after which lock of a crashed process
+        expires, defaults to 30.
+        :type lock_timeout: int, optional
+        :param poll_interval: Seconds between attempts to lock, defaults to
+        0.1.
+        :type poll_interval: float, optional
+
+        """
+        self.file_system_client = file_system_client
+        self.directory_name = directory_name.strip('/')
+        self.lease_backend = lease_backend
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self.lease_id = None
+
+    def file_client(self, job_id):
+        return self.file_system_client.get_file_client(
+            f'{self.directory_name}/{job_id}.json')
+
+    def read_job(self, job_id):
+        from azure.core.exceptions import ResourceNotFoundError
+
+        try:
+            return json.loads(
+                self.file_client(job_id).download_file().readall())
+        except ResourceNotFoundError:
+            return None
+
+    def write_job(self, job):
+        self.file_client(job['job_id']).upload_data(
+            json.dumps(job, indent=2).encode('utf-8'), overwrite=True)
+
+    def list_jobs(self):
+        from azure.core.exceptions import ResourceNotFoundError
+
+        try:
+            ls_paths = self.file_system_client.get_paths(
+                path=self.directory_name, recursive=False)
+        except ResourceNotFoundError:
+            return []
+
+        ls_jobs = []
+        for path in ls_paths:
+            if path.is_directory or (not path.name.endswith('.json')):
+                continue
+            job = self.read_job(path.name.split('/')[-1][:-len('.json')])
+            if job is not None:
+                ls_jobs.append(job)
+        return ls_jobs
+
+    def lock(self):
+        while True:
+            lease_id = self.lease_backend.acquire('jobs', self.lock_timeout)
+            if lease_id is not None:
+                self.lease_id = lease_id
+                return
+            time.sleep(self.poll_interval)
+
+    def unlock(self):
+        self.lease_backend.release('jobs', self.lease_id)
+
+
+# %% ***** Queue *****
+
+class JobQueue:
+    """
+    Queue of pipeline runs on a job store. A running job holds a lease
+    renewed by its worker; job whose lease expired (worker crashed or timed
+    out) is queued again, or failed after max_attempts, and never joined.
+    """
+
+    def __init__(self, store, lease_duration=300, max_attempts=2):
+        """
+        Initialize queue.
+
+        :param store: LocalJobStore or AdlsJobStore.
+        :param lease_duration: Seconds till lease of a running job expires
+        unless renewed, defaults to 300.
+        :type lease_duration: float, optional
+        :param max_attempts: Runs of a job before a job whose lease expired
+        is failed, defaults to 2.
+        :type max_attempts: int, optional
+
+        """
+        self.store = store
+        self.lease_duration = lease_duration
+        self.max_attempts = max_attempts
+
+    @classmethod
+    def from_config(cls, config, mode=None):
+        """
+        Initialize queue from jobs settings of config_dcpd.json; job files
+        on the storage account for azure-adls mode, else on local disk.
+
+        :param config: Project configuration.
+        :type config: dictionary
+        :param mode: IO mode, defaults to conf.env of config.
+        :type mode: str, optional
+        :return: Queue.
+        :rtype: JobQueue
+
+        """
+        dict_jobs = config.get('jobs', {})
+        lock_timeout = dict_jobs.get('lock_timeout', 30)
+
+        mode = config.get('conf.env', 'azure-adls') if mode is None else mode
+        if mode == 'azure-adls':
+            from utils.io import io_adls
+            from utils.run_coordinator import BlobLeaseBackend
+
+            key = config['file']['Processed']['adls_credentials'][
+                'connection_string']
+            connection_string = io_adls.read_credentials([key])[
+                key.replace('-', '_')]
+            store = AdlsJobStore(
+                io_adls.backend.service_client(
+                    connection_string).get_file_system_client(
+                    dict_jobs['container_name']),
+                dict_jobs['directory_name'],
+                BlobLeaseBackend(connection_string,
+                                 dict_jobs['container_name'],
+                                 dict_jobs['directory_name']),
+                lock_timeout)
+        else:
+            store = LocalJobStore(
+                dict_jobs.get('dir', './results/jobs'), lock_timeout)
+
+        return cls(store, dict_jobs.get('lease_duration', 300),
+                   dict_jobs.get('max_attempts', 2))
+
+    # ***** Storage *****
+
+    def read_job(self, job_id):
+        """
+        Read job.
+
+        :param job_id: Job id.
+        :type job_id: str
+        :return: Job, None if job does not exist.
+        :rtype: dictionary
+
+        """
+        if not re.fullmatch(r'[0-9a-f]{32}', str(job_id)):
+            return None
+        return self.store.read_job(job_id)
+
+    def write_job(self, job):
+        self.store.write_job(job)
+
+    def list_jobs(self):
+        """
+        Jobs in order of submission.
+
+        :return: Jobs.
+        :rtype: list of dictionaries
+
+        """
+        return sorted(self.store.list_jobs(),
+                      key=lambda job: job['submitted'])
+
+    def lock(self):
+        self.store.lock()
+
+    def unlock(self):
+        self.store.unlock()
+
+    # ***** Leases *****
+
+    def is_expired(self, job, time_now=None):
+        """Job is running and its lease was not renewed in time."""
+        time_now = time.time() if time_now is None else time_now
+        return (job['status'] == 'running') and (
+            (job.get('lease_expires') or 0) < time_now)
+
+    def recover_expired(self, ls_jobs):
+        """
+        Queue again (or fail after max_attempts) running jobs whose lease
+        expired; queue is locked by caller.
+
+        :param ls_jobs: Jobs.
+        :type ls_jobs: list of dictionaries
+        :return: Jobs after recovery.
+        :rtype: list of dictionaries
+
+        """
+        time_now = time.time()
+        for job in ls_jobs:
+            if not self.is_expired(job, time_now):
+                continue
+            dict_lost = {'claim_id': None, 'lease_expires': None,
+                         'error': f"Lease expired: worker {job.get('worker')}"}
+            if job.get('attempts', 1) < self.max_attempts:
+                job.update(status='queued', started=None, **dict_lost)
+                logger.app_info(f"Job {job['job_id']}: lease expired, queued")
+            else:
+                job.update(status='failed', ended=timestamp(time_now),
+                           **dict_lost)
+                logger.app_info(f"Job {job['job_id']}: lease expired, failed")
+            self.write_job(job)
+        return ls_jobs
+
+    def recover(self):
+        """
+        Recover jobs whose lease expired.
+
+        :return: Jobs recovered.
+        :rtype: list of dictionaries
+
+        """
+        self.lock()
+        try:
+            ls_jobs = [job for job in self.list_jobs()
+                       if self.is_expired(job)]
+            return self.recover_expired(ls_jobs)
+        finally:
+            self.unlock()
+
+    # ***** Jobs *****
+
+    @staticmethod
+    def request_key(pipeline, params):
+        """
+        Key of request; identical requests have same key.
+
+        :param pipeline: Name of pipeline e.g. contracts.
+        :type pipeline: str
+        :param params: Parameters of run.
+        :type params: dictionary
+        :return: Key.
+        :rtype: str
+
+        """
+        return hashlib.sha1(json.dumps(
+            [pipeline, params], sort_keys=True, default=str).encode(
+                'utf-8')).hexdigest()
+
+    def submit(self, pipeline, params=None):
+        """
+        Enqueue a run of pipeline. If identical run is queued or running,
+        its job is returned instead.
+
+        :param pipeline: Name of pipeline e.g. contracts.
+        :type pipeline: str
+        :param params: Parameters of run, defaults to None.
+        :type params: dictionary, optional
+        :return: Job and whether job was created by this request.
+        :rtype: tuple of dictionary and bool
+
+        """
+        params = {} if params is None else params
+        key = self.request_key(pipeline, params)
+
+        self.lock()
+        try:
+            for job in self.recover_expired(self.list_jobs()):
+                if (job['key'] == key) and (job['status'] in LS_STATUS_ACTIVE):
+                    job['n_requests'] += 1
+                    self.write_job(job)
+                    logger.app_info(f"Job {job['job_id']}: joined request")
+                    return job, False
+
+            job = {'job_id': uuid.uuid4().hex, 'pipeline': pipeline,
+                   'params': params, 'key': key, 'status': 'queued',
+                   'n_requests': 1, 'submitted': timestamp(),
+                   'attempts': 0, 'claim_id': None, 'worker': None,
+                   'lease_expires': None,
+                   'started': None, 'ended': None, 'duration': None,
+                   'stages': [], 'result': None, 'error': None}
+            self.write_job(job)
+        finally:
+            self.unlock()
+
+        logger.app_info(f"Job {job['job_id']}: {pipeline} queued")
+        return job, True
+
+    def update(self, job_id, stage=None, claim_id=None, **kwargs):
+        """
+        Update job.
+
+        :param job_id: Job id.
+        :type job_id: str
+        :param stage: Stage to be appended to progress, defaults to None.
+        :type stage: dictionary, optional
+        :param claim_id: Claim of the run updating the job; job claimed by
+        other run is not updated, defaults to None i.e. not checked.
+        :type claim_id: str, optional
+        :param kwargs: Fields of job to be updated e.g. status.
+        :return: Job, None if claim of the run is lost.
+        :rtype: dictionary
+
+        """
+        self.lock()
+        try:
+            job = self.read_job(job_id)
+            if (claim_id is not None) and (job['claim_id'] != claim_id):
+                return None
+            if stage is not None:
+                job['stages'].append(stage)
+            job.update(kwargs)
+            self.write_job(job)
+        finally:
+            self.unlock()
+        return job
+
+    def claim(self):
+        """
+        Claim oldest queued job for a run; the run holds a lease on the job
+        till it ends.
+
+        :return: Job marked as running, None if no job is queued.
+        :rtype: dictionary
+
+        """
+        self.lock()
+        try:
+            for job in self.recover_expired(self.list_jobs()):
+                if job['status'] == 'queued':
+                    job.update(
+                        status='running', started=timestamp(),
+                        claim_id=uuid.uuid4().hex,
+                        worker=f'{socket.gethostname()}:{os.getpid()}',
+                        attempts=job.get('attempts', 0) + 1,
+                        lease_expires=time.time() + self.lease_duration)
+                    self.write_job(job)
+                    return job
+        finally:
+            self.unlock()
+        return None
+
+    def run_job(self, job, dict_pipelines):
+        """
+        Run a claimed job; steps logged by the pipeline are recorded as
+        stages and lease of the job is renewed in background till run ends.
+
+        :param job: Job claimed for run.
+        :type job: dictionary
+        :param dict_pipelines: Functions running pipeline by name; called
+        with parameters of job.
+        :type dict_pipelines: dictionary
+        :return: Job after run.
+        :rtype: dictionary
+
+        """
+        _step = f"Run job {job['job_id']}: {job['pipeline']}"
+        recorder = StageRecorder(self, job['job_id'], job['claim_id'])
+        AppLogger.ls_step_listeners.append(recorder)
+
+        event_stop = threading.Event()
+
+        def renew():
+            while not event_stop.wait(self.lease_duration / 3):
+                if self.update(job['job_id'], claim_id=job['claim_id'],
+                               lease_expires=time.time() + self.lease_duration
+                               ) is None:
+                    logger.app_info(f"{_step}: lease lost")
+                    return
+
+        thread = threading.Thread(target=renew, daemon=True)
+        thread.start()
+        time_start = time.time()
+        try:
+            result = dict_pipelines[job['pipeline']](**job['params'])
+            dict_update = {'status': 'succeeded', 'result': str(result)}
+            logger.app_success(_step)
+        except Exception as e:
+            logger.app_fail(_step, f'{traceback.print_exc()}')
+            dict_update = {'status': 'failed', 'error': str(e)}
+        finally:
+            AppLogger.ls_step_listeners.remove(recorder)
+            event_stop.set()
+            thread.join()
+
+        job_run = self.update(
+            job['job_id'], claim_id=job['claim_id'], ended=timestamp(),
+            duration=round(time.time() - time_start, 3), lease_expires=None,
+            **dict_update)
+        if job_run is None:
+            # Lease expired during the run; job was queued again or failed
+            logger.app_info(f"{_step}: lease lost, result discarded")
+            return self.read_job(job['job_id'])
+        return job_run
+
+    def run_pending(self, dict_pipelines, max_jobs=None):
+        """
+        Run queued jobs one after another.
+
+        :param dict_pipelines: Functions running pipeline by name.
+        :type dict_pipelines: dictionary
+        :param max_jobs: Maximum jobs to run, defaults to None i.e. all.
+        :type max_jobs: int, optional
+        :return: Jobs run.
+        :rtype: list of dictionaries
+
+        """
+        ls_jobs = []
+        while (max_jobs is None) or (len(ls_jobs) < max_jobs):
+            job = self.claim()
+            if job is None:
+                break
+            ls_jobs.append(self.run_job(job, dict_pipelines))
+        return ls_jobs
+
+    # ***** HTTP *****
+
+    def handle_request(self, method, pipeline, params=None, job_id=None):
+        """
+        Respond to HTTP trigger: POST enqueues a run, GET with job_id
+        reports status of the job.
+
+        :param method: HTTP method.
+        :type method: str
+        :param pipeline: Name of pipeline of the trigger.
+        :type pipeline: str
+        :param params: Parameters of run, defaults to None.
+        :type params: dictionary, optional
+        :param job_id: Job id, defaults to None.
+        :type job_id: str, optional
+        :return: Body (json) and status code i.e. 202 (queued), 200
+        (status), 400 (invalid parameters) or 404 (unknown job).
+        :rtype: tuple of str and int
+
+        """
+        if method.upper() == 'POST':
+            if (params is not None) and (not isinstance(params, dict)):
+                return json.dumps(
+                    {'error': 'Parameters must be a json object'}), 400
+            job, f_created = self.submit(pipeline, params)
+            return json.dumps({
+                'job_id': job['job_id'], 'status': job['status'],
+                'deduplicated': not f_created}), 202
+
+        job = self.read_job(job_id)
+        if (job is not None) and self.is_expired(job):
+            self.recover()
+            job = self.read_job(job_id)
+        if (job is None) or (job['pipeline'] != pipeline):
+            return json.dumps({'error': f'Unknown job: {job_id}'}), 404
+        return json.dumps(job), 200
+
+
+# %% ***** Worker *****
+
+def get_pipelines(config):
+    """
+    Pipelines which can be requested over HTTP. Parameter mode of request
+    overrides conf.env of config. Runs are coordinated with runs of other
+    triggers (see utils.run_coordinator).
+
+    :param config: Project configuration.
+    :type config: dictionary
+    :return: Functions running pipeline by name.
+    :rtype: dictionary
+
+    """
+    from utils.dcpd.class_contracts_data import Contract
+    from utils.dcpd.class_installbase import InstallBase
+    from utils.run_coordinator import run_stage
+
+    mode_config = config.get("conf.env", "azure-adls")
+    return {
+        'contracts': lambda mode=mode_config: run_stage(
+            config, 'contracts', Contract(mode, config).main_contracts),
+        'install_base': lambda mode=mode_config: run_stage(
+            config, 'install_base', InstallBase(mode, config).main_install)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run queued pipeline jobs")
+    parser.add_argument("--config", default="config/config_dcpd.json")
+    parser.add_argument("--max-jobs", type=int, default=None)
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as file:
+        config_dcpd = json.load(file)
+
+    for job_run in JobQueue.from_config(config_dcpd).run_pending(
+            get_pipelines(config_dcpd), args.max_jobs):
+        print(f"{job_run['job_id']} {job_run['pipeline']} "
+              f"{job_run['status']} {job_run['duration']} s")
+
+# %%
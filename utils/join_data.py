@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+
+"""
+@file join_data.py
+
+@brief Keyed joins with projection and fan-out guard.
+
+
+@details Join layer used while assembling leads:
+    - Data to be joined (e.g. install base, services) is projected to the
+      required columns and indexed on the join key (register), so that
+      columns not needed in the output are not carried through the join.
+      Indexed data is kept by name; joining it again by name does not
+      index it again.
+    - Before joining, rows expected in the output are computed from the key
+      counts. Fan-out due to repeated keys in the indexed data (many-to-many
+      join) is logged and joins exceeding the configured limit raise an
+      error.
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# %% *** Setup Environment ***
+import pandas as pd
+
+from utils.logger import AppLogger
+logger = AppLogger(__name__)
+
+# %% *** Define Class ***
+
+
+class Join:
+    """Keyed joins with projection and fan-out guard."""
+
+    col_position = '_ix_position'
+    col_left = '_ix_left'
+
+    def __init__(self, max_fanout=None):
+        """
+        Initialize join layer.
+
+        :param max_fanout: Maximum allowed ratio of output rows to rows of a
+            many-to-one join. None disables the limit; fan-out is still
+            logged.
+        :type max_fanout: float, optional
+
+        """
+        self.max_fanout = max_fanout
+        self.dict_index = {}
+
+    def register(self, name, df_data, key, ls_cols=None, keep_key=False):
+        """
+        Project data to columns of interest and index it on the join key.
+
+        :param name: Name of indexed data in joins.
+        :type name: str
+        :param df_data: Data to be indexed.
+        :type df_data: pandas DataFrame.
+        :param key: Join key.
+        :type key: str
+        :param ls_cols: Columns to be carried in joins, defaults to all.
+        :type ls_cols: list, optional
+        :param keep_key: Keep key as a column (e.g. when left and right
+            key names are different), defaults to False
+        :type keep_key: bool, optional
+        :return: Indexed data.
+        :rtype: pandas DataFrame.
+
+        """
+        if ls_cols is None:
+            ls_cols = list(df_data.columns)
+        ls_cols = [col for col in ls_cols if col != key]
+        if keep_key:
+            ls_cols = [key] + ls_cols
+
+        df_index = df_data.loc[:, ls_cols].set_index(df_data[key])
+        df_index.index.name = key
+        df_index[self.col_position] = range(df_index.shape[0])
+
+        self.dict_index[name] = df_index
+        logger.app_debug(f'Register {name}: {df_index.shape}', 2)
+        return df_index
+
+    def is_registered(self, name):
+        """
+        Whether data is registered with given name.
+
+        :param name: Name used while registering.
+        :type name: str
+        :return: True if registered.
+        :rtype: bool
+
+        """
+        return name in self.dict_index
+
+    def get(self, name):
+        """
+        Indexed data registered with given name.
+
+        :param name: Name used while registering.
+        :type name: str
+        :return: Indexed data.
+        :rtype: pandas DataFrame.
+
+        """
+        return self.dict_index[name]
+
+    def count_rows(self, ar_key, df_index, how):
+        """
+        Rows expected from joining keys to indexed data, along with rows
+        expected if the index was unique (i.e. many-to-one join).
+
+        :param ar_key: Keys of left data.
+        :type ar_key: pandas Series.
+        :param df_index: Indexed data.
+        :type df_index: pandas DataFrame.
+        :param how: 'left', 'inner' or 'right'.
+        :type how: str
+        :return: Rows expected in the output, rows for many-to-one join.
+        :rtype: tuple
+
+        """
+        n_matched = ar_key.map(df_index.index.value_counts(dropna=False))
+        f_matched = pd.notna(n_matched)
+
+        n_output = int(n_matched[f_matched].sum())
+        n_unique = int(f_matched.sum())
+
+        if how == 'left':
+            n_unmatched = int((~f_matched).sum())
+        elif how == 'right':
+            n_unmatched = int(
+                (~df_index.index.isin(ar_key.unique())).sum())
+        else:
+            n_unmatched = 0
+
+        return n_output + n_unmatched, n_unique + n_unmatched
+
+    def join(self, df_left, right, left_on, how='left', ls_cols=None,
+             max_fanout=None, step='join'):
+        """
+        Join data to indexed data. Output (rows, order, dtypes) is same as
+        df_left.merge(right_data, on=key, how=how) if left_on is key, else
+        df_left.merge(right_data, left_on=left_on, right_on=key, how=how)
+        without column key unless it is kept.
+
+        :param df_left: Left data.
+        :type df_left: pandas DataFrame.
+        :param right: Indexed data or name used while registering.
+        :type right: pandas DataFrame or str
+        :param left_on: Join key in left data.
+        :type left_on: str
+        :param how: 'left', 'inner' or 'right', defaults to 'left'
+        :type how: str, optional
+        :param ls_cols: Subset of indexed columns to join, defaults to all.
+        :type ls_cols: list, optional
+        :param max_fanout: Overrides max_fanout of the instance.
+        :type max_fanout: float, optional
+        :param step: Step name for logging.
+        :type step: str, optional
+        :raises ValueError: Raised if fan-out exceeds max_fanout or unknown
+            join type is provided.
+        :return: Joined data.
+        :rtype: pandas DataFrame.
+
+        """
+        if how not in ['left', 'inner', 'right']:
+            raise ValueError(f'Unknown join type: {how}')
+
+        df_index = self.get(right) if isinstance(right, str) else right
+        if ls_cols is not None:
+            df_index = df_index.loc[:, ls_cols + [self.col_position]]
+
+        # Fan-out guard: rows duplicated due to repeated keys in indexed data
+        max_fanout = self.max_fanout if max_fanout is None else max_fanout
+        n_output, n_unique = self.count_rows(df_left[left_on], df_index, how)
+        if n_output > n_unique:
+            logger.app_info(f'{step}: fan-out {n_unique} -> {n_output} rows')
+            if (max_fanout is not None) and (
+                    n_output > max_fanout * max(n_unique, 1)):
+                raise ValueError(
+                    f'{step}: fan-out {n_unique} -> {n_output} rows exceeds '
+                    f'limit {max_fanout}')
+
+        # Overlapping columns are suffixed as done by merge
+        ls_overlap = [col for col in df_index.columns
+                      if (col in df_left.columns) and (col != left_on)]
+        if len(ls_overlap) > 0:
+            df_left = df_left.rename(
+                columns={col: f'{col}_x' for col in ls_overlap})
+            df_index = df_index.rename(
+                columns={col: f'{col}_y' for col in ls_overlap})
+
+        # Join
+        if how == 'right':
+            df_left = df_left.assign(**{self.col_left: range(len(df_left))})
+            df_out = df_left.join(df_index, on=left_on, how='inner')
+
+            # Keys without match in left data; left key is the right key
+            # only if both have same name (as merge on=key)
+            f_unmatched = ~df_index.index.isin(df_left[left_on].unique())
+            if f_unmatched.any():
+                df_unmatched = df_index.loc[f_unmatched]
+                if df_index.index.name == left_on:
+                    df_unmatched = df_unmatched.reset_index()
+                else:
+                    df_unmatched = df_unmatched.reset_index(drop=True)
+                df_out = pd.concat([df_out, df_unmatched])
+
+            # Rows of right data in order, matches in order of left data
+            df_out = df_out.sort_values(
+                by=[self.col_position, self.col_left], kind='stable')
+            df_out = df_out.drop(columns=[self.col_left])
+        else:
+            df_out = df_left.join(df_index, on=left_on, how=how)
+
+        df_out = df_out.drop(columns=[self.col_position])
+        return df_out.reset_index(drop=True)
+
+
+# %%
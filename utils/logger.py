@@ -18,6 +18,10 @@ import logging
 class AppLogger():
     """ Logging Class."""
 
+    # Functions called with (step, status) on app_success / app_fail e.g.
+    # progress of jobs; called even if logging is disabled
+    ls_step_listeners = []
+
     def __init__(self, app_name="CapEoUL", mode=0, level='Info'):
         """
 
@@ -81,6 +85,7 @@ class AppLogger():
             )
         )
         self.log_idx += 1
+        self.notify_step(log_txt, log_status)
 
     def app_fail(self, log_txt, ex, status='F'):
         """Log application failure.
@@ -111,6 +116,29 @@ class AppLogger():
         )
         self.logger.error("{}".format(ex))
         self.log_idx += 1
+        self.notify_step(log_txt, log_status)
+
+    @staticmethod
+    def notify_step(log_txt, log_status):
+        """Notify step listeners; failure of a listener is ignored.
+
+        Parameters
+        ----------
+        log_txt : String
+            Logging message.
+        log_status : String
+            Logging status e.g. SUCCEEDED.
+
+        Returns
+        -------
+        None.
+
+        """
+        for listener in list(AppLogger.ls_step_listeners):
+            try:
+                listener(log_txt, log_status)
+            except Exception:
+                pass
 
     def app_debug(self, log_txt, level=0):
         """Log application failure.
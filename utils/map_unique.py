@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+"""
+@file map_unique.py
+
+@brief Apply a function once per distinct value of a column.
+
+
+@details Columns like SerialNumber, Email or part numbers are highly
+repetitive; applying a Python function row wise (Series.apply) evaluates it
+again for every repeated value. map_unique factorizes the column, evaluates
+the function over the distinct values only and scatters the results back to
+the rows. NA is a distinct value and is passed to the function as with
+Series.apply.
+    - element wise: function of a single value; for many distinct values
+      it can be evaluated in a process pool (function should be picklable
+      i.e. defined at module / class level).
+    - vectorized: function of a pandas Series of the distinct values.
+
+Example:
+    MapUnique.map_unique(df_data['Email'], get_domain)
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# %% *** Setup Environment ***
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from utils.logger import AppLogger
+logger = AppLogger(__name__)
+
+# %% *** Define Class ***
+
+
+class MapUnique:
+    """Evaluate functions once per distinct value."""
+
+    # Distinct values below which process pool is not worth starting
+    MIN_UNIQUES_POOL = 10000
+
+    @staticmethod
+    def map_unique(ar_data, func, vectorized=False, max_workers=None):
+        """
+        Apply func once per distinct value and scatter results to rows.
+
+        :param ar_data: Input data.
+        :type ar_data: pandas Series / list
+        :param func: Function of a value, or of a pandas Series of distinct
+            values if vectorized.
+        :type func: function
+        :param vectorized: func takes pandas Series of distinct values,
+            defaults to False
+        :type vectorized: bool, optional
+        :param max_workers: Processes evaluating element wise func; None or
+            1 evaluates in current process, defaults to None
+        :type max_workers: int, optional
+        :return: Output of func for each row; index and name of input.
+        :rtype: pandas Series
+
+        """
+        if not isinstance(ar_data, pd.Series):
+            ar_data = pd.Series(ar_data)
+
+        ar_codes, ar_uniques = pd.factorize(ar_data, use_na_sentinel=False)
+        ar_uniques = pd.Series(ar_uniques, dtype=ar_data.dtype)
+
+        if vectorized:
+            ar_out = pd.Series(func(ar_uniques))
+        else:
+            ar_out = pd.Series(
+                MapUnique.map_values(list(ar_uniques), func, max_workers),
+                dtype=None if len(ar_uniques) > 0 else object)
+
+        return pd.Series(
+            ar_out.to_numpy()[ar_codes], index=ar_data.index,
+            name=ar_data.name)
+
+    @staticmethod
+    def map_values(ls_values, func, max_workers=None):
+        """
+        Apply element wise func to values, in a process pool if there are
+        many values.
+
+        :param ls_values: Values.
+        :type ls_values: list
+        :param func: Function of a value.
+        :type func: function
+        :param max_workers: Processes, defaults to None
+        :type max_workers: int, optional
+        :return: Output of func for each value.
+        :rtype: list
+
+        """
+        if (max_workers is None) or (max_workers <= 1) or (
+                len(ls_values) < MapUnique.MIN_UNIQUES_POOL):
+            return [func(value) for value in ls_values]
+
+        chunksize = max(1, math.ceil(len(ls_values) / (4 * max_workers)))
+        logger.app_debug(
+            f"map_unique: {len(ls_values)} values, {max_workers} processes")
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(func, ls_values, chunksize=chunksize))
+
+
+# %%
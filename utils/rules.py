@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+"""
+@file rules.py
+
+@brief Vectorized evaluation of declarative rules for derived columns.
+
+
+@details Derived columns are described as an ordered list of rules; each
+rule has a condition and a value. Like np.select, first matching rule
+decides the value of a row and rows matching no rule get the default.
+    - condition: function of data returning bool array,
+    - value: constant or function of data. Functions are evaluated only on
+      the rows matching the rule, hence can assume the rule's condition
+      (e.g. parse a column which is valid only for those rows).
+
+Text can be decoded with ordered (label, pattern) rules using first_match;
+patterns are combined in one regex and evaluated once per distinct text.
+
+Example:
+    {'End_Customer_City': {
+        'rules': [
+            {'condition': lambda df: Rules.is_true(df['was_startedup']),
+             'value': Rules.col('StartupCity')}],
+        'default': Rules.col('ShipTo_City')}}
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# %% *** Setup Environment ***
+import re
+
+import numpy as np
+import pandas as pd
+
+from utils.logger import AppLogger
+logger = AppLogger(__name__)
+
+# %% *** Define Class ***
+
+
+class Rules:
+    """Vectorized evaluation of declarative rules."""
+
+    @staticmethod
+    def col(col_name):
+        """
+        Value of rule taken from a column.
+
+        :param col_name: Column name.
+        :type col_name: str
+        :return: function returning column from data.
+        :rtype: function
+
+        """
+        return lambda df_data: df_data[col_name]
+
+    @staticmethod
+    def is_true(ar_values):
+        """
+        Truth value of each element as evaluated by python i.e. NaN and
+        non-empty strings are True; None, '', 0 and False are False.
+
+        :param ar_values: Values to be evaluated.
+        :type ar_values: pandas Series.
+        :return: Truth value of each element.
+        :rtype: numpy array.
+
+        """
+        return np.asarray(ar_values, dtype=object).astype(bool)
+
+    def value(self, df_data, value):
+        """
+        Evaluate value of a rule for given rows.
+
+        :param df_data: Rows for which rule is applicable.
+        :type df_data: pandas DataFrame.
+        :param value: Constant or function of data.
+        :type value: object
+        :return: Values for the rows.
+        :rtype: array like or scalar
+
+        """
+        if callable(value):
+            value = value(df_data)
+            if isinstance(value, pd.Series):
+                value = value.to_numpy(dtype=object)
+        return value
+
+    def select(self, df_data, ls_rules, default=np.nan):
+        """
+        Evaluate ordered rules; first matching rule decides the value.
+
+        :param df_data: Input data.
+        :type df_data: pandas DataFrame.
+        :param ls_rules: Rules with keys 'condition' and 'value'.
+        :type ls_rules: list
+        :param default: Value (constant or function) for rows matching no
+            rule, defaults to np.nan
+        :type default: object, optional
+        :return: Derived column.
+        :rtype: pandas Series.
+
+        """
+        ar_out = np.full(df_data.shape[0], np.nan, dtype=object)
+        f_pending = np.ones(df_data.shape[0], dtype=bool)
+
+        for rule in ls_rules + [{'condition': None, 'value': default}]:
+            if rule['condition'] is None:
+                f_rule = f_pending.copy()
+            else:
+                f_rule = f_pending & np.asarray(
+                    rule['condition'](df_data), dtype=bool)
+
+            if f_rule.any():
+                ar_out[f_rule] = self.value(df_data.loc[f_rule], rule['value'])
+            f_pending = f_pending & ~f_rule
+
+        return pd.Series(ar_out, index=df_data.index).infer_objects()
+
+    @staticmethod
+    def compile_first_match(ls_patterns):
+        """
+        Combine patterns in one regex; alternatives are evaluated in the
+        given order at the start of the text and each looks ahead for its
+        pattern anywhere in the text, hence the first pattern found by
+        re.search decides the match (not the leftmost occurrence).
+
+        :param ls_patterns: Regex patterns in priority order.
+        :type ls_patterns: list
+        :return: Compiled regex with groups _r0, _r1, ...
+        :rtype: re.Pattern
+
+        """
+        return re.compile("|".join(
+            f"(?=.*?(?P<_r{ix}>{pat}))" for ix, pat in enumerate(ls_patterns)),
+            re.DOTALL)
+
+    def first_match(self, ar_text, ls_rules, default="", prep=None):
+        """
+        Decode text with ordered (label, pattern) rules; label of the first
+        pattern found in the text is returned. Text is decoded once per
+        distinct value and broadcast to rows.
+
+        :param ar_text: Text to be decoded.
+        :type ar_text: pandas Series.
+        :param ls_rules: (label, regex pattern) in priority order.
+        :type ls_rules: list
+        :param default: Label for text matching no pattern and missing
+            text, defaults to ""
+        :type default: object, optional
+        :param prep: Function applied to distinct text (pandas Series)
+            before decoding e.g. cleaning, defaults to None
+        :type prep: function, optional
+        :return: Label of each text.
+        :rtype: pandas Series.
+
+        """
+        ar_codes, ar_unique = pd.factorize(ar_text)
+        if prep is not None:
+            ar_unique = prep(pd.Series(ar_unique, dtype=object))
+
+        ls_labels = [label for label, _ in ls_rules]
+        if len(ls_rules) > 0:
+            pattern = self.compile_first_match([pat for _, pat in ls_rules])
+            ls_decoded = []
+            for text in ar_unique:
+                match = pattern.match(str(text))
+                ls_decoded.append(default if match is None else next(
+                    label for ix, label in enumerate(ls_labels)
+                    if match.group(f"_r{ix}") is not None))
+        else:
+            ls_decoded = [default] * len(ar_unique)
+
+        # Code -1 (missing text) gets the default
+        ar_decoded = np.asarray(ls_decoded + [default], dtype=object)
+        return pd.Series(ar_decoded[ar_codes], index=ar_text.index)
+
+    def apply(self, df_data, dict_rules):
+        """
+        Derive columns described by rules. Columns are derived in the order
+        given; rules can use columns derived earlier.
+
+        :param df_data: Input data.
+        :type df_data: pandas DataFrame.
+        :param dict_rules: Column name to {'rules': [...], 'default': ...}.
+        :type dict_rules: dictionary
+        :return: Data with derived columns.
+        :rtype: pandas DataFrame.
+
+        """
+        for col in dict_rules:
+            logger.app_debug(f'Derive column: {col}', 2)
+            df_data[col] = self.select(
+                df_data, dict_rules[col].get('rules', []),
+                dict_rules[col].get('default', np.nan))
+        return df_data
+
+
+# %%
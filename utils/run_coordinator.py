@@ -0,0 +1,567 @@
+"""@file run_coordinator.py
+
+
+
+@brief Single-flight coordination of pipeline runs across triggers.
+
+
+@details
+Timer triggers, HTTP triggers and the job worker may start the same pipeline
+stage (install_base, contracts, services) at overlapping times. A run of a
+stage holds a lease on the stage:
+    - caller acquiring the lease runs the stage; lease is renewed while the
+      stage runs and released when it ends, so lease of a crashed run
+      expires,
+    - caller finding the lease held attaches to the run in flight and gets
+      its result (or its error) instead of running the stage again,
+    - stage listed with dependencies (run_coordinator.after in config) waits
+      for dependencies which are running or due i.e. services runs after
+      contracts when both are due. A dependency is due if its timer
+      (run_coordinator.schedules, same NCRONTAB expression as function.json
+      of its timer trigger) fired within due_window before the request and
+      it has not started since; a dependency neither running nor due is not
+      waited for.
+
+State of the latest run of a stage (run_id, status, timings, result) is kept
+next to the lease so that other callers can attach to it.
+
+Backends:
+    - BlobLeaseBackend: blob leases on the storage account (azure-adls),
+    - LocalLeaseBackend: lease files on local file system (local, tests).
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# %% ***** Setup Environment *****
+
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from utils.logger import AppLogger
+
+logger = AppLogger(__name__)
+
+
+def timestamp(time_sec=None):
+    """ISO timestamp (UTC) of seconds since epoch, defaults to now."""
+    time_sec = time.time() if time_sec is None else time_sec
+    return datetime.fromtimestamp(time_sec, tz=timezone.utc).isoformat()
+
+
+def seconds(iso_timestamp):
+    """Seconds since epoch of ISO timestamp; 0 if unavailable."""
+    if not iso_timestamp:
+        return 0.0
+    return datetime.fromisoformat(iso_timestamp).timestamp()
+
+
+# %% ***** Schedules *****
+
+# Fields of NCRONTAB expression: second, minute, hour, day, month, day of
+# week (0 is Sunday) with their ranges
+LS_CRON_FIELDS = [(0, 59), (0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+
+def cron_field_matches(field, value, low, high):
+    """
+    Whether value matches a field of NCRONTAB expression i.e. list of *,
+    values or ranges with optional step (e.g. *, 5, 1-5, */10, 0,30).
+    """
+    for part in field.split(','):
+        range_, _, step = part.partition('/')
+        if range_ == '*':
+            start, end = low, high
+        elif '-' in range_:
+            start, end = [int(value_) for value_ in range_.split('-')]
+        else:
+            start = int(range_)
+            end = high if step else start
+        if (start <= value <= end) and ((value - start) % int(step or 1) == 0):
+            return True
+    return False
+
+
+def cron_matches(schedule, time_sec):
+    """
+    Whether timer of NCRONTAB expression (UTC) fires at a second.
+
+    :param schedule: NCRONTAB expression e.g. '0 0 0 * * *'.
+    :type schedule: str
+    :param time_sec: Seconds since epoch.
+    :type time_sec: int
+    :return: True if timer fires.
+    :rtype: bool
+
+    """
+    time_utc = datetime.fromtimestamp(time_sec, tz=timezone.utc)
+    ls_values = [time_utc.second, time_utc.minute, time_utc.hour,
+                 time_utc.day, time_utc.month, (time_utc.weekday() + 1) % 7]
+    return all(
+        cron_field_matches(field, value, low, high)
+        for field, value, (low, high) in zip(
+            schedule.split(), ls_values, LS_CRON_FIELDS))
+
+
+# %% ***** Lease backends *****
+
+class LocalLeaseBackend:
+    """
+    Lease files on local file system; stand-in of blob leases.
+    """
+
+    def __init__(self, lease_dir, mutex_timeout=30):
+        """
+        Initialize backend.
+
+        :param lease_dir: Directory of lease and state files.
+        :type lease_dir: str
+        :param mutex_timeout: Seconds after which mutex of a crashed process
+        is broken, defaults to 30.
+        :type mutex_timeout: int, optional
+
+        """
+        self.lease_dir = lease_dir
+        self.mutex_timeout = mutex_timeout
+        os.makedirs(lease_dir, exist_ok=True)
+
+    def path(self, name, ext):
+        return os.path.join(self.lease_dir, f'{name}.{ext}')
+
+    def lock(self, name):
+        # Lease file is read and written under exclusively created mutex
+        path_mutex = self.path(name, 'mutex')
+        while True:
+            try:
+                os.close(os.open(
+                    path_mutex, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(path_mutex) > \
+                            self.mutex_timeout:
+                        os.remove(path_mutex)
+                        continue
+                except FileNotFoundError:
+                    continue
+                time.sleep(0.01)
+
+    def unlock(self, name):
+        try:
+            os.remove(self.path(name, 'mutex'))
+        except FileNotFoundError:
+            pass
+
+    def read_json(self, path):
+        try:
+            with open(path, 'r') as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def write_json(self, path, data):
+        path_tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(path_tmp, 'w') as file:
+            json.dump(data, file, indent=2)
+        os.replace(path_tmp, path)
+
+    def acquire(self, name, duration):
+        """
+        Acquire lease if it is free or expired.
+
+        :param name: Name of lease e.g. stage.
+        :type name: str
+        :param duration: Seconds till lease expires unless renewed.
+        :type duration: float
+        :return: Lease id, None if lease is held.
+        :rtype: str
+
+        """
+        self.lock(name)
+        try:
+            lease = self.read_json(self.path(name, 'lease'))
+            if lease.get('expires', 0) > time.time():
+                return None
+            lease_id = uuid.uuid4().hex
+            self.write_json(self.path(name, 'lease'), {
+                'lease_id': lease_id, 'expires': time.time() + duration})
+            return lease_id
+        finally:
+            self.unlock(name)
+
+    def renew(self, name, lease_id, duration):
+        """
+        Renew lease.
+
+        :return: False if lease is lost i.e. expired and acquired by other.
+        :rtype: bool
+
+        """
+        self.lock(name)
+        try:
+            lease = self.read_json(self.path(name, 'lease'))
+            if lease.get('lease_id') != lease_id:
+                return False
+            lease['expires'] = time.time() + duration
+            self.write_json(self.path(name, 'lease'), lease)
+            return True
+        finally:
+            self.unlock(name)
+
+    def release(self, name, lease_id):
+        self.lock(name)
+        try:
+            lease = self.read_json(self.path(name, 'lease'))
+            if lease.get('lease_id') == lease_id:
+                os.remove(self.path(name, 'lease'))
+        finally:
+            self.unlock(name)
+
+    def read_state(self, name):
+        return self.read_json(self.path(name, 'state'))
+
+    def write_state(self, name, state, lease_id):
+        self.write_json(self.path(name, 'state'), state)
+
+
+class BlobLeaseBackend:
+    """
+    Blob leases on storage account; state is the content of the leased
+    blob. Lease duration is between 15 and 60 seconds.
+    """
+
+    def __init__(self, connection_string, container_name, directory_name):
+        from azure.storage.blob import BlobServiceClient
+
+        self.container_client = BlobServiceClient.from_connection_string(
+            connection_string).get_container_client(container_name)
+        self.directory_name = directory_name
+
+    def blob_client(self, name):
+        return self.container_client.get_blob_client(
+            f'{self.directory_name}/{name}.lease')
+
+    def acquire(self, name, duration):
+        from azure.core.exceptions import HttpResponseError, \
+            ResourceExistsError
+        from azure.storage.blob import BlobLeaseClient
+
+        blob_client = self.blob_client(name)
+        try:
+            blob_client.upload_blob(b'{}', overwrite=False)
+        except ResourceExistsError:
+            pass
+
+        lease_client = BlobLeaseClient(blob_client)
+        try:
+            lease_client.acquire(lease_duration=int(min(max(duration, 15), 60)))
+        except HttpResponseError:
+            # Lease is held
+            return None
+        return lease_client.id
+
+    def renew(self, name, lease_id, duration):
+        from azure.core.exceptions import HttpResponseError
+        from azure.storage.blob import BlobLeaseClient
+
+        try:
+            BlobLeaseClient(self.blob_client(name), lease_id=lease_id).renew()
+            return True
+        except HttpResponseError:
+            return False
+
+    def release(self, name, lease_id):
+        from azure.core.exceptions import HttpResponseError
+        from azure.storage.blob import BlobLeaseClient
+
+        try:
+            BlobLeaseClient(
+                self.blob_client(name), lease_id=lease_id).release()
+        except HttpResponseError:
+            pass
+
+    def read_state(self, name):
+        from azure.core.exceptions import ResourceNotFoundError
+
+        try:
+            return json.loads(
+                self.blob_client(name).download_blob().readall() or b'{}')
+        except ResourceNotFoundError:
+            return {}
+
+    def write_state(self, name, state, lease_id):
+        self.blob_client(name).upload_blob(
+            json.dumps(state).encode('utf-8'), overwrite=True, lease=lease_id)
+
+
+# %% ***** Coordinator *****
+
+class RunCoordinator:
+    """
+    Single-flight runs of pipeline stages on a lease backend.
+    """
+
+    def __init__(self, backend, dict_after=None, lease_duration=60,
+                 poll_interval=5, wait_timeout=7200, start_grace=120,
+                 due_window=300, dict_schedules=None):
+        """
+        Initialize coordinator.
+
+        :param backend: LocalLeaseBackend or BlobLeaseBackend.
+        :param dict_after: Dependencies of stages e.g.
+        {'services': ['contracts']}, defaults to None.
+        :type dict_after: dictionary, optional
+        :param lease_duration: Seconds till lease of a crashed run expires,
+        defaults to 60.
+        :type lease_duration: float, optional
+        :param poll_interval: Seconds between checks of runs in flight,
+        defaults to 5.
+        :type poll_interval: float, optional
+        :param wait_timeout: Seconds to wait for a run in flight, defaults
+        to 7200.
+        :type wait_timeout: float, optional
+        :param start_grace: Seconds after scheduled time of a dependency to
+        wait for it to start, defaults to 120.
+        :type start_grace: float, optional
+        :param due_window: Dependency scheduled up to these seconds before
+        request is due, defaults to 300.
+        :type due_window: float, optional
+        :param dict_schedules: NCRONTAB expressions of timers of stages e.g.
+        {'contracts': '0 0 0 * * *'}, defaults to None i.e. no timers.
+        :type dict_schedules: dictionary, optional
+
+        """
+        self.backend = backend
+        self.dict_after = {} if dict_after is None else dict_after
+        self.lease_duration = lease_duration
+        self.poll_interval = poll_interval
+        self.wait_timeout = wait_timeout
+        self.start_grace = start_grace
+        self.due_window = due_window
+        self.dict_schedules = {} if dict_schedules is None \
+            else dict_schedules
+
+    @classmethod
+    def from_config(cls, config, mode=None):
+        """
+        Initialize coordinator from run_coordinator settings of
+        config_dcpd.json; blob leases for azure-adls mode, else lease files.
+
+        :param config: Project configuration.
+        :type config: dictionary
+        :param mode: IO mode, defaults to conf.env of config.
+        :type mode: str, optional
+        :return: Coordinator, None if disabled.
+        :rtype: RunCoordinator
+
+        """
+        dict_coord = config.get('run_coordinator', {})
+        if not dict_coord.get('enable', False):
+            return None
+
+        mode = config.get('conf.env', 'azure-adls') if mode is None else mode
+        if mode == 'azure-adls':
+            from utils.io import io_adls
+
+            key = config['file']['Processed']['adls_credentials'][
+                'connection_string']
+            connection_string = io_adls.read_credentials([key])[
+                key.replace('-', '_')]
+            backend = BlobLeaseBackend(
+                connection_string, dict_coord['container_name'],
+                dict_coord['directory_name'])
+        else:
+            backend = LocalLeaseBackend(dict_coord.get('dir', './results/leases'))
+
+        return cls(backend, dict_coord.get('after', {}),
+                   dict_schedules=dict_coord.get('schedules', {}),
+                   **{key: dict_coord[key] for key in [
+                       'lease_duration', 'poll_interval', 'wait_timeout',
+                       'start_grace', 'due_window'] if key in dict_coord})
+
+    # ***** Dependencies *****
+
+    def is_alive(self, state):
+        """Run of state is in flight; run not renewed for two lease
+        durations has crashed."""
+        return (state.get('status') == 'running') and (
+            time.time() - seconds(state.get('renewed'))
+            < 2 * self.lease_duration)
+
+    def time_due(self, stage, time_request):
+        """
+        Latest time timer of stage fired within due_window before request.
+
+        :param stage: Stage e.g. contracts.
+        :type stage: str
+        :param time_request: Time of request (seconds since epoch).
+        :type time_request: float
+        :return: Seconds since epoch, None if stage is not due.
+        :rtype: int
+
+        """
+        schedule = self.dict_schedules.get(stage)
+        if not schedule:
+            return None
+        for time_sec in range(int(time_request),
+                              int(time_request - self.due_window) - 1, -1):
+            if cron_matches(schedule, time_sec):
+                return time_sec
+        return None
+
+    def wait_for_dependencies(self, stage, time_request):
+        """
+        Wait for dependencies of stage which are running or due; dependency
+        neither running nor due is not waited for.
+
+        :param stage: Stage e.g. services.
+        :type stage: str
+        :param time_request: Time of request (seconds since epoch).
+        :type time_request: float
+
+        """
+        for dependency in self.dict_after.get(stage, []):
+            _step = f"{stage}: wait for {dependency}"
+            time_start = time.time()
+            time_due = self.time_due(dependency, time_request)
+            while True:
+                state = self.backend.read_state(dependency)
+                time_now = time.time()
+                if self.is_alive(state):
+                    if time_now - time_start > self.wait_timeout:
+                        logger.app_info(f"{_step}: timed out")
+                        break
+                elif time_due is None:
+                    # Dependency is not due
+                    break
+                elif seconds(state.get('started')) >= time_due:
+                    # Dependency ran for this schedule
+                    break
+                elif time_now - time_due > self.start_grace:
+                    # Timer of dependency did not start it
+                    logger.app_info(f"{_step}: not started")
+                    break
+                time.sleep(self.poll_interval)
+            logger.app_debug(f"{_step}: {time.time() - time_start:.1f} s")
+
+    # ***** Runs *****
+
+    def run(self, stage, func, *args, **kwargs):
+        """
+        Run stage unless a run of stage is in flight, in which case result
+        of that run is returned (or its error raised).
+
+        :param stage: Stage e.g. contracts.
+        :type stage: str
+        :param func: Function running the stage.
+        :type func: function
+        :raises TimeoutError: Run in flight did not end in wait_timeout.
+        :raises Exception: Error of run.
+        :return: Result of run; str of result if attached to run of other
+        caller.
+
+        """
+        time_request = time.time()
+        self.wait_for_dependencies(stage, time_request)
+
+        run_id = None
+        while True:
+            state = self.backend.read_state(stage)
+            if (run_id is None) and (state.get('status') == 'running'):
+                run_id = state['run_id']
+                logger.app_info(f"{stage}: attached to run {run_id}")
+
+            f_ended = (run_id is not None) and (
+                state.get('run_id') == run_id) and (
+                state.get('status') != 'running')
+            if not f_ended:
+                lease_id = self.backend.acquire(stage, self.lease_duration)
+                if lease_id is not None:
+                    # Run attached to may have ended before lease was free
+                    state = self.backend.read_state(stage)
+                    f_ended = (run_id is not None) and (
+                        state.get('run_id') == run_id) and (
+                        state.get('status') != 'running')
+                    if not f_ended:
+                        return self.execute(stage, lease_id, func, *args,
+                                            **kwargs)
+                    self.backend.release(stage, lease_id)
+
+            if f_ended:
+                if state['status'] == 'failed':
+                    raise Exception(
+                        f"{stage}: run {run_id} failed: {state['error']}")
+                return state['result']
+
+            if time.time() - time_request > self.wait_timeout:
+                raise TimeoutError(f"{stage}: run {run_id} did not end")
+            time.sleep(self.poll_interval)
+
+    def execute(self, stage, lease_id, func, *args, **kwargs):
+        """
+        Run stage holding the lease; lease is renewed in background till
+        run ends.
+        """
+        state = {'run_id': uuid.uuid4().hex, 'status': 'running',
+                 'owner': f'{socket.gethostname()}:{os.getpid()}',
+                 'started': timestamp(), 'renewed': timestamp(),
+                 'ended': None, 'result': None, 'error': None}
+        self.backend.write_state(stage, state, lease_id)
+        logger.app_info(f"{stage}: run {state['run_id']} started")
+
+        event_stop = threading.Event()
+
+        def renew():
+            while not event_stop.wait(self.lease_duration / 3):
+                if not self.backend.renew(stage, lease_id,
+                                          self.lease_duration):
+                    logger.app_info(f"{stage}: lease lost")
+                    return
+                self.backend.write_state(
+                    stage, dict(state, renewed=timestamp()), lease_id)
+
+        thread = threading.Thread(target=renew, daemon=True)
+        thread.start()
+        try:
+            result = func(*args, **kwargs)
+            state.update(status='succeeded', result=str(result))
+            return result
+        except Exception as e:
+            state.update(status='failed', error=str(e))
+            raise
+        finally:
+            event_stop.set()
+            thread.join()
+            state.update(ended=timestamp(), renewed=timestamp())
+            self.backend.write_state(stage, state, lease_id)
+            self.backend.release(stage, lease_id)
+            logger.app_info(f"{stage}: run {state['run_id']} {state['status']}")
+
+
+def run_stage(config, stage, func, *args, **kwargs):
+    """
+    Run stage through coordinator if enabled in config, else run directly.
+
+    :param config: Project configuration.
+    :type config: dictionary
+    :param stage: Stage i.e. install_base, contracts or services.
+    :type stage: str
+    :param func: Function running the stage.
+    :type func: function
+    :return: Result of run.
+
+    """
+    coordinator = RunCoordinator.from_config(config)
+    if coordinator is None:
+        return func(*args, **kwargs)
+    return coordinator.run(stage, func, *args, **kwargs)
+
+# %%
@@ -0,0 +1,268 @@
+"""@file sampling.py
+
+
+
+@brief Deterministic sample / partition of serial numbers for dev runs and
+scale-out runs of the pipelines.
+
+
+@details
+Dev run mode (config: sampling.enable) restricts every raw read to a subset
+of units so that an end-to-end run completes in minutes. A unit is identified
+by the prefix of its serial number (e.g. 110-1234 of 110-1234-1a) and is
+sampled by a salted hash of the prefix, hence:
+    - the same units are sampled in every run and by every pipeline;
+    - a unit sampled in one source (SerialNumber, contracts, services,
+      events) is sampled in all others i.e. joins of the sample are
+      referentially consistent;
+    - ranges / lists of serial numbers (contracts, services) are kept if any
+      unit of the row is sampled.
+Rows without a recognisable serial number are kept so that no sampled unit is
+lost. Sources keyed by other ids (M2M shipments, BOM) are restricted to the
+keys of sampled data (restrict) instead of being hashed.
+
+Scale-out runs (see utils.scale_out) use the same hash to split units into
+partitions (config: scale_out.n_partitions); a run of partition k
+(scale_out.partition) keeps units of partition k, and partition_of assigns
+rows of outputs to the partition owning their unit.
+
+Example:
+    sampling = Sampling.from_config(config)
+    df_contract = sampling.sample(df_contract, 'contracts')
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# %% ***** Setup Environment *****
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from utils.logger import AppLogger
+
+logger = AppLogger(__name__)
+
+
+# %% ***** Sampling *****
+
+class Sampling:
+    """Hash based sample of units shared by all raw reads."""
+
+    # Prefix of serial number i.e. first two groups of a serial number which
+    # does not continue a previous group (1-3 of 110-1234-1-3)
+    PAT_UNIT = r'(?<![A-Z0-9-])[A-Z0-9]+-[A-Z0-9]+'
+
+    # Resolution of sampled fraction
+    N_BUCKETS = 1_000_000
+
+    def __init__(self, dict_sampling=None, dict_scale_out=None):
+        """
+        Initialise sampling.
+
+        :param dict_sampling: sampling settings of config_dcpd.json i.e.
+            enable, fraction, salt and sources (columns with serial numbers
+            of raw sources), defaults to None i.e. disabled.
+        :type dict_sampling: dictionary, optional
+        :param dict_scale_out: scale_out settings of config_dcpd.json i.e.
+            n_partitions and partition of the run, defaults to None i.e.
+            not partitioned.
+        :type dict_scale_out: dictionary, optional
+
+        """
+        dict_sampling = {} if dict_sampling is None else dict_sampling
+        dict_scale_out = {} if dict_scale_out is None else dict_scale_out
+
+        # Partition processed by the run; None processes all partitions
+        self.n_partitions = int(dict_scale_out.get('n_partitions', 1))
+        self.partition = dict_scale_out.get('partition')
+
+        f_sample = dict_sampling.get('enable', False)
+        self.fraction = float(dict_sampling.get('fraction', 1.0)) \
+            if f_sample else 1.0
+        self.f_enable = f_sample or (self.partition is not None)
+        self.dict_sources = dict_sampling.get('sources', {})
+
+        # hash_pandas_object takes a key of 16 characters
+        self.hash_key = hashlib.md5(str(dict_sampling.get(
+            'salt', '')).encode('utf-8')).hexdigest()[:16]
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Initialise sampling from sampling settings of config_dcpd.json.
+
+        :param config: Project configuration.
+        :type config: dictionary
+        :return: Sampling.
+        :rtype: Sampling
+
+        """
+        return cls(config.get('sampling', {}), config.get('scale_out', {}))
+
+    # ***** Units *****
+
+    def units(self, ar_serial):
+        """
+        Units (serial number prefixes) referred by each value.
+
+        :param ar_serial: Serial numbers, ranges or free text.
+        :type ar_serial: pandas Series
+        :return: List of units for each value.
+        :rtype: pandas Series
+
+        """
+        return ar_serial.astype(str).str.upper() \
+            .str.replace(r'\s*-[\s-]*', '-', regex=True) \
+            .str.findall(self.PAT_UNIT)
+
+    def hash_units(self, ar_unit):
+        """
+        Salted hash of units.
+
+        :param ar_unit: Units.
+        :type ar_unit: pandas Series
+        :return: Hash of each unit.
+        :rtype: numpy array
+
+        """
+        return pd.util.hash_pandas_object(
+            ar_unit.astype(str), index=False,
+            hash_key=self.hash_key).to_numpy()
+
+    def is_sampled(self, ar_unit):
+        """
+        Whether units are sampled; depends only on unit, salt, fraction and
+        partition. Sample and partition use independent digits of the hash.
+
+        :param ar_unit: Units.
+        :type ar_unit: pandas Series
+        :return: Flag for each unit.
+        :rtype: numpy array
+
+        """
+        ar_hash = self.hash_units(ar_unit)
+        f_sampled = (ar_hash % self.N_BUCKETS) < (
+            self.fraction * self.N_BUCKETS)
+        if self.partition is not None:
+            f_sampled &= (ar_hash // self.N_BUCKETS) % self.n_partitions \
+                == self.partition
+        return f_sampled
+
+    def partition_of(self, ar_serial):
+        """
+        Partition owning each serial number i.e. partition of its (first)
+        unit; values without unit are owned by partition 0.
+
+        :param ar_serial: Serial numbers.
+        :type ar_serial: pandas Series
+        :return: Partition of each value.
+        :rtype: numpy array
+
+        """
+        ar_unit = self.units(ar_serial.reset_index(drop=True)).str[0]
+
+        # Evaluate hash once per distinct unit
+        ar_codes, ar_uniques = pd.factorize(ar_unit)
+        ar_part = (self.hash_units(pd.Series(ar_uniques))
+                   // self.N_BUCKETS) % self.n_partitions
+        return np.append(ar_part, 0)[ar_codes].astype(int)
+
+    # ***** Data *****
+
+    def sample(self, df_data, source):
+        """
+        Rows of raw data referring to a sampled unit. Data is returned as is
+        if sampling is disabled or source is not sampled.
+
+        :param df_data: Raw data.
+        :type df_data: pandas DataFrame
+        :param source: Name of source in sampling.sources e.g. contracts.
+        :type source: str
+        :return: Sampled data.
+        :rtype: pandas DataFrame
+
+        """
+        ls_cols = [col for col in self.dict_sources.get(source, [])
+                   if col in df_data.columns]
+        if (not self.f_enable) or (not ls_cols) or df_data.empty:
+            return df_data
+
+        # Positions of rows; index of raw data need not be unique
+        ar_units = pd.concat([
+            self.units(df_data[col].reset_index(drop=True))
+            for col in ls_cols])
+        ar_units = ar_units.explode().dropna()
+
+        # Evaluate hash once per distinct unit
+        ar_codes, ar_uniques = pd.factorize(ar_units)
+        ar_sampled = pd.Series(
+            self.is_sampled(pd.Series(ar_uniques))[ar_codes],
+            index=ar_units.index)
+
+        # Kept: any unit sampled or no unit
+        f_sampled = ar_sampled.groupby(level=0).any()
+        f_keep = f_sampled.reindex(range(len(df_data)), fill_value=True)
+        df_data = df_data.loc[f_keep.to_numpy()]
+
+        logger.app_info(
+            f"Sampling {source}: {len(df_data)} of {len(f_keep)} rows")
+        return df_data
+
+    @staticmethod
+    def key_values(df_keys):
+        """
+        Comparable key of rows; numbers are compared as integers (1 and 1.0
+        are same key), text ignoring case and surrounding spaces.
+
+        :param df_keys: Columns of key.
+        :type df_keys: pandas DataFrame
+        :return: Key of each row.
+        :rtype: pandas Series
+
+        """
+        ls_keys = []
+        for col in df_keys.columns:
+            ar_text = df_keys[col].astype(str).str.strip().str.upper()
+            ar_num = pd.to_numeric(df_keys[col], errors='coerce')
+            f_int = ar_num.notna() & (ar_num % 1 == 0)
+            ar_text[f_int] = ar_num[f_int].astype('int64').astype(str)
+            ls_keys.append(ar_text)
+
+        ar_key = ls_keys[0]
+        for ar_text in ls_keys[1:]:
+            ar_key = ar_key + '|' + ar_text
+        return ar_key
+
+    def restrict(self, df_data, ls_cols, df_keys, source=''):
+        """
+        Rows of data whose key is a key of sampled data (semi join). Data is
+        returned as is if sampling is disabled.
+
+        :param df_data: Raw data.
+        :type df_data: pandas DataFrame
+        :param ls_cols: Columns of key in df_data.
+        :type ls_cols: list
+        :param df_keys: Keys of sampled data; columns in order of ls_cols.
+        :type df_keys: pandas DataFrame
+        :param source: Name of source for logs, defaults to ''.
+        :type source: str, optional
+        :return: Restricted data.
+        :rtype: pandas DataFrame
+
+        """
+        if (not self.f_enable) or df_data.empty:
+            return df_data
+
+        f_keep = self.key_values(df_data[ls_cols]).isin(
+            set(self.key_values(df_keys)))
+        logger.app_info(
+            f"Sampling {source}: {f_keep.sum()} of {len(df_data)} rows")
+        return df_data.loc[f_keep.to_numpy()]
+
+# %%
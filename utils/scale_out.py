@@ -0,0 +1,455 @@
+"""@file scale_out.py
+
+
+
+@brief Hash partitioned run of the pipeline chain across worker processes or
+nodes.
+
+
+@details
+Units (serial number prefixes, see utils.sampling) are split into
+n_partitions by a salted hash (config: scale_out). A run of partition k
+processes the whole chain (stages i.e. install base, contracts, services,
+contacts, lead generation) on its slice of every raw read:
+    - SerialNumber, contracts, services and events rows are kept if they
+      refer to a unit of partition k; rows referring to units of several
+      partitions (ranges) and rows without unit are read by all of them,
+    - M2M shipments are co-partitioned with their serial numbers and BOM
+      with Job_Index of the install base (Sampling.restrict).
+Partition k writes its results under <dir_results><dir>/part_k/ (local) or
+<dir>/part_k/<directory_name> (ADLS) along with a status file, so partitions
+run in a process pool or on separate nodes sharing the store (local
+directory, ADLS or its local stand-in).
+
+Reducer merges outputs of partitions into results of the full run. A row of
+an output is owned by the partition of its serial number
+(Sampling.partition_of); rows of other partitions (from rows read by several
+partitions) are dropped. Rows without unit are owned by partition 0, hence
+outputs are expected to be keyed by serial numbers i.e. a row without unit
+only derives from raw rows without unit (read by all partitions). Global
+aggregates are then applied to merged rows
+i.e. one customer per serial number and latest contact per serial number,
+source and contact type.
+
+Usage (from repository root):
+    python -m utils.scale_out                       # all partitions, reduce
+    python -m utils.scale_out --partition 3 --no-reduce   # partition on a node
+    python -m utils.scale_out --reduce-only         # after all partitions
+
+
+@copyright 2023 Eaton Corporation. All Rights Reserved.
+@note Eaton Corporation claims proprietary rights to the material disclosed
+here on. This technical information may not be reproduced or used without
+direct written permission from Eaton Corporation.
+"""
+
+# %% ***** Setup Environment *****
+
+import argparse
+import copy
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from utils import IO
+from utils.logger import AppLogger
+from utils.sampling import Sampling
+
+logger = AppLogger(__name__)
+
+# Outputs merged by reducer: column with serial number owning the row and
+# global aggregate of merged rows
+DICT_OUTPUTS = {
+    'output_iLead': {'column': 'Serial_Number'},
+    'ref_install': {'column': 'Serial_Number', 'unique': ['Serial_Number']},
+    # Same rule as Contacts.filter_latest
+    'contact': {'column': 'SerialNumber', 'latest': {
+        'by': ['SerialNumber', 'Source', 'Contact_Type', 'Date'],
+        'subset': ['SerialNumber', 'Source', 'Contact_Type']}},
+    'customer': {'column': 'Serial_Number', 'unique': ['Serial_Number']}}
+
+
+# %% ***** Stages *****
+# Pipelines are imported by the stage so that a worker imports only the
+# pipelines it runs. Install base runs once: it reads raw data and references
+# only, its second iteration in lead_generation.dcpd reproduces the first.
+
+def stage_install_base(config, mode):  # pragma: no cover
+    from utils.dcpd.class_installbase import InstallBase
+    return InstallBase(mode, config).main_install()
+
+
+def stage_contracts(config, mode):  # pragma: no cover
+    from utils.dcpd.class_contracts_data import Contract
+    return Contract(mode, config).main_contracts()
+
+
+def stage_services(config, mode):  # pragma: no cover
+    from utils.dcpd.class_services_data_past_release import \
+        ProcessServiceIncidents
+    return ProcessServiceIncidents(mode, config).main_services()
+
+
+def stage_contacts(config, mode):  # pragma: no cover
+    from utils.dcpd.class_generate_contacts import Contacts
+    return Contacts(mode, config).main_contact()
+
+
+def stage_lead_generation(config, mode):  # pragma: no cover
+    from utils.dcpd.class_lead_generation import LeadGeneration
+    return LeadGeneration(mode, config=config).main_lead_generation()
+
+
+DICT_STAGES = {
+    'install_base': stage_install_base,
+    'contracts': stage_contracts,
+    'services': stage_services,
+    'contacts': stage_contacts,
+    'lead_generation': stage_lead_generation}
+
+
+# %% ***** Scale-out *****
+
+class ScaleOut:
+    """
+    Hash partitioned run of the pipeline chain and reducer of its outputs.
+    """
+
+    def __init__(self, config, mode=None, dict_stages=None):
+        """
+        Initialize scale-out run.
+
+        :param config: Project configuration.
+        :type config: dictionary
+        :param mode: IO mode, defaults to conf.env of config.
+        :type mode: str, optional
+        :param dict_stages: Functions running stage by name; called with
+            config and mode of partition, defaults to None i.e. pipelines of
+            DICT_STAGES.
+        :type dict_stages: dictionary, optional
+
+        """
+        self.config = config
+        self.mode = config.get('conf.env', 'azure-adls') \
+            if mode is None else mode
+        self.dict_stages = DICT_STAGES if dict_stages is None \
+            else dict_stages
+
+        dict_scale_out = config.get('scale_out', {})
+        self.n_partitions = int(dict_scale_out.get('n_partitions', 1))
+        self.max_workers = int(dict_scale_out.get('max_workers', 1))
+        self.dir = dict_scale_out.get('dir', 'partitions')
+        self.ls_stages = dict_scale_out.get('stages', list(DICT_STAGES))
+        self.ls_outputs = dict_scale_out.get('outputs', list(DICT_OUTPUTS))
+
+        self.sampling = Sampling(
+            config.get('sampling', {}), {'n_partitions': self.n_partitions})
+
+    # ***** Locations *****
+
+    def partition_dir(self, partition):
+        return f'{self.dir}/part_{partition:02d}'
+
+    def partition_config(self, partition):
+        """
+        Configuration of a run of partition: results are written to the
+        directory of partition and raw reads keep units of partition.
+
+        :param partition: Partition.
+        :type partition: int
+        :return: Project configuration of partition.
+        :rtype: dictionary
+
+        """
+        config = copy.deepcopy(self.config)
+        dir_part = self.partition_dir(partition)
+
+        dict_file = config['file']
+        dict_file['dir_results'] = f"{dict_file['dir_results']}{dir_part}/"
+
+        ls_sections = [dict_file['Processed']]
+        while ls_sections:
+            dict_section = ls_sections.pop()
+            if 'directory_name' in dict_section:
+                dict_section['directory_name'] = \
+                    f"{dir_part}/{dict_section['directory_name']}"
+            ls_sections += [value for value in dict_section.values()
+                            if isinstance(value, dict)]
+
+        config['conf.env'] = self.mode
+        config.setdefault('scale_out', {})['partition'] = partition
+        return config
+
+    @staticmethod
+    def output_config(config, name):
+        """
+        Location of an output of the chain.
+
+        :param config: Project configuration (of partition or full run).
+        :type config: dictionary
+        :param name: Name of output i.e. output_iLead, ref_install, contact
+            or customer.
+        :type name: str
+        :return: Location of output.
+        :rtype: dictionary
+
+        """
+        dict_processed = config['file']['Processed']
+        dict_location = {
+            'output_iLead': ('output_iLead', 'file_name'),
+            'ref_install': ('output_iLead', 'ref_install'),
+            'contact': ('output_iLead_contact', 'file_name'),
+            'customer': ('customer', 'file_name')}
+
+        processed, key = dict_location[name]
+        dict_adls = dict_processed[processed]
+        return {'file_dir': config['file']['dir_results'],
+                'file_name': dict_adls[key],
+                'adls_config': dict_processed['adls_credentials'],
+                'adls_dir': {'container_name': dict_adls['container_name'],
+                             'directory_name': dict_adls['directory_name'],
+                             'file_name': dict_adls[key]}}
+
+    def status_config(self, partition):
+        """
+        Location of status of a run of partition.
+
+        :param partition: Partition.
+        :type partition: int
+        :return: Location of status.
+        :rtype: dictionary
+
+        """
+        config = self.partition_config(partition)
+        dict_processed = config['file']['Processed']
+        return {'file_dir': config['file']['dir_results'],
+                'file_name': 'scale_out_status.csv',
+                'adls_config': dict_processed['adls_credentials'],
+                'adls_dir': {
+                    'container_name':
+                        dict_processed['output_iLead']['container_name'],
+                    'directory_name': self.partition_dir(partition),
+                    'file_name': 'scale_out_status.csv'}}
+
+    # ***** Partitions *****
+
+    def run_partition(self, partition):
+        """
+        Run stages of the chain for a partition.
+
+        :param partition: Partition.
+        :type partition: int
+        :raises Exception: Stage failed.
+        :return: Status of stages i.e. stage, duration and status.
+        :rtype: pandas DataFrame
+
+        """
+        config = self.partition_config(partition)
+        config_status = self.status_config(partition)
+        if self.mode != 'azure-adls':
+            dict_file = config['file']
+            for dir_sub in ['', dict_file['dir_validation'],
+                            dict_file['dir_intermediate']]:
+                os.makedirs(dict_file['dir_results'] + dir_sub, exist_ok=True)
+
+        # Status of an earlier run is outdated
+        ls_status = []
+        IO.write_csv(self.mode, config_status, pd.DataFrame(
+            [['', 0.0, 'running']], columns=['stage', 'duration', 'status']))
+
+        for stage in self.ls_stages:
+            _step = f"Partition {partition}: {stage}"
+            time_start = time.time()
+            try:
+                self.dict_stages[stage](config, self.mode)
+                ls_status.append([stage, time.time() - time_start,
+                                  'succeeded'])
+                logger.app_success(_step)
+            except Exception as e:
+                logger.app_fail(_step, f'{traceback.print_exc()}')
+                ls_status.append([stage, time.time() - time_start, 'failed'])
+                IO.write_csv(self.mode, config_status, pd.DataFrame(
+                    ls_status, columns=['stage', 'duration', 'status']))
+                raise Exception(f'{_step}: Failed') from e
+
+        df_status = pd.DataFrame(
+            ls_status, columns=['stage', 'duration', 'status'])
+        IO.write_csv(self.mode, config_status, df_status)
+        return df_status
+
+    def run_partitions(self, ls_partitions=None):
+        """
+        Run partitions in a bounded process pool (scale_out.max_workers).
+
+        :param ls_partitions: Partitions to run, defaults to None i.e. all.
+        :type ls_partitions: list, optional
+        :return: Status of stages of each partition.
+        :rtype: dictionary
+
+        """
+        ls_partitions = list(range(self.n_partitions)) \
+            if ls_partitions is None else ls_partitions
+        max_workers = min(self.max_workers, len(ls_partitions))
+
+        dict_futures = {}
+        executor = None
+        if max_workers > 1:
+            executor = ProcessPoolExecutor(max_workers=max_workers)
+            dict_futures = {
+                partition: executor.submit(self.run_partition, partition)
+                for partition in ls_partitions}
+
+        dict_status = {}
+        try:
+            for partition in ls_partitions:
+                if partition in dict_futures:
+                    dict_status[partition] = dict_futures[partition].result()
+                else:
+                    dict_status[partition] = self.run_partition(partition)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        return dict_status
+
+    # ***** Reducer *****
+
+    def check_partitions(self):
+        """
+        Verify all partitions have run successfully.
+
+        :raises ValueError: Partitions not run, running or failed.
+        :return: Duration of each partition (seconds).
+        :rtype: dictionary
+
+        """
+        dict_duration = {}
+        ls_pending = []
+        for partition in range(self.n_partitions):
+            try:
+                df_status = IO.read_csv(
+                    self.mode, self.status_config(partition))
+            except Exception:
+                df_status = pd.DataFrame(columns=['duration', 'status'])
+
+            if (len(df_status) == 0) or (
+                    df_status['status'] != 'succeeded').any():
+                ls_pending.append(partition)
+            dict_duration[partition] = df_status['duration'].sum()
+
+        if ls_pending:
+            raise ValueError(f"Partitions not succeeded: {ls_pending}")
+        return dict_duration
+
+    def owned(self, df_data, column, partition):
+        """
+        Rows of output of a partition owned by the partition.
+
+        :param df_data: Output of partition.
+        :type df_data: pandas DataFrame
+        :param column: Column with serial number.
+        :type column: str
+        :param partition: Partition.
+        :type partition: int
+        :return: Owned rows.
+        :rtype: pandas DataFrame
+
+        """
+        f_owned = self.sampling.partition_of(df_data[column]) == partition
+        return df_data.loc[f_owned]
+
+    @staticmethod
+    def aggregate(df_data, dict_output):
+        """
+        Apply global aggregate of output to merged rows.
+
+        :param df_data: Merged output.
+        :type df_data: pandas DataFrame
+        :param dict_output: Output settings of DICT_OUTPUTS.
+        :type dict_output: dictionary
+        :return: Aggregated output.
+        :rtype: pandas DataFrame
+
+        """
+        if 'latest' in dict_output:
+            dict_latest = dict_output['latest']
+            df_data = df_data.sort_values(
+                by=dict_latest['by'], ascending=False, kind='stable'
+            ).drop_duplicates(subset=dict_latest['subset'], keep='first')
+        if 'unique' in dict_output:
+            df_data = df_data.drop_duplicates(
+                subset=dict_output['unique'], keep='first')
+        return df_data.reset_index(drop=True)
+
+    def reduce(self):
+        """
+        Merge outputs of partitions into results of the full run.
+
+        :raises Exception: Partitions not succeeded or output not readable.
+        :return: Rows of each output.
+        :rtype: dictionary
+
+        """
+        _step = 'Check partitions'
+        try:
+            dict_duration = self.check_partitions()
+            logger.app_info(f"Partitions (s): {dict_duration}")
+
+            dict_rows = {}
+            for name in self.ls_outputs:
+                _step = f'Reduce output: {name}'
+                dict_output = DICT_OUTPUTS[name]
+
+                ls_data = []
+                for partition in range(self.n_partitions):
+                    df_part = IO.read_csv(self.mode, self.output_config(
+                        self.partition_config(partition), name))
+                    ls_data.append(self.owned(
+                        df_part, dict_output['column'], partition))
+
+                df_out = self.aggregate(
+                    pd.concat(ls_data, ignore_index=True), dict_output)
+                IO.write_csv(
+                    self.mode, self.output_config(self.config, name), df_out)
+                dict_rows[name] = len(df_out)
+                logger.app_success(_step)
+
+        except Exception as e:
+            logger.app_fail(_step, f'{traceback.print_exc()}')
+            raise Exception(f'{_step}: Failed') from e
+
+        return dict_rows
+
+
+# %% ***** Main *****
+
+if __name__ == "__main__":  # pragma: no cover
+    parser = argparse.ArgumentParser(
+        description="Hash partitioned run of the pipeline chain")
+    parser.add_argument("--config", default="config/config_dcpd.json")
+    parser.add_argument("--mode", default=None)
+    parser.add_argument("--partition", type=int, action="append",
+                        help="partition to run; repeat for several, "
+                             "defaults to all")
+    parser.add_argument("--no-reduce", action="store_true")
+    parser.add_argument("--reduce-only", action="store_true")
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as file:
+        config_dcpd = json.load(file)
+
+    scale_out = ScaleOut(config_dcpd, args.mode)
+    if not args.reduce_only:
+        for part, df_part_status in scale_out.run_partitions(
+                args.partition).items():
+            print(f"partition {part}: "
+                  f"{df_part_status['duration'].sum():.1f} s")
+    if not args.no_reduce:
+        for output, n_rows in scale_out.reduce().items():
+            print(f"{output}: {n_rows} rows")
+
+# %%
@@ -28,6 +28,8 @@ from utils import IO
 from utils import AppLogger
 from string import punctuation
 import traceback
+import hashlib
+import numpy as np
 import pandas as pd
 import json
 import os
@@ -41,18 +43,29 @@ logger = AppLogger(__name__, level='Debug')
 
 class StrategicCustomer:
 
-    def __init__(self):
+    # Resolved customer identities: listing signature -> {(CompanyName,
+    # CompanyAliasName, CompanyDomain): row of listing, -1 if not strategic}.
+    # Shared by all instances so InstallBase and LeadGeneration resolve each
+    # identity once.
+    dict_resolution = {}
+
+    ls_col_key = ['CompanyName', 'CompanyAliasName', 'CompanyDomain']
+
+    ls_col_cache = ls_col_key + ['RefIndex', 'Signature']
+
+    def __init__(self, config=None):
         config_dir = os.path.join(os.path.dirname(__file__), "../config")
         config_file = os.path.join(config_dir, "config_dcpd.json") 
         try:
         # Read the configuration file
-            with open(config_file, 'r') as config_file:
-                config = json.load(config_file)
+            if config is None:
+                with open(config_file, 'r') as config_file:
+                    config = json.load(config_file)
         except Exception as e:
             return e
         self.mode = config.get("conf.env", "azure-adls")
-
-        
+        self.config = config
+        self.init_cache(self.mode, config)
 
         self.dict_con = {0: ['MatchType_00', 'CompanyName'],
                          1: ['MatchType_01', 'CompanyAliasName'],
@@ -61,6 +74,33 @@ class StrategicCustomer:
         self.ls_col_exp = ['Serial_Number', 'CompanyName',
                            'CompanyAliasName', 'CompanyDomain']
 
+    def init_cache(self, mode, config):
+        """
+        Configure persisted resolution of customer identities.
+
+        :param mode: IO mode i.e. 'local' or 'azure-adls'.
+        :type mode: String.
+        :param config: Project configuration.
+        :type config: Dictionary.
+
+        """
+        self.mode = mode
+        self.n_persisted = 0
+
+        dict_cache = config.get(
+            "strategic_customer", {}).get("cache", {})
+        self.f_cache = bool(dict_cache.get("enable", False))
+        if self.f_cache:
+            self.cache_config = {
+                "file_dir": config["file"]["dir_results"]
+                + config["file"]["dir_intermediate"],
+                "file_name": config["file"]["Processed"][
+                    "customer_resolution_cache"]["file_name"],
+                "adls_config": config["file"]["Processed"]["adls_credentials"],
+                "adls_dir": config["file"]["Processed"][
+                    "customer_resolution_cache"],
+            }
+
     def main_customer_list(self, df_leads=None):  # pragma: no cover
         """
         Main pipeline for identifying strategic customers.
@@ -93,7 +133,10 @@ class StrategicCustomer:
 
             # Identify Strategic Customers
             _step = 'Identify Strategic Customers'
+            signature = self.listing_signature(ref_df)
+            self.load_resolution(signature)
             df_out = self.pipeline_identify_customers(ref_df, df_leads)
+            self.export_resolution(signature)
             logger.app_success(_step)
 
             # Export data
@@ -354,44 +397,24 @@ class StrategicCustomer:
         try:
             logger.app_info("Identify Strategic Customers : STARTED")
 
-            # Identify
             ref_df = ref_df.reset_index(drop=True)
-            # Iterate the reference file for every stretegic customer detail
-            for row_ix in ref_df.index:
-                # row_ix = ref_df.index[0]
-
-                # Select the row from reference file
-                ac_info = ref_df.iloc[row_ix, 1:]
-                display_name = ref_df.DisplayName[row_ix]
-                flag_all, ls_col_exp = self.identify_customer(
-                    df_leads, ac_info)
-                df_leads['flag_all'] = flag_all
-
-                # Output
-                df_temp = df_leads.loc[df_leads['flag_all'], ls_col_exp].copy()
-                df_temp['StrategicCustomer'] = display_name
-
-                if 'df_out' not in locals():
-                    df_out = df_temp.copy()
-                else:
-                    df_out = pd.concat([df_out, df_temp])
-                del df_temp
+            df_leads = df_leads.loc[:, self.ls_col_exp]
 
-                # Drop from org data
-                df_leads = df_leads.loc[~ df_leads['flag_all'], ls_col_exp]
+            # Row of listing for every serial number; serial numbers are
+            # grouped in order of listing, NOT categorized are at the end
+            ar_ref_ix = self.resolve_customers(ref_df, df_leads)
+            ar_ref_ix = np.where(ar_ref_ix >= 0, ar_ref_ix, ref_df.shape[0])
+            ar_order = np.argsort(ar_ref_ix, kind='stable')
 
-                if df_leads.shape[0] == 0:
-                    break
-
-                logger.app_debug(
-                    f"{row_ix}/{ref_df.shape[0]}: {display_name}", 2)
+            df_out = df_leads.iloc[ar_order].copy()
+            ar_display = np.append(
+                ref_df.DisplayName.to_numpy(dtype=object), 'Other')
+            df_out['StrategicCustomer'] = ar_display[ar_ref_ix[ar_order]]
 
             # NOT categorized customers will be tagged as customer
-            df_leads['StrategicCustomer'] = 'Other'
-            df_leads['StrategicCustomer_new'] = df_leads['CompanyName']
-
-            df_out['StrategicCustomer_new'] = df_out['StrategicCustomer'].copy()
-            df_out = pd.concat([df_out, df_leads])
+            f_strategic = ar_ref_ix[ar_order] < ref_df.shape[0]
+            df_out['StrategicCustomer_new'] = df_out['StrategicCustomer'].where(
+                f_strategic, df_out['CompanyName'])
 
             return df_out
 
@@ -399,6 +422,166 @@ class StrategicCustomer:
             logger.app_fail(_step, f"{traceback.print_exc()}")
             raise Exception from e
 
+    # ***** Resolution Cache *****
+
+    @staticmethod
+    def listing_signature(ref_df):
+        """
+        Signature of the (formatted) AccountManagerListing; resolved
+        customers are discarded when the listing changes.
+
+        :param ref_df: reference file for strategic customers identification.
+        :type ref_df: pandas DataFrame.
+        :return: Signature of listing.
+        :rtype: String
+
+        """
+        ar_hash = pd.util.hash_pandas_object(
+            ref_df.reset_index(drop=True), index=True).to_numpy()
+        str_cols = '\t'.join(map(str, ref_df.columns))
+        return hashlib.sha1(
+            ar_hash.tobytes() + str_cols.encode()).hexdigest()
+
+    def customer_key(self, df_leads):
+        """
+        Normalized customer identity of serial numbers.
+
+        :param df_leads: Customer, ShipTo customer and emails of serial numbers.
+        :type df_leads: pandas DataFrame.
+        :return: Identity i.e. (CompanyName, CompanyAliasName, CompanyDomain).
+        :rtype: pandas Series
+
+        """
+        ls_key = [df_leads[col].fillna('').astype(str).str.lower()
+                  for col in self.ls_col_key]
+        return pd.Series(list(zip(*ls_key)), index=df_leads.index,
+                         dtype=object)
+
+    def resolve_customers(self, ref_df, df_leads):
+        """
+        Row of listing identifying strategic customer of every serial number.
+        Each distinct customer identity is evaluated once; identities
+        resolved earlier against the same listing are reused.
+
+        :param ref_df: reference file for strategic customers identification.
+        :type ref_df: pandas DataFrame.
+        :param df_leads: Customer, ShipTo customer and emails of serial numbers.
+        :type df_leads: pandas DataFrame.
+        :return: Row of listing; -1 if not a strategic customer.
+        :rtype: numpy array
+
+        """
+        ref_df = ref_df.reset_index(drop=True)
+        dict_resolved = self.dict_resolution.setdefault(
+            self.listing_signature(ref_df), {})
+
+        ar_codes, ar_uniques = pd.factorize(self.customer_key(df_leads))
+        ls_new = [key for key in ar_uniques if key not in dict_resolved]
+        logger.app_debug(
+            f"Resolve customers: {len(ar_uniques)} identities, "
+            f"{len(ls_new)} new", 2)
+
+        if len(ls_new) > 0:
+            df_new = pd.DataFrame(ls_new, columns=self.ls_col_key)
+            dict_resolved.update(zip(
+                ls_new, self.evaluate_customers(ref_df, df_new)))
+
+        ar_ref_ix = np.array(
+            [dict_resolved[key] for key in ar_uniques], dtype=np.int64)
+        return ar_ref_ix[ar_codes]
+
+    def evaluate_customers(self, ref_df, df_key):
+        """
+        Evaluate customer identities against listing; identity belongs to the
+        first strategic customer it matches.
+
+        :param ref_df: reference file for strategic customers identification.
+        :type ref_df: pandas DataFrame.
+        :param df_key: Distinct customer identities.
+        :type df_key: pandas DataFrame.
+        :return: Row of listing; -1 if not a strategic customer.
+        :rtype: numpy array
+
+        """
+        ar_ref_ix = np.full(df_key.shape[0], -1, dtype=np.int64)
+        df_key = df_key.reset_index(drop=True)
+
+        # Iterate the reference file for every stretegic customer detail
+        for row_ix in ref_df.index:
+            if df_key.shape[0] == 0:
+                break
+
+            ac_info = ref_df.iloc[row_ix, 1:]
+            flag_all, _ = self.identify_customer(df_key, ac_info)
+            flag_all = flag_all.to_numpy(dtype=bool)
+
+            ar_ref_ix[df_key.index[flag_all]] = row_ix
+            df_key = df_key.loc[~flag_all, self.ls_col_key]
+
+            logger.app_debug(
+                f"{row_ix}/{ref_df.shape[0]}: {ref_df.DisplayName[row_ix]}", 2)
+
+        return ar_ref_ix
+
+    def load_resolution(self, signature):
+        """
+        Load persisted customer identities resolved against the listing;
+        entries resolved against a different listing are discarded.
+
+        :param signature: Signature of current listing.
+        :type signature: String
+
+        """
+        _step = "Read customer resolution cache"
+
+        dict_resolved = self.dict_resolution.setdefault(signature, {})
+        if self.f_cache and (len(dict_resolved) == 0):
+            try:
+                df_cache = IO.read_csv(self.mode, self.cache_config)
+                df_cache = df_cache.loc[
+                    df_cache['Signature'].astype(str) == signature,
+                    self.ls_col_cache]
+                ls_key = self.customer_key(df_cache)
+                dict_resolved.update(zip(
+                    ls_key, df_cache['RefIndex'].astype(int)))
+                logger.app_info(f"{_step}: {len(dict_resolved)} identities")
+            except Exception:
+                # Cache is not available for the very first run
+                logger.app_info(f"{_step}: cache not available")
+
+        self.n_persisted = len(dict_resolved)
+
+    def export_resolution(self, signature):
+        """
+        Persist customer identities resolved against the listing.
+
+        :param signature: Signature of current listing.
+        :type signature: String
+        :return: Status of export.
+        :rtype: String
+
+        """
+        _step = "Export customer resolution cache"
+
+        dict_resolved = self.dict_resolution.get(signature, {})
+        if (not self.f_cache) or (len(dict_resolved) == self.n_persisted):
+            return "skipped"
+
+        try:
+            df_cache = pd.DataFrame(
+                list(dict_resolved.keys()), columns=self.ls_col_key)
+            df_cache['RefIndex'] = list(dict_resolved.values())
+            df_cache['Signature'] = signature
+            status = IO.write_csv(self.mode, self.cache_config, df_cache)
+            self.n_persisted = len(dict_resolved)
+            logger.app_success(_step)
+        except Exception:
+            # Failing to persist cache must not fail the pipeline
+            logger.app_fail(_step, f"{traceback.print_exc()}")
+            status = "unsuccessful !"
+
+        return status
+
     def identify_customer(self, df_input, ac_info):
         """
         Identify if a serial number is one of the strategic customer based on